@@ -0,0 +1,107 @@
+"""partition_audit_logs_and_login_history
+
+Revision ID: a7d3e9b15c42
+Revises: e2b7c4a91d06
+Create Date: 2025-11-27 09:48:21.604117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e9b15c42'
+down_revision = 'e2b7c4a91d06'
+branch_labels = None
+depends_on = None
+
+# Mois créés à l'avance ; la tâche planifiée partition_maintenance prend ensuite le relais
+PREMAKE_MONTHS = 3
+
+# Table -> (colonne de partitionnement, colonnes indexées, clés étrangères (colonne, table, colonne))
+PARTITIONED_TABLES = {
+    'audit_logs': (
+        'timestamp',
+        ['action_type', 'actor_id', 'actor_username', 'target_id', 'target_type', 'timestamp'],
+        [('actor_id', 'users', 'id')],
+    ),
+    'login_history': (
+        'created_at',
+        ['created_at', 'success', 'user_id', 'username'],
+        [],
+    ),
+}
+
+
+def _create_keys_and_indexes(table: str, primary_key: list, indexed_columns: list, foreign_keys: list) -> None:
+    op.create_primary_key(f'{table}_pkey', table, primary_key)
+    for column, referred_table, referred_column in foreign_keys:
+        op.create_foreign_key(f'{table}_{column}_fkey', table, referred_table, [column], [referred_column])
+    for column in indexed_columns:
+        op.create_index(op.f(f'ix_{table}_{column}'), table, [column], unique=False)
+
+
+def _partition(table: str, column: str, indexed_columns: list, foreign_keys: list) -> None:
+    staging = f'{table}_partitioned'
+    op.execute(f'CREATE TABLE {staging} (LIKE {table} INCLUDING DEFAULTS) PARTITION BY RANGE ("{column}")')
+
+    # Une partition par mois (UTC), des données existantes jusqu'aux prochains mois
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            current_month timestamp := date_trunc(
+                'month', COALESCE((SELECT MIN("{column}") FROM {table}), now()) AT TIME ZONE 'UTC'
+            );
+            last_month timestamp := date_trunc('month', now() AT TIME ZONE 'UTC')
+                + interval '{PREMAKE_MONTHS} months';
+        BEGIN
+            WHILE current_month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF {staging} FOR VALUES FROM (%L) TO (%L)',
+                    '{table}_p' || to_char(current_month, 'YYYYMM'),
+                    current_month AT TIME ZONE 'UTC',
+                    (current_month + interval '1 month') AT TIME ZONE 'UTC'
+                );
+                current_month := current_month + interval '1 month';
+            END LOOP;
+        END $$;
+        """
+    )
+    # Filet de sécurité si la maintenance n'a pas créé la partition du mois
+    op.execute(f'CREATE TABLE {table}_default PARTITION OF {staging} DEFAULT')
+
+    op.execute(f'INSERT INTO {staging} SELECT * FROM {table}')
+    op.drop_table(table)
+    op.rename_table(staging, table)
+    # La clé primaire d'une table partitionnée doit inclure la colonne de partitionnement
+    _create_keys_and_indexes(table, ['id', column], indexed_columns, foreign_keys)
+
+
+def _unpartition(table: str, indexed_columns: list, foreign_keys: list) -> None:
+    staging = f'{table}_unpartitioned'
+    op.execute(f'CREATE TABLE {staging} (LIKE {table} INCLUDING DEFAULTS)')
+    # Les partitions déjà détachées (schéma d'archive) ne sont pas réintégrées
+    op.execute(f'INSERT INTO {staging} SELECT * FROM {table}')
+    op.drop_table(table)
+    op.rename_table(staging, table)
+    _create_keys_and_indexes(table, ['id'], indexed_columns, foreign_keys)
+
+
+def upgrade() -> None:
+    # Tables en ajout seul, interrogées par période : partitions mensuelles, rétention par DETACH PARTITION
+    for table, (column, indexed_columns, foreign_keys) in PARTITIONED_TABLES.items():
+        _partition(table, column, indexed_columns, foreign_keys)
+
+    # sales / sale_items restent non partitionnées (sale_items.sale_id référence sales.id, ce
+    # qu'une table partitionnée par date ne permet pas) : index pour les requêtes par période
+    op.create_index(op.f('ix_sales_created_at'), 'sales', ['created_at'], unique=False)
+    op.create_index(op.f('ix_sale_items_sale_id'), 'sale_items', ['sale_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_sale_items_sale_id'), table_name='sale_items')
+    op.drop_index(op.f('ix_sales_created_at'), table_name='sales')
+
+    for table, (_, indexed_columns, foreign_keys) in PARTITIONED_TABLES.items():
+        _unpartition(table, indexed_columns, foreign_keys)
@@ -0,0 +1,31 @@
+"""add_email_outbox_columns
+
+Revision ID: b7e2c9d41f0a
+Revises: edb26c4fe53b
+Create Date: 2025-11-24 09:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2c9d41f0a'
+down_revision = 'edb26c4fe53b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Colonnes de l'outbox email : les envois sont mis en file et traités par EmailOutboxWorker
+    op.add_column('email_logs', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('email_logs', sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('email_logs', sa.Column('outbox_payload', sa.Text(), nullable=True))
+    op.create_index(op.f('ix_email_logs_next_attempt_at'), 'email_logs', ['next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_email_logs_next_attempt_at'), table_name='email_logs')
+    op.drop_column('email_logs', 'outbox_payload')
+    op.drop_column('email_logs', 'next_attempt_at')
+    op.drop_column('email_logs', 'attempts')
@@ -0,0 +1,59 @@
+"""add_cash_session_close_jobs
+
+Revision ID: c41d8e2a7b93
+Revises: b7e2c9d41f0a
+Create Date: 2025-11-25 16:03:27.502914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41d8e2a7b93'
+down_revision = 'b7e2c9d41f0a'
+branch_labels = None
+depends_on = None
+
+
+close_job_status = postgresql.ENUM('pending', 'running', 'completed', 'failed', name='closejobstatus', create_type=False)
+close_job_step_status = postgresql.ENUM('pending', 'done', 'skipped', 'failed', name='closejobstepstatus', create_type=False)
+
+
+def upgrade() -> None:
+    # Pipeline post-fermeture des sessions de caisse (rapport, email, kDrive) traité par CashSessionCloseWorker
+    close_job_status.create(op.get_bind(), checkfirst=True)
+    close_job_step_status.create(op.get_bind(), checkfirst=True)
+    op.create_table('cash_session_close_jobs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('cash_session_id', sa.UUID(), nullable=False),
+    sa.Column('status', close_job_status, nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('report_status', close_job_step_status, nullable=False),
+    sa.Column('report_filename', sa.String(), nullable=True),
+    sa.Column('email_status', close_job_step_status, nullable=False),
+    sa.Column('email_log_id', sa.UUID(), nullable=True),
+    sa.Column('kdrive_status', close_job_step_status, nullable=False),
+    sa.Column('kdrive_remote_path', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['cash_session_id'], ['cash_sessions.id'], ),
+    sa.ForeignKeyConstraint(['email_log_id'], ['email_logs.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_cash_session_close_jobs_cash_session_id'), 'cash_session_close_jobs', ['cash_session_id'], unique=True)
+    op.create_index(op.f('ix_cash_session_close_jobs_next_attempt_at'), 'cash_session_close_jobs', ['next_attempt_at'], unique=False)
+    op.create_index(op.f('ix_cash_session_close_jobs_status'), 'cash_session_close_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_cash_session_close_jobs_status'), table_name='cash_session_close_jobs')
+    op.drop_index(op.f('ix_cash_session_close_jobs_next_attempt_at'), table_name='cash_session_close_jobs')
+    op.drop_index(op.f('ix_cash_session_close_jobs_cash_session_id'), table_name='cash_session_close_jobs')
+    op.drop_table('cash_session_close_jobs')
+    close_job_step_status.drop(op.get_bind(), checkfirst=True)
+    close_job_status.drop(op.get_bind(), checkfirst=True)
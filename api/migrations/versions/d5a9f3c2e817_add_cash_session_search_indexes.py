@@ -0,0 +1,38 @@
+"""add_cash_session_search_indexes
+
+Revision ID: d5a9f3c2e817
+Revises: c41d8e2a7b93
+Create Date: 2025-11-26 10:12:44.318027
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a9f3c2e817'
+down_revision = 'c41d8e2a7b93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Recherche ILIKE '%...%' de l'historique des sessions (opérateur, ID de session)
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_users_username_trgm "
+        "ON users USING gin (username gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_cash_sessions_id_text_trgm "
+        "ON cash_sessions USING gin ((id::text) gin_trgm_ops)"
+    )
+    # Pagination par curseur (opened_at, id)
+    op.create_index('ix_cash_sessions_opened_at_id', 'cash_sessions', ['opened_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_cash_sessions_opened_at_id', table_name='cash_sessions')
+    op.execute("DROP INDEX IF EXISTS ix_cash_sessions_id_text_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_users_username_trgm")
+    # L'extension pg_trgm est conservée : d'autres objets peuvent en dépendre
@@ -0,0 +1,42 @@
+"""add_ticket_depot_totals
+
+Revision ID: e2b7c4a91d06
+Revises: d5a9f3c2e817
+Create Date: 2025-11-26 14:37:09.562184
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b7c4a91d06'
+down_revision = 'd5a9f3c2e817'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Totaux dénormalisés des tickets de dépôt (liste des tickets sans charger les lignes)
+    op.add_column('ticket_depot', sa.Column('total_lignes', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('ticket_depot', sa.Column('total_poids_kg', sa.Numeric(precision=10, scale=3), server_default='0', nullable=False))
+
+    # Reprise des tickets existants
+    op.execute(
+        """
+        UPDATE ticket_depot AS t
+        SET total_lignes = agg.total_lignes,
+            total_poids_kg = agg.total_poids_kg
+        FROM (
+            SELECT ticket_id, COUNT(*) AS total_lignes, COALESCE(SUM(poids_kg), 0) AS total_poids_kg
+            FROM ligne_depot
+            GROUP BY ticket_id
+        ) AS agg
+        WHERE agg.ticket_id = t.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('ticket_depot', 'total_poids_kg')
+    op.drop_column('ticket_depot', 'total_lignes')
@@ -4,13 +4,17 @@ from typing import Optional, List
 from datetime import datetime, timezone
 import uuid
 import logging
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
 from uuid import UUID
 
 from recyclic_api.core.database import get_db
-from recyclic_api.core.auth import get_current_user, require_admin_role, require_admin_role_strict
+from recyclic_api.utils.rate_limit import limiter
+from recyclic_api.utils.response_cache import invalidate_response_cache
+from recyclic_api.core.auth import (
+    get_current_user,
+    invalidate_user_auth_cache,
+    require_admin_role,
+    require_admin_role_strict,
+)
 from recyclic_api.core.audit import log_role_change, log_admin_access, log_audit, AuditActionType
 from recyclic_api.models.user import User, UserRole, UserStatus
 from recyclic_api.models.user_status_history import UserStatusHistory
@@ -46,9 +50,6 @@ from recyclic_api.services.activity_service import (
 router = APIRouter(tags=["admin"])
 logger = logging.getLogger(__name__)
 
-# Configuration du rate limiting
-limiter = Limiter(key_func=get_remote_address)
-
 # La fonction require_admin_role est maintenant import├®e depuis core.auth
 
 @router.get(
@@ -304,6 +305,7 @@ def update_user_role(
         user.role = role_update.role
         db.commit()
         db.refresh(user)
+        invalidate_user_auth_cache(user.id)
 
         # Log de la modification de r├┤le
         log_role_change(
@@ -433,6 +435,7 @@ async def approve_user(
         user.status = UserStatus.APPROVED
         db.commit()
         db.refresh(user)
+        invalidate_user_auth_cache(user.id)
 
         # Log de l'approbation
         log_role_change(
@@ -536,6 +539,7 @@ async def reject_user(
         user.status = UserStatus.REJECTED
         db.commit()
         db.refresh(user)
+        invalidate_user_auth_cache(user.id)
 
         # Log du rejet
         log_role_change(
@@ -652,6 +656,7 @@ def update_user_status(
         user.is_active = status_update.is_active
         db.commit()
         db.refresh(user)
+        invalidate_user_auth_cache(user.id)
 
         # Cr├®er une entr├®e dans l'historique
         status_history = UserStatusHistory(
@@ -782,6 +787,7 @@ def update_user_profile(
 
         db.commit()
         db.refresh(user)
+        invalidate_user_auth_cache(user.id)
 
         # Log de la modification de profil
         log_role_change(
@@ -1801,6 +1807,7 @@ async def update_activity_threshold(
         db.commit()
         db.refresh(setting)
         ActivityService.refresh_cache(threshold)
+        invalidate_response_cache("settings")
         
         # Log de l'audit
         log_audit(
@@ -9,7 +9,7 @@ import time
 import uuid
 
 from recyclic_api.core.database import get_db
-from recyclic_api.core.security import create_access_token, verify_password, hash_password, create_password_reset_token, verify_reset_token
+from recyclic_api.core.security import create_access_token, verify_and_update_password_async, hash_password_async, create_password_reset_token, verify_reset_token
 from recyclic_api.core.audit import log_audit, AuditActionType
 from recyclic_api.core.auth import get_current_user
 from recyclic_api.models.user import User, UserRole, UserStatus
@@ -18,7 +18,7 @@ from recyclic_api.schemas.auth import LoginRequest, LoginResponse, AuthUser, Sig
 from recyclic_api.schemas.pin import PinAuthRequest, PinAuthResponse
 from recyclic_api.utils.auth_metrics import auth_metrics
 from recyclic_api.core.uuid_validation import validate_and_convert_uuid
-from recyclic_api.utils.password_reset_email import send_password_reset_email_safe
+from recyclic_api.utils.password_reset_email import queue_password_reset_email
 from recyclic_api.core.config import settings
 from recyclic_api.services.activity_service import ActivityService
 
@@ -87,8 +87,9 @@ async def login(request: Request, payload: LoginRequest, db: Session = Depends(g
             detail="Identifiants invalides ou utilisateur inactif",
         )
 
-    # Vérifier le mot de passe
-    if not verify_password(payload.password, user.hashed_password):
+    # Vérifier le mot de passe (bcrypt exécuté hors de la boucle d'événements)
+    password_valid, new_password_hash = await verify_and_update_password_async(payload.password, user.hashed_password)
+    if not password_valid:
         # Log failed login attempt due to invalid password
         logger.warning(f"Failed login attempt for username: {payload.username}, IP: {client_ip}")
 
@@ -132,6 +133,10 @@ async def login(request: Request, payload: LoginRequest, db: Session = Depends(g
             detail="Identifiants invalides ou utilisateur inactif",
         )
 
+    # Rehash transparent si le coût bcrypt a changé (commité avec l'historique de connexion)
+    if new_password_hash:
+        user.hashed_password = new_password_hash
+
     # Créer le token JWT
     token = create_access_token({"sub": str(user.id)})
 
@@ -227,7 +232,7 @@ async def signup(request: Request, payload: SignupRequest, db: Session = Depends
             )
 
     # Hasher le mot de passe
-    hashed_password = hash_password(payload.password)
+    hashed_password = await hash_password_async(payload.password)
 
     # Créer le nouvel utilisateur
     new_user = User(
@@ -276,16 +281,18 @@ async def forgot_password(request: Request, payload: ForgotPasswordRequest, db:
         base_url = getattr(settings, 'FRONTEND_URL', 'http://localhost:4444')
         reset_link = f"{base_url}/reset-password?token={reset_token}"
 
-        # Envoyer l'email de réinitialisation
+        # Mettre l'email en file (outbox) : l'envoi Brevo est fait par le worker
         try:
-            email_sent = send_password_reset_email_safe(
+            email_sent = queue_password_reset_email(
+                db=db,
                 to_email=user.email,
                 reset_link=reset_link,
-                user_name=user.first_name or user.username
+                user_name=user.first_name or user.username,
+                user_id=user.id
             )
             
             if email_sent:
-                logger.info(f"Password reset email sent successfully to {user.email}")
+                logger.info(f"Password reset email queued for {user.email}")
                 
                 # Log audit for password reset request
                 log_audit(
@@ -298,7 +305,7 @@ async def forgot_password(request: Request, payload: ForgotPasswordRequest, db:
                     db=db
                 )
             else:
-                logger.error(f"Failed to send password reset email to {user.email}")
+                logger.error(f"Failed to queue password reset email to {user.email}")
                 
         except Exception as e:
             logger.error(f"Error sending password reset email to {user.email}: {e}")
@@ -343,7 +350,7 @@ async def reset_password(payload: ResetPasswordRequest, db: Session = Depends(ge
         )
 
     # Hasher le nouveau mot de passe
-    new_hashed_password = hash_password(payload.new_password)
+    new_hashed_password = await hash_password_async(payload.new_password)
 
     # Mettre à jour le mot de passe
     user.hashed_password = new_hashed_password
@@ -393,8 +400,9 @@ async def authenticate_with_pin(
             detail="Utilisateur invalide, inactif ou PIN non défini",
         )
 
-    # Vérifier le PIN
-    if not verify_password(payload.pin, user.hashed_pin):
+    # Vérifier le PIN (bcrypt exécuté hors de la boucle d'événements)
+    pin_valid, new_pin_hash = await verify_and_update_password_async(payload.pin, user.hashed_pin)
+    if not pin_valid:
         logger.warning(f"Failed PIN auth attempt for user_id: {payload.user_id}, IP: {client_ip}")
 
         # Record metrics for failed PIN auth
@@ -412,6 +420,14 @@ async def authenticate_with_pin(
             detail="PIN invalide",
         )
 
+    # Rehash transparent du PIN si le coût bcrypt a changé
+    if new_pin_hash:
+        user.hashed_pin = new_pin_hash
+        try:
+            db.commit()
+        except Exception:
+            db.rollback()
+
     # Créer le token JWT
     token = create_access_token({"sub": str(user.id)})
 
@@ -13,12 +13,14 @@ from recyclic_api.schemas.cash_register import (
 )
 from recyclic_api.services.cash_register_service import CashRegisterService
 from recyclic_api.services.cash_session_service import CashSessionService
+from recyclic_api.utils.response_cache import cache_response, invalidates_response_cache
 
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[CashRegisterResponse], summary="Lister les postes de caisse")
+@cache_response("cash_registers", response_model=List[CashRegisterResponse])
 async def list_cash_registers(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=200),
@@ -68,6 +70,7 @@ async def get_cash_register(
 
 
 @router.post("/", response_model=CashRegisterResponse, status_code=status.HTTP_201_CREATED, summary="Créer un poste de caisse")
+@invalidates_response_cache("cash_registers")
 async def create_cash_register(
     payload: CashRegisterCreate,
     db: Session = Depends(get_db),
@@ -78,6 +81,7 @@ async def create_cash_register(
 
 
 @router.patch("/{register_id}", response_model=CashRegisterResponse, summary="Mettre à jour un poste de caisse")
+@invalidates_response_cache("cash_registers")
 async def update_cash_register(
     register_id: str,
     payload: CashRegisterUpdate,
@@ -92,6 +96,7 @@ async def update_cash_register(
 
 
 @router.delete("/{register_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Supprimer un poste de caisse")
+@invalidates_response_cache("cash_registers")
 async def delete_cash_register(
     register_id: str,
     db: Session = Depends(get_db),
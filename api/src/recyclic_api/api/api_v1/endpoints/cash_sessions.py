@@ -1,7 +1,7 @@
 import logging
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 
 from recyclic_api.core.database import get_db
@@ -14,10 +14,11 @@ from recyclic_api.core.audit import (
 )
 from recyclic_api.models.user import User, UserRole
 from recyclic_api.models.cash_session import CashSession, CashSessionStatus, CashSessionStep
-from recyclic_api.core.config import settings
-from recyclic_api.core.email_service import EmailAttachment, get_email_service
-from recyclic_api.services.export_service import generate_cash_session_report
-from recyclic_api.utils.report_tokens import generate_download_token
+from recyclic_api.services.cash_session_close_service import (
+    CashSessionCloseJobService,
+    build_report_download_url,
+    get_cash_session_close_worker,
+)
 from recyclic_api.schemas.cash_session import (
     CashSessionCreate,
     CashSessionUpdate,
@@ -30,7 +31,8 @@ from recyclic_api.schemas.cash_session import (
     SaleDetail,
     CashSessionStepUpdate,
     CashSessionStepResponse,
-    CashSessionStep
+    CashSessionStep,
+    CashSessionCloseJobResponse,
 )
 from recyclic_api.services.cash_session_service import CashSessionService
 from uuid import UUID
@@ -204,8 +206,13 @@ async def get_cash_session_status(
     - `date_to` : Date de fin (ISO 8601)
     - `skip` : Nombre d'éléments à ignorer (pagination)
     - `limit` : Nombre maximum d'éléments (1-100)
+    - `cursor` : Curseur renvoyé dans `next_cursor` par la page précédente
+    - `count` : Calcul du total (`exact`, `cached` ou `estimate`)
     
-    **Pagination :** Les résultats sont paginés pour optimiser les performances
+    **Pagination :** Les résultats sont paginés pour optimiser les performances.
+    Pour parcourir l'historique, préférer `cursor` à `skip` : le coût d'une page
+    ne dépend alors plus de sa position. Avec `count=cached` ou `count=estimate`,
+    `total` peut être approximatif (`total_is_approximate`).
     """,
     responses={
         200: {
@@ -228,7 +235,9 @@ async def get_cash_session_status(
                         ],
                         "total": 1,
                         "skip": 0,
-                        "limit": 20
+                        "limit": 20,
+                        "next_cursor": None,
+                        "total_is_approximate": False
                     }
                 }
             }
@@ -255,6 +264,8 @@ async def get_cash_sessions(
     date_from: Optional[datetime] = Query(None, description="Date de début (ISO 8601)"),
     date_to: Optional[datetime] = Query(None, description="Date de fin (ISO 8601)"),
     search: Optional[str] = Query(None, description="Recherche textuelle (nom opérateur ou ID de session)"),
+    cursor: Optional[str] = Query(None, description="Curseur de pagination (remplace skip)"),
+    count: Literal["exact", "cached", "estimate"] = Query("exact", description="Mode de calcul du total"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role_strict([UserRole.USER, UserRole.ADMIN, UserRole.SUPER_ADMIN]))
 ):
@@ -269,15 +280,22 @@ async def get_cash_sessions(
         date_from=date_from,
         date_to=date_to,
         search=search,
+        cursor=cursor,
+        count=count,
     )
     
-    sessions, total = service.get_sessions_with_filters(filters)
+    try:
+        page = service.get_sessions_page(filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return CashSessionListResponse(
-        data=[CashSessionResponse.model_validate(session) for session in sessions],
-        total=total,
+        data=[CashSessionResponse.model_validate(session) for session in page.sessions],
+        total=page.total,
         skip=skip,
-        limit=limit
+        limit=limit,
+        next_cursor=page.next_cursor,
+        total_is_approximate=page.total_is_approximate,
     )
 
 
@@ -619,12 +637,17 @@ async def close_cash_session(
                 detail="Un commentaire est obligatoire en cas d'écart entre le montant théorique et le montant physique"
             )
         
+        # Le rapport, l'email et l'envoi kDrive sont traités en tâche de fond :
+        # le traitement est enregistré dans la même transaction que la fermeture.
+        close_job = CashSessionCloseJobService(db).enqueue(session)
+
         # Fermer la session avec contrôle des montants
         closed_session = service.close_session_with_amounts(
             session_id, 
             close_data.actual_amount, 
             close_data.variance_comment
         )
+        get_cash_session_close_worker().wake()
         
         # Log de la fermeture de session
         log_cash_session_closing(
@@ -635,65 +658,11 @@ async def close_cash_session(
             success=True,
             db=db
         )
-        
-
-        report_path = generate_cash_session_report(db, closed_session)
-        download_token = generate_download_token(report_path.name)
-        report_download_url = f"{settings.API_V1_STR}/admin/reports/cash-sessions/{report_path.name}?token={download_token}"
-        email_sent = False
-
-        recipient = settings.CASH_SESSION_REPORT_RECIPIENT
-        if not recipient:
-            logger.warning("CASH_SESSION_REPORT_RECIPIENT is not configured; skipping report email dispatch")
-        else:
-            try:
-                email_service = get_email_service()
-                with report_path.open('rb') as report_file:
-                    attachment = EmailAttachment(
-                        filename=report_path.name,
-                        content=report_file.read(),
-                        mime_type='text/csv',
-                    )
-
-                if closed_session.operator:
-                    operator_label = (
-                        closed_session.operator.username
-                        or getattr(closed_session.operator, 'telegram_id', None)
-                        or str(closed_session.operator_id)
-                    )
-                else:
-                    operator_label = str(closed_session.operator_id)
-
-                if closed_session.actual_amount is not None:
-                    final_amount = closed_session.actual_amount
-                elif closed_session.closing_amount is not None:
-                    final_amount = closed_session.closing_amount
-                else:
-                    final_amount = closed_session.initial_amount or 0.0
-
-                html_rows = [
-                    '<p>Bonjour,</p>',
-                    f'<p>Veuillez trouver en pièce jointe le rapport CSV de la session de caisse {closed_session.id}.</p>',
-                    f'<p>Opérateur : {operator_label}</p>',
-                    f"<p>Montant final déclaré : {final_amount:.2f} €</p>",
-                    f'<p>Vous pouvez également le télécharger via {report_download_url} (valide pendant {settings.CASH_SESSION_REPORT_TOKEN_TTL_SECONDS // 60} minutes).</p>',
-                    '<p>- Recyclic</p>',
-                ]
-
-                email_sent = email_service.send_email(
-                    to_email=recipient,
-                    subject=f"Rapport de session de caisse {closed_session.id}",
-                    html_content=''.join(html_rows),
-                    db_session=db,
-                    attachments=[attachment],
-                )
-            except Exception as exc:  # noqa: BLE001 - keep closing flow resilient
-                logger.error("Failed to send cash session report email: %s", exc)
 
         response_model = CashSessionResponse.model_validate(closed_session)
         response_model = response_model.model_copy(update={
-            'report_download_url': report_download_url,
-            'report_email_sent': email_sent,
+            'close_job_id': str(close_job.id),
+            'close_job_status': close_job.status.value,
         })
         return response_model
 
@@ -711,6 +680,57 @@ async def close_cash_session(
         raise
 
 
+@router.get(
+    "/{session_id}/close-job",
+    response_model=CashSessionCloseJobResponse,
+    summary="Suivi du traitement post-fermeture",
+    description="""
+    Retourne l'état du traitement lancé à la fermeture d'une session :
+    génération du rapport CSV, envoi par email et dépôt sur kDrive.
+
+    **Permissions requises :** CASHIER (sa propre session), ADMIN, ou SUPER_ADMIN
+    """,
+    tags=["Sessions de Caisse"]
+)
+async def get_cash_session_close_job(
+    session_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role([UserRole.USER, UserRole.ADMIN, UserRole.SUPER_ADMIN]))
+):
+    service = CashSessionService(db)
+    session = service.get_session_by_id(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session de caisse non trouvée")
+
+    if (current_user.role == UserRole.USER and
+        str(session.operator_id) != str(current_user.id)):
+        raise HTTPException(status_code=403, detail="Accès non autorisé à cette session")
+
+    job = CashSessionCloseJobService(db).get_job_for_session(session.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Aucun traitement de fermeture pour cette session")
+
+    report_download_url = None
+    if job.report_filename:
+        report_download_url = build_report_download_url(job.report_filename)
+
+    return CashSessionCloseJobResponse(
+        job_id=str(job.id),
+        session_id=str(job.cash_session_id),
+        status=job.status.value,
+        attempts=job.attempts or 0,
+        report_status=job.report_status.value,
+        report_download_url=report_download_url,
+        email_status=job.email_status.value,
+        email_delivery_status=job.email_log.status.value if job.email_log else None,
+        kdrive_status=job.kdrive_status.value,
+        last_error=job.last_error,
+        next_attempt_at=job.next_attempt_at,
+        created_at=job.created_at,
+        completed_at=job.completed_at,
+    )
+
+
 @router.get("/stats/summary", response_model=CashSessionStats)
 async def get_cash_session_stats(
     date_from: Optional[datetime] = Query(None, description="Date de début (ISO 8601)"),
@@ -18,8 +18,9 @@ from recyclic_api.schemas.category import (
 )
 from recyclic_api.services.category_service import CategoryService
 from recyclic_api.services.category_management import CategoryManagementService
-from recyclic_api.services.category_export_service import CategoryExportService
+from recyclic_api.services.category_export_service import CategoryExportService, EXPORT_FORMATS, iter_file_chunks
 from recyclic_api.services.category_import_service import CategoryImportService
+from recyclic_api.utils.response_cache import cache_response, invalidates_response_cache
 from pydantic import BaseModel
 
 
@@ -42,6 +43,7 @@ class DisplayOrderUpdate(BaseModel):
     summary="Create a new category",
     description="Create a new category. Requires ADMIN or SUPER_ADMIN role."
 )
+@invalidates_response_cache("categories")
 async def create_category(
     category_data: CategoryCreate,
     current_user: User = Depends(require_role_strict([UserRole.ADMIN, UserRole.SUPER_ADMIN])),
@@ -74,6 +76,7 @@ async def get_categories(
     summary="Get categories hierarchy",
     description="Get all categories in a hierarchical structure with their children. Requires authentication."
 )
+@cache_response("categories", response_model=List[CategoryWithChildren])
 async def get_categories_hierarchy(
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     current_user: User = Depends(get_current_user),
@@ -100,31 +103,16 @@ async def export_categories(
     - **format**: Either 'pdf' or 'xls'
     - Returns the file as a downloadable stream
     """
-    if format not in ['pdf', 'xls', 'csv']:
+    if format not in EXPORT_FORMATS:
         raise HTTPException(status_code=400, detail="Invalid format. Must be 'pdf', 'xls' or 'csv'")
 
-    export_service = CategoryExportService(db)
-
-    if format == 'pdf':
-        buffer = export_service.export_to_pdf()
-        filename = f"categories_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        media_type = "application/pdf"
-    elif format == 'xls':
-        buffer = export_service.export_to_excel()
-        filename = f"categories_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    else:  # csv
-        content_bytes = CategoryExportService(db).export_to_csv()
-        filename = f"categories_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        media_type = "text/csv"
-        return StreamingResponse(
-            io.BytesIO(content_bytes),
-            media_type=media_type,
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
+    # Generated once per category tree version, then streamed from the stored file
+    export_file = CategoryExportService(db).open_cached_export(format)
+    extension, media_type = EXPORT_FORMATS[format]
+    filename = f"categories_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extension}"
 
     return StreamingResponse(
-        buffer,
+        iter_file_chunks(export_file),
         media_type=media_type,
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
@@ -174,6 +162,7 @@ async def analyze_categories_import(
     summary="Exécuter un import de catégories depuis une session",
     description="Exécute l'upsert transactionnel à partir d'une session d'analyse. Nécessite ADMIN ou SUPER_ADMIN.",
 )
+@invalidates_response_cache("categories")
 async def execute_categories_import(
     payload: CategoryImportExecuteRequest,
     current_user: User = Depends(require_role_strict([UserRole.ADMIN, UserRole.SUPER_ADMIN])),
@@ -211,6 +200,7 @@ async def get_category(
     summary="Update a category",
     description="Update a category's information. Requires ADMIN or SUPER_ADMIN role."
 )
+@invalidates_response_cache("categories")
 async def update_category(
     category_id: str,
     category_data: CategoryUpdate,
@@ -233,6 +223,7 @@ async def update_category(
     summary="Soft delete a category",
     description="Soft delete a category by setting is_active to False. Requires ADMIN or SUPER_ADMIN role."
 )
+@invalidates_response_cache("categories")
 async def delete_category(
     category_id: str,
     current_user: User = Depends(require_role_strict([UserRole.ADMIN, UserRole.SUPER_ADMIN])),
@@ -254,6 +245,7 @@ async def delete_category(
     description="Delete a category permanently if it has no children. Requires ADMIN or SUPER_ADMIN role.",
     status_code=204,
 )
+@invalidates_response_cache("categories")
 async def hard_delete_category(
     category_id: str,
     current_user: User = Depends(require_role_strict([UserRole.ADMIN, UserRole.SUPER_ADMIN])),
@@ -327,6 +319,7 @@ async def get_category_breadcrumb(
     summary="Update category visibility",
     description="Update category visibility for ENTRY tickets. Requires ADMIN or SUPER_ADMIN role."
 )
+@invalidates_response_cache("categories")
 async def update_category_visibility(
     category_id: str,
     visibility_data: VisibilityUpdate,
@@ -344,6 +337,7 @@ async def update_category_visibility(
     summary="Update category display order",
     description="Update category display order. Requires ADMIN or SUPER_ADMIN role."
 )
+@invalidates_response_cache("categories")
 async def update_category_display_order(
     category_id: str,
     order_data: DisplayOrderUpdate,
@@ -6,6 +6,7 @@ from typing import List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from recyclic_api.core.audit import log_admin_access
@@ -17,6 +18,7 @@ from recyclic_api.models.user import User, UserRole
 from recyclic_api.schemas.cash_session import CashSessionFilters, CashSessionSummary
 from recyclic_api.schemas.dashboard import DashboardMetrics, DashboardStatsResponse, RecentReport
 from recyclic_api.services.cash_session_service import CashSessionService
+from recyclic_api.services.dashboard_stream_service import get_dashboard_event_broadcaster
 from recyclic_api.utils.financial_security import encrypt_string
 from recyclic_api.utils.rate_limit import conditional_rate_limit
 
@@ -156,3 +158,46 @@ def get_dashboard_stats(
     )
     return payload.model_dump(by_alias=True)
 
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_dashboard_events(
+    site_id: Optional[str] = Query(None, description="Ne recevoir que les evenements de ce site"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin_role),
+):
+    """
+    Flux Server-Sent Events des variations des metriques du tableau de bord.
+
+    Evenements : ``ready`` (charger alors /stats une fois), ``sale_created``,
+    ``session_opened``, ``session_closed``, ``session_updated`` (variations a
+    appliquer) et ``resync``
+    (recharger /stats).
+    """
+    normalised_site: Optional[str] = None
+    if site_id:
+        try:
+            normalised_site = str(UUID(str(site_id)))
+        except (ValueError, TypeError) as exc:
+            raise HTTPException(status_code=400, detail="site_id invalide") from exc
+
+    broadcaster = get_dashboard_event_broadcaster()
+    try:
+        subscriber = await broadcaster.subscribe(normalised_site)
+    except Exception as exc:
+        raise HTTPException(status_code=503, detail="Flux du tableau de bord indisponible") from exc
+
+    log_admin_access(
+        str(current_user.id),
+        current_user.username or "Unknown",
+        "/admin/dashboard/stream",
+        success=True,
+    )
+    # La connexion reste ouverte : ne pas garder de connexion PostgreSQL pendant le flux
+    db.close()
+
+    return StreamingResponse(
+        broadcaster.stream(subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,16 +1,25 @@
 """
 Database purge endpoint for SuperAdmins.
-Allows secure deletion of transactional data.
+Allows secure deletion of transactional data (full TRUNCATE or date-bounded batches).
 """
 
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
+import uuid
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
 from recyclic_api.core.database import get_db
 from recyclic_api.core.auth import require_super_admin_role
+from recyclic_api.core.config import settings
 from recyclic_api.models.user import User
+from recyclic_api.services.db_purge_service import (
+    DatabasePurgeJobStore,
+    run_batched_purge,
+    truncate_transactional_data,
+)
 
 router = APIRouter(tags=["admin"])
 logger = logging.getLogger(__name__)
@@ -19,72 +28,67 @@ logger = logging.getLogger(__name__)
 @router.post(
     "/db/purge-transactions",
     summary="Purge sécurisée des données transactionnelles (Super Admin uniquement)",
-    description="Supprime toutes les données de ventes, réceptions et sessions de caisse. Action irréversible.",
+    description=(
+        "Supprime toutes les données de ventes, réceptions et sessions de caisse (TRUNCATE). "
+        "Avec older_than_years, seules les données plus anciennes sont supprimées, par lots, "
+        "en tâche de fond (202 + job_id à suivre via GET /db/purge-transactions/{job_id}). Action irréversible."
+    ),
     status_code=status.HTTP_200_OK
 )
 async def purge_transactional_data(
+    background_tasks: BackgroundTasks,
+    response: Response,
+    older_than_years: Optional[int] = Query(
+        None, ge=1, le=100, description="Ne supprimer que les données de plus de N années (purge par lots)"
+    ),
+    batch_size: Optional[int] = Query(
+        None, ge=100, le=100000, description="Lignes supprimées par transaction (défaut: DB_PURGE_BATCH_SIZE)"
+    ),
     current_user: User = Depends(require_super_admin_role()),
     db: Session = Depends(get_db)
 ):
     """
-    Supprime de manière sécurisée toutes les données transactionnelles de l'application.
+    Supprime de manière sécurisée les données transactionnelles de l'application.
     
     Tables affectées (dans cet ordre pour respecter les contraintes de clés étrangères) :
     - sale_items (lignes de vente)
     - sales (ventes)
     - ligne_depot (lignes de dépôt)
     - ticket_depot (tickets de dépôt)
+    - cash_session_close_jobs (traitements post-clôture)
     - cash_sessions (sessions de caisse)
     
     Tables préservées :
     - users, sites, categories, cash_registers (configuration)
     
+    Modes :
+    - sans paramètre : TRUNCATE de toutes les tables, dans une transaction unique
+    - older_than_years : suppression par lots des données antérieures, chaque lot
+      dans sa propre transaction, puis VACUUM ANALYZE des tables concernées
+    
     Restrictions:
     - Accessible uniquement aux Super-Admins
     - Action irréversible
-    - Exécutée dans une transaction unique
     """
+    if older_than_years is not None:
+        return _start_batched_purge(background_tasks, response, older_than_years, batch_size, current_user, db)
+
     try:
         logger.warning(f"Database purge requested by user {current_user.id} ({current_user.username})")
-        
-        # Ordre de suppression pour respecter les contraintes de clés étrangères
-        # Les tables enfants doivent être supprimées avant les tables parents
-        tables_to_purge = [
-            "sale_items",        # Lignes de vente (dépendent de sales)
-            "sales",             # Ventes (dépendent de cash_sessions)
-            "ligne_depot",       # Lignes de dépôt (dépendent de ticket_depot)
-            "ticket_depot",      # Tickets de dépôt
-            "cash_sessions"      # Sessions de caisse
-        ]
-        
-        deleted_counts = {}
-        
-        # Utiliser une transaction SQLAlchemy appropriée
+
         try:
-            for table in tables_to_purge:
-                # Compter les enregistrements avant suppression
-                count_query = text(f"SELECT COUNT(*) FROM {table}")
-                count_result = db.execute(count_query).scalar()
-                
-                # Supprimer tous les enregistrements
-                delete_query = text(f"DELETE FROM {table}")
-                db.execute(delete_query)
-                
-                deleted_counts[table] = count_result
-                logger.info(f"Deleted {count_result} records from {table}")
-            
-            # Valider la transaction
+            deleted_counts = truncate_transactional_data(db)
             db.commit()
-            
         except Exception as e:
             # Rollback en cas d'erreur
             db.rollback()
             raise e
-        
+
         logger.warning(f"Database purge completed by user {current_user.id}. Records deleted: {deleted_counts}")
-        
+
         return {
             "message": "Purge des données transactionnelles effectuée avec succès",
+            "mode": "truncate",
             "deleted_records": deleted_counts,
             "timestamp": db.execute(text("SELECT NOW()")).scalar()
         }
@@ -97,3 +101,67 @@ async def purge_transactional_data(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la purge des données: {str(e)}"
         )
+
+
+def _start_batched_purge(
+    background_tasks: BackgroundTasks,
+    response: Response,
+    older_than_years: int,
+    batch_size: Optional[int],
+    current_user: User,
+    db: Session,
+) -> dict:
+    logger.warning(
+        f"Batched database purge (older than {older_than_years} years) requested by user "
+        f"{current_user.id} ({current_user.username})"
+    )
+    store = DatabasePurgeJobStore()
+    job_id = uuid.uuid4().hex
+    if not store.acquire_lock(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Une purge des données est déjà en cours"
+        )
+
+    cutoff = db.execute(text("SELECT NOW() - make_interval(years => :years)"), {"years": older_than_years}).scalar()
+    batch_size = batch_size or settings.DB_PURGE_BATCH_SIZE
+    store.save(
+        job_id,
+        status="pending",
+        stage="queued",
+        progress_percent=0,
+        cutoff=cutoff.isoformat(),
+        batch_size=batch_size,
+        requested_by=current_user.id,
+        created_at=datetime.utcnow().isoformat(),
+    )
+    background_tasks.add_task(run_batched_purge, job_id, cutoff, batch_size, store)
+
+    response.status_code = status.HTTP_202_ACCEPTED
+    return {
+        "message": "Purge des données transactionnelles démarrée",
+        "mode": "batched",
+        "job_id": job_id,
+        "status": "pending",
+        "cutoff": cutoff.isoformat(),
+        "batch_size": batch_size,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+@router.get(
+    "/db/purge-transactions/{job_id}",
+    summary="Suivi d'une purge par lots (Super Admin uniquement)",
+    description="Retourne l'état, l'étape et le nombre de lignes supprimées d'une purge par lots."
+)
+async def get_purge_status(
+    job_id: str,
+    current_user: User = Depends(require_super_admin_role()),
+):
+    job = DatabasePurgeJobStore().get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Purge introuvable"
+        )
+    return {"job_id": job_id, **job}
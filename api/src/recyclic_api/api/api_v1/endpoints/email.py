@@ -9,7 +9,7 @@ from sqlalchemy.orm import Session
 
 from recyclic_api.core.database import get_db
 from recyclic_api.core.config import settings
-from recyclic_api.services.email_webhook_service import BrevoWebhookService
+from recyclic_api.services.email_webhook_service import BrevoWebhookService, enqueue_webhook_event
 
 logger = logging.getLogger(__name__)
 
@@ -26,15 +26,16 @@ async def brevo_webhook(
     Handle Brevo webhook events for email delivery status updates.
 
     This endpoint receives notifications from Brevo about email events
-    like deliveries, bounces, spam complaints, etc.
+    like deliveries, bounces, spam complaints, etc. It only verifies the
+    event and queues it: the email event worker applies queued events in batches.
 
     Args:
         request: FastAPI request object containing the webhook payload
-        db: Database session
+        db: Database session (used only if the queue is unavailable)
         x_mailin_signature: Brevo webhook signature for verification
 
     Returns:
-        Confirmation of webhook processing
+        Confirmation that the event was accepted
     """
     try:
         # Get raw payload for signature verification
@@ -61,14 +62,16 @@ async def brevo_webhook(
             logger.warning("Webhook secret configured but no signature provided")
             raise HTTPException(status_code=401, detail="Missing webhook signature")
 
-        # Process the webhook event
-        result = webhook_service.process_webhook_event(payload)
+        if not isinstance(payload, dict) or not payload.get("event") or not payload.get("email"):
+            raise HTTPException(status_code=400, detail="Missing required fields: event or email")
+
+        # Queue the webhook event
+        queued = enqueue_webhook_event(db, payload)
 
         return {
             "success": True,
-            "message": "Webhook processed successfully",
-            "event_id": result.get("event_id"),
-            "event_type": result.get("event_type")
+            "message": "Webhook queued for processing" if queued else "Webhook processed successfully",
+            "event_type": payload.get("event")
         }
 
     except HTTPException:
@@ -9,12 +9,14 @@ from fastapi import APIRouter, Query, HTTPException
 from pydantic import BaseModel, EmailStr
 from typing import Dict, Any
 import os
+import time
 
 from recyclic_api.utils.performance_monitor import performance_monitor
 from recyclic_api.utils.classification_cache import classification_cache
 from recyclic_api.core.email_service import send_email
 from recyclic_api.utils.email_metrics import email_metrics
 from recyclic_api.utils.auth_metrics import auth_metrics
+from recyclic_api.utils.rate_limit_metrics import rate_limit_metrics
 
 router = APIRouter()
 
@@ -226,7 +228,7 @@ async def get_classification_health():
 
         return {
             "status": health_status,
-            "timestamp": performance_monitor.get_performance_summary(hours=0.1),  # Last 6 minutes
+            "timestamp": time.time(),
             "recent_performance": recent_performance,
             "issues": issues,
             "service_capabilities": {
@@ -366,4 +368,54 @@ async def reset_auth_metrics():
             "message": "Authentication metrics reset successfully"
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to reset auth metrics: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to reset auth metrics: {str(e)}")
+
+
+@router.get("/rate-limit/metrics")
+async def get_rate_limit_metrics():
+    """
+    Get counters of requests rejected by the rate limiter (all workers).
+
+    Returns:
+        Total throttled requests and a per-route breakdown with the limit hit
+    """
+    try:
+        return {
+            "success": True,
+            "metrics": rate_limit_metrics.get_metrics_summary()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get rate limit metrics: {str(e)}")
+
+
+@router.get("/rate-limit/metrics/prometheus")
+async def get_rate_limit_metrics_prometheus():
+    """
+    Get rate limiting metrics in Prometheus format.
+
+    Returns:
+        Prometheus-formatted metrics as plain text
+    """
+    try:
+        prometheus_metrics = rate_limit_metrics.get_prometheus_metrics()
+        return "\n".join(prometheus_metrics)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get Prometheus rate limit metrics: {str(e)}")
+
+
+@router.post("/rate-limit/metrics/reset")
+async def reset_rate_limit_metrics():
+    """
+    Reset rate limiting counters (for testing purposes).
+
+    Returns:
+        Confirmation of metrics reset
+    """
+    try:
+        rate_limit_metrics.reset_metrics()
+        return {
+            "success": True,
+            "message": "Rate limit metrics reset successfully"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to reset rate limit metrics: {str(e)}")
\ No newline at end of file
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from recyclic_api.core.database import get_db
 from recyclic_api.services.preset_management import PresetManagementService
+from recyclic_api.utils.response_cache import cache_response
 from recyclic_api.schemas.preset_button import (
     PresetButtonRead,
     PresetButtonWithCategory,
@@ -33,6 +34,7 @@ async def get_preset_buttons(
 
 
 @router.get("/active", response_model=List[PresetButtonWithCategory])
+@cache_response("presets", "categories", response_model=List[PresetButtonWithCategory])
 async def get_active_preset_buttons(db: Session = Depends(get_db)):
     """
     Get all active preset buttons for use in the interface.
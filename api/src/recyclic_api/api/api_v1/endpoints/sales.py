@@ -12,6 +12,12 @@ from recyclic_api.models.sale_item import SaleItem
 from recyclic_api.models.cash_session import CashSession
 from recyclic_api.models.user import User, UserRole
 from recyclic_api.schemas.sale import SaleResponse, SaleCreate
+from recyclic_api.services.dashboard_stream_service import (
+    SALE_CREATED,
+    metric_deltas,
+    publish_dashboard_event,
+    session_contribution,
+)
 
 router = APIRouter()
 auth_scheme = HTTPBearer(auto_error=False)
@@ -95,6 +101,7 @@ async def create_sale(
     # Update cash session counters
     cash_session = db.query(CashSession).filter(CashSession.id == sale_data.cash_session_id).first()
     if cash_session:
+        before = session_contribution(cash_session)
         # Calculate total sales and items for this session (includes the sale we just created)
         session_sales = db.query(
             func.coalesce(func.sum(Sale.total_amount), 0).label('total_sales'),
@@ -107,5 +114,14 @@ async def create_sale(
         cash_session.current_amount = cash_session.initial_amount + cash_session.total_sales
 
         db.commit()
+        # Variation appliquée en direct par les tableaux de bord ouverts. Les totaux de
+        # la session ne comptent dans /stats qu'une fois celle-ci fermée.
+        deltas = metric_deltas(before, session_contribution(cash_session))
+        deltas.update({
+            "numberOfSales": 1,
+            "totalDonations": float(sale_data.donation or 0),
+            "totalWeightSold": float(sum(item.weight or 0 for item in sale_data.items)),
+        })
+        publish_dashboard_event(SALE_CREATED, cash_session.site_id, deltas)
     db.refresh(db_sale)
     return db_sale
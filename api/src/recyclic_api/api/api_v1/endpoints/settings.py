@@ -6,11 +6,13 @@ from recyclic_api.models.setting import Setting
 from recyclic_api.models.user import UserRole
 from recyclic_api.schemas.setting import SettingResponse, SettingCreate, SettingUpdate
 from recyclic_api.core.auth import require_role_strict
+from recyclic_api.utils.response_cache import cache_response, invalidates_response_cache
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[SettingResponse])
+@cache_response("settings", response_model=List[SettingResponse])
 async def get_settings(
     db: Session = Depends(get_db),
     current_user=Depends(require_role_strict([UserRole.ADMIN, UserRole.SUPER_ADMIN]))
@@ -34,6 +36,7 @@ async def get_setting(
 
 
 @router.post("/", response_model=SettingResponse)
+@invalidates_response_cache("settings")
 async def create_setting(
     setting_data: SettingCreate,
     db: Session = Depends(get_db),
@@ -53,6 +56,7 @@ async def create_setting(
 
 
 @router.put("/{key}", response_model=SettingResponse)
+@invalidates_response_cache("settings")
 async def update_setting(
     key: str,
     setting_update: SettingUpdate,
@@ -71,6 +75,7 @@ async def update_setting(
 
 
 @router.delete("/{key}")
+@invalidates_response_cache("settings")
 async def delete_setting(
     key: str,
     db: Session = Depends(get_db),
@@ -11,12 +11,14 @@ from recyclic_api.schemas.site import (
     SiteUpdate,
 )
 from recyclic_api.services.site_service import SiteService
+from recyclic_api.utils.response_cache import cache_response, invalidates_response_cache
 
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[SiteResponse], summary="Lister les sites")
+@cache_response("sites", response_model=List[SiteResponse])
 async def list_sites(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=200),
@@ -44,6 +46,7 @@ async def get_site(
 
 
 @router.post("/", response_model=SiteResponse, status_code=status.HTTP_201_CREATED, summary="Créer un site")
+@invalidates_response_cache("sites")
 async def create_site(
     payload: SiteCreate,
     db: Session = Depends(get_db),
@@ -55,6 +58,7 @@ async def create_site(
 
 
 @router.patch("/{site_id}", response_model=SiteResponse, summary="Mettre à jour un site")
+@invalidates_response_cache("sites")
 async def update_site(
     site_id: str,
     payload: SiteUpdate,
@@ -70,6 +74,7 @@ async def update_site(
 
 
 @router.delete("/{site_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Supprimer un site")
+@invalidates_response_cache("sites")
 async def delete_site(
     site_id: str,
     db: Session = Depends(get_db),
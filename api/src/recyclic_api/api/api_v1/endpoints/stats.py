@@ -6,13 +6,12 @@ from sqlalchemy.orm import Session
 from typing import Optional, List
 from datetime import date, datetime
 import logging
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 
 from recyclic_api.core.database import get_db
 from recyclic_api.core.auth import get_current_user, require_admin_role
 from recyclic_api.models.user import User
 from recyclic_api.services.stats_service import StatsService
+from recyclic_api.utils.rate_limit import limiter
 from recyclic_api.schemas.stats import (
     ReceptionSummaryStats,
     CategoryStats,
@@ -21,9 +20,6 @@ from recyclic_api.schemas.stats import (
 router = APIRouter(tags=["stats"])
 logger = logging.getLogger(__name__)
 
-# Rate limiting configuration
-limiter = Limiter(key_func=get_remote_address)
-
 
 @router.get(
     "/reception/summary",
@@ -14,8 +14,13 @@ from recyclic_api.schemas.user import (
     PasswordChangeRequest,
 )
 from recyclic_api.schemas.pin import PinSetRequest
-from recyclic_api.core.auth import require_role_strict, get_current_user, get_user_permissions
-from recyclic_api.core.security import hash_password
+from recyclic_api.core.auth import (
+    require_role_strict,
+    get_current_user,
+    get_user_permissions,
+    invalidate_user_auth_cache,
+)
+from recyclic_api.core.security import hash_password_async
 from recyclic_api.services.telegram_link_service import TelegramLinkService
 from recyclic_api.utils.rate_limit import conditional_rate_limit
 
@@ -54,6 +59,7 @@ async def update_me(
 
     db.commit()
     db.refresh(current_user)
+    invalidate_user_auth_cache(current_user.id)
     return current_user
 
 
@@ -65,7 +71,7 @@ async def change_my_password(
 ):
     """Changer le mot de passe de l'utilisateur connecté."""
     # La validation de robustesse et de confirmation est gérée par le schéma
-    current_user.hashed_password = hash_password(payload.new_password)
+    current_user.hashed_password = await hash_password_async(payload.new_password)
     db.commit()
     return {"message": "Password updated successfully"}
 
@@ -83,7 +89,7 @@ async def set_user_pin(
     """
     
     # Hash the PIN using the same security mechanism as passwords
-    current_user.hashed_pin = hash_password(pin_request.pin)
+    current_user.hashed_pin = await hash_password_async(pin_request.pin)
 
     db.commit()
     db.refresh(current_user)
@@ -132,7 +138,6 @@ async def get_user(user_id: str, db: Session = Depends(get_db)):
 @router.post("/", response_model=UserResponse)
 async def create_user(user: UserCreate, db: Session = Depends(get_db)):
     """Create new user"""
-    from recyclic_api.core.security import hash_password
     from recyclic_api.core.audit import log_audit, AuditActionType
 
     # Check if username already exists
@@ -148,7 +153,7 @@ async def create_user(user: UserCreate, db: Session = Depends(get_db)):
 
     # Hash the password before creating user
     user_data = user.model_dump()
-    user_data['hashed_password'] = hash_password(user.password)
+    user_data['hashed_password'] = await hash_password_async(user.password)
 
     # Remove password from user data as it's not needed for User model
     del user_data['password']
@@ -204,6 +209,7 @@ async def update_user(user_id: str, user_update: UserUpdate, db: Session = Depen
 
     db.commit()
     db.refresh(user)
+    invalidate_user_auth_cache(user.id)
     
     # Log audit for user update
     log_audit(
@@ -249,6 +255,7 @@ async def delete_user(user_id: str, db: Session = Depends(get_db)):
 
     db.delete(user)
     db.commit()
+    invalidate_user_auth_cache(user_uuid)
     return {"message": "User deleted successfully"}
 
 
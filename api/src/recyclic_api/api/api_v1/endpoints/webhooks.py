@@ -8,8 +8,7 @@ import logging
 import json
 
 from recyclic_api.core.database import get_db
-from recyclic_api.services.email_log_service import EmailLogService
-from recyclic_api.models.email_log import EmailStatus
+from recyclic_api.services.email_webhook_service import EMAIL_LOG_STATUS_BY_EVENT, enqueue_webhook_event
 
 logger = logging.getLogger(__name__)
 
@@ -36,7 +35,7 @@ async def brevo_email_status_webhook(
     try:
         # Récupérer le payload JSON
         payload = await request.json()
-        logger.info(f"Webhook Brevo reçu: {json.dumps(payload, indent=2)}")
+        logger.debug(f"Webhook Brevo reçu: {json.dumps(payload)}")
         
         # Extraire les informations importantes
         event_type = payload.get("event")
@@ -48,39 +47,16 @@ async def brevo_email_status_webhook(
             logger.warning(f"Webhook Brevo incomplet: {payload}")
             raise HTTPException(status_code=400, detail="Message ID et email requis")
         
-        # Créer le service de logs d'email
-        email_log_service = EmailLogService(db)
-        
-        # Mapper les événements Brevo vers nos statuts
-        status_mapping = {
-            "sent": EmailStatus.SENT,
-            "delivered": EmailStatus.DELIVERED,
-            "opened": EmailStatus.OPENED,
-            "clicked": EmailStatus.CLICKED,
-            "bounced": EmailStatus.BOUNCED,
-            "blocked": EmailStatus.FAILED,
-            "invalid": EmailStatus.FAILED,
-            "complaint": EmailStatus.BOUNCED
-        }
-        
-        new_status = status_mapping.get(event_type)
+        new_status = EMAIL_LOG_STATUS_BY_EVENT.get(event_type)
         if not new_status:
             logger.warning(f"Événement Brevo non reconnu: {event_type}")
             return {"status": "ignored", "reason": f"Event type {event_type} not supported"}
         
-        # Mettre à jour le statut de l'email
-        updated = email_log_service.update_email_status_by_external_id(
-            external_id=message_id,
-            status=new_status,
-            additional_data=payload
-        )
-        
-        if updated:
-            logger.info(f"Statut email mis à jour: {message_id} -> {new_status}")
-            return {"status": "success", "message": f"Email status updated to {new_status}"}
-        else:
-            logger.warning(f"Email non trouvé pour message-id: {message_id}")
-            return {"status": "not_found", "message": "Email not found in logs"}
+        # Mise en file : le worker des événements email met à jour le statut par lots
+        if enqueue_webhook_event(db, payload):
+            return {"status": "queued", "message": f"Email status update to {new_status} queued"}
+        logger.info(f"Statut email mis à jour: {message_id} -> {new_status}")
+        return {"status": "success", "message": f"Email status updated to {new_status}"}
             
     except json.JSONDecodeError:
         logger.error("Payload JSON invalide reçu du webhook Brevo")
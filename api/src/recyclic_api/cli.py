@@ -11,7 +11,7 @@ from sqlalchemy.orm import Session
 from recyclic_api.core.database import get_db
 from recyclic_api.core.security import hash_password, validate_password_strength
 from recyclic_api.models.user import User, UserRole, UserStatus
-from recyclic_api.services.export_service import generate_ecologic_csv
+from recyclic_api.services.export_service import EXPORT_GRANULARITIES, generate_ecologic_csv, generate_ecologic_csv_batch
 
 def create_super_admin(username: str, password: str):
     """
@@ -92,12 +92,35 @@ def _parse_date(value: str) -> datetime:
         raise ValueError(f"Invalid date format '{value}'. Expected YYYY-MM-DD.") from exc
 
 
-def generate_ecologic_export(date_from: str, date_to: str, output_dir: str | None = None) -> None:
+def generate_ecologic_export(
+    date_from: str,
+    date_to: str,
+    output_dir: str | None = None,
+    granularity: str | None = None,
+    archive: bool = False,
+) -> None:
     start = _parse_date(date_from)
     end = _parse_date(date_to)
 
     db: Session = next(get_db())
     try:
+        if granularity:
+            batch = generate_ecologic_csv_batch(
+                db=db,
+                date_from=start,
+                date_to=end,
+                granularity=granularity,
+                export_dir=Path(output_dir) if output_dir else None,
+                archive=archive,
+            )
+            print("✅ Ecologic export generated successfully!")
+            if batch.archive_path:
+                print(f"   Archive: {batch.archive_path} ({len(batch.files)} files)")
+            else:
+                for path in batch.files:
+                    print(f"   File: {path}")
+            return
+
         output_path = generate_ecologic_csv(
             db=db,
             date_from=start,
@@ -132,6 +155,17 @@ def main():
         required=False,
         help="Optional output directory (defaults to settings.ECOLOGIC_EXPORT_DIR)",
     )
+    export_parser.add_argument(
+        "--granularity",
+        choices=EXPORT_GRANULARITIES,
+        required=False,
+        help="Generate one file per period (e.g. month) instead of a single file",
+    )
+    export_parser.add_argument(
+        "--archive",
+        action="store_true",
+        help="With --granularity, bundle the period files into a single zip archive",
+    )
 
     args = parser.parse_args()
 
@@ -142,6 +176,8 @@ def main():
             date_from=args.date_from,
             date_to=args.date_to,
             output_dir=args.output_dir,
+            granularity=args.granularity,
+            archive=args.archive,
         )
     else:
         parser.print_help()
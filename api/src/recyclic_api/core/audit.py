@@ -2,13 +2,14 @@
 Module de gestion du journal d'audit centralisé
 """
 from typing import Optional, Dict, Any, Union
-from uuid import UUID
+from uuid import UUID, uuid4
 from datetime import datetime
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
 from recyclic_api.models.audit_log import AuditLog, AuditActionType
 from recyclic_api.models.user import User
+from recyclic_api.services.audit_writer_service import get_audit_log_writer
 
 
 def log_audit(
@@ -24,6 +25,9 @@ def log_audit(
 ) -> Optional[AuditLog]:
     """
     Enregistre un événement d'audit dans le journal centralisé.
+
+    Quand le writer d'audit est démarré, l'événement est mis en file et inséré
+    par lots en arrière-plan ; sinon il est écrit immédiatement avec ``db``.
     
     Args:
         action_type: Type d'action (enum AuditActionType ou string)
@@ -52,20 +56,29 @@ def log_audit(
             action_type_str = str(action_type)
         
         # Créer l'entrée d'audit
-        audit_entry = AuditLog(
-            timestamp=datetime.utcnow(),
-            actor_id=actor.id if actor else None,
-            actor_username=actor.username if actor else None,
-            action_type=action_type_str,
-            target_id=target_id,
-            target_type=target_type,
-            details_json=details,
-            description=description,
-            ip_address=ip_address,
-            user_agent=user_agent
-        )
-        
-        # Sauvegarder en base
+        row = {
+            "id": uuid4(),
+            "timestamp": datetime.utcnow(),
+            "actor_id": actor.id if actor else None,
+            "actor_username": actor.username if actor else None,
+            "action_type": action_type_str,
+            "target_id": target_id,
+            "target_type": target_type,
+            "details_json": details,
+            "description": description,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+        }
+        audit_entry = AuditLog(**row)
+
+        # Writer démarré (application) : insertion par lots hors du chemin de la requête.
+        # L'entrée retournée n'est pas encore en base.
+        writer = get_audit_log_writer()
+        if writer.running:
+            writer.add(row)
+            return audit_entry
+
+        # Sauvegarder en base (scripts, tests : pas de writer)
         db.add(audit_entry)
         db.commit()
         db.refresh(audit_entry)
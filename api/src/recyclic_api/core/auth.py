@@ -17,11 +17,13 @@ from jose import JWTError
 from sqlalchemy import select
 from sqlalchemy.orm import Session, selectinload
 
+from .auth_cache import INVALIDATION_CHANNEL, get_verified_token_cache
 from .config import settings
 from .database import get_db
-from .email_service import get_email_service
 from .redis import get_redis
 from .security import create_access_token, create_password_reset_token, verify_token
+from ..services.email_outbox_service import enqueue_email
+from ..models.email_log import EmailType
 from ..models.permission import Group, Permission
 from ..models.user import User, UserRole, UserStatus
 
@@ -167,13 +169,38 @@ def should_use_cached_payload(request: Optional[Request]) -> bool:
     return request.method.upper() in SAFE_CACHE_METHODS
 
 
+def invalidate_user_auth_cache(user_id: Union[uuid.UUID, str], redis_client: Optional[redis.Redis] = None) -> None:
+    """
+    Drop the cached authentication state of a user (deactivation, role change, deletion).
+
+    Clears this process' verified tokens and the Redis ``user_cache`` entry, then
+    publishes the user id so that the other API processes clear theirs.
+    """
+    user_id = str(user_id)
+    get_verified_token_cache().invalidate_user(user_id)
+    redis_client = redis_client or get_redis()
+    try:
+        pipeline = redis_client.pipeline(transaction=False)
+        pipeline.delete(f"user_cache:{user_id}")
+        pipeline.publish(INVALIDATION_CHANNEL, user_id)
+        pipeline.execute()
+    except Exception:
+        # Redis unavailable: remote processes fall back on the cache TTL
+        pass
+
+
 async def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     db: Session = Depends(get_db),
     redis_client: redis.Redis = Depends(get_redis),
     request: Request = None,
 ) -> Union[User, CachedUser]:
-    """Return current user from JWT, using Redis cache for safe requests when possible."""
+    """
+    Return current user from JWT.
+
+    Read-only requests are served from the in-process token cache, then from the
+    Redis cache; other requests load the user from the database.
+    """
 
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -181,24 +208,36 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        if credentials is None:
+    if credentials is None:
+        raise credentials_exception
+    token = credentials.credentials
+    token_cache = get_verified_token_cache()
+    use_cached_payload = should_use_cached_payload(request)
+
+    # --- Local Cache (token already verified by this process) ---
+    verified = token_cache.get(token)
+    if verified is None:
+        try:
+            payload = verify_token(token)
+            user_id: Optional[str] = payload.get("sub")
+            if not user_id:
+                raise credentials_exception
+        except JWTError:
             raise credentials_exception
-        payload = verify_token(credentials.credentials)
-        user_id: Optional[str] = payload.get("sub")
-        if not user_id:
+        except Exception:
             raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    except Exception:
-        raise credentials_exception
+        verified = token_cache.put(token, str(user_id), payload)
+    elif use_cached_payload and verified.user is not None:
+        return verified.cached_user()
+    user_id = verified.user_id
 
     cache_key = f"user_cache:{user_id}"
     cached_user = load_cached_user(redis_client, cache_key)
     if cached_user:
         if not cached_user.is_active:
             raise credentials_exception
-        if should_use_cached_payload(request):
+        if use_cached_payload:
+            token_cache.set_user(token, cached_user)
             return cached_user
 
     # --- Database Lookup (Cache Miss or unsafe method) ---
@@ -214,10 +253,12 @@ async def get_current_user(
         raise credentials_exception
 
     # --- Cache Population ---
+    cache_payload = serialize_user_for_cache(user)
+    token_cache.set_user(token, CachedUser.from_dict(cache_payload))
     try:
         redis_client.set(
             cache_key,
-            json.dumps(serialize_user_for_cache(user)),
+            json.dumps(cache_payload),
             ex=USER_CACHE_TTL_SECONDS,
         )
     except Exception:
@@ -428,8 +469,9 @@ async def send_reset_password_email(email: str, db: Session) -> None:
     reset_token = create_password_reset_token(email)
     reset_url = f"{settings.FRONTEND_URL}/reset-password?token={reset_token}"
 
-    email_service = get_email_service()
-    email_service.send_email(
+    # Mise en file dans l'outbox : l'appel Brevo est fait par le worker
+    enqueue_email(
+        db,
         to_email=email,
         subject="Réinitialisation de votre mot de passe",
         html_content=f"""
@@ -438,7 +480,8 @@ async def send_reset_password_email(email: str, db: Session) -> None:
             <a href="{reset_url}">Réinitialiser le mot de passe</a>
             <p>Ce lien expirera dans 1 heure.</p>
         """,
-        db_session=db
+        email_type=EmailType.PASSWORD_RESET,
+        user_id=user.id
     )
 
 
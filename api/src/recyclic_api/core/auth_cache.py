@@ -0,0 +1,193 @@
+"""
+In-process cache of verified access tokens.
+
+A hit skips the JWT signature check and, for read-only requests, the Redis
+``user_cache`` lookup: authentication then does no network I/O. Entries are
+keyed by the SHA-256 digest of the token, bounded in size (LRU) and never
+outlive the token's ``exp``. When a user is deactivated or changes role, the
+user id is published on a Redis channel so that every API process drops the
+entries of that user.
+"""
+
+import asyncio
+import dataclasses
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set
+
+from .config import settings
+from .redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "auth:user_invalidated"
+
+
+@dataclass
+class VerifiedToken:
+    """Claims of a verified token and, once loaded, the user it authenticates."""
+
+    user_id: str
+    claims: Dict[str, Any]
+    expires_at: float  # time.monotonic() deadline
+    user: Optional[Any] = None  # CachedUser
+
+    def cached_user(self) -> Optional[Any]:
+        """Return a copy of the cached user so callers cannot alter the shared entry."""
+        return dataclasses.replace(self.user) if self.user is not None else None
+
+
+class VerifiedTokenCache:
+    """Thread-safe TTL/LRU cache of verified tokens."""
+
+    def __init__(self, max_size: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_size = max_size or settings.AUTH_TOKEN_CACHE_MAX_SIZE
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.AUTH_TOKEN_CACHE_TTL_SECONDS
+        self._entries: "OrderedDict[str, VerifiedToken]" = OrderedDict()
+        self._digests_by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def _remove(self, digest: str) -> None:
+        entry = self._entries.pop(digest, None)
+        if entry is None:
+            return
+        digests = self._digests_by_user.get(entry.user_id)
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._digests_by_user[entry.user_id]
+
+    def get(self, token: str) -> Optional[VerifiedToken]:
+        """Return the entry of a previously verified token, if still valid."""
+        digest = self._digest(token)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(digest)
+                return None
+            self._entries.move_to_end(digest)
+            return entry
+
+    def put(self, token: str, user_id: str, claims: Dict[str, Any]) -> VerifiedToken:
+        """Store the claims of a freshly verified token (not stored if caching is disabled)."""
+        lifetime = self.ttl_seconds
+        if "exp" in claims:
+            lifetime = min(lifetime, float(claims["exp"]) - time.time())
+        entry = VerifiedToken(user_id=user_id, claims=claims, expires_at=time.monotonic() + lifetime)
+        if lifetime <= 0:
+            return entry
+
+        digest = self._digest(token)
+        with self._lock:
+            self._remove(digest)
+            self._entries[digest] = entry
+            self._digests_by_user.setdefault(user_id, set()).add(digest)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+        return entry
+
+    def set_user(self, token: str, user: Any) -> None:
+        """Attach the authenticated user to a cached token."""
+        with self._lock:
+            entry = self._entries.get(self._digest(token))
+            if entry is not None and entry.user_id == str(user.id):
+                entry.user = dataclasses.replace(user)
+
+    def invalidate_user(self, user_id: str) -> int:
+        """Drop every cached token of a user; returns the number of entries removed."""
+        with self._lock:
+            digests = list(self._digests_by_user.get(str(user_id), ()))
+            for digest in digests:
+                self._remove(digest)
+        return len(digests)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._digests_by_user.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+# Global cache used by get_current_user
+verified_token_cache = VerifiedTokenCache()
+
+
+def get_verified_token_cache() -> VerifiedTokenCache:
+    """Get the global verified token cache."""
+    return verified_token_cache
+
+
+class AuthCacheInvalidationListener:
+    """
+    Subscribes to INVALIDATION_CHANNEL and drops the local entries of the
+    published user ids. The subscription runs in the redis-py worker thread.
+    """
+
+    def __init__(self, cache: Optional[VerifiedTokenCache] = None, redis_client=None):
+        self.cache = cache or verified_token_cache
+        self.redis_client = redis_client
+        self.running = False
+        self._pubsub = None
+        self._thread = None
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        removed = self.cache.invalidate_user(message["data"])
+        logger.debug("Auth cache invalidated for user %s (%d tokens)", message["data"], removed)
+
+    def _on_error(self, exc: Exception, pubsub, thread) -> None:
+        # Messages may have been missed while disconnected: start from an empty cache
+        logger.warning("Auth cache invalidation channel error: %s", exc)
+        self.cache.clear()
+        time.sleep(1.0)
+
+    async def start(self):
+        if self.running:
+            logger.warning("Auth cache invalidation listener already running")
+            return
+        redis_client = self.redis_client or get_redis()
+        self._pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await asyncio.to_thread(self._pubsub.subscribe, **{INVALIDATION_CHANNEL: self._on_message})
+        except Exception as exc:
+            # Without the channel, remote invalidations only take effect after the cache TTL
+            logger.error("Auth cache invalidation listener not started: %s", exc)
+            self._pubsub.close()
+            self._pubsub = None
+            return
+        self._thread = self._pubsub.run_in_thread(
+            sleep_time=1.0, daemon=True, exception_handler=self._on_error
+        )
+        self.running = True
+        logger.info("Auth cache invalidation listener started")
+
+    async def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self._thread.stop()
+        await asyncio.to_thread(self._thread.join, 5)
+        self._pubsub.close()
+        self._thread = None
+        self._pubsub = None
+        logger.info("Auth cache invalidation listener stopped")
+
+
+auth_cache_invalidation_listener = AuthCacheInvalidationListener()
+
+
+def get_auth_cache_invalidation_listener() -> AuthCacheInvalidationListener:
+    """Get the global auth cache invalidation listener."""
+    return auth_cache_invalidation_listener
@@ -13,6 +13,40 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+
+    # Rate limiting (shared across workers via Redis)
+    RATE_LIMIT_STORAGE_URI: str | None = None  # Defaults to REDIS_URL
+    RATE_LIMIT_STRATEGY: str = "moving-window"
+    RATE_LIMIT_KEY_PREFIX: str = "rate_limit"
+
+    # Metrics registry (increments flushed to Redis, aggregated across workers)
+    METRICS_FLUSH_INTERVAL_SECONDS: float = 5.0
+    METRICS_WINDOW_RETENTION_HOURS: int = 168  # Hourly buckets behind the "last N hours" summaries
+    SLOW_REQUEST_THRESHOLD_MS: float = 1000.0  # Slower requests are logged with their top SQL statements
+    SLOW_REQUEST_LOG_TOP_STATEMENTS: int = 5
+
+    # User activity tracking (online presence)
+    ACTIVITY_DEBOUNCE_SECONDS: float = 30.0  # At most one activity write per user and window
+    ACTIVITY_FLUSH_INTERVAL_SECONDS: float = 2.0
+
+    # Audit log (asynchronous batched writer)
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_QUEUE_MAX_SIZE: int = 10000  # Beyond that, events go to the spool file
+    AUDIT_SPOOL_PATH: str = "/app/spool/audit_logs.jsonl"  # Replayed once the database is reachable
+
+    # In-process cache of verified access tokens (invalidated through Redis pub/sub)
+    AUTH_TOKEN_CACHE_TTL_SECONDS: float = 60.0  # 0 disables the cache
+    AUTH_TOKEN_CACHE_MAX_SIZE: int = 10000
+
+    # HTTP response cache of read-mostly endpoints (Redis, invalidated by the write endpoints)
+    RESPONSE_CACHE_TTL_SECONDS: float = 30.0  # 0 disables the cache
+    RESPONSE_CACHE_STALE_SECONDS: float = 300.0  # Stale copy served while refreshing or if the database is down
+
+    # Live admin dashboard (Server-Sent Events fed by Redis pub/sub)
+    DASHBOARD_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    DASHBOARD_STREAM_QUEUE_SIZE: int = 100  # Beyond that, a slow client is asked to reload the stats
     
     # API
     API_V1_STR: str = "/v1"
@@ -28,6 +62,20 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "development"
     ECOLOGIC_EXPORT_DIR: str = "/app/exports"
 
+    # Database export (pg_dump streamed to the client)
+    DB_EXPORT_IDLE_TIMEOUT_SECONDS: float = 300.0  # Max time without output from pg_dump
+    DB_EXPORT_PARALLEL_JOBS: int = 4  # Workers of the directory format dump
+    DB_EXPORT_DIRECTORY_TIMEOUT_SECONDS: float = 3600.0
+
+    # Database import (upload spooled to disk, restored by psql / pg_restore)
+    DB_IMPORT_MAX_SIZE_MB: int = 100
+    DB_IMPORT_TIMEOUT_SECONDS: float = 3600.0  # Max duration of the backup and of the restore
+    DB_IMPORT_PARALLEL_JOBS: int = 4  # pg_restore workers for custom format dumps
+
+    # Transactional data purge (date-bounded mode)
+    DB_PURGE_BATCH_SIZE: int = 10000  # Parent rows deleted per transaction
+    DB_PURGE_VACUUM: bool = True  # VACUUM ANALYZE the purged tables afterwards
+
     # kDrive Sync
     KDRIVE_WEBDAV_URL: str | None = None
     KDRIVE_WEBDAV_USERNAME: str | None = None
@@ -37,12 +85,42 @@ class Settings(BaseSettings):
     KDRIVE_SYNC_INTERVAL_SECONDS: int = 3600
     KDRIVE_RETRY_DELAY_SECONDS: float = 5.0
     KDRIVE_MAX_RETRIES: int = 3
+    KDRIVE_SYNC_MAX_WORKERS: int = 4
+    KDRIVE_SYNC_MANIFEST_PATH: str | None = None
+
+    # Scheduler
+    SCHEDULER_LEADER_ELECTION: bool = True
+    SCHEDULER_LEADER_LOCK_TTL_SECONDS: int = 60
+    SCHEDULER_TASK_TIMEOUT_SECONDS: float = 900.0
+    SCHEDULER_JITTER_SECONDS: float = 30.0
+    ANOMALY_DETECTION_RESULT_TTL_SECONDS: int = 3600  # Last detection result kept in Redis
+    ANOMALY_DETECTION_WATERMARK_LAG_SECONDS: int = 60  # Rows this recent are read again on the next run
+
+    # Monthly partitions (audit_logs, login_history)
+    PARTITION_PREMAKE_MONTHS: int = 3  # Future partitions created ahead of time
+    PARTITION_ARCHIVE_SCHEMA: str = "archive"  # Detached partitions are moved there
+    AUDIT_LOGS_RETENTION_MONTHS: int = 36  # 0 = keep every partition attached
+    LOGIN_HISTORY_RETENTION_MONTHS: int = 12
 
     # Cash Session Reports
     CASH_SESSION_REPORT_DIR: str = '/app/reports/cash_sessions'
     CASH_SESSION_REPORT_RECIPIENT: str | None = None
     CASH_SESSION_REPORT_TOKEN_TTL_SECONDS: int = 900
     CASH_SESSION_REPORT_RETENTION_DAYS: int = 30
+    CASH_SESSION_REPORT_KDRIVE_PATH: str | None = None  # Defaults to KDRIVE_REMOTE_BASE_PATH/cash_sessions
+
+    # Cash session close pipeline (report, email, kDrive) run in the background
+    CASH_SESSION_CLOSE_JOB_BATCH_SIZE: int = 10
+    CASH_SESSION_CLOSE_JOB_POLL_INTERVAL_SECONDS: float = 10.0
+    CASH_SESSION_CLOSE_JOB_MAX_ATTEMPTS: int = 5
+    CASH_SESSION_CLOSE_JOB_RETRY_BASE_SECONDS: float = 30.0
+    CASH_SESSION_CLOSE_JOB_LEASE_SECONDS: int = 600
+    # Total count of the cash session history (count=cached / count=estimate)
+    CASH_SESSION_COUNT_CACHE_TTL_SECONDS: int = 300
+    CASH_SESSION_COUNT_ESTIMATE_THRESHOLD: int = 10000  # Below this planner estimate, count exactly
+
+    # Category exports (PDF/XLSX/CSV), stored per category tree version
+    CATEGORY_EXPORT_CACHE_DIR: str = '/app/cache/category_exports'
 
     # Email Service
 
@@ -50,6 +128,18 @@ class Settings(BaseSettings):
     BREVO_WEBHOOK_SECRET: str | None = None
     EMAIL_FROM_NAME: str = "Recyclic"
     EMAIL_FROM_ADDRESS: str = "noreply@recyclic.fr"
+
+    # Email outbox (async delivery)
+    EMAIL_OUTBOX_CONCURRENCY: int = 4
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_POLL_INTERVAL_SECONDS: float = 5.0
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 5
+    EMAIL_OUTBOX_RETRY_BASE_SECONDS: float = 30.0
+    EMAIL_OUTBOX_LEASE_SECONDS: int = 300
+    # Brevo webhook events (queued in Redis, applied in batches)
+    EMAIL_EVENTS_BATCH_SIZE: int = 500
+    EMAIL_EVENTS_POLL_INTERVAL_SECONDS: float = 2.0
+    WEEKLY_REPORT_RECIPIENT: str | None = None
     
     model_config = ConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
@@ -62,6 +62,15 @@ class EmailAttachment:
     mime_type: str = 'application/octet-stream'
 
 
+@dataclass
+class EmailDeliveryResult:
+    """Outcome of a single Brevo API call."""
+    success: bool
+    message_id: Optional[str] = None
+    error_type: Optional[str] = None
+    error_detail: Optional[str] = None
+
+
 class EmailServiceError(Exception):
     """Base exception for email service errors."""
     pass
@@ -142,6 +151,92 @@ class EmailService:
         start_time = time.time()
 
         # Check if API key is configured
+        if not self.has_api_key:
+            logger.error("Cannot send email: BREVO_API_KEY is not configured")
+            raise EmailConfigurationError(
+                "Le service email n'est pas configuré. "
+                "Veuillez configurer la variable d'environnement BREVO_API_KEY."
+            )
+
+        result = self.deliver(
+            to_email=to_email,
+            subject=subject,
+            html_content=html_content,
+            from_email=from_email,
+            from_name=from_name,
+            attachments=attachments,
+            start_time=start_time,
+        )
+
+        # Create email log record if database session provided
+        if db_session:
+            if result.success:
+                try:
+                    email_log_service = EmailLogService(db_session)
+                    email_log = email_log_service.create_email_log(
+                        recipient_email=to_email,
+                        subject=subject,
+                        body_text=body_text,
+                        body_html=html_content,
+                        email_type=email_type,
+                        user_id=user_id,
+                        recipient_name=recipient_name,
+                        external_id=result.message_id
+                    )
+
+                    # Update status to SENT
+                    email_log_service.update_email_status(
+                        email_log_id=str(email_log.id),
+                        status=EmailStatus.SENT,
+                        external_id=result.message_id,
+                        timestamp=datetime.fromtimestamp(start_time)
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to create email log record: {e}")
+                    # Don't fail the email send if status tracking fails
+                    db_session.rollback()
+            else:
+                try:
+                    email_log_service = EmailLogService(db_session)
+                    email_log = email_log_service.create_email_log(
+                        recipient_email=to_email,
+                        subject=subject,
+                        body_text=body_text,
+                        body_html=html_content,
+                        email_type=email_type,
+                        user_id=user_id,
+                        recipient_name=recipient_name
+                    )
+
+                    # Update status to FAILED
+                    email_log_service.update_email_status(
+                        email_log_id=str(email_log.id),
+                        status=EmailStatus.FAILED,
+                        error_message=result.error_detail
+                    )
+                except Exception as log_error:
+                    logger.warning(f"Failed to create email log record for failed email: {log_error}")
+
+        return result.success
+
+    def deliver(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        from_email: Optional[str] = None,
+        from_name: Optional[str] = None,
+        attachments: Optional[List[EmailAttachment]] = None,
+        start_time: Optional[float] = None,
+    ) -> "EmailDeliveryResult":
+        """
+        Perform the Brevo API call and record metrics, without touching the database.
+
+        This is the blocking part of :meth:`send_email`; the outbox worker runs it
+        in a thread and persists the outcome itself.
+        """
+        start_time = start_time or time.time()
+
         if not self.has_api_key:
             logger.error("Cannot send email: BREVO_API_KEY is not configured")
             raise EmailConfigurationError(
@@ -198,34 +293,7 @@ class EmailService:
                 message_id=api_response.message_id
             )
 
-            # Create email log record if database session provided
-            if db_session:
-                try:
-                    email_log_service = EmailLogService(db_session)
-                    email_log = email_log_service.create_email_log(
-                        recipient_email=to_email,
-                        subject=subject,
-                        body_text=body_text,
-                        body_html=html_content,
-                        email_type=email_type,
-                        user_id=user_id,
-                        recipient_name=recipient_name,
-                        external_id=api_response.message_id
-                    )
-                    
-                    # Update status to SENT
-                    email_log_service.update_email_status(
-                        email_log_id=str(email_log.id),
-                        status=EmailStatus.SENT,
-                        external_id=api_response.message_id,
-                        timestamp=datetime.fromtimestamp(start_time)
-                    )
-                except Exception as e:
-                    logger.warning(f"Failed to create email log record: {e}")
-                    # Don't fail the email send if status tracking fails
-                    db_session.rollback()
-
-            return True
+            return EmailDeliveryResult(success=True, message_id=api_response.message_id)
 
         except ApiException as e:
             elapsed_ms = (time.time() - start_time) * 1000
@@ -245,30 +313,7 @@ class EmailService:
                 error_detail=error_detail
             )
 
-            # Log failed email attempt if database session provided
-            if db_session:
-                try:
-                    email_log_service = EmailLogService(db_session)
-                    email_log = email_log_service.create_email_log(
-                        recipient_email=to_email,
-                        subject=subject,
-                        body_text=body_text,
-                        body_html=html_content,
-                        email_type=email_type,
-                        user_id=user_id,
-                        recipient_name=recipient_name
-                    )
-                    
-                    # Update status to FAILED
-                    email_log_service.update_email_status(
-                        email_log_id=str(email_log.id),
-                        status=EmailStatus.FAILED,
-                        error_message=error_detail
-                    )
-                except Exception as log_error:
-                    logger.warning(f"Failed to create email log record for failed email: {log_error}")
-
-            return False
+            return EmailDeliveryResult(success=False, error_type=error_type, error_detail=error_detail)
 
         except Exception as e:
             elapsed_ms = (time.time() - start_time) * 1000
@@ -288,30 +333,7 @@ class EmailService:
                 error_detail=error_detail
             )
 
-            # Log failed email attempt if database session provided
-            if db_session:
-                try:
-                    email_log_service = EmailLogService(db_session)
-                    email_log = email_log_service.create_email_log(
-                        recipient_email=to_email,
-                        subject=subject,
-                        body_text=body_text,
-                        body_html=html_content,
-                        email_type=email_type,
-                        user_id=user_id,
-                        recipient_name=recipient_name
-                    )
-                    
-                    # Update status to FAILED
-                    email_log_service.update_email_status(
-                        email_log_id=str(email_log.id),
-                        status=EmailStatus.FAILED,
-                        error_message=error_detail
-                    )
-                except Exception as log_error:
-                    logger.warning(f"Failed to create email log record for failed email: {log_error}")
-
-            return False
+            return EmailDeliveryResult(success=False, error_type=error_type, error_detail=error_detail)
 
 
 # Global email service instance (lazy initialization)
@@ -1,8 +1,23 @@
 import redis
 from recyclic_api.core.config import settings
+from recyclic_api.utils.request_stats import record_redis_call
+
+
+class InstrumentedRedis(redis.Redis):
+    """Redis client counting its round trips in the stats of the current request"""
+
+    def execute_command(self, *args, **options):
+        record_redis_call()
+        return super().execute_command(*args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        # A pipeline is sent in a single round trip
+        record_redis_call()
+        return super().pipeline(transaction=transaction, shard_hint=shard_hint)
+
 
 # Create Redis client
-redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+redis_client = InstrumentedRedis.from_url(settings.REDIS_URL, decode_responses=True)
 
 def get_redis():
     """Get Redis client instance"""
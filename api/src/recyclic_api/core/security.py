@@ -13,7 +13,10 @@ try:
 except ImportError:
     pass
 
+import asyncio
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import List, Tuple, Optional
 from passlib.context import CryptContext
@@ -25,7 +28,18 @@ from .config import settings
 from ..models.setting import Setting
 
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Changing PASSWORD_BCRYPT_ROUNDS makes existing hashes "need update": they are
+# transparently rehashed on the next successful login (see verify_and_update_password)
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
+
+# Dedicated pool for bcrypt: keeps the event loop free and bounds the CPU spent
+# on hashing so a login rush cannot starve the default executor
+_password_hash_executor: Optional[ThreadPoolExecutor] = None
+_password_hash_executor_lock = threading.Lock()
 
 # JWT Configuration
 ALGORITHM = "HS256"
@@ -39,6 +53,51 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and return a new hash if the stored one uses outdated parameters.
+
+    Returns:
+        Tuple of (is_valid, new_hash_or_None)
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def get_password_hash_executor() -> ThreadPoolExecutor:
+    """Return the thread pool dedicated to password hashing (created on first use)."""
+    global _password_hash_executor
+    if _password_hash_executor is None:
+        with _password_hash_executor_lock:
+            if _password_hash_executor is None:
+                _password_hash_executor = ThreadPoolExecutor(
+                    max_workers=max(settings.PASSWORD_HASH_WORKERS, 1),
+                    thread_name_prefix="password-hash",
+                )
+    return _password_hash_executor
+
+def shutdown_password_hash_executor() -> None:
+    """Shut down the password hashing pool (called on application shutdown)."""
+    global _password_hash_executor
+    with _password_hash_executor_lock:
+        executor, _password_hash_executor = _password_hash_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+async def _run_in_hash_executor(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_password_hash_executor(), func, *args)
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the dedicated pool, without blocking the event loop"""
+    return await _run_in_hash_executor(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the dedicated pool, without blocking the event loop"""
+    return await _run_in_hash_executor(verify_password, plain_password, hashed_password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Async counterpart of verify_and_update_password, run in the dedicated pool"""
+    return await _run_in_hash_executor(verify_and_update_password, plain_password, hashed_password)
+
 def validate_password_strength(password: str) -> Tuple[bool, List[str]]:
     """
     Validate password strength according to security best practices.
@@ -79,9 +138,10 @@ def get_token_expiration_minutes() -> int:
     Retourne 480 minutes (8 heures) par défaut si la valeur n'est pas trouvée.
     """
     try:
-        from ..core.database import get_db
-        db = next(get_db())
-        setting = db.query(Setting).filter(Setting.key == "token_expiration_minutes").first()
+        from ..core.database import SessionLocal
+        # Session fermée explicitement : appelé à chaque connexion, une fuite épuiserait le pool
+        with SessionLocal() as db:
+            setting = db.query(Setting).filter(Setting.key == "token_expiration_minutes").first()
         if setting:
             value = int(setting.value)
             # Validation de la valeur pour éviter les valeurs aberrantes
@@ -3,12 +3,12 @@ from fastapi import FastAPI
 import asyncio
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import PlainTextResponse
 import logging
 import time
 import os
 import re
 
-from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 
@@ -16,12 +16,23 @@ from recyclic_api.core.config import settings
 from recyclic_api.api.api_v1.api import api_router
 from recyclic_api.services.sync_service import schedule_periodic_kdrive_sync
 from recyclic_api.services.scheduler_service import get_scheduler_service
-from recyclic_api.utils.rate_limit import limiter
+from recyclic_api.services.email_outbox_service import get_email_outbox_worker
+from recyclic_api.services.cash_session_close_service import get_cash_session_close_worker
+from recyclic_api.utils.rate_limit import limiter, rate_limit_exceeded_handler
+from recyclic_api.utils.metrics_registry import metrics_registry
+from recyclic_api.middleware.request_metrics import RequestMetricsMiddleware
+from recyclic_api.utils.rate_limit_metrics import rate_limit_metrics
 from recyclic_api.core.database import engine
 from recyclic_api.models import Base
 from recyclic_api.core.database import SessionLocal
+from recyclic_api.core.security import shutdown_password_hash_executor
 from recyclic_api.initial_data import init_super_admin_if_configured
-# from recyclic_api.middleware.activity_tracker import ActivityTrackerMiddleware
+from recyclic_api.middleware.activity_tracker import ActivityTrackerMiddleware
+from recyclic_api.services.activity_service import get_activity_batch_writer
+from recyclic_api.services.audit_writer_service import get_audit_log_writer
+from recyclic_api.core.auth_cache import get_auth_cache_invalidation_listener
+from recyclic_api.services.email_webhook_service import get_email_event_worker
+from recyclic_api.services.dashboard_stream_service import get_dashboard_event_broadcaster
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -37,9 +48,33 @@ async def lifespan(app: FastAPI):
     # Démarrer le scheduler de tâches planifiées (désactivé en test)
     scheduler = None
     sync_task = None
+    email_outbox_worker = None
+    close_worker = None
+    email_event_worker = None
+    activity_writer = None
+    audit_writer = None
+    auth_cache_listener = None
     if not is_test_env:
         scheduler = get_scheduler_service()
         await scheduler.start()
+        # Démarrer le worker d'envoi des emails mis en file (outbox)
+        email_outbox_worker = get_email_outbox_worker()
+        await email_outbox_worker.start()
+        # Démarrer le worker des événements webhook Brevo (mis en file par les endpoints)
+        email_event_worker = get_email_event_worker()
+        await email_event_worker.start()
+        # Démarrer le worker des traitements post-fermeture de caisse
+        close_worker = get_cash_session_close_worker()
+        await close_worker.start()
+        # Démarrer l'écriture par lots de l'activité utilisateur (présence en ligne)
+        activity_writer = get_activity_batch_writer()
+        await activity_writer.start()
+        # Démarrer l'écriture par lots du journal d'audit
+        audit_writer = get_audit_log_writer()
+        await audit_writer.start()
+        # Écouter les invalidations du cache local d'authentification
+        auth_cache_listener = get_auth_cache_invalidation_listener()
+        await auth_cache_listener.start()
         # Démarrer la synchronisation kDrive (si nécessaire)
         sync_task = schedule_periodic_kdrive_sync()
 
@@ -77,12 +112,42 @@ async def lifespan(app: FastAPI):
         if scheduler is not None:
             await scheduler.stop()
 
+        # Arrêter le worker email après le dernier lot en cours
+        if email_outbox_worker is not None:
+            await email_outbox_worker.stop()
+
+        # Appliquer les derniers événements webhook en file
+        if email_event_worker is not None:
+            await email_event_worker.stop()
+
+        # Arrêter le worker post-fermeture (le traitement en cours se termine)
+        if close_worker is not None:
+            await close_worker.stop()
+
+        # Arrêter l'écoute des invalidations du cache d'authentification
+        if auth_cache_listener is not None:
+            await auth_cache_listener.stop()
+
+        # Fermer l'abonnement du tableau de bord en direct (ouvert à la première connexion)
+        await get_dashboard_event_broadcaster().stop()
+
+        # Écrire le dernier lot d'activité
+        if activity_writer is not None:
+            await activity_writer.stop()
+
         # Annuler la tâche de sync kDrive
         if sync_task:
             sync_task.cancel()
             with suppress(asyncio.CancelledError):
                 await sync_task
 
+        # Écrire les derniers événements d'audit (après l'arrêt des workers qui en produisent)
+        if audit_writer is not None:
+            await audit_writer.stop()
+
+        # Libérer le pool de hachage des mots de passe
+        shutdown_password_hash_executor()
+
         logger.info("Shutting down Recyclic API...")
 
 # Create FastAPI app
@@ -96,7 +161,7 @@ app = FastAPI(
 )
 
 app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
 app.add_middleware(SlowAPIMiddleware)
 
 # Add CORS middleware
@@ -144,8 +209,11 @@ async def add_process_time_header(request, call_next):
         # In production, skip timing calculation for performance
         return await call_next(request)
 
-# Add activity tracking middleware
-# app.add_middleware(ActivityTrackerMiddleware, activity_threshold_minutes=15)
+# Add activity tracking middleware (ASGI, écritures Redis par lots hors du chemin de la requête)
+app.add_middleware(ActivityTrackerMiddleware)
+
+# Latence par route, requêtes SQL et appels Redis de chaque requête (ajouté en dernier : mesure toute la pile)
+app.add_middleware(RequestMetricsMiddleware)
 
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -188,6 +256,17 @@ async def health_check():
             "timestamp": time.time()
         }
 
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus exposition aggregated over every API worker (counters shared via Redis)"""
+    lines = metrics_registry.render_prometheus()
+    try:
+        lines.extend(rate_limit_metrics.get_prometheus_metrics())
+    except Exception as e:
+        logger.warning(f"Rate limit metrics unavailable: {e}")
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,73 +1,110 @@
 """
 Middleware pour enregistrer l'activité utilisateur via Redis.
 """
-import base64
-import json
 import logging
+import time
+from typing import Dict, Optional
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from recyclic_api.services.activity_service import ActivityService
+from recyclic_api.core.config import settings
+from recyclic_api.core.security import verify_token
+from recyclic_api.services.activity_service import (
+    ActivityBatchWriter,
+    ActivityService,
+    get_activity_batch_writer,
+)
 
 logger = logging.getLogger(__name__)
 
+LOGOUT_PATH_SUFFIX = "/auth/logout"
 
-class ActivityTrackerMiddleware(BaseHTTPMiddleware):
-    """Middleware qui enregistre l'activité des utilisateurs authentifiés."""
 
-    def __init__(self, app, activity_threshold_minutes: int = 15):
-        super().__init__(app)
-        self.activity_threshold_minutes = activity_threshold_minutes
-        self.activity_service = ActivityService()
+class ActivityTrackerMiddleware:
+    """
+    Middleware ASGI qui signale l'activité des utilisateurs authentifiés.
 
-    async def dispatch(self, request: Request, call_next):
-        """Traite la requête et enregistre l'activité si l'utilisateur est authentifié."""
-        response = await call_next(request)
+    Aucune écriture Redis dans le chemin de la requête : l'activité d'un même
+    jeton / utilisateur est ignorée pendant ``debounce_seconds``, puis confiée à
+    l'``ActivityBatchWriter`` qui l'écrit par lots en tâche de fond.
+    """
 
-        auth_header = request.headers.get("Authorization")
+    def __init__(
+        self,
+        app: ASGIApp,
+        activity_threshold_minutes: int = 15,
+        debounce_seconds: Optional[float] = None,
+        batch_writer: Optional[ActivityBatchWriter] = None,
+    ):
+        self.app = app
+        self.activity_threshold_minutes = activity_threshold_minutes
+        self.debounce_seconds = (
+            settings.ACTIVITY_DEBOUNCE_SECONDS if debounce_seconds is None else debounce_seconds
+        )
+        self.batch_writer = batch_writer or get_activity_batch_writer()
+        self.activity_service = ActivityService()
+        # Dernier signalement (horloge monotone) par jeton et par utilisateur
+        self._token_seen: Dict[str, float] = {}
+        self._user_seen: Dict[str, float] = {}
+        self._last_prune = time.monotonic()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.app(scope, receive, send)
+        if scope["type"] != "http":
+            return
+        try:
+            self._track(scope)
+        except Exception as exc:
+            logger.debug("Impossible d'enregistrer l'activité via le middleware: %s", exc)
+
+    def _track(self, scope: Scope) -> None:
+        # La déconnexion efface l'activité : ne pas la signaler à nouveau
+        if scope.get("path", "").endswith(LOGOUT_PATH_SUFFIX):
+            return
+        auth_header = Headers(scope=scope).get("authorization")
         if not auth_header or not auth_header.startswith("Bearer "):
-            return response
+            return
 
-        token = auth_header.replace("Bearer ", "")
-        user_id = self._extract_user_id_from_token(token)
+        now = time.monotonic()
+        self._prune(now)
+        token = auth_header[len("Bearer "):]
+        # Jeton vu récemment : ni décodage ni écriture
+        if now - self._token_seen.get(token, float("-inf")) < self.debounce_seconds:
+            return
+        self._token_seen[token] = now
 
-        if user_id:
-            metadata = {
-                "last_endpoint": str(request.url.path),
-                "last_method": request.method,
-                "last_ip": request.client.host if request.client else "unknown",
-                "last_user_agent": request.headers.get("user-agent", "unknown"),
-            }
-            try:
-                self.activity_service.record_user_activity(
-                    user_id,
-                    metadata=metadata,
-                    threshold_override=self.activity_threshold_minutes,
-                )
-            except Exception as exc:
-                logger.debug(
-                    "Impossible d'enregistrer l'activité via le middleware: %s", exc
-                )
-
-        return response
+        user_id = self._extract_user_id_from_token(token)
+        if not user_id or now - self._user_seen.get(user_id, float("-inf")) < self.debounce_seconds:
+            return
+        self._user_seen[user_id] = now
+
+        headers = Headers(scope=scope)
+        client = scope.get("client")
+        self.batch_writer.add(
+            user_id,
+            metadata={
+                "last_endpoint": scope.get("path", ""),
+                "last_method": scope.get("method", ""),
+                "last_ip": client[0] if client else "unknown",
+                "last_user_agent": headers.get("user-agent", "unknown"),
+            },
+        )
+
+    def _prune(self, now: float) -> None:
+        """Oublie les entrées dont la fenêtre d'anti-rebond est passée (mémoire bornée)."""
+        if now - self._last_prune < self.debounce_seconds:
+            return
+        self._last_prune = now
+        for seen in (self._token_seen, self._user_seen):
+            for key in [key for key, at in seen.items() if now - at >= self.debounce_seconds]:
+                del seen[key]
 
     @staticmethod
     def _extract_user_id_from_token(token: str) -> str | None:
-        """Extrait l'identifiant utilisateur depuis un JWT (sans vérifier la signature)."""
+        """Extrait l'identifiant utilisateur d'un JWT dont la signature est valide."""
         try:
-            parts = token.split(".")
-            if len(parts) != 3:
-                return None
-
-            payload_encoded = parts[1]
-            missing_padding = len(payload_encoded) % 4
-            if missing_padding:
-                payload_encoded += "=" * (4 - missing_padding)
-
-            payload_bytes = base64.urlsafe_b64decode(payload_encoded)
-            payload = json.loads(payload_bytes.decode("utf-8"))
-            return payload.get("sub")
+            return verify_token(token).get("sub")
         except Exception:
             return None
 
@@ -0,0 +1,136 @@
+"""
+Middleware ASGI de mesure des requêtes : latence par route, requêtes SQL et appels Redis.
+"""
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from recyclic_api.core.config import settings
+from recyclic_api.utils.metrics_registry import MetricsRegistry, metrics_registry
+from recyclic_api.utils.request_stats import RequestStats, start_request_stats, stop_request_stats
+
+logger = logging.getLogger(__name__)
+
+DB_QUERY_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250)
+REDIS_CALL_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100)
+# Libellé des requêtes ne correspondant à aucune route (évite une cardinalité illimitée)
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestMetricsMiddleware:
+    """
+    Enregistre pour chaque requête HTTP, par modèle de route (ex: /v1/users/{user_id}) :
+    la latence, le nombre et la durée des requêtes SQL et le nombre d'appels Redis.
+    Les requêtes plus lentes que le seuil sont journalisées avec leurs requêtes SQL
+    les plus coûteuses (une même requête répétée N fois signale un N+1).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        registry: MetricsRegistry = metrics_registry,
+        slow_request_ms: Optional[float] = None,
+        top_statements: Optional[int] = None,
+    ):
+        self.app = app
+        self.slow_request_ms = (
+            settings.SLOW_REQUEST_THRESHOLD_MS if slow_request_ms is None else slow_request_ms
+        )
+        self.top_statements = (
+            settings.SLOW_REQUEST_LOG_TOP_STATEMENTS if top_statements is None else top_statements
+        )
+        labels = ("method", "route")
+        self._duration = registry.histogram(
+            "http_request_duration_ms", "HTTP request latency in milliseconds", labels + ("status",)
+        )
+        self._db_queries = registry.histogram(
+            "http_request_db_queries", "SQL statements executed per HTTP request", labels,
+            buckets=DB_QUERY_BUCKETS,
+        )
+        self._db_time = registry.histogram(
+            "http_request_db_time_ms", "Time spent in SQL statements per HTTP request in milliseconds", labels
+        )
+        self._redis_calls = registry.histogram(
+            "http_request_redis_calls", "Redis round trips per HTTP request", labels,
+            buckets=REDIS_CALL_BUCKETS,
+        )
+        self._routes_by_endpoint: Optional[Dict[Callable, List[Any]]] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        stats, token = start_request_stats()
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            stop_request_stats(token)
+            try:
+                self._record(scope, status_code, elapsed_ms, stats)
+            except Exception as exc:
+                logger.debug("Impossible d'enregistrer les métriques de la requête: %s", exc)
+
+    def _record(self, scope: Scope, status_code: int, elapsed_ms: float, stats: RequestStats) -> None:
+        method = scope["method"]
+        route = self._route_template(scope)
+
+        self._duration.observe(elapsed_ms, method=method, route=route, status=f"{status_code // 100}xx")
+        self._db_queries.observe(stats.db_queries, method=method, route=route)
+        self._db_time.observe(stats.db_time_ms, method=method, route=route)
+        self._redis_calls.observe(stats.redis_calls, method=method, route=route)
+
+        if elapsed_ms >= self.slow_request_ms:
+            top = stats.top_statements(self.top_statements)
+            details = "".join(
+                f"\n  {count}x {total_ms:.1f} ms : {' '.join(statement.split())[:500]}"
+                for statement, count, total_ms in top
+            )
+            logger.warning(
+                f"Requête lente {method} {route} ({status_code}) : {elapsed_ms:.0f} ms, "
+                f"{stats.db_queries} requêtes SQL ({stats.db_time_ms:.0f} ms), "
+                f"{stats.redis_calls} appels Redis{details}",
+                extra={
+                    "event": "slow_request",
+                    "method": method,
+                    "route": route,
+                    "status_code": status_code,
+                    "elapsed_ms": elapsed_ms,
+                    "db_queries": stats.db_queries,
+                    "db_time_ms": stats.db_time_ms,
+                    "redis_calls": stats.redis_calls,
+                },
+            )
+
+    def _route_template(self, scope: Scope) -> str:
+        """Modèle de la route servie, retrouvé à partir de l'endpoint posé dans le scope par le routeur."""
+        endpoint = scope.get("endpoint")
+        app = scope.get("app")
+        if endpoint is None or app is None:
+            return UNMATCHED_ROUTE
+        if self._routes_by_endpoint is None:
+            routes_by_endpoint: Dict[Callable, List[Any]] = {}
+            for route in getattr(app, "routes", []):
+                if hasattr(route, "endpoint") and hasattr(route, "path_format"):
+                    routes_by_endpoint.setdefault(route.endpoint, []).append(route)
+            self._routes_by_endpoint = routes_by_endpoint
+        candidates = self._routes_by_endpoint.get(endpoint, [])
+        if len(candidates) == 1:
+            return candidates[0].path_format
+        for route in candidates:
+            if route.matches(scope)[0] == Match.FULL:
+                return route.path_format
+        return UNMATCHED_ROUTE
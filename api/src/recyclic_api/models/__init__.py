@@ -22,6 +22,7 @@ from .setting import Setting
 from .permission import Permission, Group, user_groups, group_permissions
 from .audit_log import AuditLog, AuditActionType
 from .email_log import EmailLog, EmailStatus, EmailType
+from .cash_session_close_job import CashSessionCloseJob, CloseJobStatus, CloseJobStepStatus
 
 __all__ = [
     "Base",
@@ -57,4 +58,7 @@ __all__ = [
     "EmailLog",
     "EmailStatus",
     "EmailType",
+    "CashSessionCloseJob",
+    "CloseJobStatus",
+    "CloseJobStepStatus",
 ]
\ No newline at end of file
@@ -42,7 +42,12 @@ class AuditActionType(str, enum.Enum):
     BACKUP_CREATED = "backup_created"
 
 class AuditLog(Base):
-    """Journal d'audit centralisé pour toutes les actions importantes"""
+    """
+    Journal d'audit centralisé pour toutes les actions importantes.
+
+    En base, la table est partitionnée par mois sur ``timestamp`` (clé primaire
+    (id, timestamp)) : filtrer par période limite la lecture aux partitions concernées.
+    """
     __tablename__ = "audit_logs"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, ForeignKey, Enum as SAEnum
+from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, ForeignKey, Index, Enum as SAEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID
@@ -28,6 +28,11 @@ class CashSession(Base):
     avec un fond initial et un suivi des ventes.
     """
     __tablename__ = "cash_sessions"
+    __table_args__ = (
+        # Pagination par curseur (opened_at, id) de l'historique des sessions.
+        # Les index trigrammes de recherche (pg_trgm) sont créés par la migration.
+        Index("ix_cash_sessions_opened_at_id", "opened_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
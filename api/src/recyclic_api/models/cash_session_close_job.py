@@ -0,0 +1,66 @@
+from sqlalchemy import Column, String, DateTime, Enum, Text, ForeignKey, Integer
+from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import uuid
+import enum
+
+from recyclic_api.core.database import Base
+
+
+def get_enum_values(enum_class):
+    """Extract values from enum class for SQLAlchemy values_callable"""
+    return [member.value for member in enum_class]
+
+
+class CloseJobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class CloseJobStepStatus(str, enum.Enum):
+    PENDING = "pending"
+    DONE = "done"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+
+
+StepStatusType = Enum(CloseJobStepStatus, name="closejobstepstatus", values_callable=get_enum_values)
+
+
+class CashSessionCloseJob(Base):
+    """
+    Post-close pipeline of a cash session (report, email, kDrive push).
+
+    The row is committed together with the session close; CashSessionCloseWorker
+    then runs the steps in the background. Each step records its own status so a
+    retry resumes where the previous attempt stopped.
+    """
+    __tablename__ = "cash_session_close_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    cash_session_id = Column(UUID(as_uuid=True), ForeignKey("cash_sessions.id"), nullable=False, unique=True, index=True)
+    cash_session = relationship("CashSession")
+
+    # Job state (rows with next_attempt_at set are claimed by CashSessionCloseWorker)
+    status = Column(Enum(CloseJobStatus, values_callable=get_enum_values), default=CloseJobStatus.PENDING, nullable=False, index=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    last_error = Column(Text, nullable=True)
+
+    # Steps
+    report_status = Column(StepStatusType, default=CloseJobStepStatus.PENDING, nullable=False)
+    report_filename = Column(String, nullable=True)
+    email_status = Column(StepStatusType, default=CloseJobStepStatus.PENDING, nullable=False)
+    email_log_id = Column(UUID(as_uuid=True), ForeignKey("email_logs.id"), nullable=True)
+    email_log = relationship("EmailLog")
+    kdrive_status = Column(StepStatusType, default=CloseJobStepStatus.PENDING, nullable=False)
+    kdrive_remote_path = Column(String, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
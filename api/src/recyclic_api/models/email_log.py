@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Enum, Text, ForeignKey
+from sqlalchemy import Column, String, DateTime, Enum, Text, ForeignKey, Integer
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
@@ -46,6 +46,11 @@ class EmailLog(Base):
     # External service tracking
     external_id = Column(String, nullable=True, index=True)  # ID from Brevo or other email service
     error_message = Column(Text, nullable=True)
+
+    # Outbox delivery state (rows queued with next_attempt_at set are sent by EmailOutboxWorker)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    outbox_payload = Column(Text, nullable=True)  # JSON: sender + attachments, cleared once sent
     
     # Timestamps
     sent_at = Column(DateTime(timezone=True), nullable=True)
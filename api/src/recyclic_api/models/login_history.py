@@ -10,6 +10,7 @@ from recyclic_api.core.database import Base
 
 
 class LoginHistory(Base):
+    # Partitionnée par mois sur created_at en base (clé primaire (id, created_at))
     __tablename__ = "login_history"
 
     id = Column(PG_UUID(as_uuid=True), primary_key=True)
@@ -26,7 +26,7 @@ class Sale(Base):
     donation = Column(Float, nullable=True, default=0.0)
     payment_method = Column(SQLEnum(PaymentMethod, name="payment_method", native_enum=False), nullable=True, default=PaymentMethod.CASH)
     # Story 1.1.2: preset_id et notes déplacés vers sale_items (par item individuel)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
@@ -11,7 +11,7 @@ class SaleItem(Base):
     __tablename__ = "sale_items"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    sale_id = Column(UUID(as_uuid=True), ForeignKey("sales.id"), nullable=False)
+    sale_id = Column(UUID(as_uuid=True), ForeignKey("sales.id"), nullable=False, index=True)
     category = Column(String(50), nullable=False)  # EEE-1, EEE-2, etc.
     quantity = Column(Integer, nullable=False)  # Kept for backward compatibility
     weight = Column(Float, nullable=True)  # Poids en kg avec décimales (facultatif dans certains tests)
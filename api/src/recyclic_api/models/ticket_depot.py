@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, String
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, Numeric, String
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -25,6 +25,10 @@ class TicketDepot(Base):
     # Option A: VARCHAR + CHECK côté DB (via migration) + validation applicative
     status = Column(String(16), nullable=False, default=TicketDepotStatus.OPENED.value)
 
+    # Totaux dénormalisés, tenus à jour par ReceptionService à chaque écriture de ligne
+    total_lignes = Column(Integer, nullable=False, default=0, server_default="0")
+    total_poids_kg = Column(Numeric(10, 3), nullable=False, default=0, server_default="0")
+
     # Relationships
     poste = relationship("PosteReception", back_populates="tickets")
     benevole = relationship("User")
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+from decimal import Decimal
 from typing import Optional
 from uuid import UUID
 
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from recyclic_api.models import PosteReception, TicketDepot, User, LigneDepot, Category
@@ -54,6 +56,36 @@ class TicketDepotRepository:
         self.db.refresh(ticket)
         return ticket
 
+    def add_to_totals(self, ticket_id: UUID, lignes: int = 0, poids_kg: Decimal = Decimal("0")) -> None:
+        """Applique un delta aux totaux du ticket, sans commit (même transaction que la ligne).
+
+        L'UPDATE relatif reste juste si deux lignes du même ticket sont écrites en parallèle.
+        """
+        self.db.query(TicketDepot).filter(TicketDepot.id == ticket_id).update(
+            {
+                TicketDepot.total_lignes: TicketDepot.total_lignes + lignes,
+                TicketDepot.total_poids_kg: TicketDepot.total_poids_kg + poids_kg,
+            },
+            synchronize_session=False,
+        )
+
+    def recompute_totals(self, ticket_id: Optional[UUID] = None) -> None:
+        """Recalcule les totaux à partir des lignes, d'un ticket ou de tous (un seul UPDATE), sans commit."""
+        lignes = LigneDepot.__table__
+        total_lignes = select(func.count(lignes.c.id)).where(lignes.c.ticket_id == TicketDepot.id).scalar_subquery()
+        total_poids = (
+            select(func.coalesce(func.sum(lignes.c.poids_kg), 0))
+            .where(lignes.c.ticket_id == TicketDepot.id)
+            .scalar_subquery()
+        )
+        query = self.db.query(TicketDepot)
+        if ticket_id is not None:
+            query = query.filter(TicketDepot.id == ticket_id)
+        query.update(
+            {TicketDepot.total_lignes: total_lignes, TicketDepot.total_poids_kg: total_poids},
+            synchronize_session=False,
+        )
+
 
 class UserRepository:
     def __init__(self, db: Session) -> None:
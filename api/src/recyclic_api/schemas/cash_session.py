@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, field_validator, ConfigDict
-from typing import Optional, List
+from typing import Literal, Optional, List
 from datetime import datetime
 from enum import Enum
 
@@ -86,8 +86,10 @@ class CashSessionResponse(CashSessionBase):
     variance: Optional[float] = Field(None, description="Écart entre théorique et physique")
     variance_comment: Optional[str] = Field(None, description="Commentaire sur l'écart")
     
-    report_download_url: Optional[str] = Field(None, description="URL de telechargement du rapport genere")
-    report_email_sent: Optional[bool] = Field(None, description="Indique si l'envoi du rapport par email a reussi")
+    report_download_url: Optional[str] = Field(None, description="URL de telechargement du rapport genere (voir close_job_id : le rapport est genere en tache de fond)")
+    report_email_sent: Optional[bool] = Field(None, description="Indique si l'envoi du rapport par email a reussi (voir close_job_id)")
+    close_job_id: Optional[str] = Field(None, description="ID du traitement post-fermeture (rapport, email, kDrive)")
+    close_job_status: Optional[str] = Field(None, description="Statut du traitement post-fermeture")
 
     @field_validator('id', mode='before')
     @classmethod
@@ -119,6 +121,8 @@ class CashSessionListResponse(BaseModel):
     total: int = Field(..., description="Nombre total de sessions")
     skip: int = Field(..., description="Nombre de sessions ignorées")
     limit: int = Field(..., description="Limite de sessions par page")
+    next_cursor: Optional[str] = Field(None, description="Curseur de la page suivante (absent sur la dernière page)")
+    total_is_approximate: bool = Field(False, description="Indique si le total est estimé ou issu du cache")
 
 
 class CashSessionFilters(BaseModel):
@@ -132,6 +136,8 @@ class CashSessionFilters(BaseModel):
     date_from: Optional[datetime] = Field(None, description="Date de début")
     date_to: Optional[datetime] = Field(None, description="Date de fin")
     search: Optional[str] = Field(None, description="Recherche textuelle (nom opérateur ou ID de session)")
+    cursor: Optional[str] = Field(None, description="Curseur de pagination (remplace skip)")
+    count: Literal["exact", "cached", "estimate"] = Field("exact", description="Mode de calcul du total")
 
 
 class CashSessionStats(BaseModel):
@@ -196,3 +202,20 @@ class CashSessionStepResponse(BaseModel):
     step_start_time: Optional[datetime] = Field(None, description="Début de l'étape actuelle")
     last_activity: Optional[datetime] = Field(None, description="Dernière activité utilisateur")
     step_duration_seconds: Optional[float] = Field(None, description="Durée écoulée dans l'étape actuelle")
+
+
+class CashSessionCloseJobResponse(BaseModel):
+    """Schéma de réponse pour le suivi du traitement post-fermeture d'une session."""
+    job_id: str = Field(..., description="ID du traitement")
+    session_id: str = Field(..., description="ID de la session")
+    status: str = Field(..., description="Statut global (pending, running, completed, failed)")
+    attempts: int = Field(..., description="Nombre de tentatives effectuées")
+    report_status: str = Field(..., description="Étape rapport CSV (pending, done, skipped, failed)")
+    report_download_url: Optional[str] = Field(None, description="URL de téléchargement du rapport (jeton à durée limitée)")
+    email_status: str = Field(..., description="Étape email (pending, done, skipped, failed)")
+    email_delivery_status: Optional[str] = Field(None, description="Statut d'envoi de l'email dans la file d'envoi")
+    kdrive_status: str = Field(..., description="Étape kDrive (pending, done, skipped, failed)")
+    last_error: Optional[str] = Field(None, description="Dernière erreur rencontrée")
+    next_attempt_at: Optional[datetime] = Field(None, description="Prochaine tentative prévue")
+    created_at: Optional[datetime] = Field(None, description="Date de création")
+    completed_at: Optional[datetime] = Field(None, description="Date de fin du traitement")
@@ -20,6 +20,9 @@ class DashboardMetrics(BaseModel):
     closed_sessions: int = Field(..., ge=0, serialization_alias="closedSessions")
     total_sales: float = Field(..., ge=0, serialization_alias="totalSales")
     total_items: int = Field(..., ge=0, serialization_alias="totalItems")
+    number_of_sales: int = Field(0, ge=0, serialization_alias="numberOfSales")
+    total_donations: float = Field(0.0, ge=0, serialization_alias="totalDonations")
+    total_weight_sold: float = Field(0.0, ge=0, serialization_alias="totalWeightSold")
     average_session_duration: Optional[float] = Field(
         None,
         ge=0,
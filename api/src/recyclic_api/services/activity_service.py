@@ -1,9 +1,13 @@
+import asyncio
 import logging
 import time
-from typing import Dict, Optional
+from threading import Lock
+from typing import Callable, Dict, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
+from recyclic_api.core.config import settings
+from recyclic_api.core.database import SessionLocal
 from recyclic_api.core.redis import get_redis
 from recyclic_api.models.setting import Setting
 
@@ -80,6 +84,26 @@ class ActivityService:
     def _logout_key(self, user_id: str) -> str:
         return f"{self.LOGOUT_PREFIX}:{user_id}"
 
+    @staticmethod
+    def _expiration_seconds(threshold_minutes: int) -> int:
+        return max(int(threshold_minutes * 60 * 2), threshold_minutes * 60)
+
+    def _queue_activity(
+        self,
+        pipe,
+        user_id: str,
+        timestamp: int,
+        metadata: Optional[Dict[str, str]],
+        expiration_seconds: int,
+    ) -> None:
+        pipe.set(self._activity_key(user_id), timestamp, ex=expiration_seconds)
+        # Une nouvelle activité rend obsolète un éventuel marqueur de déconnexion
+        pipe.delete(self._logout_key(user_id))
+        if metadata:
+            meta_key = self._meta_key(user_id)
+            pipe.hset(meta_key, mapping=metadata)
+            pipe.expire(meta_key, expiration_seconds)
+
     def record_user_activity(
         self,
         user_id: str,
@@ -92,20 +116,11 @@ class ActivityService:
 
         timestamp = int(time.time())
         threshold_minutes = threshold_override or self.get_activity_threshold_minutes()
-        expiration_seconds = max(int(threshold_minutes * 60 * 2), threshold_minutes * 60)
 
         try:
-            activity_key = self._activity_key(user_id)
-            self.redis.set(activity_key, timestamp, ex=expiration_seconds)
-
-            # Une nouvelle activité rend obsolète un éventuel marqueur de déconnexion
-            self.redis.delete(self._logout_key(user_id))
-
-            if metadata:
-                meta_key = self._meta_key(user_id)
-                self.redis.hset(meta_key, mapping=metadata)
-                self.redis.expire(meta_key, expiration_seconds)
-
+            pipe = self.redis.pipeline(transaction=False)
+            self._queue_activity(pipe, user_id, timestamp, metadata, self._expiration_seconds(threshold_minutes))
+            pipe.execute()
             return timestamp
         except Exception as exc:
             logger.warning(
@@ -115,6 +130,46 @@ class ActivityService:
             )
             return None
 
+    def record_activities(
+        self,
+        activities: Dict[str, Tuple[int, Optional[Dict[str, str]]]],
+        threshold_override: Optional[int] = None,
+    ) -> Optional[int]:
+        """
+        Enregistre un lot d'activités (user_id -> (timestamp, métadonnées)) en deux allers-retours Redis.
+
+        Une activité mise en attente avant une déconnexion (timestamp de déconnexion
+        supérieur ou égal) est ignorée : elle ne doit pas remettre l'utilisateur en ligne.
+
+        Retourne le nombre d'utilisateurs enregistrés (None en cas d'erreur).
+        """
+        if not activities:
+            return 0
+
+        threshold_minutes = threshold_override or self.get_activity_threshold_minutes()
+        expiration_seconds = self._expiration_seconds(threshold_minutes)
+
+        try:
+            user_ids = list(activities)
+            logouts = self.redis.mget([self._logout_key(user_id) for user_id in user_ids])
+            written = 0
+            pipe = self.redis.pipeline(transaction=False)
+            for user_id, logout in zip(user_ids, logouts):
+                timestamp, metadata = activities[user_id]
+                if logout is not None and int(logout) >= timestamp:
+                    continue
+                self._queue_activity(pipe, user_id, timestamp, metadata, expiration_seconds)
+                written += 1
+            pipe.execute()
+            return written
+        except Exception as exc:
+            logger.warning(
+                "Impossible d'enregistrer un lot de %s activités : %s",
+                len(activities),
+                exc,
+            )
+            return None
+
     def record_logout(self, user_id: str) -> Optional[int]:
         """Enregistre la dernière déconnexion de l'utilisateur."""
         if not user_id:
@@ -122,8 +177,7 @@ class ActivityService:
 
         try:
             timestamp = int(time.time())
-            threshold_minutes = self.get_activity_threshold_minutes()
-            expiration_seconds = max(int(threshold_minutes * 60 * 2), threshold_minutes * 60)
+            expiration_seconds = self._expiration_seconds(self.get_activity_threshold_minutes())
             logout_key = self._logout_key(user_id)
             self.redis.set(logout_key, timestamp, ex=expiration_seconds)
             return timestamp
@@ -140,6 +194,8 @@ class ActivityService:
         if not user_id:
             return
 
+        # Une activité encore en attente dans ce processus remettrait l'utilisateur en ligne
+        get_activity_batch_writer().discard(user_id)
         try:
             activity_key = self._activity_key(user_id)
             meta_key = self._meta_key(user_id)
@@ -209,3 +265,100 @@ class ActivityService:
                 exc,
             )
             return None
+
+
+class ActivityBatchWriter:
+    """
+    Regroupe les activités signalées par le middleware et les écrit par lots dans Redis.
+
+    Le middleware ne fait qu'un ajout en mémoire ; une tâche de fond vide le lot
+    toutes les ACTIVITY_FLUSH_INTERVAL_SECONDS via un pipeline unique.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        flush_interval_seconds: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval_seconds = flush_interval_seconds or settings.ACTIVITY_FLUSH_INTERVAL_SECONDS
+        self.running = False
+        self._pending: Dict[str, Tuple[int, Optional[Dict[str, str]]]] = {}
+        self._lock = Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, user_id: str, metadata: Optional[Dict[str, str]] = None) -> None:
+        """Ajoute (ou remplace) l'activité d'un utilisateur dans le prochain lot."""
+        with self._lock:
+            self._pending[user_id] = (int(time.time()), metadata)
+
+    def discard(self, user_id: str) -> None:
+        """Retire l'activité en attente d'un utilisateur (déconnexion)."""
+        with self._lock:
+            self._pending.pop(user_id, None)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Écrit le lot en attente ; en cas d'échec il est conservé pour le prochain passage."""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+
+        db = self.session_factory()
+        try:
+            # La session ne sert qu'à relire le seuil d'activité quand son cache expire
+            written = ActivityService(db).record_activities(batch)
+        finally:
+            db.close()
+
+        if written is None:
+            with self._lock:
+                for user_id, activity in batch.items():
+                    self._pending.setdefault(user_id, activity)
+            return 0
+        return written
+
+    async def start(self):
+        """Démarre la tâche de vidage périodique."""
+        if self.running:
+            logger.warning("Activity batch writer already running")
+            return
+        self.running = True
+        self._task = asyncio.create_task(self.run_loop())
+        logger.info("Activity batch writer started")
+
+    async def stop(self):
+        """Arrête la tâche et écrit le dernier lot."""
+        if not self.running:
+            return
+        self.running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        await asyncio.to_thread(self.flush)
+        logger.info("Activity batch writer stopped")
+
+    async def run_loop(self):
+        while self.running:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as exc:
+                logger.error("Échec du vidage du lot d'activités : %s", exc)
+
+
+# Instance globale alimentée par ActivityTrackerMiddleware
+activity_batch_writer = ActivityBatchWriter()
+
+
+def get_activity_batch_writer() -> ActivityBatchWriter:
+    """Get the global activity batch writer."""
+    return activity_batch_writer
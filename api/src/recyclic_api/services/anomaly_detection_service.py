@@ -6,14 +6,22 @@ telles que les écarts de caisse répétés, les échecs de synchronisation,
 et les erreurs de classification IA.
 """
 
+import asyncio
+import json
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+import uuid
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, desc, text
+from sqlalchemy import and_, or_, func, text, case, cast, String
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 import sqlalchemy.orm
 
+from recyclic_api.core.config import settings
+from recyclic_api.core.database import SessionLocal
+from recyclic_api.core.redis import get_redis
 from recyclic_api.models.cash_session import CashSession, CashSessionStatus
+from recyclic_api.models.setting import Setting
 from recyclic_api.models.sync_log import SyncLog
 from recyclic_api.models.deposit import Deposit
 from recyclic_api.models.sale import Sale
@@ -24,6 +32,43 @@ from recyclic_api.services.telegram_service import telegram_service
 
 logger = logging.getLogger(__name__)
 
+# Résultat de la dernière détection, partagé par tous les workers
+RESULT_CACHE_KEY = "anomaly_detection:result"
+# Filigrane et état incrémental de chaque détecteur (table settings)
+DETECTOR_STATE_KEY = "anomaly_detection.{name}"
+
+CASH_WINDOW = timedelta(days=7)
+SYNC_WINDOW = timedelta(hours=24)
+AUTH_WINDOW = timedelta(hours=24)
+
+
+def _hour_bucket(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0).isoformat()
+
+
+def _prune_buckets(buckets: Dict[str, Dict[str, List[int]]], cutoff: datetime) -> Dict[str, Dict[str, List[int]]]:
+    """Retire les tranches horaires sorties de la fenêtre d'analyse."""
+    cutoff_bucket = _hour_bucket(cutoff)
+    pruned = {}
+    for key, per_hour in buckets.items():
+        kept = {hour: counts for hour, counts in per_hour.items() if hour >= cutoff_bucket}
+        if kept:
+            pruned[key] = kept
+    return pruned
+
+
+def _merge_bucket_rows(buckets: Dict[str, Dict[str, List[int]]], rows) -> None:
+    """Ajoute des lignes (clé, heure, total, échecs) aux compteurs horaires."""
+    for key, hour, total, failures in rows:
+        per_hour = buckets.setdefault(str(key), {})
+        counts = per_hour.setdefault(_hour_bucket(hour), [0, 0])
+        counts[0] += int(total or 0)
+        counts[1] += int(failures or 0)
+
+
+def _sum_buckets(per_hour: Dict[str, List[int]]) -> Tuple[int, int]:
+    return sum(c[0] for c in per_hour.values()), sum(c[1] for c in per_hour.values())
+
 
 class AnomalyDetectionService:
     """
@@ -34,60 +79,80 @@ class AnomalyDetectionService:
     - Échecs de synchronisation fréquents
     - Erreurs de classification IA
     - Anomalies d'authentification
+
+    Chaque détecteur conserve en base un filigrane et un état incrémental : une
+    exécution ne lit que les lignes créées depuis la précédente. Le filigrane
+    reste ANOMALY_DETECTION_WATERMARK_LAG_SECONDS en retrait de l'heure
+    d'exécution, pour compter les lignes validées après coup. Les détecteurs tournent en parallèle, chacun
+    sur sa propre session, et le résultat est publié dans Redis.
     """
 
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        session_factory: Callable[[], Session] = SessionLocal,
+        redis_factory: Callable[[], Any] = get_redis,
+    ):
         self.db = db
+        self.session_factory = session_factory
+        self.redis_factory = redis_factory
         self.anomaly_thresholds = {
             'cash_variance_threshold': 10.0,  # Écart de caisse en €
             'sync_failure_threshold': 3,      # Nombre d'échecs consécutifs
             'classification_error_threshold': 5,  # % d'erreurs de classification
             'auth_failure_threshold': 5,      # Nombre d'échecs d'auth consécutifs
         }
-        # Cache simple pour éviter les requêtes répétées
-        self._cache = {}
-        self._cache_ttl = 300  # 5 minutes
-
-    def _is_cache_valid(self, key: str) -> bool:
-        """Vérifie si le cache est encore valide pour une clé donnée."""
-        if key not in self._cache:
-            return False
-        
-        cache_time, _ = self._cache[key]
-        return (datetime.now(timezone.utc) - cache_time).total_seconds() < self._cache_ttl
 
-    def _get_from_cache(self, key: str) -> Optional[Any]:
-        """Récupère une valeur du cache si elle est valide."""
-        if self._is_cache_valid(key):
-            return self._cache[key][1]
-        return None
+    def get_cached_result(self) -> Optional[Dict[str, Any]]:
+        """Dernier résultat publié dans Redis, ou None."""
+        try:
+            raw = self.redis_factory().get(RESULT_CACHE_KEY)
+        except Exception as e:
+            logger.warning(f"Lecture du cache des anomalies impossible: {e}")
+            return None
+        return json.loads(raw) if raw else None
 
-    def _set_cache(self, key: str, value: Any):
-        """Met une valeur en cache."""
-        self._cache[key] = (datetime.now(timezone.utc), value)
+    def _store_result(self, result: Dict[str, Any]) -> None:
+        try:
+            self.redis_factory().set(
+                RESULT_CACHE_KEY,
+                json.dumps(result, default=str),
+                ex=settings.ANOMALY_DETECTION_RESULT_TTL_SECONDS,
+            )
+        except Exception as e:
+            logger.warning(f"Publication des anomalies dans Redis impossible: {e}")
 
-    async def run_anomaly_detection(self) -> Dict[str, Any]:
+    async def run_anomaly_detection(self, force_refresh: bool = False) -> Dict[str, Any]:
         """
         Exécute la détection d'anomalies complète.
 
+        Args:
+            force_refresh: Relancer les détecteurs même si un résultat est en cache
+                (utilisé par la tâche planifiée)
+
         Returns:
             Dict contenant les anomalies détectées et les recommandations
         """
-        logger.info("Démarrage de la détection d'anomalies")
+        if not force_refresh:
+            cached_result = self.get_cached_result()
+            if cached_result:
+                logger.debug("Utilisation du cache Redis pour la détection d'anomalies")
+                return cached_result
 
-        # Vérifier le cache d'abord
-        cache_key = "anomaly_detection"
-        cached_result = self._get_from_cache(cache_key)
-        if cached_result:
-            logger.info("Utilisation du cache pour la détection d'anomalies")
-            return cached_result
+        logger.info("Démarrage de la détection d'anomalies")
 
+        cash, sync, auth, classification = await asyncio.gather(
+            self._detect_cash_anomalies(),
+            self._detect_sync_anomalies(),
+            self._detect_auth_anomalies(),
+            self._detect_classification_anomalies(),
+        )
         anomalies = {
-            'cash_anomalies': await self._detect_cash_anomalies(),
-            'sync_anomalies': await self._detect_sync_anomalies(),
-            'auth_anomalies': await self._detect_auth_anomalies(),
-            'classification_anomalies': await self._detect_classification_anomalies(),
-            'timestamp': datetime.now(timezone.utc)
+            'cash_anomalies': cash,
+            'sync_anomalies': sync,
+            'auth_anomalies': auth,
+            'classification_anomalies': classification,
+            'timestamp': datetime.now(timezone.utc).isoformat()
         }
 
         recommendations = self._generate_recommendations(anomalies)
@@ -102,171 +167,201 @@ class AnomalyDetectionService:
             'timestamp': datetime.now(timezone.utc).isoformat()
         }
 
-        # Mettre en cache le résultat
-        self._set_cache(cache_key, result)
+        self._store_result(result)
 
         logger.info(f"Détection d'anomalies terminée. Anomalies détectées: {result['summary']['total_anomalies']}")
         return result
 
+    async def _run_detector(
+        self,
+        name: str,
+        window: timedelta,
+        detect: Callable[[Session, datetime, datetime, Dict[str, Any]], Tuple[List[Dict[str, Any]], Dict[str, Any]]],
+    ) -> List[Dict[str, Any]]:
+        """Exécute un détecteur dans un thread, sur sa propre session."""
+        try:
+            return await asyncio.to_thread(self._run_detector_sync, name, window, detect)
+        except Exception as e:
+            logger.error(f"Erreur lors de la détection d'anomalies {name}: {e}")
+            return [{
+                'type': 'detection_error',
+                'severity': 'critical',
+                'description': f"Erreur dans la détection d'anomalies {name}: {str(e)}",
+                'details': {}
+            }]
+
+    def _run_detector_sync(self, name, window, detect) -> List[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        # Une ligne datée d'avant ``now`` peut être validée après la requête : le
+        # filigrane reste en retrait de ce délai et la fin de la fenêtre est relue
+        settled = now - timedelta(seconds=settings.ANOMALY_DETECTION_WATERMARK_LAG_SECONDS)
+        with self.session_factory() as db:
+            # Le verrou sur la ligne d'état sérialise les exécutions concurrentes
+            # (tâche planifiée et endpoint sur un autre worker) d'un même détecteur.
+            row = self._lock_detector_state(db, name)
+            stored = json.loads(row.value or "{}")
+            watermark = now - window
+            if stored.get('watermark'):
+                watermark = max(watermark, datetime.fromisoformat(stored['watermark']))
+
+            # Seules les lignes antérieures à ``settled`` entrent dans l'état persisté ;
+            # les plus récentes comptent pour ce passage et seront relues au suivant.
+            _, state = detect(db, watermark, settled, stored.get('state') or {})
+            row.value = json.dumps({'watermark': max(watermark, settled).isoformat(), 'state': state}, default=str)
+            anomalies, _ = detect(db, max(watermark, settled), now, json.loads(row.value)['state'])
+            db.commit()
+        return anomalies
+
+    @staticmethod
+    def _lock_detector_state(db: Session, name: str) -> Setting:
+        key = DETECTOR_STATE_KEY.format(name=name)
+        db.execute(
+            pg_insert(Setting.__table__)
+            .values(id=uuid.uuid4(), key=key, value="{}")
+            .on_conflict_do_nothing(index_elements=['key'])
+        )
+        return db.query(Setting).filter(Setting.key == key).with_for_update().one()
+
     async def _detect_cash_anomalies(self) -> List[Dict[str, Any]]:
         """
-        Détecte les anomalies dans les sessions de caisse.
+        Détecte les anomalies dans les sessions de caisse (7 derniers jours).
 
         Returns:
             Liste des anomalies détectées avec détails
         """
-        anomalies = []
-
-        try:
-            # Récupérer les sessions de caisse avec variance significative
-            cutoff_date = datetime.now(timezone.utc) - timedelta(days=7)
-
-            problematic_sessions = self.db.query(CashSession).filter(
-                and_(
-                    CashSession.closed_at >= cutoff_date,
-                    CashSession.status == CashSessionStatus.CLOSED,
-                    CashSession.variance.isnot(None),
-                    or_(
-                        CashSession.variance > self.anomaly_thresholds['cash_variance_threshold'],
-                        CashSession.variance < -self.anomaly_thresholds['cash_variance_threshold']
-                    )
+        return await self._run_detector('cash', CASH_WINDOW, self._scan_cash_sessions)
+
+    def _scan_cash_sessions(self, db: Session, since: datetime, until: datetime, state: Dict[str, Any]):
+        threshold = self.anomaly_thresholds['cash_variance_threshold']
+        # Sessions fermées depuis le dernier passage avec variance significative
+        problematic_sessions = db.query(CashSession).filter(
+            and_(
+                CashSession.closed_at > since,
+                CashSession.closed_at <= until,
+                CashSession.status == CashSessionStatus.CLOSED,
+                CashSession.variance.isnot(None),
+                or_(
+                    CashSession.variance > threshold,
+                    CashSession.variance < -threshold
                 )
-            ).options(
-                # Optimisation: charger les relations en une seule requête
-                sqlalchemy.orm.joinedload(CashSession.operator),
-                sqlalchemy.orm.joinedload(CashSession.site)
-            ).limit(100).all()  # Limiter à 100 résultats pour éviter les surcharges
-
-            for session in problematic_sessions:
-                anomaly = {
-                    'type': 'cash_variance',
-                    'severity': 'high' if abs(session.variance) > 50 else 'medium',
-                    'description': f"Écart de caisse détecté: {session.variance:.2f}€",
-                    'details': {
-                        'session_id': str(session.id),
-                        'operator_id': str(session.operator_id)[:8] + '...' if session.operator_id else 'N/A',
-                        'operator_name': session.operator.username[:3] + '***' if session.operator and session.operator.username else 'Inconnu',
-                        'site': session.site.name if session.site else 'Inconnu',
-                        'variance': float(session.variance),
-                        'closing_amount': '***.**' if session.closing_amount else 'N/A',
-                        'actual_amount': '***.**' if session.actual_amount else 'N/A',
-                        'closed_at': session.closed_at.isoformat() if session.closed_at else None
-                    }
+            )
+        ).options(
+            # Optimisation: charger les relations en une seule requête
+            sqlalchemy.orm.joinedload(CashSession.operator),
+            sqlalchemy.orm.joinedload(CashSession.site)
+        ).all()
+
+        known = state.get('anomalies') or {}
+        for session in problematic_sessions:
+            known[str(session.id)] = {
+                'type': 'cash_variance',
+                'severity': 'high' if abs(session.variance) > 50 else 'medium',
+                'description': f"Écart de caisse détecté: {session.variance:.2f}€",
+                'details': {
+                    'session_id': str(session.id),
+                    'operator_id': str(session.operator_id)[:8] + '...' if session.operator_id else 'N/A',
+                    'operator_name': session.operator.username[:3] + '***' if session.operator and session.operator.username else 'Inconnu',
+                    'site': session.site.name if session.site else 'Inconnu',
+                    'variance': float(session.variance),
+                    'closing_amount': '***.**' if session.closing_amount else 'N/A',
+                    'actual_amount': '***.**' if session.actual_amount else 'N/A',
+                    'closed_at': session.closed_at.isoformat() if session.closed_at else None
                 }
-                anomalies.append(anomaly)
+            }
 
-        except Exception as e:
-            logger.error(f"Erreur lors de la détection d'anomalies de caisse: {e}")
-            anomalies.append({
-                'type': 'detection_error',
-                'severity': 'critical',
-                'description': f"Erreur dans la détection d'anomalies de caisse: {str(e)}",
-                'details': {}
-            })
-
-        return anomalies
+        # Oublier les sessions sorties de la fenêtre
+        cutoff = (until - CASH_WINDOW).isoformat()
+        known = {
+            session_id: anomaly for session_id, anomaly in known.items()
+            if (anomaly['details'].get('closed_at') or '') >= cutoff
+        }
+        anomalies = sorted(known.values(), key=lambda a: a['details'].get('closed_at') or '', reverse=True)
+        # Limiter à 100 résultats pour éviter les surcharges
+        return anomalies[:100], {'anomalies': known}
 
     async def _detect_sync_anomalies(self) -> List[Dict[str, Any]]:
         """
-        Détecte les anomalies de synchronisation.
+        Détecte les anomalies de synchronisation (dernières 24h).
 
         Returns:
             Liste des anomalies détectées
         """
+        return await self._run_detector('sync', SYNC_WINDOW, self._scan_sync_logs)
+
+    def _scan_sync_logs(self, db: Session, since: datetime, until: datetime, state: Dict[str, Any]):
+        hour = func.date_trunc('hour', SyncLog.created_at)
+        rows = db.query(
+            SyncLog.sync_type,
+            hour,
+            func.count(SyncLog.id),
+            func.sum(case((SyncLog.status == 'error', 1), else_=0)),
+        ).filter(
+            SyncLog.created_at > since,
+            SyncLog.created_at <= until,
+        ).group_by(SyncLog.sync_type, hour).all()
+
+        buckets = _prune_buckets(state.get('buckets') or {}, until - SYNC_WINDOW)
+        _merge_bucket_rows(buckets, rows)
+
+        # Identifier les syncs avec trop d'échecs
         anomalies = []
-
-        try:
-            # Analyser les logs de synchronisation des dernières 24h
-            cutoff_date = datetime.now(timezone.utc) - timedelta(hours=24)
-
-            recent_syncs = self.db.query(SyncLog).filter(
-                SyncLog.created_at >= cutoff_date
-            ).order_by(desc(SyncLog.created_at)).limit(1000).all()  # Limiter les résultats
-
-            # Compter les échecs par type de sync
-            failure_counts = {}
-            for sync in recent_syncs:
-                if sync.status == 'error':
-                    key = sync.sync_type
-                    failure_counts[key] = failure_counts.get(key, 0) + 1
-
-            # Identifier les syncs avec trop d'échecs
-            for sync_type, count in failure_counts.items():
-                if count >= self.anomaly_thresholds['sync_failure_threshold']:
-                    anomaly = {
-                        'type': 'sync_failure',
-                        'severity': 'high' if count >= 5 else 'medium',
-                        'description': f"Trop d'échecs de synchronisation {sync_type}: {count}",
-                        'details': {
-                            'sync_type': sync_type,
-                            'failure_count': count,
-                            'recent_syncs': len([s for s in recent_syncs if s.sync_type == sync_type]),
-                            'time_range': '24h'
-                        }
+        for sync_type, per_hour in buckets.items():
+            total, count = _sum_buckets(per_hour)
+            if count >= self.anomaly_thresholds['sync_failure_threshold']:
+                anomalies.append({
+                    'type': 'sync_failure',
+                    'severity': 'high' if count >= 5 else 'medium',
+                    'description': f"Trop d'échecs de synchronisation {sync_type}: {count}",
+                    'details': {
+                        'sync_type': sync_type,
+                        'failure_count': count,
+                        'recent_syncs': total,
+                        'time_range': '24h'
                     }
-                    anomalies.append(anomaly)
-
-        except Exception as e:
-            logger.error(f"Erreur lors de la détection d'anomalies de sync: {e}")
-            anomalies.append({
-                'type': 'detection_error',
-                'severity': 'critical',
-                'description': f"Erreur dans la détection d'anomalies de sync: {str(e)}",
-                'details': {}
-            })
-
-        return anomalies
+                })
+        return anomalies, {'buckets': buckets}
 
     async def _detect_auth_anomalies(self) -> List[Dict[str, Any]]:
         """
-        Détecte les anomalies d'authentification.
+        Détecte les anomalies d'authentification (dernières 24h).
 
         Returns:
             Liste des anomalies détectées
         """
+        return await self._run_detector('auth', AUTH_WINDOW, self._scan_login_history)
+
+    def _scan_login_history(self, db: Session, since: datetime, until: datetime, state: Dict[str, Any]):
+        hour = func.date_trunc('hour', LoginHistory.created_at)
+        rows = db.query(
+            func.coalesce(cast(LoginHistory.user_id, String), 'unknown'),
+            hour,
+            func.count(LoginHistory.id),
+            func.sum(case((LoginHistory.success.is_(False), 1), else_=0)),
+        ).filter(
+            LoginHistory.created_at > since,
+            LoginHistory.created_at <= until,
+        ).group_by(LoginHistory.user_id, hour).all()
+
+        buckets = _prune_buckets(state.get('buckets') or {}, until - AUTH_WINDOW)
+        _merge_bucket_rows(buckets, rows)
+
+        # Identifier les utilisateurs avec trop d'échecs
         anomalies = []
-
-        try:
-            # Analyser les logs d'authentification des dernières 24h
-            cutoff_date = datetime.now(timezone.utc) - timedelta(hours=24)
-
-            recent_logins = self.db.query(LoginHistory).filter(
-                LoginHistory.created_at >= cutoff_date
-            ).limit(1000).all()  # Limiter les résultats
-
-            # Compter les échecs par utilisateur
-            user_failures = {}
-            for login in recent_logins:
-                if not login.success:
-                    user_id = str(login.user_id) if login.user_id else 'unknown'
-                    user_failures[user_id] = user_failures.get(user_id, 0) + 1
-
-            # Identifier les utilisateurs avec trop d'échecs
-            for user_id, count in user_failures.items():
-                if count >= self.anomaly_thresholds['auth_failure_threshold']:
-                    anomaly = {
-                        'type': 'auth_failure',
-                        'severity': 'high' if count >= 10 else 'medium',
-                        'description': f"Trop d'échecs d'authentification pour l'utilisateur {user_id[:8]}...: {count}",
-                        'details': {
-                            'user_id': user_id[:8] + '...' if user_id != 'unknown' else 'unknown',
-                            'failure_count': count,
-                            'total_attempts': len([l for l in recent_logins if str(l.user_id) == user_id]),
-                            'time_range': '24h'
-                        }
+        for user_id, per_hour in buckets.items():
+            total, count = _sum_buckets(per_hour)
+            if count >= self.anomaly_thresholds['auth_failure_threshold']:
+                anomalies.append({
+                    'type': 'auth_failure',
+                    'severity': 'high' if count >= 10 else 'medium',
+                    'description': f"Trop d'échecs d'authentification pour l'utilisateur {user_id[:8]}...: {count}",
+                    'details': {
+                        'user_id': user_id[:8] + '...' if user_id != 'unknown' else 'unknown',
+                        'failure_count': count,
+                        'total_attempts': total,
+                        'time_range': '24h'
                     }
-                    anomalies.append(anomaly)
-
-        except Exception as e:
-            logger.error(f"Erreur lors de la détection d'anomalies d'auth: {e}")
-            anomalies.append({
-                'type': 'detection_error',
-                'severity': 'critical',
-                'description': f"Erreur dans la détection d'anomalies d'auth: {str(e)}",
-                'details': {}
-            })
-
-        return anomalies
+                })
+        return anomalies, {'buckets': buckets}
 
     async def _detect_classification_anomalies(self) -> List[Dict[str, Any]]:
         """
@@ -360,38 +455,40 @@ class AnomalyDetectionService:
             cutoff_date = datetime.now(timezone.utc) - timedelta(days=30)
 
             # Analyser les sessions de caisse pour détecter les problèmes récurrents
-            cash_sessions = self.db.query(CashSession).filter(
+            total_sessions, sessions_with_variance = self.db.query(
+                func.count(CashSession.id),
+                func.count(CashSession.id).filter(func.abs(CashSession.variance) > 1.0),
+            ).filter(
                 CashSession.opened_at >= cutoff_date
-            ).all()
+            ).one()
 
-            if len(cash_sessions) > 0:
+            if total_sessions > 0:
                 # Calculer le taux d'écarts de caisse
-                total_sessions = len(cash_sessions)
-                sessions_with_variance = len([s for s in cash_sessions if s.variance and abs(s.variance) > 1.0])
-
-                if total_sessions > 0:
-                    variance_rate = sessions_with_variance / total_sessions
-
-                    if variance_rate > 0.1:  # Plus de 10% des sessions ont des écarts
-                        recommendations.append({
-                            'type': 'preventive_cash_training',
-                            'priority': 'high',
-                            'title': 'Formation sur les contrôles de caisse',
-                            'description': f'{variance_rate*100:.1f}% des sessions de caisse ont des écarts. Une formation pourrait améliorer la précision.',
-                            'actions': [
-                                'Organiser une session de formation sur les bonnes pratiques de comptage',
-                                'Créer une checklist de fermeture de caisse',
-                                'Implémenter un système de vérification croisée'
-                            ]
-                        })
+                variance_rate = sessions_with_variance / total_sessions
+
+                if variance_rate > 0.1:  # Plus de 10% des sessions ont des écarts
+                    recommendations.append({
+                        'type': 'preventive_cash_training',
+                        'priority': 'high',
+                        'title': 'Formation sur les contrôles de caisse',
+                        'description': f'{variance_rate*100:.1f}% des sessions de caisse ont des écarts. Une formation pourrait améliorer la précision.',
+                        'actions': [
+                            'Organiser une session de formation sur les bonnes pratiques de comptage',
+                            'Créer une checklist de fermeture de caisse',
+                            'Implémenter un système de vérification croisée'
+                        ]
+                    })
 
             # Analyser les logs de synchronisation pour détecter les problèmes récurrents
-            sync_logs = self.db.query(SyncLog).filter(
+            total_syncs, failed_syncs = self.db.query(
+                func.count(SyncLog.id),
+                func.count(SyncLog.id).filter(SyncLog.status == 'error'),
+            ).filter(
                 SyncLog.created_at >= cutoff_date
-            ).all()
+            ).one()
 
-            if len(sync_logs) > 0:
-                error_rate = len([s for s in sync_logs if s.status == 'error']) / len(sync_logs)
+            if total_syncs > 0:
+                error_rate = failed_syncs / total_syncs
 
                 if error_rate > 0.05:  # Plus de 5% d'erreurs de sync
                     recommendations.append({
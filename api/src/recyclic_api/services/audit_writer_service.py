@@ -0,0 +1,244 @@
+"""
+Écriture asynchrone du journal d'audit.
+
+``log_audit`` ne fait qu'ajouter l'événement à une file en mémoire ; une tâche de
+fond l'insère par lots (INSERT multi-lignes) toutes les AUDIT_FLUSH_INTERVAL_SECONDS.
+La file est bornée : au-delà de AUDIT_QUEUE_MAX_SIZE événements, ou quand la base
+est indisponible, les événements sont écrits dans un fichier de secours (JSON, une
+ligne par événement) rejoué au prochain vidage réussi.
+
+Si l'insertion groupée échoue pour une autre raison (contrainte violée par une
+ligne), les événements sont réinsérés un par un : ceux qui échouent encore partent
+dans un fichier de rebut (``<AUDIT_SPOOL_PATH>.dead``) et ne bloquent plus les
+vidages suivants.
+"""
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from datetime import datetime
+from threading import Lock
+from typing import Any, Callable, Deque, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from recyclic_api.core.config import settings
+from recyclic_api.core.database import SessionLocal
+from recyclic_api.models.audit_log import AuditLog
+
+logger = logging.getLogger(__name__)
+
+_UUID_COLUMNS = ("id", "actor_id", "target_id")
+
+# Erreurs qui signalent une base indisponible : les événements restent à rejouer
+_TRANSIENT_ERRORS = (OperationalError, ConnectionError, TimeoutError)
+
+
+def _dump_row(row: Dict[str, Any]) -> str:
+    return json.dumps(row, default=lambda value: value.isoformat() if isinstance(value, datetime) else str(value))
+
+
+def _load_row(line: str) -> Dict[str, Any]:
+    row = json.loads(line)
+    for column in _UUID_COLUMNS:
+        if row.get(column) is not None:
+            row[column] = UUID(row[column])
+    row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+    return row
+
+
+class AuditLogWriter:
+    """
+    Regroupe les événements d'audit et les insère par lots dans audit_logs.
+
+    Les événements portent leur identifiant : le rejeu du fichier de secours ignore
+    ceux déjà insérés (ON CONFLICT DO NOTHING).
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        flush_interval_seconds: Optional[float] = None,
+        max_queue_size: Optional[int] = None,
+        spool_path: Optional[str] = None,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval_seconds = flush_interval_seconds or settings.AUDIT_FLUSH_INTERVAL_SECONDS
+        self.max_queue_size = max_queue_size or settings.AUDIT_QUEUE_MAX_SIZE
+        self.spool_path = spool_path or settings.AUDIT_SPOOL_PATH
+        self.running = False
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._lock = Lock()
+        self._spool_lock = Lock()
+        self._flush_lock = Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def _replay_path(self) -> str:
+        return f"{self.spool_path}.replay"
+
+    @property
+    def dead_letter_path(self) -> str:
+        return f"{self.spool_path}.dead"
+
+    def add(self, row: Dict[str, Any]) -> None:
+        """Ajoute un événement (colonnes de AuditLog) au prochain lot."""
+        with self._lock:
+            if len(self._pending) < self.max_queue_size:
+                self._pending.append(row)
+                return
+        logger.warning("File d'audit pleine, événement écrit dans le fichier de secours")
+        self._spool([row])
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _spool(self, rows: List[Dict[str, Any]], path: Optional[str] = None) -> None:
+        with self._spool_lock:
+            path = path or self.spool_path
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as spool:
+                spool.writelines(f"{_dump_row(row)}\n" for row in rows)
+
+    def _take_spooled(self) -> List[Dict[str, Any]]:
+        """
+        Récupère les événements du fichier de secours. Le fichier est renommé avant
+        lecture pour que les ajouts concurrents repartent dans un nouveau fichier ;
+        il n'est supprimé qu'une fois les événements insérés.
+        """
+        with self._spool_lock:
+            if not os.path.exists(self._replay_path):
+                if not os.path.exists(self.spool_path):
+                    return []
+                os.replace(self.spool_path, self._replay_path)
+        with open(self._replay_path, encoding="utf-8") as spool:
+            return [_load_row(line) for line in spool if line.strip()]
+
+    def flush(self) -> int:
+        """
+        Insère le lot en attente, précédé des événements du fichier de secours.
+
+        Les événements non insérés faute de base sont écrits dans le fichier de
+        secours : rien n'est perdu si le processus s'arrête avant que la base ne
+        revienne. Ceux que la base refuse vont dans le fichier de rebut.
+        """
+        with self._flush_lock:
+            return self._flush()
+
+    def _flush(self) -> int:
+        with self._lock:
+            batch = list(self._pending)
+            self._pending.clear()
+        try:
+            spooled = self._take_spooled()
+        except (OSError, ValueError) as e:
+            logger.error(f"Lecture du fichier de secours d'audit impossible : {e}")
+            spooled = []
+        rows = spooled + batch
+        if not rows:
+            return 0
+
+        try:
+            self._insert(rows)
+            retry: List[Dict[str, Any]] = []
+            dead: List[Dict[str, Any]] = []
+        except _TRANSIENT_ERRORS as e:
+            logger.error(f"Écriture de {len(rows)} événements d'audit impossible, mise en attente sur disque : {e}")
+            retry, dead = rows, []
+        except Exception as e:
+            # Une ligne invalide ne doit pas bloquer les autres : on les isole
+            logger.error(f"Lot de {len(rows)} événements d'audit refusé ({e}), insertion un par un")
+            retry, dead = self._insert_one_by_one(rows)
+
+        # Réécrits avant la suppression du fichier de rejeu : un arrêt entre les deux
+        # ne produit que des doublons, ignorés au prochain rejeu
+        if retry:
+            self._spool(retry)
+        if dead:
+            logger.error(f"{len(dead)} événements d'audit rejetés, écrits dans {self.dead_letter_path}")
+            self._spool(dead, self.dead_letter_path)
+        if spooled:
+            os.remove(self._replay_path)
+        written = len(rows) - len(retry) - len(dead)
+        if spooled and written:
+            logger.info(f"{len(spooled)} événements d'audit repris depuis le fichier de secours")
+        return written
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(insert(AuditLog).on_conflict_do_nothing(), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _insert_one_by_one(self, rows: List[Dict[str, Any]]):
+        """
+        Insère chaque événement dans sa propre transaction.
+
+        Retourne (à rejouer, rejetés) : si la base devient indisponible en cours de
+        route, les événements restants sont à rejouer ; un événement refusé pour une
+        autre raison est rejeté.
+        """
+        dead = []
+        for index, row in enumerate(rows):
+            try:
+                self._insert([row])
+            except _TRANSIENT_ERRORS as e:
+                logger.error(f"Base indisponible pendant l'insertion unitaire des événements d'audit : {e}")
+                return rows[index:], dead
+            except Exception as e:
+                logger.error(f"Événement d'audit {row.get('id')} rejeté : {e}")
+                dead.append(row)
+        return [], dead
+
+    async def start(self):
+        """Démarre la tâche de vidage périodique."""
+        if self.running:
+            logger.warning("Audit log writer already running")
+            return
+        self.running = True
+        self._task = asyncio.create_task(self.run_loop())
+        logger.info("Audit log writer started")
+
+    async def stop(self):
+        """Arrête la tâche et écrit le dernier lot."""
+        if not self.running:
+            return
+        self.running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        await asyncio.to_thread(self.flush)
+        logger.info("Audit log writer stopped")
+
+    async def run_loop(self):
+        while self.running:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as exc:
+                logger.error("Échec du vidage du journal d'audit : %s", exc)
+
+
+# Instance globale alimentée par log_audit
+audit_log_writer = AuditLogWriter()
+
+
+def get_audit_log_writer() -> AuditLogWriter:
+    """Get the global audit log writer."""
+    return audit_log_writer
@@ -0,0 +1,334 @@
+"""
+Cash session close pipeline: the close endpoint enqueues, a background worker runs.
+
+Closing a session only commits the state change and a ``CashSessionCloseJob``
+row (in the same transaction). ``CashSessionCloseWorker`` then claims pending
+jobs and runs their steps:
+
+1. generate the CSV report,
+2. queue the report email in the email outbox,
+3. push the report to kDrive (when the kDrive sync is enabled).
+
+Each step records its status on the job, so a failed attempt is retried later
+(exponential backoff) starting from the step that failed.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from recyclic_api.core.config import settings
+from recyclic_api.core.database import SessionLocal
+from recyclic_api.core.email_service import EmailAttachment
+from recyclic_api.models.cash_session import CashSession
+from recyclic_api.models.cash_session_close_job import (
+    CashSessionCloseJob,
+    CloseJobStatus,
+    CloseJobStepStatus,
+)
+from recyclic_api.models.email_log import EmailType
+from recyclic_api.services.email_outbox_service import EmailOutboxService, get_email_outbox_worker
+from recyclic_api.services.export_service import generate_cash_session_report
+from recyclic_api.services.sync_service import KDriveSyncService
+from recyclic_api.utils.report_tokens import generate_download_token
+
+logger = logging.getLogger(__name__)
+
+
+def build_report_download_url(filename: str) -> str:
+    """Build a signed download URL for a cash session report."""
+    download_token = generate_download_token(filename)
+    return f"{settings.API_V1_STR}/admin/reports/cash-sessions/{filename}?token={download_token}"
+
+
+def build_report_email_html(session: CashSession, report_download_url: str) -> str:
+    """Build the HTML body of the cash session report email."""
+    if session.operator:
+        operator_label = (
+            session.operator.username
+            or getattr(session.operator, 'telegram_id', None)
+            or str(session.operator_id)
+        )
+    else:
+        operator_label = str(session.operator_id)
+
+    if session.actual_amount is not None:
+        final_amount = session.actual_amount
+    elif session.closing_amount is not None:
+        final_amount = session.closing_amount
+    else:
+        final_amount = session.initial_amount or 0.0
+
+    html_rows = [
+        '<p>Bonjour,</p>',
+        f'<p>Veuillez trouver en pièce jointe le rapport CSV de la session de caisse {session.id}.</p>',
+        f'<p>Opérateur : {operator_label}</p>',
+        f"<p>Montant final déclaré : {final_amount:.2f} €</p>",
+        f'<p>Vous pouvez également le télécharger via {report_download_url} (valide pendant {settings.CASH_SESSION_REPORT_TOKEN_TTL_SECONDS // 60} minutes).</p>',
+        '<p>- Recyclic</p>',
+    ]
+    return ''.join(html_rows)
+
+
+class CashSessionCloseJobService:
+    """Service for creating and reading close jobs."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(self, session: CashSession) -> CashSessionCloseJob:
+        """
+        Add the close job of a session to the current transaction.
+
+        The job is not committed here: the caller commits it together with the
+        session close, so a closed session always has its job.
+        """
+        job = CashSessionCloseJob(
+            cash_session_id=session.id,
+            status=CloseJobStatus.PENDING,
+            attempts=0,
+            next_attempt_at=datetime.now(timezone.utc),
+            report_status=CloseJobStepStatus.PENDING,
+            email_status=CloseJobStepStatus.PENDING,
+            kdrive_status=CloseJobStepStatus.PENDING,
+        )
+        self.db.add(job)
+        return job
+
+    def get_job_for_session(self, session_id) -> Optional[CashSessionCloseJob]:
+        """Get the close job of a session, if any."""
+        return (
+            self.db.query(CashSessionCloseJob)
+            .filter(CashSessionCloseJob.cash_session_id == session_id)
+            .first()
+        )
+
+
+class CashSessionCloseWorker:
+    """Background worker running the cash session close jobs."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        kdrive_service_factory: Callable[[], KDriveSyncService] = lambda: KDriveSyncService(max_retries=1),
+        batch_size: Optional[int] = None,
+        poll_interval_seconds: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        retry_base_seconds: Optional[float] = None,
+        lease_seconds: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.kdrive_service_factory = kdrive_service_factory
+        self.batch_size = max(batch_size or settings.CASH_SESSION_CLOSE_JOB_BATCH_SIZE, 1)
+        self.poll_interval_seconds = poll_interval_seconds or settings.CASH_SESSION_CLOSE_JOB_POLL_INTERVAL_SECONDS
+        self.max_attempts = max_attempts or settings.CASH_SESSION_CLOSE_JOB_MAX_ATTEMPTS
+        self.retry_base_seconds = (
+            retry_base_seconds if retry_base_seconds is not None else settings.CASH_SESSION_CLOSE_JOB_RETRY_BASE_SECONDS
+        )
+        self.lease_seconds = lease_seconds or settings.CASH_SESSION_CLOSE_JOB_LEASE_SECONDS
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def start(self):
+        """Start the worker loop."""
+        if self.running:
+            logger.warning("Cash session close worker already running")
+            return
+        self.running = True
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self.run_loop())
+        logger.info("Cash session close worker started")
+
+    async def stop(self):
+        """Stop the worker, letting the job in progress finish."""
+        if not self.running:
+            return
+        self.running = False
+        self.wake()
+        if self._task:
+            try:
+                await asyncio.wait_for(self._task, timeout=60)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        logger.info("Cash session close worker stopped")
+
+    def wake(self):
+        """Ask the worker to poll now (safe to call from any thread)."""
+        if self._loop is None or self._wakeup is None or self._loop.is_closed():
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            pass
+
+    async def run_loop(self):
+        while self.running:
+            try:
+                processed = await self.process_batch()
+            except Exception as e:
+                logger.error(f"Cash session close cycle failed: {e}", exc_info=True)
+                processed = 0
+
+            if processed >= self.batch_size:
+                continue  # Backlog: keep draining without waiting
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def process_batch(self) -> int:
+        """Claim and run one batch of jobs. Returns the number of jobs handled."""
+        job_ids = await asyncio.to_thread(self._claim_batch)
+        # Jobs run one after the other: report generation is DB-heavy and the
+        # close-out rush should not compete with the tills for connections.
+        for job_id in job_ids:
+            await asyncio.to_thread(self._run_job, job_id)
+        return len(job_ids)
+
+    def _claim_batch(self) -> List:
+        """Lock due jobs, push their next_attempt_at forward (lease) and return their ids."""
+        now = datetime.now(timezone.utc)
+        with self.session_factory() as db:
+            jobs = (
+                db.query(CashSessionCloseJob)
+                .filter(
+                    CashSessionCloseJob.status.in_([CloseJobStatus.PENDING, CloseJobStatus.RUNNING]),
+                    CashSessionCloseJob.next_attempt_at.isnot(None),
+                    CashSessionCloseJob.next_attempt_at <= now,
+                )
+                .order_by(CashSessionCloseJob.next_attempt_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            lease_until = now + timedelta(seconds=self.lease_seconds)
+            for job in jobs:
+                # If this worker dies mid-job, the job becomes due again after the lease
+                job.status = CloseJobStatus.RUNNING
+                job.next_attempt_at = lease_until
+            db.commit()
+            return [job.id for job in jobs]
+
+    def _run_job(self, job_id) -> None:
+        with self.session_factory() as db:
+            job = db.get(CashSessionCloseJob, job_id)
+            if job is None:
+                return
+            try:
+                self._run_steps(db, job)
+            except Exception as e:
+                db.rollback()
+                job = db.get(CashSessionCloseJob, job_id)
+                self._record_failure(job, e)
+                db.commit()
+                return
+
+            job.status = CloseJobStatus.COMPLETED
+            job.next_attempt_at = None
+            job.last_error = None
+            job.completed_at = datetime.now(timezone.utc)
+            db.commit()
+            logger.info(f"Cash session close job {job.id} completed for session {job.cash_session_id}")
+
+    def _run_steps(self, db: Session, job: CashSessionCloseJob) -> None:
+        session = job.cash_session
+
+        if job.report_status != CloseJobStepStatus.DONE:
+            report_path = generate_cash_session_report(db, session)
+            job.report_filename = report_path.name
+            job.report_status = CloseJobStepStatus.DONE
+            db.commit()
+
+        if job.email_status not in (CloseJobStepStatus.DONE, CloseJobStepStatus.SKIPPED):
+            recipient = settings.CASH_SESSION_REPORT_RECIPIENT
+            if not recipient:
+                logger.warning("CASH_SESSION_REPORT_RECIPIENT is not configured; skipping report email dispatch")
+                job.email_status = CloseJobStepStatus.SKIPPED
+            else:
+                report_path = self._ensure_report(db, job)
+                attachment = EmailAttachment(
+                    filename=report_path.name,
+                    content=report_path.read_bytes(),
+                    mime_type='text/csv',
+                )
+                # Delivery and its retries are handled by the email outbox
+                email_log = EmailOutboxService(db).enqueue(
+                    to_email=recipient,
+                    subject=f"Rapport de session de caisse {session.id}",
+                    html_content=build_report_email_html(session, build_report_download_url(report_path.name)),
+                    attachments=[attachment],
+                    email_type=EmailType.NOTIFICATION,
+                    commit=False,
+                )
+                job.email_log_id = email_log.id
+                job.email_status = CloseJobStepStatus.DONE
+            db.commit()
+            if job.email_log_id:
+                get_email_outbox_worker().wake()
+
+        if job.kdrive_status not in (CloseJobStepStatus.DONE, CloseJobStepStatus.SKIPPED):
+            if not settings.KDRIVE_SYNC_ENABLED:
+                job.kdrive_status = CloseJobStepStatus.SKIPPED
+            else:
+                report_path = self._ensure_report(db, job)
+                remote_directory = settings.CASH_SESSION_REPORT_KDRIVE_PATH or (
+                    f"{(settings.KDRIVE_REMOTE_BASE_PATH or '').rstrip('/')}/cash_sessions"
+                )
+                job.kdrive_remote_path = self.kdrive_service_factory().upload_file_to_kdrive(
+                    report_path, f"{remote_directory.rstrip('/')}/{report_path.name}"
+                )
+                job.kdrive_status = CloseJobStepStatus.DONE
+            db.commit()
+
+    def _ensure_report(self, db: Session, job: CashSessionCloseJob) -> Path:
+        """Return the report file, regenerating it if it was purged in between."""
+        report_path = Path(settings.CASH_SESSION_REPORT_DIR) / (job.report_filename or "")
+        if job.report_filename and report_path.is_file():
+            return report_path
+        report_path = generate_cash_session_report(db, job.cash_session)
+        job.report_filename = report_path.name
+        job.report_status = CloseJobStepStatus.DONE
+        return report_path
+
+    def _record_failure(self, job: CashSessionCloseJob, error: Exception) -> None:
+        job.attempts = (job.attempts or 0) + 1
+        job.last_error = str(error)
+        if job.attempts >= self.max_attempts:
+            logger.error(
+                f"Giving up cash session close job {job.id} (session {job.cash_session_id}) "
+                f"after {job.attempts} attempts: {error}"
+            )
+            job.status = CloseJobStatus.FAILED
+            job.next_attempt_at = None
+            for step in ("report_status", "email_status", "kdrive_status"):
+                if getattr(job, step) == CloseJobStepStatus.PENDING:
+                    setattr(job, step, CloseJobStepStatus.FAILED)
+                    break
+        else:
+            delay = self.retry_base_seconds * (2 ** (job.attempts - 1))
+            logger.warning(
+                f"Cash session close job {job.id} failed (attempt {job.attempts}/{self.max_attempts}), "
+                f"retrying in {delay:.0f}s: {error}"
+            )
+            job.status = CloseJobStatus.PENDING
+            job.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+
+
+# Global worker instance
+cash_session_close_worker = CashSessionCloseWorker()
+
+
+def get_cash_session_close_worker() -> CashSessionCloseWorker:
+    """Get the global cash session close worker."""
+    return cash_session_close_worker
@@ -1,5 +1,12 @@
+import base64
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, func, cast, String
+from sqlalchemy import and_, or_, desc, func, cast, Text, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
 from typing import List, Optional, Tuple, Dict, Any
 from datetime import datetime, timedelta, timezone
 
@@ -10,6 +17,57 @@ from recyclic_api.models.user import User
 from recyclic_api.models.sale import Sale
 from recyclic_api.models.sale_item import SaleItem
 from recyclic_api.schemas.cash_session import CashSessionFilters
+from recyclic_api.core.config import settings
+from recyclic_api.utils.response_cache import invalidate_response_cache
+from recyclic_api.services.dashboard_stream_service import (
+    SESSION_CLOSED,
+    SESSION_OPENED,
+    SESSION_UPDATED,
+    metric_deltas,
+    publish_dashboard_event,
+    session_contribution,
+)
+from recyclic_api.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CashSessionPage:
+    """Page de l'historique des sessions de caisse."""
+    sessions: List[CashSession]
+    total: int
+    next_cursor: Optional[str] = None
+    total_is_approximate: bool = False
+
+
+class _ExplainJson(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) d'une requête, avec ses paramètres liés."""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_ExplainJson, "postgresql")
+def _compile_explain_json(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def encode_session_cursor(session: CashSession) -> str:
+    """Encode la position (opened_at, id) d'une session en curseur opaque."""
+    raw = f"{session.opened_at.isoformat()}|{session.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_session_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Décode un curseur de pagination. Lève ValueError s'il est invalide."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        opened_at, session_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(opened_at), UUID(session_id)
+    except Exception as e:
+        raise ValueError("Curseur de pagination invalide") from e
 
 
 class CashSessionService:
@@ -50,6 +108,7 @@ class CashSessionService:
                 self.db.add(default_register)
                 self.db.commit()
                 self.db.refresh(default_register)
+                invalidate_response_cache("cash_registers")
             register_uuid = default_register.id  # type: ignore[assignment]
 
         # Unicité: pas de session ouverte pour ce registre
@@ -73,6 +132,7 @@ class CashSessionService:
         self.db.add(cash_session)
         self.db.commit()
         self.db.refresh(cash_session)
+        publish_dashboard_event(SESSION_OPENED, cash_session.site_id, metric_deltas({}, session_contribution(cash_session)))
         
         return cash_session
     
@@ -123,6 +183,47 @@ class CashSessionService:
     
     def get_sessions_with_filters(self, filters: CashSessionFilters) -> Tuple[List[CashSession], int]:
         """Récupère les sessions avec filtres et pagination."""
+        page = self.get_sessions_page(filters)
+        return page.sessions, page.total
+
+    def get_sessions_page(self, filters: CashSessionFilters) -> CashSessionPage:
+        """
+        Récupère une page de sessions, triée par (opened_at, id) décroissants.
+
+        Avec ``filters.cursor``, la page démarre après la dernière session de la
+        page précédente (pagination par curseur, sans OFFSET). Sinon ``skip`` est
+        utilisé. ``filters.count`` choisit le calcul du total : exact, mis en
+        cache, ou estimé par le planificateur PostgreSQL.
+        """
+        query = self._filtered_query(filters)
+
+        total, total_is_approximate = self._count_sessions(query, filters)
+
+        page_query = query.order_by(desc(CashSession.opened_at), desc(CashSession.id))
+        if filters.cursor:
+            cursor_opened_at, cursor_id = decode_session_cursor(filters.cursor)
+            page_query = page_query.filter(
+                tuple_(CashSession.opened_at, CashSession.id) < tuple_(cursor_opened_at, cursor_id)
+            )
+        else:
+            page_query = page_query.offset(filters.skip)
+
+        # Une session de plus que demandé pour savoir s'il existe une page suivante
+        sessions = page_query.limit(filters.limit + 1).all()
+        next_cursor = None
+        if len(sessions) > filters.limit:
+            sessions = sessions[:filters.limit]
+            next_cursor = encode_session_cursor(sessions[-1])
+
+        self._attach_sales_aggregates(sessions)
+        return CashSessionPage(
+            sessions=sessions,
+            total=total,
+            next_cursor=next_cursor,
+            total_is_approximate=total_is_approximate,
+        )
+
+    def _filtered_query(self, filters: CashSessionFilters):
         query = self.db.query(CashSession)
 
         # Appliquer les filtres
@@ -148,25 +249,71 @@ class CashSessionService:
                 date_to = date_to.replace(tzinfo=timezone.utc)
             query = query.filter(CashSession.opened_at <= date_to)
 
-        # Recherche textuelle
+        # Recherche textuelle (index trigrammes sur users.username et cash_sessions.id::text)
         if getattr(filters, 'search', None):
             search_value = f"%{filters.search.strip()}%"
             query = query.join(User, User.id == CashSession.operator_id).filter(
                 or_(
                     User.username.ilike(search_value),
-                    cast(CashSession.id, String).ilike(search_value)
+                    cast(CashSession.id, Text).ilike(search_value)
                 )
             )
+        return query
 
-        # Compter le total avant la pagination
-        total = query.count()
+    def _count_sessions(self, query, filters: CashSessionFilters) -> Tuple[int, bool]:
+        """Calcule le total selon ``filters.count``. Retourne (total, approximatif)."""
+        if filters.count == "cached":
+            cache_key = self._count_cache_key(filters)
+            try:
+                cached = get_redis().get(cache_key)
+                if cached is not None:
+                    return int(cached), True
+            except Exception as e:
+                logger.warning(f"Cache du total des sessions indisponible: {e}")
+                return query.count(), False
+            total = query.count()
+            try:
+                get_redis().setex(cache_key, settings.CASH_SESSION_COUNT_CACHE_TTL_SECONDS, total)
+            except Exception as e:
+                logger.warning(f"Impossible de mettre en cache le total des sessions: {e}")
+            return total, False
 
-        # Appliquer la pagination et l'ordre
-        sessions = query.order_by(desc(CashSession.opened_at)).offset(filters.skip).limit(filters.limit).all()
+        if filters.count == "estimate":
+            estimate = self._estimate_count(query)
+            # Sur les petits volumes l'estimation est peu fiable et le comptage exact est bon marché
+            if estimate is not None and estimate >= settings.CASH_SESSION_COUNT_ESTIMATE_THRESHOLD:
+                return estimate, True
+
+        return query.count(), False
+
+    @staticmethod
+    def _count_cache_key(filters: CashSessionFilters) -> str:
+        criteria = filters.model_dump(mode="json", exclude={"skip", "limit", "cursor", "count"})
+        digest = hashlib.sha1(json.dumps(criteria, sort_keys=True).encode()).hexdigest()
+        return f"cash_sessions:count:{digest}"
+
+    def _estimate_count(self, query) -> Optional[int]:
+        """Nombre de lignes estimé par le planificateur (EXPLAIN), sans parcourir la table."""
+        bind = self.db.get_bind()
+        if bind.dialect.name != "postgresql":
+            return None
+        try:
+            # Savepoint : un EXPLAIN en échec ne doit pas invalider la transaction de la requête
+            with self.db.begin_nested():
+                plan = self.db.execute(_ExplainJson(query.statement)).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception as e:
+            logger.warning(f"Estimation du total des sessions impossible, comptage exact: {e}")
+            return None
+
+    def _attach_sales_aggregates(self, sessions: List[CashSession]) -> None:
+        """Renseigne number_of_sales et total_donations des sessions de la page."""
         session_ids = [s.id for s in sessions]
 
         if not session_ids:
-            return [], total
+            return
 
         # --- Optimisation N+1 ---
         # 1. Calculer le nombre de ventes par session en une seule requête
@@ -203,27 +350,34 @@ class CashSessionService:
         for session in sessions:
             session.number_of_sales = sales_map.get(str(session.id), 0)
             session.total_donations = float(donations_map.get(str(session.id), 0.0))
-
-        return sessions, total
     
     def update_session(self, session_id: str, update_data: Dict[str, Any]) -> Optional[CashSession]:
         """Met à jour une session de caisse."""
         session = self.get_session_by_id(session_id)
         if not session:
             return None
+        before = session_contribution(session)
+        was_open = session.status == CashSessionStatus.OPEN
         
         # Mettre à jour les champs fournis
         update_dict = update_data.model_dump(exclude_unset=True)
         for field, value in update_dict.items():
             if hasattr(session, field) and value is not None:
+                if field == "status":
+                    # Le schéma a son propre enum : convertir vers celui du modèle
+                    value = CashSessionStatus(value.value)
                 setattr(session, field, value)
         
         # Si on ferme la session, mettre à jour la date de fermeture
-        if update_data.status == CashSessionStatus.CLOSED:
+        if was_open and session.status == CashSessionStatus.CLOSED:
             session.closed_at = datetime.now(timezone.utc)
         
         self.db.commit()
         self.db.refresh(session)
+        deltas = metric_deltas(before, session_contribution(session))
+        if deltas:
+            closed = was_open and session.status == CashSessionStatus.CLOSED
+            publish_dashboard_event(SESSION_CLOSED if closed else SESSION_UPDATED, session.site_id, deltas)
         
         return session
     
@@ -236,11 +390,13 @@ class CashSessionService:
         if session.status == CashSessionStatus.CLOSED:
             return session
         
+        before = session_contribution(session)
         session.status = CashSessionStatus.CLOSED
         session.closed_at = datetime.now(timezone.utc)
         
         self.db.commit()
         self.db.refresh(session)
+        publish_dashboard_event(SESSION_CLOSED, session.site_id, metric_deltas(before, session_contribution(session)))
         
         return session
 
@@ -253,11 +409,13 @@ class CashSessionService:
         if session.status == CashSessionStatus.CLOSED:
             return session
         
+        before = session_contribution(session)
         # Utiliser la nouvelle méthode du modèle
         session.close_with_amounts(actual_amount, variance_comment)
         
         self.db.commit()
         self.db.refresh(session)
+        publish_dashboard_event(SESSION_CLOSED, session.site_id, metric_deltas(before, session_contribution(session)))
         
         return session
     
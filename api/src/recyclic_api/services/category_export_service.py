@@ -3,10 +3,16 @@
 from io import BytesIO
 import io
 import csv
+import os
+import tempfile
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional, Tuple
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
 from decimal import Decimal
 
+from sqlalchemy import Text, cast, func, literal
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.orm import Session
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
@@ -15,37 +21,152 @@ from reportlab.lib.units import cm
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, KeepTogether
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill
 
+from ..core.config import settings
 from ..models.category import Category
 from ..schemas.category import CategoryRead
 
 
+# Supported formats: file extension and media type
+EXPORT_FORMATS: Dict[str, Tuple[str, str]] = {
+    "pdf": (".pdf", "application/pdf"),
+    "xls": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": (".csv", "text/csv"),
+}
+
+# Size of the chunks sent to the client when streaming a cached export
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass(frozen=True)
+class CategoryExportRow:
+    """A category in export order, with its depth and its root category."""
+
+    category: Category
+    level: int
+    root: Category
+
+
+def iter_file_chunks(file_obj: BinaryIO, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield an open binary file in chunks, closing it at the end."""
+    try:
+        while True:
+            chunk = file_obj.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        file_obj.close()
+
+
 class CategoryExportService:
     """Service for exporting categories in PDF and Excel formats"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, cache_dir: Optional[Path | str] = None):
         self.db = db
+        self.cache_dir = Path(cache_dir or settings.CATEGORY_EXPORT_CACHE_DIR)
 
-    def _get_all_categories_hierarchy(self) -> List[Tuple[Category, int]]:
-        """Get all categories ordered hierarchically (root first, then children)"""
-        # Get all active categories
+    def _get_export_rows(self) -> List[CategoryExportRow]:
+        """Single traversal of the active category tree (root first, then children, by name)"""
         categories = self.db.query(Category).filter(Category.is_active == True).order_by(Category.name).all()
 
-        # Build hierarchy: root categories first, then their children recursively
-        hierarchy = []
-        root_categories = [cat for cat in categories if cat.parent_id is None]
+        children: Dict[Optional[object], List[Category]] = {}
+        for cat in categories:
+            children.setdefault(cat.parent_id, []).append(cat)
+
+        rows: List[CategoryExportRow] = []
+
+        def add_category_and_children(category: Category, level: int, root: Category):
+            rows.append(CategoryExportRow(category, level, root))
+            for child in children.get(category.id, []):
+                add_category_and_children(child, level + 1, root)
+
+        # Query is ordered by name, so each children list is already sorted
+        for root in children.get(None, []):
+            add_category_and_children(root, 0, root)
+
+        return rows
+
+    def tree_version(self) -> str:
+        """Fingerprint of the exported category columns, computed by the database."""
+        exported_columns = cast(
+            func.row(Category.id, Category.name, Category.is_active, Category.parent_id, Category.price, Category.max_price),
+            Text,
+        )
+        digest = self.db.query(
+            func.md5(func.coalesce(func.string_agg(exported_columns, aggregate_order_by(literal(","), Category.id)), ""))
+        ).scalar()
+        return digest[:16]
+
+    def tree_last_modified(self) -> Optional[datetime]:
+        """Last modification of a category, printed in the PDF instead of the generation time."""
+        return self.db.query(func.max(func.coalesce(Category.updated_at, Category.created_at))).scalar()
+
+    def get_cached_export(self, export_format: str) -> Path:
+        """
+        Return the export file for the current category tree version.
 
-        def add_category_and_children(category: Category, level: int = 0):
-            hierarchy.append((category, level))
-            children = [cat for cat in categories if cat.parent_id == category.id]
-            for child in sorted(children, key=lambda x: x.name):
-                add_category_and_children(child, level + 1)
+        The file is generated on the first request for a version and stored in
+        CATEGORY_EXPORT_CACHE_DIR; later downloads reuse it until the tree changes.
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+        extension, _ = EXPORT_FORMATS[export_format]
+        writers: Dict[str, Callable[[BinaryIO], None]] = {
+            "pdf": self.write_pdf,
+            "xls": self.write_excel,
+            "csv": self.write_csv,
+        }
+
+        version = self.tree_version()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        file_path = self.cache_dir / f"categories_{version}{extension}"
+        if file_path.exists():
+            return file_path
+
+        # Write to a temporary file, then rename so concurrent readers never see a partial export
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as output:
+                writers[export_format](output)
+            os.replace(tmp_name, file_path)
+        except Exception:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        self._prune_cache(version)
+        return file_path
+
+    def open_cached_export(self, export_format: str, attempts: int = 3) -> BinaryIO:
+        """
+        Open the export file for the current category tree version.
 
-        for root in sorted(root_categories, key=lambda x: x.name):
-            add_category_and_children(root)
+        Another worker may prune the file between get_cached_export and the open
+        when the tree changes meanwhile: the export is then looked up again.
+        Once open, the file stays readable even if it is pruned.
+        """
+        for attempt in range(attempts):
+            try:
+                return self.get_cached_export(export_format).open("rb")
+            except FileNotFoundError:
+                if attempt == attempts - 1:
+                    raise
+
+    def _prune_cache(self, current_version: str) -> None:
+        """
+        Remove exports generated for older versions of the category tree.
 
-        return hierarchy
+        Downloads already streaming a pruned file keep reading it: the file is
+        only unlinked, and open_cached_export retries when it vanishes first.
+        """
+        for candidate in self.cache_dir.glob("categories_*"):
+            if not candidate.name.startswith(f"categories_{current_version}."):
+                try:
+                    candidate.unlink()
+                except OSError:
+                    continue
 
     def _format_price(self, price: Optional[Decimal]) -> str:
         """Format price for display"""
@@ -53,14 +174,24 @@ class CategoryExportService:
             return "-"
         return f"{float(price):.2f} €"
 
+    def _format_last_modified(self, moment: datetime) -> str:
+        """Format the tree modification time shown under the PDF title"""
+        return f"Catégories à jour au {moment.astimezone().strftime('%d/%m/%Y à %H:%M')}"
+
     def export_to_pdf(self) -> BytesIO:
+        """Generate the PDF export in memory (see write_pdf)."""
+        buffer = BytesIO()
+        self.write_pdf(buffer)
+        buffer.seek(0)
+        return buffer
+
+    def write_pdf(self, output: BinaryIO) -> None:
         """
-        Generate a PDF export of all categories with professional layout.
+        Write a PDF export of all categories with professional layout.
         Each root category is displayed with its name as a title, followed by its children in a table.
         """
-        buffer = BytesIO()
         doc = SimpleDocTemplate(
-            buffer,
+            output,
             pagesize=A4,
             leftMargin=2*cm,
             rightMargin=2*cm,
@@ -104,24 +235,26 @@ class CategoryExportService:
             borderPadding=8
         )
 
-        # Main title
+        # Main title. The file is cached per tree version: print when the tree last
+        # changed, not when this copy was generated.
+        last_modified = self.tree_last_modified()
         elements.append(Paragraph("Configuration des Catégories", title_style))
-        elements.append(Paragraph(
-            f"Export généré le {datetime.now().strftime('%d/%m/%Y à %H:%M')}",
-            subtitle_style
-        ))
+        if last_modified is not None:
+            elements.append(Paragraph(self._format_last_modified(last_modified), subtitle_style))
         elements.append(Spacer(1, 0.5*cm))
 
-        # Get categories hierarchy
-        hierarchy = self._get_all_categories_hierarchy()
+        # Categories grouped by root, from a single traversal of the tree
+        groups: List[Tuple[Category, List[Category]]] = []
+        for row in self._get_export_rows():
+            if row.level == 0:
+                groups.append((row.category, []))
+            else:
+                groups[-1][1].append(row.category)
 
-        if not hierarchy:
+        if not groups:
             elements.append(Paragraph("Aucune catégorie active trouvée.", styles['Normal']))
         else:
-            # Process categories grouped by root category
-            root_categories = [cat for cat, level in hierarchy if level == 0]
-
-            for root_idx, root_cat in enumerate(root_categories):
+            for root_idx, (root_cat, descendants) in enumerate(groups):
                 # Build a group block (title + spacer + table) and keep it together across pages
                 group_block = []
                 group_block.append(Paragraph(f"{root_cat.name}", category_title_style))
@@ -153,13 +286,12 @@ class CategoryExportService:
                     ])
 
                 # Add children
-                for cat, level in hierarchy:
-                    if level > 0 and self._is_descendant_of(cat, root_cat.id, hierarchy):
-                        group_data.append([
-                            Paragraph(cat.name, styles['Normal']),
-                            Paragraph(self._format_price(cat.price), styles['Normal']),
-                            Paragraph(self._format_price(cat.max_price), styles['Normal'])
-                        ])
+                for cat in descendants:
+                    group_data.append([
+                        Paragraph(cat.name, styles['Normal']),
+                        Paragraph(self._format_price(cat.price), styles['Normal']),
+                        Paragraph(self._format_price(cat.max_price), styles['Normal'])
+                    ])
 
                 # Create table for this group
                 col_widths = [10*cm, 3*cm, 3*cm]
@@ -194,7 +326,7 @@ class CategoryExportService:
                 elements.append(KeepTogether(group_block))
 
                 # Add spacing between root categories (but not after the last one)
-                if root_idx < len(root_categories) - 1:
+                if root_idx < len(groups) - 1:
                     elements.append(Spacer(1, 1*cm))
 
         # Footer
@@ -207,38 +339,35 @@ class CategoryExportService:
             alignment=TA_CENTER
         )
         elements.append(Paragraph(
-            f"Document généré par RecyClique - {datetime.now().year}",
+            f"Document généré par RecyClique - {(last_modified or datetime.now()).year}",
             footer_style
         ))
 
         # Build PDF
         doc.build(elements)
+
+    def export_to_excel(self) -> BytesIO:
+        """Generate the Excel export in memory (see write_excel)."""
+        buffer = BytesIO()
+        self.write_excel(buffer)
         buffer.seek(0)
         return buffer
 
-    def _is_descendant_of(self, cat: Category, root_id: str, hierarchy: List[Tuple[Category, int]]) -> bool:
-        """Check if a category is a descendant of the given root category"""
-        current = cat
-        while current.parent_id is not None:
-            if current.parent_id == root_id:
-                return True
-            # Find parent in hierarchy
-            parent = next((c for c, _ in hierarchy if c.id == current.parent_id), None)
-            if parent is None:
-                break
-            current = parent
-        return False
-
-    def export_to_excel(self) -> BytesIO:
+    def write_excel(self, output: BinaryIO) -> None:
         """
-        Generate an Excel export of all categories.
+        Write an Excel export of all categories using openpyxl's write-only (streaming) mode.
         Structure: First column shows root category name, second column shows sub-category name.
-        Returns a BytesIO buffer containing the .xlsx file.
         """
-        buffer = BytesIO()
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Catégories"
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Catégories")
+
+        # Column widths (must be set before any row is written in write-only mode)
+        ws.column_dimensions['A'].width = 30  # Catégorie Racine
+        ws.column_dimensions['B'].width = 30  # Nom Sous-Catégorie
+        ws.column_dimensions['C'].width = 15  # Prix Min
+        ws.column_dimensions['D'].width = 15  # Prix Max
+        ws.column_dimensions['E'].width = 20  # Info
+        ws.column_dimensions['F'].width = 20  # Image URL
 
         # Header styling
         header_font = Font(bold=True, color="FFFFFF", size=11)
@@ -247,120 +376,70 @@ class CategoryExportService:
 
         # Headers
         headers = ["Catégorie Racine", "Nom Sous-Catégorie", "Prix Minimum", "Prix Maximum", "Info", "Image URL"]
-        ws.append(headers)
-
-        # Apply header styling
-        for cell in ws[1]:
+        header_cells = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
             cell.font = header_font
             cell.fill = header_fill
             cell.alignment = header_alignment
+            header_cells.append(cell)
+        ws.append(header_cells)
 
-        # Get categories hierarchy
-        hierarchy = self._get_all_categories_hierarchy()
-
-        # Build a map to find root category for each category
-        def get_root_category(cat: Category) -> Category:
-            """Get the root category for any category"""
-            current = cat
-            while current.parent_id is not None:
-                parent = next((c for c, _ in hierarchy if c.id == current.parent_id), None)
-                if parent is None:
-                    break
-                current = parent
-            return current
+        # Cell alignment for data: root, sub-category, min price, max price, info, image URL
+        left = Alignment(horizontal="left")
+        right = Alignment(horizontal="right")
+        alignments = (left, left, right, right, left, left)
 
         # Data rows
-        for cat, level in hierarchy:
-            root_cat = get_root_category(cat)
-
+        for row in self._get_export_rows():
+            cat = row.category
             # For root categories, show their name in first column and empty second column
             # For children, show root name in first column and child name in second column
-            if level == 0:
-                # This is a root category
-                row = [
-                    root_cat.name,
-                    "",  # Empty for root category itself
-                    float(cat.price) if cat.price is not None else "",
-                    float(cat.max_price) if cat.max_price is not None else "",
-                    "",  # Info column (empty for now)
-                    ""   # Image URL column (empty for now)
-                ]
-            else:
-                # This is a child category
-                row = [
-                    root_cat.name,
-                    cat.name,
-                    float(cat.price) if cat.price is not None else "",
-                    float(cat.max_price) if cat.max_price is not None else "",
-                    "",  # Info column (empty for now)
-                    ""   # Image URL column (empty for now)
-                ]
-            ws.append(row)
-
-        # Column widths
-        ws.column_dimensions['A'].width = 30  # Catégorie Racine
-        ws.column_dimensions['B'].width = 30  # Nom Sous-Catégorie
-        ws.column_dimensions['C'].width = 15  # Prix Min
-        ws.column_dimensions['D'].width = 15  # Prix Max
-        ws.column_dimensions['E'].width = 20  # Info
-        ws.column_dimensions['F'].width = 20  # Image URL
-
-        # Cell alignment for data
-        for row in ws.iter_rows(min_row=2, max_row=ws.max_row):
-            row[0].alignment = Alignment(horizontal="left")   # Root Category
-            row[1].alignment = Alignment(horizontal="left")   # Sub-Category Name
-            row[2].alignment = Alignment(horizontal="right")  # Min Price
-            row[3].alignment = Alignment(horizontal="right")  # Max Price
-            row[4].alignment = Alignment(horizontal="left")   # Info
-            row[5].alignment = Alignment(horizontal="left")   # Image URL
-
-        # Save to buffer
-        wb.save(buffer)
-        buffer.seek(0)
-        return buffer
+            values = [
+                row.root.name,
+                "" if row.level == 0 else cat.name,
+                float(cat.price) if cat.price is not None else "",
+                float(cat.max_price) if cat.max_price is not None else "",
+                "",  # Info column (empty for now)
+                ""   # Image URL column (empty for now)
+            ]
+            cells = []
+            for value, alignment in zip(values, alignments):
+                cell = WriteOnlyCell(ws, value=value)
+                cell.alignment = alignment
+                cells.append(cell)
+            ws.append(cells)
+
+        wb.save(output)
 
     def export_to_csv(self) -> bytes:
+        """Generate the CSV export in memory (see write_csv)."""
+        buffer = BytesIO()
+        self.write_csv(buffer)
+        return buffer.getvalue()
+
+    def write_csv(self, output: BinaryIO) -> None:
         """
-        Generate a CSV export aligned with the import template headers so it can be re-imported.
+        Write a CSV export aligned with the import template headers so it can be re-imported.
         Headers: "Catégorie racine","Sous-catégorie","Prix minimum (€)","Prix maximum (€)"
         Only root and first-level children are exported to match the import contract.
         """
-        hierarchy = self._get_all_categories_hierarchy()
-
-        # Build a quick map from category to level
-        level_map = {cat.id: level for cat, level in hierarchy}
-
-        # Helper to find root for any category
-        def get_root(cat: Category) -> Category:
-            current = cat
-            while current.parent_id is not None:
-                parent = next((c for c, _ in hierarchy if c.id == current.parent_id), None)
-                if parent is None:
-                    break
-                current = parent
-            return current
-
-        buf = io.StringIO()
-        writer = csv.writer(buf)
+        text_output = io.TextIOWrapper(output, encoding="utf-8", newline="")
+        writer = csv.writer(text_output)
         writer.writerow(["Catégorie racine", "Sous-catégorie", "Prix minimum (€)", "Prix maximum (€)"])
 
-        for cat, level in hierarchy:
-            # Root rows
-            if level == 0:
-                writer.writerow([
-                    cat.name,
-                    "",
-                    f"{float(cat.price):.2f}" if cat.price is not None else "",
-                    f"{float(cat.max_price):.2f}" if cat.max_price is not None else "",
-                ])
-            # First-level children only to respect import contract
-            elif level == 1:
-                root = get_root(cat)
-                writer.writerow([
-                    root.name,
-                    cat.name,
-                    f"{float(cat.price):.2f}" if cat.price is not None else "",
-                    f"{float(cat.max_price):.2f}" if cat.max_price is not None else "",
-                ])
-
-        return buf.getvalue().encode("utf-8")
+        for row in self._get_export_rows():
+            cat = row.category
+            # Root rows, then first-level children only to respect import contract
+            if row.level > 1:
+                continue
+            writer.writerow([
+                row.root.name,
+                "" if row.level == 0 else cat.name,
+                f"{float(cat.price):.2f}" if cat.price is not None else "",
+                f"{float(cat.max_price):.2f}" if cat.max_price is not None else "",
+            ])
+
+        text_output.flush()
+        # Leave the underlying binary output open for the caller
+        text_output.detach()
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from uuid import uuid4
 import csv
 import io
 from decimal import Decimal, InvalidOperation
 
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from recyclic_api.core.redis import get_redis
@@ -22,6 +24,10 @@ class CategoryImportService:
 
     REDIS_KEY_PREFIX = "import:categories:session:"
     REDIS_TTL_SECONDS = 30 * 60  # 30 minutes
+    UPSERT_BATCH_SIZE = 500  # Lignes par INSERT ... ON CONFLICT
+
+    # Colonnes gérées par l'import
+    IMPORTED_FIELDS = ("parent_id", "price", "max_price", "is_active")
 
     REQUIRED_HEADERS = [
         "Catégorie racine",
@@ -60,6 +66,30 @@ class CategoryImportService:
         name = value.strip()
         return name if name else None
 
+    def _load_by_names(self, names: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Charge en une seule requête IN les catégories existantes portant ces noms."""
+        unique_names = {name for name in names if name}
+        if not unique_names:
+            return {}
+        rows = self.db.query(
+            Category.id,
+            Category.name,
+            Category.parent_id,
+            Category.price,
+            Category.max_price,
+            Category.is_active,
+        ).filter(Category.name.in_(unique_names)).all()
+        return {
+            row.name: {
+                "id": row.id,
+                "parent_id": row.parent_id,
+                "price": row.price,
+                "max_price": row.max_price,
+                "is_active": row.is_active,
+            }
+            for row in rows
+        }
+
     # ---------- Analyze ----------
     def analyze(self, file_bytes: bytes) -> Dict[str, Any]:
         """Analyse le CSV, valide et prépare un état d'import.
@@ -88,7 +118,15 @@ class CategoryImportService:
         roots_seen: set[str] = set()
         parent_price_conflicts: Dict[str, bool] = {}  # Track parents with prices
 
-        for idx, raw in enumerate(reader, start=2):  # start=2 inclut l'en-tête ligne 1
+        raw_rows = list(reader)
+        # Contrainte d'unicité globale sur name: une seule requête pour toutes les lignes
+        existing = self._load_by_names(
+            self._clean_name(raw.get(column))
+            for raw in raw_rows
+            for column in ("Catégorie racine", "Sous-catégorie")
+        )
+
+        for idx, raw in enumerate(raw_rows, start=2):  # start=2 inclut l'en-tête ligne 1
             root = self._clean_name(raw.get("Catégorie racine"))
             sub = self._clean_name(raw.get("Sous-catégorie"))
             min_price = self._to_decimal(raw.get("Prix minimum (€)"))
@@ -101,15 +139,14 @@ class CategoryImportService:
             # Nouvelle règle: Les prix peuvent être définis sur les catégories racines
             # (Cette règle a été supprimée pour permettre la cohérence avec B37-16)
 
-            # Charger existence en base pour déterminer create/update
-            # Contrainte d'unicité globale sur name: on identifie par name uniquement
-            root_obj = self.db.query(Category).filter(Category.name == root).first()
+            # Existence en base pour déterminer create/update (identifiée par name uniquement)
+            root_obj = existing.get(root)
 
             if root_obj is None:
                 roots_seen.add(root)
             else:
                 # Vérifier si le parent a des prix (conflit potentiel)
-                if root_obj.price is not None or root_obj.max_price is not None:
+                if root_obj["price"] is not None or root_obj["max_price"] is not None:
                     parent_price_conflicts[root] = True
 
             if sub:
@@ -117,18 +154,17 @@ class CategoryImportService:
                 if parent_price_conflicts.get(root, False):
                     warnings.append(f"L{idx}: La catégorie parente '{root}' a des prix qui seront supprimés automatiquement lors de l'import")
                 
-                sub_obj = None
                 # Identifier par nom global (unicité sur name)
-                sub_obj = self.db.query(Category).filter(Category.name == sub).first()
+                sub_obj = existing.get(sub)
 
                 if sub_obj is None:
                     to_create += 1
                 else:
                     # Déterminer si une mise à jour est nécessaire (prix)
                     should_update = False
-                    if min_price is not None and sub_obj.price != min_price:
+                    if min_price is not None and sub_obj["price"] != min_price:
                         should_update = True
-                    if max_price is not None and sub_obj.max_price != max_price:
+                    if max_price is not None and sub_obj["max_price"] != max_price:
                         should_update = True
                     if should_update:
                         to_update += 1
@@ -169,11 +205,16 @@ class CategoryImportService:
 
     # ---------- Execute ----------
     def execute(self, session_id: str, delete_existing: bool = False) -> Dict[str, Any]:
-        """Exécute l'import (upsert) à partir d'une session d'analyse valide."""
+        """Exécute l'import (upsert) à partir d'une session d'analyse valide.
+
+        Les noms sont résolus en une requête, les lignes sont appliquées en mémoire dans
+        l'ordre du fichier, puis les catégories modifiées sont écrites par lots
+        (INSERT ... ON CONFLICT (name) DO UPDATE) dans une seule transaction.
+        """
         key = f"{self.REDIS_KEY_PREFIX}{session_id}"
         payload_raw = self.redis.get(key)
         if not payload_raw:
-            return {"imported": 0, "updated": 0, "errors": ["Session d'import introuvable ou expirée"]}
+            return {"imported": 0, "updated": 0, "errors": ["Session d'import introuvable ou expirée"], "rows": []}
 
         import json
         payload = json.loads(payload_raw)
@@ -182,6 +223,7 @@ class CategoryImportService:
         imported = 0
         updated = 0
         errors: List[str] = []
+        outcomes: List[Dict[str, Any]] = []
 
         try:
             # Supprimer toutes les catégories existantes si demandé
@@ -194,92 +236,133 @@ class CategoryImportService:
                 from recyclic_api.models.sale_item import SaleItem
                 from recyclic_api.models.preset_button import PresetButton
                 from recyclic_api.models.ligne_depot import LigneDepot
+                from recyclic_api.repositories.reception import TicketDepotRepository
                 
                 # Nettoyer les sale_items qui référencent des preset_buttons (mettre preset_id à NULL)
                 self.db.query(SaleItem).filter(SaleItem.preset_id.isnot(None)).update({"preset_id": None})
                 # Supprimer les preset_buttons qui référencent les catégories
                 self.db.query(PresetButton).delete()
-                # Supprimer les lignes de dépôt qui référencent les catégories
+                # Supprimer les lignes de dépôt qui référencent les catégories,
+                # puis remettre à jour les totaux stockés des tickets
                 self.db.query(LigneDepot).delete()
+                TicketDepotRepository(self.db).recompute_totals()
                 # Puis supprimer toutes les catégories
                 self.db.query(Category).delete()
                 self.db.flush()  # Flush pour s'assurer que la suppression est effective
-            
-            # Transaction explicite
-            for row in rows:
+                states: Dict[str, Dict[str, Any]] = {}
+            else:
+                states = self._load_by_names(name for row in rows for name in (row["root"], row["sub"]))
+
+            originals = {name: dict(state) for name, state in states.items()}
+            created: set[str] = set()
+
+            def upsert_state(name: str) -> Dict[str, Any]:
+                state = states.get(name)
+                if state is None:
+                    state = {"id": uuid4(), "parent_id": None, "price": None, "max_price": None, "is_active": True}
+                    states[name] = state
+                    created.add(name)
+                return state
+
+            for line, row in enumerate(rows, start=2):
                 root = row["root"]
                 sub = row["sub"]
                 min_price = Decimal(row["min_price"]) if row.get("min_price") is not None else None
                 max_price = Decimal(row["max_price"]) if row.get("max_price") is not None else None
 
-                # Upsert root (par nom global)
-                root_obj = self.db.query(Category).filter(Category.name == root).first()
-                if root_obj is None:
-                    root_obj = Category(name=root, is_active=True, parent_id=None)
-                    self.db.add(root_obj)
-                    self.db.flush()
-                else:
-                    # S'assurer que c'est une racine
-                    root_obj.parent_id = None
-                    root_obj.is_active = True
+                # Upsert root (par nom global), toujours racine et active
+                root_was_known = root in states
+                root_state = upsert_state(root)
+                before = dict(root_state)
+                root_state["parent_id"] = None
+                root_state["is_active"] = True
 
                 # NOUVELLE RÈGLE: Gérer les prix sur les catégories racines (si pas de sous-catégorie)
                 if sub is None and (min_price is not None or max_price is not None):
-                    # Mettre à jour les prix de la catégorie racine
-                    root_obj.price = min_price
-                    root_obj.max_price = max_price
-                    if root_obj.id not in [obj.id for obj in self.db.new]:  # Si pas nouveau
-                        updated += 1
-                    else:
-                        imported += 1
-
-                # Subcat upsert si présent (par nom global)
-                if sub is not None:
+                    root_state["price"] = min_price
+                    root_state["max_price"] = max_price
+
+                if sub is None:
+                    status = self._row_status(root_was_known, before, root_state)
+                else:
                     # NOUVELLE RÈGLE: Supprimer automatiquement les prix du parent si nécessaire
-                    if root_obj.price is not None or root_obj.max_price is not None:
-                        root_obj.price = None
-                        root_obj.max_price = None
-                        # Commit immédiat pour le parent
-                        self.db.commit()
-                    
-                    sub_obj = self.db.query(Category).filter(Category.name == sub).first()
-                    if sub_obj is None:
-                        sub_obj = Category(
-                            name=sub,
-                            is_active=True,
-                            parent_id=root_obj.id,
-                            price=min_price,
-                            max_price=max_price,
-                        )
-                        self.db.add(sub_obj)
-                        imported += 1
-                    else:
-                        # Reparent et MAJ prix
-                        should_update = False
-                        if sub_obj.parent_id != root_obj.id:
-                            sub_obj.parent_id = root_obj.id
-                            should_update = True
-                        if min_price is not None and sub_obj.price != min_price:
-                            sub_obj.price = min_price
-                            should_update = True
-                        if max_price is not None and sub_obj.max_price != max_price:
-                            sub_obj.max_price = max_price
-                            should_update = True
-                        if not sub_obj.is_active:
-                            sub_obj.is_active = True
-                            should_update = True
-                        if should_update:
-                            updated += 1
+                    root_state["price"] = None
+                    root_state["max_price"] = None
+
+                    # Subcat upsert (par nom global) : reparent, MAJ prix, réactivation
+                    sub_was_known = sub in states
+                    sub_state = upsert_state(sub)
+                    before = dict(sub_state)
+                    sub_state["parent_id"] = root_state["id"]
+                    if min_price is not None or not sub_was_known:
+                        sub_state["price"] = min_price
+                    if max_price is not None or not sub_was_known:
+                        sub_state["max_price"] = max_price
+                    sub_state["is_active"] = True
+                    status = self._row_status(sub_was_known, before, sub_state)
+
+                if status == "created":
+                    imported += 1
+                elif status == "updated":
+                    updated += 1
+                outcomes.append({"line": line, "root": root, "sub": sub, "status": status})
+
+            changed = [
+                (name, state) for name, state in states.items()
+                if name in created or any(state[f] != originals[name][f] for f in self.IMPORTED_FIELDS)
+            ]
+            # Racines d'abord : les sous-catégories d'un lot référencent des parents déjà écrits
+            changed.sort(key=lambda item: item[1]["parent_id"] is not None)
+            self._bulk_upsert(changed)
 
             self.db.commit()
         except Exception as exc:  # meaningful handling: rollback + error capture
             self.db.rollback()
             errors.append(f"Erreur d'exécution: {exc}")
+            imported = updated = 0
+            outcomes = []
 
         # Nettoyage session
         self.redis.delete(key)
 
-        return {"imported": imported, "updated": updated, "errors": errors}
+        return {"imported": imported, "updated": updated, "errors": errors, "rows": outcomes}
+
+    @classmethod
+    def _row_status(cls, existed: bool, before: Dict[str, Any], after: Dict[str, Any]) -> str:
+        if not existed:
+            return "created"
+        if any(before[field] != after[field] for field in cls.IMPORTED_FIELDS):
+            return "updated"
+        return "unchanged"
+
+    def _bulk_upsert(self, changed: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Écrit les catégories par lots avec INSERT ... ON CONFLICT (name) DO UPDATE."""
+        for start in range(0, len(changed), self.UPSERT_BATCH_SIZE):
+            batch = changed[start:start + self.UPSERT_BATCH_SIZE]
+            statement = pg_insert(Category).values([
+                {
+                    "id": state["id"],
+                    "name": name,
+                    "parent_id": state["parent_id"],
+                    "price": state["price"],
+                    "max_price": state["max_price"],
+                    "is_active": state["is_active"],
+                    "display_order": 0,
+                    "is_visible": True,
+                }
+                for name, state in batch
+            ])
+            statement = statement.on_conflict_do_update(
+                index_elements=[Category.name],
+                set_={
+                    "parent_id": statement.excluded.parent_id,
+                    "price": statement.excluded.price,
+                    "max_price": statement.excluded.max_price,
+                    "is_active": statement.excluded.is_active,
+                    "updated_at": func.now(),
+                },
+            )
+            self.db.execute(statement)
 
     # ---------- Template ----------
     def generate_template_csv(self) -> bytes:
@@ -260,6 +260,11 @@ class CategoryService:
             name=category.name,
             is_active=category.is_active,
             parent_id=str(category.parent_id) if category.parent_id else None,
+            price=category.price,
+            max_price=category.max_price,
+            display_order=category.display_order,
+            is_visible=category.is_visible,
+            shortcut_key=category.shortcut_key,
             created_at=category.created_at,
             updated_at=category.updated_at,
             children=children
@@ -0,0 +1,211 @@
+"""
+Diffusion en direct des métriques du tableau de bord (Server-Sent Events).
+
+Les chemins d'écriture (création d'une vente, ouverture et fermeture d'une session
+de caisse) publient, après commit, la variation qu'ils apportent aux métriques sur
+le canal Redis DASHBOARD_EVENTS_CHANNEL. Chaque processus API n'y est abonné qu'une
+fois, dès qu'un tableau de bord est ouvert, et relaie chaque événement aux
+connexions SSE ouvertes : le coût d'un événement est constant, quel que soit le
+nombre de tableaux de bord, et aucune statistique n'est recalculée.
+
+Le client charge une fois /admin/dashboard/stats après l'événement ``ready`` puis
+applique les variations reçues. Un événement ``resync`` lui demande de recharger
+les statistiques (connexion trop lente, messages perdus pendant une coupure Redis).
+"""
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from recyclic_api.core.config import settings
+from recyclic_api.core.redis import get_redis
+from recyclic_api.models.cash_session import CashSessionStatus
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_EVENTS_CHANNEL = "dashboard:events"
+
+SALE_CREATED = "sale_created"
+SESSION_OPENED = "session_opened"
+SESSION_CLOSED = "session_closed"
+SESSION_UPDATED = "session_updated"
+RESYNC = "resync"
+
+
+def session_contribution(session) -> Dict[str, float]:
+    """
+    Part d'une session de caisse dans les métriques de /stats.
+
+    Comme dans CashSessionService.get_session_stats, total_sales et total_items ne
+    comptent qu'une fois la session fermée.
+    """
+    closed = session.status == CashSessionStatus.CLOSED
+    return {
+        "totalSessions": 1,
+        "openSessions": int(session.status == CashSessionStatus.OPEN),
+        "closedSessions": int(closed),
+        "totalSales": float(session.total_sales or 0) if closed else 0.0,
+        "totalItems": int(session.total_items or 0) if closed else 0,
+    }
+
+
+def metric_deltas(before: Dict[str, float], after: Dict[str, float]) -> Dict[str, float]:
+    """Variations non nulles entre deux contributions."""
+    deltas = {key: after.get(key, 0) - before.get(key, 0) for key in {**before, **after}}
+    return {key: value for key, value in sorted(deltas.items()) if value}
+
+
+def publish_dashboard_event(event_type: str, site_id: Optional[Any], deltas: Dict[str, float], redis_client=None) -> None:
+    """
+    Publie la variation des métriques (clés de DashboardMetrics en camelCase).
+
+    Appelé après commit ; un échec de publication n'interrompt jamais l'écriture.
+    """
+    event = {
+        "type": event_type,
+        "siteId": str(site_id) if site_id is not None else None,
+        "deltas": deltas,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+    try:
+        (redis_client or get_redis()).publish(DASHBOARD_EVENTS_CHANNEL, json.dumps(event))
+    except Exception as e:
+        logger.warning(f"Publication de l'événement tableau de bord {event_type} impossible : {e}")
+
+
+def format_sse(event_type: str, data: Dict[str, Any]) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+
+@dataclass(eq=False)
+class DashboardSubscriber:
+    """File d'une connexion SSE, alimentée depuis le thread d'écoute Redis."""
+
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue
+    site_id: Optional[str] = None
+
+    def accepts(self, event: Dict[str, Any]) -> bool:
+        return self.site_id is None or event.get("siteId") == self.site_id
+
+    def deliver(self, event: Dict[str, Any]) -> None:
+        # Exécuté dans la boucle de la connexion
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Client trop lent : ses variations ne sont plus fiables, il doit recharger
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": RESYNC})
+
+
+class DashboardEventBroadcaster:
+    """Abonnement Redis unique par processus, relayé aux connexions SSE ouvertes."""
+
+    def __init__(self, redis_client=None, queue_size: Optional[int] = None):
+        self.redis_client = redis_client
+        self.queue_size = queue_size or settings.DASHBOARD_STREAM_QUEUE_SIZE
+        self.running = False
+        self._subscribers: Set[DashboardSubscriber] = set()
+        self._lock = Lock()
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._pubsub = None
+        self._thread = None
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def _dispatch(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = [subscriber for subscriber in self._subscribers if subscriber.accepts(event)]
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.deliver, event)
+            except RuntimeError:
+                # Boucle fermée : la connexion est en cours d'arrêt
+                pass
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        try:
+            event = json.loads(message["data"])
+        except (TypeError, ValueError):
+            logger.warning("Événement tableau de bord illisible ignoré")
+            return
+        self._dispatch(event)
+
+    def _on_error(self, exc: Exception, pubsub, thread) -> None:
+        # Des événements ont pu être perdus pendant la coupure
+        logger.warning(f"Canal des événements tableau de bord interrompu : {exc}")
+        self._dispatch({"type": RESYNC})
+        time.sleep(1.0)
+
+    async def start(self) -> None:
+        """Ouvre l'abonnement Redis (au premier tableau de bord ouvert)."""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self.running:
+                return
+            redis_client = self.redis_client or get_redis()
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            await asyncio.to_thread(pubsub.subscribe, **{DASHBOARD_EVENTS_CHANNEL: self._on_message})
+            self._pubsub = pubsub
+            self._thread = pubsub.run_in_thread(sleep_time=1.0, daemon=True, exception_handler=self._on_error)
+            self.running = True
+            logger.info("Dashboard event broadcaster started")
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self.running = False
+        self._thread.stop()
+        await asyncio.to_thread(self._thread.join, 5)
+        self._pubsub.close()
+        self._thread = None
+        self._pubsub = None
+        logger.info("Dashboard event broadcaster stopped")
+
+    async def subscribe(self, site_id: Optional[str] = None) -> DashboardSubscriber:
+        await self.start()
+        subscriber = DashboardSubscriber(
+            loop=asyncio.get_running_loop(),
+            queue=asyncio.Queue(maxsize=self.queue_size),
+            site_id=site_id,
+        )
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: DashboardSubscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    async def stream(self, subscriber: DashboardSubscriber, heartbeat_seconds: Optional[float] = None) -> AsyncIterator[str]:
+        """Flux SSE d'un abonné ; le désabonne quand le client se déconnecte."""
+        heartbeat = heartbeat_seconds or settings.DASHBOARD_STREAM_HEARTBEAT_SECONDS
+        try:
+            yield format_sse("ready", {"siteId": subscriber.site_id})
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    # Garde la connexion ouverte derrière les proxys
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event.get("type", "message"), event)
+        finally:
+            self.unsubscribe(subscriber)
+
+
+# Instance globale partagée par les connexions SSE du processus
+dashboard_event_broadcaster = DashboardEventBroadcaster()
+
+
+def get_dashboard_event_broadcaster() -> DashboardEventBroadcaster:
+    """Get the global dashboard event broadcaster."""
+    return dashboard_event_broadcaster
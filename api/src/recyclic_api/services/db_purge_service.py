@@ -0,0 +1,210 @@
+"""
+Purge des données transactionnelles (ventes, réceptions, sessions de caisse).
+
+Deux modes :
+- purge complète : un seul TRUNCATE, sans journaliser ni verrouiller chaque ligne ;
+- purge par date : suppression des données antérieures à une date par lots
+  validés un à un (verrous courts, WAL étalé), suivie d'un VACUUM ANALYZE des
+  tables concernées. La progression est publiée dans Redis.
+"""
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from recyclic_api.core.config import settings
+from recyclic_api.core.database import SessionLocal
+from recyclic_api.services.db_restore_service import DatabaseImportJobStore
+
+logger = logging.getLogger(__name__)
+
+# Tables purgées, enfants avant parents (contraintes de clés étrangères)
+PURGED_TABLES = [
+    "sale_items",               # Lignes de vente (dépendent de sales)
+    "sales",                    # Ventes (dépendent de cash_sessions)
+    "ligne_depot",              # Lignes de dépôt (dépendent de ticket_depot)
+    "ticket_depot",             # Tickets de dépôt
+    "cash_session_close_jobs",  # Traitements post-clôture (dépendent de cash_sessions)
+    "cash_sessions",            # Sessions de caisse
+]
+
+PURGE_LOCK_TTL_SECONDS = 6 * 3600
+
+
+@dataclass(frozen=True)
+class BatchedPurge:
+    """Table parente purgée par lots avec ses tables enfants."""
+    table: str
+    date_column: str
+    children: Tuple[Tuple[str, str], ...]  # (table enfant, clé étrangère)
+    condition: str = ""
+
+
+BATCHED_PURGES = [
+    BatchedPurge("sales", "created_at", (("sale_items", "sale_id"),)),
+    BatchedPurge("ticket_depot", "created_at", (("ligne_depot", "ticket_id"),)),
+    # Sessions fermées avant la date et dont plus aucune vente ne dépend
+    BatchedPurge(
+        "cash_sessions", "closed_at", (("cash_session_close_jobs", "cash_session_id"),),
+        condition="AND NOT EXISTS (SELECT 1 FROM sales s WHERE s.cash_session_id = p.id)",
+    ),
+]
+
+
+def truncate_transactional_data(db: Session) -> Dict[str, int]:
+    """
+    Vide toutes les tables transactionnelles et retourne le nombre de lignes supprimées par table.
+
+    Les tables sont verrouillées avant le comptage pour que les nombres retournés
+    soient exacts. La transaction est validée par l'appelant.
+    """
+    tables = ", ".join(PURGED_TABLES)
+    db.execute(text(f"LOCK TABLE {tables} IN ACCESS EXCLUSIVE MODE"))
+    counts = {table: db.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar() for table in PURGED_TABLES}
+    db.execute(text(f"TRUNCATE TABLE {tables} RESTART IDENTITY CASCADE"))
+    return counts
+
+
+def _batch_delete_statement(purge: BatchedPurge):
+    children = "".join(
+        f"child_{index} AS (DELETE FROM {table} WHERE {column} IN (SELECT id FROM batch) RETURNING 1),\n"
+        for index, (table, column) in enumerate(purge.children)
+    )
+    child_counts = "".join(f", (SELECT COUNT(*) FROM child_{index})" for index in range(len(purge.children)))
+    # Les enfants et leurs parents sont supprimés dans la même instruction : les
+    # contraintes de clés étrangères sont vérifiées à la fin de celle-ci
+    return text(
+        f"WITH batch AS (\n"
+        f"    SELECT p.id FROM {purge.table} p\n"
+        f"    WHERE p.{purge.date_column} < :cutoff {purge.condition}\n"
+        f"    ORDER BY p.{purge.date_column} LIMIT :batch_size FOR UPDATE SKIP LOCKED\n"
+        f"),\n"
+        f"{children}"
+        f"parents AS (DELETE FROM {purge.table} WHERE id IN (SELECT id FROM batch) RETURNING 1)\n"
+        f"SELECT (SELECT COUNT(*) FROM parents){child_counts}"
+    )
+
+
+def _count_statement(purge: BatchedPurge):
+    return text(
+        f"SELECT COUNT(*) FROM {purge.table} p WHERE p.{purge.date_column} < :cutoff {purge.condition}"
+    )
+
+
+def purge_older_than(
+    cutoff: datetime,
+    batch_size: int,
+    session_factory: Callable[[], Session] = SessionLocal,
+    on_progress: Optional[Callable[[str, Dict[str, int], float], None]] = None,
+) -> Dict[str, int]:
+    """
+    Supprime les données antérieures à ``cutoff`` par lots de ``batch_size`` lignes parentes.
+
+    Chaque lot est validé dans sa propre transaction. ``on_progress(table, counts, percent)``
+    est appelé après chaque lot. Retourne le nombre de lignes supprimées par table.
+    """
+    counts = {table: 0 for table in PURGED_TABLES}
+    db = session_factory()
+    try:
+        # Estimation initiale pour la progression (les sessions ne deviennent purgeables
+        # qu'une fois leurs ventes supprimées : elles sont recomptées à leur tour)
+        total = sum(db.execute(_count_statement(purge), {"cutoff": cutoff}).scalar() for purge in BATCHED_PURGES[:-1])
+        done = 0
+        for index, purge in enumerate(BATCHED_PURGES):
+            if index == len(BATCHED_PURGES) - 1:
+                total += db.execute(_count_statement(purge), {"cutoff": cutoff}).scalar()
+            statement = _batch_delete_statement(purge)
+            while True:
+                row = db.execute(statement, {"cutoff": cutoff, "batch_size": batch_size}).one()
+                db.commit()
+                deleted = row[0]
+                if not deleted:
+                    break
+                counts[purge.table] += deleted
+                for (child, _), child_deleted in zip(purge.children, row[1:]):
+                    counts[child] += child_deleted
+                done += deleted
+                logger.info(f"Purge: deleted {deleted} records from {purge.table} ({done}/{total})")
+                if on_progress is not None:
+                    on_progress(purge.table, counts, done / total * 100 if total else 100.0)
+        return counts
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def vacuum_tables(tables: List[str], session_factory: Callable[[], Session] = SessionLocal) -> None:
+    """Lance un VACUUM ANALYZE (hors transaction) pour récupérer l'espace libéré par la purge."""
+    db = session_factory()
+    try:
+        with db.get_bind().engine.connect() as connection:
+            connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+            for table in tables:
+                connection.execute(text(f"VACUUM (ANALYZE) {table}"))
+                logger.info(f"VACUUM ANALYZE completed for {table}")
+    finally:
+        db.close()
+
+
+class DatabasePurgeJobStore(DatabaseImportJobStore):
+    """État des purges par lots dans Redis et verrou garantissant une seule purge à la fois."""
+
+    KEY_PREFIX = "db_purge:job"
+    LOCK_KEY = "db_purge:lock"
+
+    def lock_ttl_seconds(self) -> int:
+        return PURGE_LOCK_TTL_SECONDS
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = super().get(job_id)
+        if job is not None:
+            job["deleted_records"] = json.loads(job.get("deleted_records") or "{}")
+        return job
+
+
+def run_batched_purge(
+    job_id: str,
+    cutoff: datetime,
+    batch_size: int,
+    store: Optional[DatabasePurgeJobStore] = None,
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> None:
+    """
+    Exécute une purge par lots puis le VACUUM des tables touchées, en publiant
+    l'avancement dans le job. Ne lève jamais : l'erreur est enregistrée dans le job.
+    """
+    store = store or DatabasePurgeJobStore()
+
+    def on_progress(table: str, counts: Dict[str, int], percent: float) -> None:
+        store.save(
+            job_id, current_table=table, deleted_records=json.dumps(counts),
+            progress_percent=round(min(percent, 100.0), 1),
+        )
+
+    try:
+        store.save(job_id, status="running", stage="delete")
+        counts = purge_older_than(cutoff, batch_size, session_factory=session_factory, on_progress=on_progress)
+        store.save(job_id, deleted_records=json.dumps(counts), progress_percent=100)
+
+        purged_tables = [table for table in PURGED_TABLES if counts[table]]
+        if settings.DB_PURGE_VACUUM and purged_tables:
+            store.save(job_id, stage="vacuum", current_table=None)
+            try:
+                vacuum_tables(purged_tables, session_factory=session_factory)
+            except Exception as e:
+                # Les données sont déjà supprimées : l'autovacuum prendra le relais
+                logger.warning(f"VACUUM after purge {job_id} failed: {e}")
+
+        store.save(job_id, status="completed", stage="done", finished_at=datetime.now(timezone.utc).isoformat())
+        logger.warning(f"Batched purge {job_id} completed. Records deleted: {counts}")
+    except Exception as e:
+        logger.error(f"Batched purge {job_id} failed: {e}", exc_info=True)
+        store.save(job_id, status="failed", error=str(e), finished_at=datetime.now(timezone.utc).isoformat())
+    finally:
+        store.release_lock(job_id)
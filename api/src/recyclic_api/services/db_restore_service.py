@@ -0,0 +1,273 @@
+"""
+Restauration de la base de données à partir d'une sauvegarde importée.
+
+Le fichier reçu est recopié sur disque par blocs, puis restauré par un
+sous-processus : psql (SQL brut, transmis sur l'entrée standard, en une seule
+transaction) ou pg_restore (format custom, en parallèle). Les blocs COPY des
+sauvegardes passent ainsi par le protocole COPY de PostgreSQL au lieu d'une
+requête par ligne.
+
+L'état de chaque import (étape, progression, erreur) est conservé dans Redis :
+la base étant remplacée pendant l'opération, elle ne peut pas l'héberger, et
+n'importe quel worker peut répondre au suivi.
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Callable, Dict, List, Optional
+
+from recyclic_api.core.config import settings
+from recyclic_api.core.redis import get_redis
+from recyclic_api.services.db_backup_service import (
+    PgConnectionParams,
+    dump_to_file,
+    parse_database_url,
+    spawn_process,
+)
+
+logger = logging.getLogger(__name__)
+
+SPOOL_CHUNK_SIZE = 1024 * 1024
+CUSTOM_FORMAT_MAGIC = b"PGDMP"
+# Directives psql non standard (pg_dump >= 17.6) refusées par les clients plus anciens
+UNSUPPORTED_PSQL_DIRECTIVES = (b"\\restrict", b"\\unrestrict")
+JOB_TTL_SECONDS = 24 * 3600
+# Fréquence maximale des mises à jour de progression dans Redis
+PROGRESS_UPDATE_INTERVAL_SECONDS = 1.0
+STDERR_TAIL_LINES = 20
+
+
+class DatabaseImportError(Exception):
+    """La restauration a échoué."""
+
+
+class UploadTooLarge(DatabaseImportError):
+    """Le fichier dépasse la taille maximale autorisée."""
+
+
+def spool_upload(source: BinaryIO, destination_path: str, max_bytes: int) -> str:
+    """
+    Recopie le fichier reçu sur disque par blocs et retourne son format ("custom" ou "plain").
+
+    Les directives \\restrict / \\unrestrict sont retirées des sauvegardes SQL au passage.
+    Lève UploadTooLarge dès que ``max_bytes`` est dépassé.
+    """
+    source.seek(0)
+    is_custom = source.read(len(CUSTOM_FORMAT_MAGIC)) == CUSTOM_FORMAT_MAGIC
+    source.seek(0)
+
+    written = 0
+    with open(destination_path, "wb") as destination:
+        if is_custom:
+            for chunk in iter(lambda: source.read(SPOOL_CHUNK_SIZE), b""):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+                destination.write(chunk)
+        else:
+            for line in source:
+                written += len(line)
+                if written > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+                if line.lstrip().startswith(UNSUPPORTED_PSQL_DIRECTIVES):
+                    continue
+                destination.write(line)
+    return "custom" if is_custom else "plain"
+
+
+class DatabaseImportJobStore:
+    """État des imports dans Redis et verrou garantissant un seul import à la fois."""
+
+    KEY_PREFIX = "db_import:job"
+    LOCK_KEY = "db_import:lock"
+
+    def __init__(self, redis_factory: Callable[[], Any] = get_redis):
+        self.redis_factory = redis_factory
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.KEY_PREFIX}:{job_id}"
+
+    def lock_ttl_seconds(self) -> int:
+        # Le verrou expire de lui-même si le worker meurt en cours d'import
+        return max(int(2 * settings.DB_IMPORT_TIMEOUT_SECONDS), 60)
+
+    def acquire_lock(self, job_id: str) -> bool:
+        return bool(self.redis_factory().set(self.LOCK_KEY, job_id, nx=True, ex=self.lock_ttl_seconds()))
+
+    def release_lock(self, job_id: str) -> None:
+        client = self.redis_factory()
+        if client.get(self.LOCK_KEY) == job_id:
+            client.delete(self.LOCK_KEY)
+
+    def save(self, job_id: str, **fields: Any) -> None:
+        mapping = {name: "" if value is None else str(value) for name, value in fields.items()}
+        pipe = self.redis_factory().pipeline(transaction=False)
+        pipe.hset(self._key(job_id), mapping=mapping)
+        pipe.expire(self._key(job_id), JOB_TTL_SECONDS)
+        pipe.execute()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        data = self.redis_factory().hgetall(self._key(job_id))
+        if not data:
+            return None
+        job = {name: (value or None) for name, value in data.items()}
+        job["progress_percent"] = float(job.get("progress_percent") or 0)
+        return job
+
+
+class _ProgressReporter:
+    """Publie la progression d'une étape, au plus une fois par seconde."""
+
+    def __init__(self, store: DatabaseImportJobStore, job_id: str):
+        self.store = store
+        self.job_id = job_id
+        self._last_update = 0.0
+
+    def update(self, percent: float, force: bool = False) -> None:
+        now = time.monotonic()
+        if force or now - self._last_update >= PROGRESS_UPDATE_INTERVAL_SECONDS:
+            self._last_update = now
+            self.store.save(self.job_id, progress_percent=round(min(percent, 100.0), 1))
+
+
+async def _collect_stderr(stream: asyncio.StreamReader, tail: List[str],
+                          on_line: Optional[Callable[[str], None]] = None) -> None:
+    while True:
+        line = await stream.readline()
+        if not line:
+            return
+        text = line.decode("utf-8", errors="replace").rstrip()
+        tail.append(text)
+        del tail[:-STDERR_TAIL_LINES]
+        if on_line is not None:
+            on_line(text)
+
+
+async def _finish(process: asyncio.subprocess.Process, stderr_task: asyncio.Task,
+                  tail: List[str], tool: str) -> None:
+    returncode = await process.wait()
+    await stderr_task
+    if returncode != 0:
+        raise DatabaseImportError(f"{tool} failed with return code {returncode}: " + "\n".join(tail))
+
+
+async def _kill_if_running(process: asyncio.subprocess.Process) -> None:
+    """Arrête le sous-processus abandonné (timeout, annulation)."""
+    if process.returncode is None:
+        process.kill()
+        await process.wait()
+
+
+async def _restore_plain(params: PgConnectionParams, path: str, progress: _ProgressReporter) -> None:
+    """Rejoue une sauvegarde SQL via psql, en une transaction (un échec laisse la base intacte)."""
+    process = await spawn_process(
+        ["psql", *params.args(), "-X", "-q", "-v", "ON_ERROR_STOP=1", "--single-transaction", "-f", "-"],
+        env=params.env(),
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.DEVNULL,
+    )
+    tail: List[str] = []
+    stderr_task = asyncio.create_task(_collect_stderr(process.stderr, tail))
+    total = max(os.path.getsize(path), 1)
+    sent = 0
+    try:
+        try:
+            with open(path, "rb") as dump:
+                while True:
+                    chunk = await asyncio.to_thread(dump.read, SPOOL_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    process.stdin.write(chunk)
+                    await process.stdin.drain()
+                    sent += len(chunk)
+                    progress.update(sent / total * 100)
+            process.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            # psql s'est arrêté sur une erreur : son code retour et stderr la décrivent
+            pass
+        await _finish(process, stderr_task, tail, "psql")
+    finally:
+        await _kill_if_running(process)
+
+
+async def _restore_custom(params: PgConnectionParams, path: str, progress: _ProgressReporter) -> None:
+    """Restaure une sauvegarde au format custom via pg_restore, avec plusieurs workers."""
+    listing = await spawn_process(["pg_restore", "-l", path])
+    toc, _ = await listing.communicate()
+    total_items = max(
+        sum(1 for line in toc.decode("utf-8", errors="replace").splitlines() if line and not line.startswith(";")),
+        1,
+    )
+
+    process = await spawn_process(
+        [
+            "pg_restore", *params.args(),
+            "--clean", "--if-exists", "--no-owner", "--no-privileges",
+            "--exit-on-error", "--verbose",
+            "-j", str(settings.DB_IMPORT_PARALLEL_JOBS),
+            path,
+        ],
+        env=params.env(),
+        stdout=asyncio.subprocess.DEVNULL,
+    )
+    done = 0
+
+    def on_line(line: str) -> None:
+        nonlocal done
+        # Une ligne de création / chargement par élément de la table des matières
+        if line.startswith(("pg_restore: creating", "pg_restore: processing data")):
+            done += 1
+            progress.update(min(done / total_items * 100, 99.0))
+
+    tail: List[str] = []
+    stderr_task = asyncio.create_task(_collect_stderr(process.stderr, tail, on_line))
+    try:
+        await _finish(process, stderr_task, tail, "pg_restore")
+    finally:
+        await _kill_if_running(process)
+
+
+async def run_database_import(job_id: str, spool_path: str, dump_format: str, backup_path: str,
+                              store: Optional[DatabaseImportJobStore] = None,
+                              database_url: Optional[str] = None) -> None:
+    """
+    Sauvegarde la base courante puis restaure le fichier importé ; met à jour l'état du job
+    à chaque étape. Ne lève jamais : l'erreur est enregistrée dans le job.
+    """
+    store = store or DatabaseImportJobStore()
+    progress = _ProgressReporter(store, job_id)
+    try:
+        params = parse_database_url(database_url or settings.DATABASE_URL)
+
+        store.save(job_id, status="running", stage="backup", progress_percent=0)
+        logger.info(f"Creating automatic backup before import: {backup_path}")
+        await dump_to_file(params, backup_path, "custom", timeout_seconds=settings.DB_IMPORT_TIMEOUT_SECONDS)
+
+        store.save(job_id, stage="restore")
+        logger.info(f"Restoring {dump_format} backup {spool_path} (job {job_id})")
+        restore = _restore_custom if dump_format == "custom" else _restore_plain
+        await asyncio.wait_for(restore(params, spool_path, progress), settings.DB_IMPORT_TIMEOUT_SECONDS)
+
+        store.save(
+            job_id, status="completed", stage="done", progress_percent=100,
+            finished_at=datetime.now(timezone.utc).isoformat(),
+        )
+        logger.warning(f"Database import {job_id} completed successfully")
+    except asyncio.TimeoutError:
+        logger.error(f"Database import {job_id} timed out")
+        store.save(
+            job_id, status="failed", finished_at=datetime.now(timezone.utc).isoformat(),
+            error=f"L'import de la base de données a pris trop de temps (timeout après "
+                  f"{settings.DB_IMPORT_TIMEOUT_SECONDS:.0f} secondes)",
+        )
+    except Exception as e:
+        logger.error(f"Database import {job_id} failed: {e}")
+        store.save(job_id, status="failed", error=str(e), finished_at=datetime.now(timezone.utc).isoformat())
+    finally:
+        try:
+            os.unlink(spool_path)
+        except OSError as e:
+            logger.warning(f"Could not delete temporary file {spool_path}: {e}")
+        store.release_lock(job_id)
@@ -0,0 +1,347 @@
+"""
+Email outbox: request handlers enqueue, a background worker delivers.
+
+Queued emails are ``EmailLog`` rows in ``pending`` status with ``next_attempt_at``
+set. ``EmailOutboxWorker`` claims them in batches, sends them through Brevo with
+bounded concurrency (the blocking SDK call runs in threads) and writes the
+outcomes back in a single bulk update per batch.
+"""
+import asyncio
+import base64
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from recyclic_api.core.config import settings
+from recyclic_api.core.database import SessionLocal
+from recyclic_api.core.email_service import (
+    EmailAttachment,
+    EmailDeliveryResult,
+    EmailService,
+    get_email_service,
+)
+from recyclic_api.models.email_log import EmailLog, EmailStatus, EmailType
+
+logger = logging.getLogger(__name__)
+
+
+class EmailOutboxService:
+    """Service for queueing emails in the outbox."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        from_email: Optional[str] = None,
+        from_name: Optional[str] = None,
+        attachments: Optional[List[EmailAttachment]] = None,
+        email_type: EmailType = EmailType.OTHER,
+        user_id: Optional[str] = None,
+        recipient_name: Optional[str] = None,
+        body_text: Optional[str] = None,
+        commit: bool = True,
+    ) -> EmailLog:
+        """
+        Queue an email for asynchronous delivery.
+
+        Only a single INSERT happens on the caller's session; the Brevo call is
+        made later by the outbox worker.
+
+        Args:
+            commit: If False, the row is only flushed so the caller can commit it
+                together with its own changes.
+
+        Returns:
+            EmailLog: The queued email log entry
+        """
+        payload: Dict[str, Any] = {
+            "from_email": from_email,
+            "from_name": from_name,
+            "attachments": [
+                {
+                    "filename": attachment.filename,
+                    "mime_type": attachment.mime_type,
+                    "content": base64.b64encode(attachment.content).decode("ascii"),
+                }
+                for attachment in attachments or []
+            ],
+        }
+
+        email_log = EmailLog(
+            recipient_email=to_email,
+            recipient_name=recipient_name,
+            subject=subject,
+            body_text=body_text,
+            body_html=html_content,
+            email_type=email_type,
+            user_id=user_id,
+            status=EmailStatus.PENDING,
+            attempts=0,
+            next_attempt_at=datetime.now(timezone.utc),
+            outbox_payload=json.dumps(payload),
+        )
+        self.db.add(email_log)
+        if commit:
+            self.db.commit()
+            self.db.refresh(email_log)
+            email_outbox_worker.wake()
+        else:
+            self.db.flush()
+
+        return email_log
+
+
+def enqueue_email(db: Session, to_email: str, subject: str, html_content: str, **kwargs: Any) -> EmailLog:
+    """Convenience function to queue an email in the outbox."""
+    return EmailOutboxService(db).enqueue(to_email, subject, html_content, **kwargs)
+
+
+@dataclass
+class OutboxMessage:
+    """Snapshot of a claimed outbox row, detached from any DB session."""
+    id: Any
+    to_email: str
+    subject: str
+    html_content: str
+    attempts: int
+    from_email: Optional[str] = None
+    from_name: Optional[str] = None
+    attachments: List[EmailAttachment] = field(default_factory=list)
+
+    @classmethod
+    def from_log(cls, email_log: EmailLog) -> "OutboxMessage":
+        payload = json.loads(email_log.outbox_payload) if email_log.outbox_payload else {}
+        return cls(
+            id=email_log.id,
+            to_email=email_log.recipient_email,
+            subject=email_log.subject,
+            html_content=email_log.body_html or "",
+            attempts=email_log.attempts or 0,
+            from_email=payload.get("from_email"),
+            from_name=payload.get("from_name"),
+            attachments=[
+                EmailAttachment(
+                    filename=item["filename"],
+                    content=base64.b64decode(item["content"]),
+                    mime_type=item.get("mime_type") or "application/octet-stream",
+                )
+                for item in payload.get("attachments", [])
+            ],
+        )
+
+
+class EmailOutboxWorker:
+    """Background worker draining the email outbox."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        email_service_factory: Callable[[], EmailService] = get_email_service,
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        poll_interval_seconds: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        retry_base_seconds: Optional[float] = None,
+        lease_seconds: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.email_service_factory = email_service_factory
+        self.concurrency = max(concurrency or settings.EMAIL_OUTBOX_CONCURRENCY, 1)
+        self.batch_size = max(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE, 1)
+        self.poll_interval_seconds = poll_interval_seconds or settings.EMAIL_OUTBOX_POLL_INTERVAL_SECONDS
+        self.max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+        self.retry_base_seconds = (
+            retry_base_seconds if retry_base_seconds is not None else settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS
+        )
+        self.lease_seconds = lease_seconds or settings.EMAIL_OUTBOX_LEASE_SECONDS
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def start(self):
+        """Start the worker loop."""
+        if self.running:
+            logger.warning("Email outbox worker already running")
+            return
+        self.running = True
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self.run_loop())
+        logger.info("Email outbox worker started (concurrency=%s)", self.concurrency)
+
+    async def stop(self):
+        """Stop the worker, letting the batch in progress finish."""
+        if not self.running:
+            return
+        self.running = False
+        self.wake()
+        if self._task:
+            try:
+                await asyncio.wait_for(self._task, timeout=30)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        logger.info("Email outbox worker stopped")
+
+    def wake(self):
+        """Ask the worker to poll now (safe to call from any thread)."""
+        if self._loop is None or self._wakeup is None or self._loop.is_closed():
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            pass
+
+    async def run_loop(self):
+        while self.running:
+            try:
+                processed = await self.process_batch()
+            except Exception as e:
+                logger.error(f"Email outbox cycle failed: {e}", exc_info=True)
+                processed = 0
+
+            if processed >= self.batch_size:
+                continue  # Backlog: keep draining without waiting
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def process_batch(self) -> int:
+        """Claim, send and record one batch. Returns the number of messages handled."""
+        messages = await asyncio.to_thread(self._claim_batch)
+        if not messages:
+            return 0
+
+        try:
+            email_service = self.email_service_factory()
+        except Exception as e:
+            # Misconfiguration (e.g. missing API key): retry later like any failure
+            logger.error(f"Email outbox cannot get email service: {e}")
+            results = [
+                (message, EmailDeliveryResult(success=False, error_type="configuration_error", error_detail=str(e)))
+                for message in messages
+            ]
+            await asyncio.to_thread(self._record_results, results)
+            return len(messages)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _send(message: OutboxMessage) -> Tuple[OutboxMessage, EmailDeliveryResult]:
+            async with semaphore:
+                try:
+                    result = await asyncio.to_thread(
+                        email_service.deliver,
+                        to_email=message.to_email,
+                        subject=message.subject,
+                        html_content=message.html_content,
+                        from_email=message.from_email,
+                        from_name=message.from_name,
+                        attachments=message.attachments or None,
+                    )
+                except Exception as e:
+                    result = EmailDeliveryResult(success=False, error_type="unexpected_error", error_detail=str(e))
+                return message, result
+
+        results = await asyncio.gather(*(_send(message) for message in messages))
+        await asyncio.to_thread(self._record_results, results)
+        return len(messages)
+
+    def _claim_batch(self) -> List[OutboxMessage]:
+        """Lock due rows, push their next_attempt_at forward (lease) and return them."""
+        now = datetime.now(timezone.utc)
+        with self.session_factory() as db:
+            rows = (
+                db.query(EmailLog)
+                .filter(
+                    EmailLog.status == EmailStatus.PENDING,
+                    EmailLog.next_attempt_at.isnot(None),
+                    EmailLog.next_attempt_at <= now,
+                )
+                .order_by(EmailLog.next_attempt_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            if not rows:
+                return []
+
+            lease_until = now + timedelta(seconds=self.lease_seconds)
+            messages = []
+            for row in rows:
+                try:
+                    messages.append(OutboxMessage.from_log(row))
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.error(f"Dropping malformed outbox entry {row.id}: {e}")
+                    row.status = EmailStatus.FAILED
+                    row.next_attempt_at = None
+                    row.error_message = f"Malformed outbox payload: {e}"
+                    continue
+                # If this worker dies mid-send, the row becomes due again after the lease
+                row.next_attempt_at = lease_until
+            db.commit()
+            return messages
+
+    def _record_results(self, results: List[Tuple[OutboxMessage, EmailDeliveryResult]]):
+        """Write every outcome of a batch in one bulk update."""
+        now = datetime.now(timezone.utc)
+        mappings = []
+        for message, result in results:
+            attempts = message.attempts + 1
+            if result.success:
+                mappings.append({
+                    "id": message.id,
+                    "status": EmailStatus.SENT,
+                    "external_id": result.message_id,
+                    "sent_at": now,
+                    "attempts": attempts,
+                    "next_attempt_at": None,
+                    "outbox_payload": None,
+                    "error_message": None,
+                })
+            elif attempts >= self.max_attempts:
+                logger.error(
+                    f"Giving up email {message.id} to {message.to_email} after {attempts} attempts: "
+                    f"{result.error_detail}"
+                )
+                mappings.append({
+                    "id": message.id,
+                    "status": EmailStatus.FAILED,
+                    "attempts": attempts,
+                    "next_attempt_at": None,
+                    "error_message": result.error_detail,
+                })
+            else:
+                delay = self.retry_base_seconds * (2 ** (attempts - 1))
+                mappings.append({
+                    "id": message.id,
+                    "attempts": attempts,
+                    "next_attempt_at": now + timedelta(seconds=delay),
+                    "error_message": result.error_detail,
+                })
+
+        with self.session_factory() as db:
+            db.bulk_update_mappings(EmailLog, mappings)
+            db.commit()
+
+
+# Global worker instance
+email_outbox_worker = EmailOutboxWorker()
+
+
+def get_email_outbox_worker() -> EmailOutboxWorker:
+    """Get the global email outbox worker."""
+    return email_outbox_worker
@@ -9,6 +9,7 @@ import re
 
 from recyclic_api.models.setting import Setting
 from recyclic_api.core.config import settings
+from recyclic_api.utils.response_cache import invalidate_response_cache
 
 
 class EmailSettingsService:
@@ -101,6 +102,7 @@ class EmailSettingsService:
 
         try:
             self.db.commit()
+            invalidate_response_cache("settings")
         except IntegrityError as e:
             self.db.rollback()
             raise ValueError(f"Erreur lors de la sauvegarde: {str(e)}") from e
@@ -1,21 +1,63 @@
 """
 Service for handling Brevo webhook events and updating email status.
+
+Webhook endpoints only verify and enqueue: payloads are pushed on a Redis list
+(``EmailEventQueue``). ``EmailEventWorker`` drains it in batches, coalesces the
+events of each message and applies them with one query per table: the events
+are inserted together, then the matching ``EmailStatusModel`` and ``EmailLog``
+rows are loaded and updated in the same transaction.
 """
+import asyncio
 import json
 import logging
 import hashlib
 import hmac
+import uuid
+from collections import defaultdict
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
 from recyclic_api.models.email_event import EmailEvent, EmailStatusModel, EmailEventType
+from recyclic_api.models.email_log import EmailLog, EmailStatus
 from recyclic_api.core.config import settings
+from recyclic_api.core.database import SessionLocal
+from recyclic_api.core.redis import get_redis
 
 logger = logging.getLogger(__name__)
 
+# Brevo events mapped to the EmailLog status
+EMAIL_LOG_STATUS_BY_EVENT = {
+    "sent": EmailStatus.SENT,
+    "delivered": EmailStatus.DELIVERED,
+    "opened": EmailStatus.OPENED,
+    "clicked": EmailStatus.CLICKED,
+    "bounced": EmailStatus.BOUNCED,
+    "blocked": EmailStatus.FAILED,
+    "invalid": EmailStatus.FAILED,
+    "complaint": EmailStatus.BOUNCED,
+}
+
+EMAIL_LOG_TIMESTAMP_BY_STATUS = {
+    EmailStatus.SENT: "sent_at",
+    EmailStatus.DELIVERED: "delivered_at",
+    EmailStatus.OPENED: "opened_at",
+    EmailStatus.CLICKED: "clicked_at",
+    EmailStatus.BOUNCED: "bounced_at",
+}
+
+# Map event types to EmailStatusModel statuses
+STATUS_BY_EVENT = {
+    EmailEventType.DELIVERED: "delivered",
+    EmailEventType.BOUNCED: "bounced",
+    EmailEventType.SPAM: "spam",
+    EmailEventType.BLOCKED: "blocked",
+    EmailEventType.ERROR: "error",
+}
+
 
 class BrevoWebhookService:
     """Service for processing Brevo webhook events."""
@@ -60,9 +102,56 @@ class BrevoWebhookService:
             logger.error(f"Error verifying webhook signature: {e}")
             return False
 
+    @staticmethod
+    def build_event(payload: Dict[str, Any]) -> EmailEvent:
+        """
+        Build the (pending) EmailEvent of a webhook payload.
+
+        Raises:
+            ValueError: if the event type or the email address is missing
+        """
+        event_type = payload.get("event")
+        email_address = payload.get("email")
+        timestamp_str = payload.get("ts")
+
+        if not event_type or not email_address:
+            raise ValueError("Missing required fields: event or email")
+
+        # Parse timestamp
+        if timestamp_str:
+            try:
+                # Brevo sends timestamp as Unix timestamp
+                event_timestamp = datetime.fromtimestamp(int(timestamp_str), tz=timezone.utc)
+            except (ValueError, TypeError):
+                event_timestamp = datetime.now(timezone.utc)
+        else:
+            event_timestamp = datetime.now(timezone.utc)
+
+        # Validate event type
+        known_events = {e.value for e in EmailEventType} | set(EMAIL_LOG_STATUS_BY_EVENT)
+        if event_type not in known_events:
+            logger.warning(f"Unknown event type: {event_type}")
+            event_type = "unknown"
+
+        return EmailEvent(
+            email_address=email_address,
+            message_id=payload.get("message-id"),
+            event_type=event_type,
+            event_timestamp=event_timestamp,
+            reason=payload.get("reason", ""),
+            error_code=payload.get("error_code"),
+            user_agent=payload.get("user-agent"),
+            ip_address=payload.get("ip"),
+            webhook_data=json.dumps(payload),
+            processed="pending"
+        )
+
     def process_webhook_event(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Process a webhook event from Brevo.
+        Process a single webhook event from Brevo synchronously.
+
+        Used when the event queue is unavailable and to isolate an event that
+        made its batch fail; the normal path is ``process_webhook_events``.
 
         Args:
             payload: Parsed webhook payload
@@ -71,55 +160,20 @@ class BrevoWebhookService:
             Dict with processing result
         """
         try:
-            # Extract event details
-            event_type = payload.get("event")
-            email_address = payload.get("email")
-            message_id = payload.get("message-id")
-            timestamp_str = payload.get("ts")
-            reason = payload.get("reason", "")
-
-            if not event_type or not email_address:
-                raise ValueError("Missing required fields: event or email")
-
-            # Parse timestamp
-            if timestamp_str:
-                try:
-                    # Brevo sends timestamp as Unix timestamp
-                    event_timestamp = datetime.fromtimestamp(int(timestamp_str))
-                except (ValueError, TypeError):
-                    event_timestamp = datetime.now(timezone.utc)
-            else:
-                event_timestamp = datetime.now(timezone.utc)
-
-            # Validate event type
-            if event_type not in [e.value for e in EmailEventType]:
-                logger.warning(f"Unknown event type: {event_type}")
-                event_type = "unknown"
-
-            # Create email event record
-            email_event = EmailEvent(
-                email_address=email_address,
-                message_id=message_id,
-                event_type=event_type,
-                event_timestamp=event_timestamp,
-                reason=reason,
-                error_code=payload.get("error_code"),
-                user_agent=payload.get("user-agent"),
-                ip_address=payload.get("ip"),
-                webhook_data=json.dumps(payload),
-                processed="pending"
-            )
-
+            email_event = self.build_event(payload)
             self.db.add(email_event)
 
             # Update email status
             self._update_email_status(
-                email_address=email_address,
-                message_id=message_id,
-                event_type=event_type,
-                reason=reason,
-                event_timestamp=event_timestamp
+                email_address=email_event.email_address,
+                message_id=email_event.message_id,
+                event_type=email_event.event_type,
+                reason=email_event.reason,
+                event_timestamp=email_event.event_timestamp
             )
+            if email_event.message_id:
+                for email_log in self.db.query(EmailLog).filter(EmailLog.external_id == email_event.message_id):
+                    self._apply_email_log_event(email_log, payload, email_event.event_timestamp)
 
             # Mark event as processed
             email_event.processed = "success"
@@ -129,18 +183,18 @@ class BrevoWebhookService:
                 f"Processed webhook event",
                 extra={
                     "event": "webhook_processed",
-                    "email": email_address,
-                    "message_id": message_id,
-                    "event_type": event_type,
-                    "timestamp": event_timestamp.isoformat()
+                    "email": email_event.email_address,
+                    "message_id": email_event.message_id,
+                    "event_type": email_event.event_type,
+                    "timestamp": email_event.event_timestamp.isoformat()
                 }
             )
 
             return {
                 "success": True,
                 "event_id": email_event.id,
-                "event_type": event_type,
-                "email": email_address
+                "event_type": email_event.event_type,
+                "email": email_event.email_address
             }
 
         except Exception as e:
@@ -164,6 +218,78 @@ class BrevoWebhookService:
                 detail=f"Error processing webhook event: {str(e)}"
             )
 
+    def process_webhook_events(self, payloads: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Apply a batch of webhook events in one transaction.
+
+        Events are coalesced per message: the status and the email log of a
+        message are loaded once and updated with its events in timestamp order.
+        Invalid payloads are skipped. Raises on database errors (nothing is applied).
+
+        Returns:
+            Dict with the number of events recorded and rows updated
+        """
+        entries: List[Tuple[Dict[str, Any], EmailEvent]] = []
+        for payload in payloads:
+            try:
+                entries.append((payload, self.build_event(payload)))
+            except ValueError as e:
+                logger.warning(f"Skipping invalid webhook event: {e}", extra={"payload": payload})
+        if not entries:
+            return {"events": 0, "statuses": 0, "email_logs": 0}
+
+        self.db.add_all([event for _, event in entries])
+
+        by_message: Dict[str, List[Tuple[Dict[str, Any], EmailEvent]]] = defaultdict(list)
+        for payload, event in sorted(entries, key=lambda entry: entry[1].event_timestamp):
+            if event.message_id:
+                by_message[event.message_id].append((payload, event))
+            else:
+                # Fallback to the latest email sent to the address
+                self._update_email_status(
+                    email_address=event.email_address,
+                    message_id=None,
+                    event_type=event.event_type,
+                    reason=event.reason,
+                    event_timestamp=event.event_timestamp
+                )
+
+        updated_statuses = updated_logs = 0
+        if by_message:
+            message_ids = list(by_message)
+            statuses = {
+                status.message_id: status
+                for status in self.db.query(EmailStatusModel).filter(EmailStatusModel.message_id.in_(message_ids))
+            }
+            email_logs: Dict[str, List[EmailLog]] = defaultdict(list)
+            for email_log in self.db.query(EmailLog).filter(EmailLog.external_id.in_(message_ids)):
+                email_logs[email_log.external_id].append(email_log)
+
+            for message_id, message_events in by_message.items():
+                email_status = statuses.get(message_id)
+                if email_status is not None:
+                    changed = [
+                        self._apply_status_event(email_status, event.event_type, event.reason, event.event_timestamp)
+                        for _, event in message_events
+                    ]
+                    updated_statuses += any(changed)
+                for email_log in email_logs.get(message_id, []):
+                    changed = [
+                        self._apply_email_log_event(email_log, payload, event.event_timestamp)
+                        for payload, event in message_events
+                    ]
+                    updated_logs += any(changed)
+
+        for _, event in entries:
+            event.processed = "success"
+        self.db.commit()
+
+        logger.info(
+            f"Processed {len(entries)} webhook events "
+            f"({len(by_message)} messages, {updated_statuses} statuses, {updated_logs} email logs updated)"
+        )
+        return {"events": len(entries), "statuses": updated_statuses, "email_logs": updated_logs}
+
     def _update_email_status(
         self,
         email_address: str,
@@ -197,16 +323,17 @@ class BrevoWebhookService:
             logger.warning(f"No email status found for {email_address} (message_id: {message_id})")
             return
 
-        # Map event types to statuses
-        status_mapping = {
-            EmailEventType.DELIVERED: "delivered",
-            EmailEventType.BOUNCED: "bounced",
-            EmailEventType.SPAM: "spam",
-            EmailEventType.BLOCKED: "blocked",
-            EmailEventType.ERROR: "error"
-        }
+        self._apply_status_event(email_status, event_type, reason, event_timestamp)
 
-        new_status = status_mapping.get(event_type, email_status.current_status)
+    @staticmethod
+    def _apply_status_event(
+        email_status: EmailStatusModel,
+        event_type: str,
+        reason: Optional[str],
+        event_timestamp: datetime
+    ) -> bool:
+        """Apply one event to an email status; returns True if the status changed."""
+        new_status = STATUS_BY_EVENT.get(event_type, email_status.current_status)
 
         # Only update if this is a significant status change
         should_update = (
@@ -214,25 +341,46 @@ class BrevoWebhookService:
             event_timestamp >= email_status.last_updated
         )
 
-        if should_update:
-            email_status.current_status = new_status
-            email_status.last_updated = event_timestamp
+        if not should_update:
+            return False
 
-            # Store bounce/error details
-            if event_type in [EmailEventType.BOUNCED, EmailEventType.ERROR]:
-                email_status.bounced_reason = reason
-                email_status.error_details = reason
+        old_status = email_status.current_status
+        email_status.current_status = new_status
+        email_status.last_updated = event_timestamp
+
+        # Store bounce/error details
+        if event_type in [EmailEventType.BOUNCED, EmailEventType.ERROR]:
+            email_status.bounced_reason = reason
+            email_status.error_details = reason
+
+        logger.info(
+            f"Updated email status: {email_status.email_address} -> {new_status}",
+            extra={
+                "event": "status_updated",
+                "email": email_status.email_address,
+                "message_id": email_status.message_id,
+                "old_status": old_status,
+                "new_status": new_status
+            }
+        )
+        return True
 
-            logger.info(
-                f"Updated email status: {email_address} -> {new_status}",
-                extra={
-                    "event": "status_updated",
-                    "email": email_address,
-                    "message_id": message_id,
-                    "old_status": email_status.current_status,
-                    "new_status": new_status
-                }
-            )
+    @staticmethod
+    def _apply_email_log_event(email_log: EmailLog, payload: Dict[str, Any], event_timestamp: datetime) -> bool:
+        """Apply one event to the EmailLog of the message; returns True if it was updated."""
+        new_status = EMAIL_LOG_STATUS_BY_EVENT.get(payload.get("event"))
+        if new_status is None:
+            return False
+
+        email_log.status = new_status
+        timestamp_column = EMAIL_LOG_TIMESTAMP_BY_STATUS.get(new_status)
+        if timestamp_column:
+            setattr(email_log, timestamp_column, event_timestamp)
+
+        additional_data = json.loads(email_log.additional_data) if email_log.additional_data else {}
+        additional_data.update(payload)
+        email_log.additional_data = json.dumps(additional_data)
+        return True
 
     def get_email_status(self, email_address: str, message_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
@@ -295,4 +443,186 @@ class BrevoWebhookService:
                 "processed": event.processed
             }
             for event in events
-        ]
\ No newline at end of file
+        ]
+
+class EmailEventQueue:
+    """Redis list of webhook payloads waiting to be applied."""
+
+    QUEUE_KEY = "email_events:queue"
+    DEAD_LETTER_KEY = "email_events:dead"
+    LOCK_KEY = "email_events:consumer_lock"
+
+    def __init__(self, redis_factory: Callable[[], Any] = get_redis):
+        self.redis_factory = redis_factory
+
+    def push(self, payload: Dict[str, Any]) -> None:
+        self.redis_factory().rpush(self.QUEUE_KEY, json.dumps(payload))
+
+    def peek(self, count: int) -> List[str]:
+        return self.redis_factory().lrange(self.QUEUE_KEY, 0, count - 1)
+
+    def acknowledge(self, count: int) -> None:
+        """Remove the ``count`` oldest entries once they have been applied."""
+        self.redis_factory().ltrim(self.QUEUE_KEY, count, -1)
+
+    def dead_letter(self, items: Iterable[str]) -> None:
+        items = list(items)
+        if items:
+            self.redis_factory().rpush(self.DEAD_LETTER_KEY, *items)
+
+    def length(self) -> int:
+        return self.redis_factory().llen(self.QUEUE_KEY)
+
+    def acquire_lock(self, token: str, ttl_seconds: int) -> bool:
+        return bool(self.redis_factory().set(self.LOCK_KEY, token, nx=True, ex=ttl_seconds))
+
+    def release_lock(self, token: str) -> None:
+        client = self.redis_factory()
+        if client.get(self.LOCK_KEY) == token:
+            client.delete(self.LOCK_KEY)
+
+
+def enqueue_webhook_event(db: Session, payload: Dict[str, Any], queue: Optional[EmailEventQueue] = None) -> bool:
+    """
+    Queue a verified webhook payload for the worker.
+
+    Falls back to synchronous processing when Redis is unavailable, so that
+    no event is lost. Returns True if the event was queued.
+    """
+    try:
+        (queue or EmailEventQueue()).push(payload)
+        return True
+    except Exception as e:
+        logger.warning(f"Email event queue unavailable, processing webhook inline: {e}")
+        BrevoWebhookService(db).process_webhook_event(payload)
+        return False
+
+
+class EmailEventWorker:
+    """Background worker applying queued webhook events in batches."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        queue: Optional[EmailEventQueue] = None,
+        batch_size: Optional[int] = None,
+        poll_interval_seconds: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.queue = queue or EmailEventQueue()
+        self.batch_size = max(batch_size or settings.EMAIL_EVENTS_BATCH_SIZE, 1)
+        self.poll_interval_seconds = poll_interval_seconds or settings.EMAIL_EVENTS_POLL_INTERVAL_SECONDS
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start the worker loop."""
+        if self.running:
+            logger.warning("Email event worker already running")
+            return
+        self.running = True
+        self._task = asyncio.create_task(self.run_loop())
+        logger.info("Email event worker started")
+
+    async def stop(self):
+        """Stop the worker and apply what is already queued."""
+        if not self.running:
+            return
+        self.running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        try:
+            await asyncio.to_thread(self.process_batch)
+        except Exception as e:
+            logger.error(f"Email event worker final batch failed: {e}")
+        logger.info("Email event worker stopped")
+
+    async def run_loop(self):
+        while self.running:
+            try:
+                processed = await asyncio.to_thread(self.process_batch)
+            except Exception as e:
+                logger.error(f"Email event cycle failed: {e}", exc_info=True)
+                processed = 0
+
+            if processed >= self.batch_size:
+                continue  # Backlog: keep draining without waiting
+            # Waiting between cycles lets the events of a burst coalesce
+            await asyncio.sleep(self.poll_interval_seconds)
+
+    def process_batch(self) -> int:
+        """
+        Apply the oldest queued events. Returns the number of queue entries handled.
+
+        A lock keeps a single consumer across API processes. Entries leave the
+        queue only once applied: a crash before that replays them.
+        """
+        token = uuid.uuid4().hex
+        if not self.queue.acquire_lock(token, ttl_seconds=max(int(self.poll_interval_seconds * 10), 60)):
+            return 0
+        try:
+            raw_items = self.queue.peek(self.batch_size)
+            if not raw_items:
+                return 0
+
+            payloads, malformed = [], []
+            for raw in raw_items:
+                try:
+                    payloads.append(json.loads(raw))
+                except json.JSONDecodeError:
+                    malformed.append(raw)
+            if malformed:
+                logger.error(f"Dropping {len(malformed)} malformed queued webhook events")
+                self.queue.dead_letter(malformed)
+
+            try:
+                self._apply(payloads)
+            except OperationalError:
+                # Database unreachable: the events stay queued for the next cycle
+                raise
+            except Exception as e:
+                # One bad event must not block the queue: isolate it
+                logger.error(f"Email event batch failed ({e}), applying events one by one")
+                self.queue.dead_letter(json.dumps(payload) for payload in self._apply_one_by_one(payloads))
+
+            self.queue.acknowledge(len(raw_items))
+            return len(raw_items)
+        finally:
+            self.queue.release_lock(token)
+
+    def _apply(self, payloads: List[Dict[str, Any]]) -> None:
+        db = self.session_factory()
+        try:
+            BrevoWebhookService(db).process_webhook_events(payloads)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _apply_one_by_one(self, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply each event in its own transaction; returns the events that still fail."""
+        failed = []
+        for payload in payloads:
+            db = self.session_factory()
+            try:
+                BrevoWebhookService(db).process_webhook_event(payload)
+            except HTTPException:
+                failed.append(payload)
+            finally:
+                db.close()
+        return failed
+
+
+# Global worker instance
+email_event_worker = EmailEventWorker()
+
+
+def get_email_event_worker() -> EmailEventWorker:
+    """Get the global email event worker."""
+    return email_event_worker
@@ -3,13 +3,15 @@
 from __future__ import annotations
 
 import csv
+import io
+import zipfile
 from dataclasses import dataclass
-from datetime import date, datetime, time, timedelta
+from datetime import date, datetime, time, timedelta, timezone
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
 from uuid import UUID as UUIDType
 
-from sqlalchemy import func
+from sqlalchemy import DateTime, Float, case, cast, func, literal, null, select, union_all
 from sqlalchemy.orm import Session, joinedload
 
 from recyclic_api.core.config import settings
@@ -100,22 +102,6 @@ def _normalize_datetime(value: date | datetime, end_of_day: bool = False) -> dat
     return datetime.combine(value, boundary_time)
 
 
-def _category_from_deposit(category: Optional[EEECategory], fallback: Optional[EEECategory]) -> Optional[str]:
-    resolved = category or fallback
-    if not resolved:
-        return None
-    mapping = _deposit_category_map()
-    return mapping.get(resolved.value)
-
-
-def _deposit_category_map() -> Dict[str, str]:
-    mapping: Dict[str, str] = {}
-    for eco_category in ECOLOGIC_CATEGORIES:
-        for deposit_category in eco_category.deposit_categories:
-            mapping[deposit_category.value] = eco_category.code
-    return mapping
-
-
 def _initialize_export_totals() -> Dict[str, Dict[str, float]]:
     totals: Dict[str, Dict[str, float]] = {}
     for eco_category in ECOLOGIC_CATEGORIES:
@@ -128,99 +114,286 @@ def _initialize_export_totals() -> Dict[str, Dict[str, float]]:
     return totals
 
 
-def generate_ecologic_csv(
-    db: Session,
-    date_from: date | datetime,
-    date_to: date | datetime,
-    export_dir: Optional[Path | str] = None,
-) -> Path:
-    """Generate the Ecologic CSV export for the given period."""
-    if date_to < date_from:
-        raise ValueError("date_to must be greater than or equal to date_from")
+# Granularités acceptées par la génération multi-périodes (valeurs de date_trunc)
+EXPORT_GRANULARITIES: Tuple[str, ...] = ("day", "week", "month", "quarter", "year")
 
-    start_dt = _normalize_datetime(date_from)
-    end_dt = _normalize_datetime(date_to, end_of_day=True)
+# Nombre de lignes agrégées lues par aller-retour avec la base
+EXPORT_FETCH_SIZE = 500
+
+_PERIOD_MONTHS = {"month": 1, "quarter": 3, "year": 12}
+
+
+@dataclass
+class EcologicBatchExport:
+    """Result of a multi-period export: one CSV per period, optionally zipped."""
+
+    files: List[Path]
+    archive_path: Optional[Path] = None
+
+
+def _to_utc_naive(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _truncate_period(value: datetime, granularity: str) -> datetime:
+    """Python counterpart of date_trunc() for the supported granularities."""
+    day = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    if granularity == "quarter":
+        return day.replace(month=3 * ((day.month - 1) // 3) + 1, day=1)
+    return day.replace(month=1, day=1)
+
+
+def _next_period(value: datetime, granularity: str) -> datetime:
+    if granularity == "day":
+        return value + timedelta(days=1)
+    if granularity == "week":
+        return value + timedelta(days=7)
+    months = value.month - 1 + _PERIOD_MONTHS[granularity]
+    return value.replace(year=value.year + months // 12, month=months % 12 + 1)
+
+
+def _split_periods(
+    start_dt: datetime,
+    end_dt: datetime,
+    granularity: Optional[str],
+) -> List[Tuple[Optional[datetime], datetime, datetime]]:
+    """Return (bucket, period_start, period_end) tuples covering [start_dt, end_dt]."""
+    if granularity is None:
+        return [(None, start_dt, end_dt)]
+
+    periods = []
+    bucket = _truncate_period(_to_utc_naive(start_dt), granularity)
+    last_bucket = _truncate_period(_to_utc_naive(end_dt), granularity)
+    while bucket <= last_bucket:
+        next_bucket = _next_period(bucket, granularity)
+        period_start = max(_to_utc_naive(start_dt), bucket)
+        period_end = min(_to_utc_naive(end_dt), next_bucket - timedelta(microseconds=1))
+        periods.append((bucket, period_start, period_end))
+        bucket = next_bucket
+    return periods
+
+
+def _deposit_code_expression():
+    """Resolve the Ecologic code of a deposit in SQL (category, then AI category)."""
+    resolved = func.coalesce(Deposit.category, Deposit.eee_category)
+    return case(
+        *[
+            (resolved.in_(eco_category.deposit_categories), eco_category.code)
+            for eco_category in ECOLOGIC_CATEGORIES
+        ],
+        else_="EEE-8",  # Fallback bucket for unmapped categories
+    )
+
+
+def _ecologic_aggregate_query(start_dt: datetime, end_dt: datetime, granularity: Optional[str]):
+    """Single query aggregating deposits and sales per period and Ecologic code."""
 
-    totals = _initialize_export_totals()
-    category_labels = {cat.code: cat.label for cat in ECOLOGIC_CATEGORIES}
+    def _bucket(column):
+        if granularity is None:
+            return cast(null(), DateTime)
+        # Périodes calculées en UTC pour correspondre à _split_periods
+        return func.date_trunc(granularity, func.timezone("UTC", column))
 
-    # Aggregate deposits
-    deposit_query = (
-        db.query(
-            Deposit.category,
-            Deposit.eee_category,
-            func.count(Deposit.id),
-            func.coalesce(func.sum(Deposit.weight), 0.0),
+    # Projection limitée aux colonnes utiles, regroupement dans la requête externe
+    deposits = (
+        select(
+            _bucket(Deposit.created_at).label("bucket"),
+            _deposit_code_expression().label("code"),
+            Deposit.weight.label("weight"),
         )
-        .filter(
+        .where(
             Deposit.created_at >= start_dt,
             Deposit.created_at <= end_dt,
             Deposit.status.in_(ELIGIBLE_DEPOSIT_STATUSES),
         )
-        .group_by(Deposit.category, Deposit.eee_category)
+        .subquery()
     )
-
-    for category, eee_category, count, total_weight in deposit_query.all():
-        code = _category_from_deposit(category, eee_category)
-        if not code:
-            code = "EEE-8"  # Fallback bucket for unmapped categories
-        totals[code]["deposit_count"] += int(count or 0)
-        totals[code]["deposit_weight_kg"] += float(total_weight or 0.0)
-
-    # Aggregate sales
-    sale_query = (
-        db.query(
-            SaleItem.category,
-            func.coalesce(func.sum(SaleItem.quantity), 0),
-            func.coalesce(func.sum(SaleItem.total_price), 0.0),
+    sales = (
+        select(
+            _bucket(Sale.created_at).label("bucket"),
+            func.trim(SaleItem.category).label("code"),
+            SaleItem.quantity.label("quantity"),
+            SaleItem.total_price.label("amount"),
         )
         .join(Sale, SaleItem.sale_id == Sale.id)
-        .filter(
+        .where(
             Sale.created_at >= start_dt,
             Sale.created_at <= end_dt,
         )
-        .group_by(SaleItem.category)
+        .subquery()
     )
 
-    for category, quantity, total_amount in sale_query.all():
-        code = str(category).strip() if category else None
-        if code not in totals:
-            # Treat unexpected categories as "EEE-8"
-            code = "EEE-8"
-        totals[code]["sales_quantity"] += int(quantity or 0)
-        totals[code]["sales_amount_eur"] += float(total_amount or 0.0)
+    deposit_totals = select(
+        deposits.c.bucket,
+        deposits.c.code,
+        func.count().label("deposit_count"),
+        func.coalesce(func.sum(deposits.c.weight), 0.0).label("deposit_weight_kg"),
+        literal(0).label("sales_quantity"),
+        cast(literal(0.0), Float).label("sales_amount_eur"),
+    ).group_by(deposits.c.bucket, deposits.c.code)
+    sale_totals = select(
+        sales.c.bucket,
+        sales.c.code,
+        literal(0).label("deposit_count"),
+        cast(literal(0.0), Float).label("deposit_weight_kg"),
+        func.coalesce(func.sum(sales.c.quantity), 0).label("sales_quantity"),
+        func.coalesce(func.sum(sales.c.amount), 0.0).label("sales_amount_eur"),
+    ).group_by(sales.c.bucket, sales.c.code)
+
+    combined = union_all(deposit_totals, sale_totals).subquery()
+    return select(combined).order_by(combined.c.bucket)
+
+
+def _add_aggregate_row(totals: Dict[str, Dict[str, float]], row) -> None:
+    code = str(row.code).strip() if row.code else None
+    if code not in totals:
+        # Treat unexpected categories as "EEE-8"
+        code = "EEE-8"
+    totals[code]["deposit_count"] += int(row.deposit_count or 0)
+    totals[code]["deposit_weight_kg"] += float(row.deposit_weight_kg or 0.0)
+    totals[code]["sales_quantity"] += int(row.sales_quantity or 0)
+    totals[code]["sales_amount_eur"] += float(row.sales_amount_eur or 0.0)
+
+
+def _iter_period_totals(
+    db: Session,
+    start_dt: datetime,
+    end_dt: datetime,
+    granularity: Optional[str] = None,
+) -> Iterator[Tuple[datetime, datetime, Dict[str, Dict[str, float]]]]:
+    """Yield (period_start, period_end, totals) in order, reading the aggregates in chunks."""
+    if granularity is not None and granularity not in EXPORT_GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(EXPORT_GRANULARITIES)}")
+
+    statement = _ecologic_aggregate_query(start_dt, end_dt, granularity)
+    rows = iter(db.execute(statement.execution_options(yield_per=EXPORT_FETCH_SIZE)))
+    pending = next(rows, None)
+
+    for bucket, period_start, period_end in _split_periods(start_dt, end_dt, granularity):
+        totals = _initialize_export_totals()
+        # Les lignes arrivent triées par période : consommer celles de la période courante
+        while pending is not None and (bucket is None or pending.bucket <= bucket):
+            if bucket is None or pending.bucket == bucket:
+                _add_aggregate_row(totals, pending)
+            pending = next(rows, None)
+        yield period_start, period_end, totals
+
+
+def _build_export_rows(
+    totals: Dict[str, Dict[str, float]],
+    period_start: datetime,
+    period_end: datetime,
+    generated_at: str,
+) -> List[Dict[str, float | int | str]]:
+    rows: List[Dict[str, float | int | str]] = []
+    for category in ECOLOGIC_CATEGORIES:
+        values = totals[category.code]
+        rows.append(
+            {
+                "category_code": category.code,
+                "category_label": category.label,
+                "deposit_count": values["deposit_count"],
+                "deposit_weight_kg": round(values["deposit_weight_kg"], 3),
+                "sales_quantity": values["sales_quantity"],
+                "sales_amount_eur": round(values["sales_amount_eur"], 2),
+                "period_start": period_start.date().isoformat(),
+                "period_end": period_end.date().isoformat(),
+                "generated_at": generated_at,
+            }
+        )
+    return rows
+
+
+def _write_export_rows(csvfile: IO[str], rows: Iterable[Dict[str, float | int | str]]) -> None:
+    writer = csv.DictWriter(csvfile, fieldnames=CSV_HEADERS)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def _export_filename(period_start: datetime, period_end: datetime, timestamp: str) -> str:
+    return f"ecologic_export_{period_start.strftime('%Y%m%d')}_{period_end.strftime('%Y%m%d')}_{timestamp}.csv"
+
+
+def _validate_period(date_from: date | datetime, date_to: date | datetime) -> Tuple[datetime, datetime]:
+    if date_to < date_from:
+        raise ValueError("date_to must be greater than or equal to date_from")
+    return _normalize_datetime(date_from), _normalize_datetime(date_to, end_of_day=True)
+
+
+def generate_ecologic_csv(
+    db: Session,
+    date_from: date | datetime,
+    date_to: date | datetime,
+    export_dir: Optional[Path | str] = None,
+) -> Path:
+    """Generate the Ecologic CSV export for the given period."""
+    start_dt, end_dt = _validate_period(date_from, date_to)
 
     export_path = Path(export_dir) if export_dir else Path(settings.ECOLOGIC_EXPORT_DIR)
     export_path.mkdir(parents=True, exist_ok=True)
 
     timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-    filename = f"ecologic_export_{start_dt.strftime('%Y%m%d')}_{end_dt.strftime('%Y%m%d')}_{timestamp}.csv"
-    file_path = export_path / filename
-
+    file_path = export_path / _export_filename(start_dt, end_dt, timestamp)
     generated_at = datetime.utcnow().isoformat()
 
+    period_start, period_end, totals = next(_iter_period_totals(db, start_dt, end_dt))
     with file_path.open("w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=CSV_HEADERS)
-        writer.writeheader()
-        for category in ECOLOGIC_CATEGORIES:
-            values = totals[category.code]
-            writer.writerow(
-                {
-                    "category_code": category.code,
-                    "category_label": category_labels[category.code],
-                    "deposit_count": values["deposit_count"],
-                    "deposit_weight_kg": round(values["deposit_weight_kg"], 3),
-                    "sales_quantity": values["sales_quantity"],
-                    "sales_amount_eur": round(values["sales_amount_eur"], 2),
-                    "period_start": start_dt.date().isoformat(),
-                    "period_end": end_dt.date().isoformat(),
-                    "generated_at": generated_at,
-                }
-            )
+        _write_export_rows(csvfile, _build_export_rows(totals, period_start, period_end, generated_at))
 
     return file_path
 
 
+def generate_ecologic_csv_batch(
+    db: Session,
+    date_from: date | datetime,
+    date_to: date | datetime,
+    granularity: str = "month",
+    export_dir: Optional[Path | str] = None,
+    archive: bool = False,
+) -> EcologicBatchExport:
+    """Generate one Ecologic CSV per period (e.g. each month of a year) from a single query.
+
+    Each file is written as soon as its period has been read. With ``archive=True`` the
+    files are written directly into a single zip archive instead of the export directory.
+    """
+    start_dt, end_dt = _validate_period(date_from, date_to)
+
+    export_path = Path(export_dir) if export_dir else Path(settings.ECOLOGIC_EXPORT_DIR)
+    export_path.mkdir(parents=True, exist_ok=True)
+
+    timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    generated_at = datetime.utcnow().isoformat()
+    periods = _iter_period_totals(db, start_dt, end_dt, granularity)
+
+    if not archive:
+        files: List[Path] = []
+        for period_start, period_end, totals in periods:
+            file_path = export_path / _export_filename(period_start, period_end, timestamp)
+            with file_path.open("w", newline="", encoding="utf-8") as csvfile:
+                _write_export_rows(csvfile, _build_export_rows(totals, period_start, period_end, generated_at))
+            files.append(file_path)
+        return EcologicBatchExport(files=files)
+
+    archive_path = export_path / (
+        f"ecologic_export_{start_dt.strftime('%Y%m%d')}_{end_dt.strftime('%Y%m%d')}_{granularity}_{timestamp}.zip"
+    )
+    names: List[Path] = []
+    with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_DEFLATED) as zip_file:
+        for period_start, period_end, totals in periods:
+            name = _export_filename(period_start, period_end, timestamp)
+            with zip_file.open(name, "w") as member, io.TextIOWrapper(member, encoding="utf-8", newline="") as csvfile:
+                _write_export_rows(csvfile, _build_export_rows(totals, period_start, period_end, generated_at))
+            names.append(Path(name))
+    return EcologicBatchExport(files=names, archive_path=archive_path)
+
 
 def _enforce_report_retention(report_root: Path) -> None:
     """Delete reports older than the configured retention window."""
@@ -469,68 +642,6 @@ def preview_ecologic_export(
     start_dt = _normalize_datetime(date_from)
     end_dt = _normalize_datetime(date_to, end_of_day=True)
 
-    # Reuse the core aggregation but accumulate results without file IO
-    totals = _initialize_export_totals()
-    category_labels = {cat.code: cat.label for cat in ECOLOGIC_CATEGORIES}
-
-    deposit_query = (
-        db.query(
-            Deposit.category,
-            Deposit.eee_category,
-            func.count(Deposit.id),
-            func.coalesce(func.sum(Deposit.weight), 0.0),
-        )
-        .filter(
-            Deposit.created_at >= start_dt,
-            Deposit.created_at <= end_dt,
-            Deposit.status.in_(ELIGIBLE_DEPOSIT_STATUSES),
-        )
-        .group_by(Deposit.category, Deposit.eee_category)
-    )
-
-    for category, eee_category, count, total_weight in deposit_query.all():
-        code = _category_from_deposit(category, eee_category) or "EEE-8"
-        totals[code]["deposit_count"] += int(count or 0)
-        totals[code]["deposit_weight_kg"] += float(total_weight or 0.0)
-
-    sale_query = (
-        db.query(
-            SaleItem.category,
-            func.coalesce(func.sum(SaleItem.quantity), 0),
-            func.coalesce(func.sum(SaleItem.total_price), 0.0),
-        )
-        .join(Sale, SaleItem.sale_id == Sale.id)
-        .filter(
-            Sale.created_at >= start_dt,
-            Sale.created_at <= end_dt,
-        )
-        .group_by(SaleItem.category)
-    )
-
-    for category, quantity, total_amount in sale_query.all():
-        code = str(category).strip() if category else None
-        if code not in totals:
-            code = "EEE-8"
-        totals[code]["sales_quantity"] += int(quantity or 0)
-        totals[code]["sales_amount_eur"] += float(total_amount or 0.0)
-
-    generated_at = datetime.utcnow().isoformat()
-
-    preview_rows: List[Dict[str, float | int | str]] = []
-    for category in ECOLOGIC_CATEGORIES:
-        values = totals[category.code]
-        preview_rows.append(
-            {
-                "category_code": category.code,
-                "category_label": category_labels[category.code],
-                "deposit_count": values["deposit_count"],
-                "deposit_weight_kg": round(values["deposit_weight_kg"], 3),
-                "sales_quantity": values["sales_quantity"],
-                "sales_amount_eur": round(values["sales_amount_eur"], 2),
-                "period_start": start_dt.date().isoformat(),
-                "period_end": end_dt.date().isoformat(),
-                "generated_at": generated_at,
-            }
-        )
-
-    return preview_rows
+    # Same engine as the file exports, without file IO
+    period_start, period_end, totals = next(_iter_period_totals(db, start_dt, end_dt))
+    return _build_export_rows(totals, period_start, period_end, datetime.utcnow().isoformat())
@@ -0,0 +1,154 @@
+"""
+Maintenance des tables partitionnées par mois (audit_logs, login_history).
+
+Chaque partition couvre un mois calendaire (UTC) et se nomme
+``<table>_pAAAAMM``. La maintenance crée les partitions des prochains mois
+avant qu'elles ne soient nécessaires, et détache les partitions sorties de la
+période de rétention : elles sont déplacées dans un schéma d'archive au lieu
+d'être vidées par un DELETE massif.
+
+Les tables créées par ``Base.metadata.create_all`` (tests, développement) ne
+sont pas partitionnées : elles sont ignorées.
+"""
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from recyclic_api.core.config import settings
+from recyclic_api.core.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+PARTITION_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+@dataclass(frozen=True)
+class PartitionedTable:
+    table: str
+    column: str
+    retention_months: int  # 0 = aucune partition détachée
+
+
+def partitioned_tables() -> List[PartitionedTable]:
+    return [
+        PartitionedTable("audit_logs", "timestamp", settings.AUDIT_LOGS_RETENTION_MONTHS),
+        PartitionedTable("login_history", "created_at", settings.LOGIN_HISTORY_RETENTION_MONTHS),
+    ]
+
+
+def month_start(moment: datetime) -> datetime:
+    moment = moment.astimezone(timezone.utc) if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month.year:04d}{month.month:02d}"
+
+
+def is_partitioned(db: Session, table: str) -> bool:
+    return db.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+        {"table": table},
+    ).first() is not None
+
+
+def list_monthly_partitions(db: Session, table: str) -> Dict[str, datetime]:
+    """Partitions mensuelles attachées (nom -> premier jour du mois), hors partition par défaut."""
+    rows = db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ),
+        {"table": table},
+    ).scalars()
+    partitions = {}
+    for name in rows:
+        match = PARTITION_SUFFIX.search(name)
+        if match and name == f"{table}{match.group(0)}":
+            partitions[name] = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+    return partitions
+
+
+def create_partition(db: Session, spec: PartitionedTable, month: datetime) -> str:
+    name = partition_name(spec.table, month)
+    db.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {spec.table} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    ))
+    return name
+
+
+def ensure_future_partitions(db: Session, spec: PartitionedTable, now: datetime,
+                             months_ahead: int) -> List[str]:
+    """Crée les partitions du mois courant et des ``months_ahead`` mois suivants."""
+    existing = list_monthly_partitions(db, spec.table)
+    current = month_start(now)
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if partition_name(spec.table, month) not in existing:
+            created.append(create_partition(db, spec, month))
+    return created
+
+
+def detach_expired_partitions(db: Session, spec: PartitionedTable, now: datetime,
+                              archive_schema: str) -> List[str]:
+    """
+    Détache les partitions entièrement antérieures à la période de rétention et
+    les déplace dans ``archive_schema`` (opération sur le catalogue, sans DELETE).
+    """
+    if spec.retention_months <= 0:
+        return []
+    oldest_kept = add_months(month_start(now), -spec.retention_months)
+    detached = []
+    for name, month in sorted(list_monthly_partitions(db, spec.table).items(), key=lambda item: item[1]):
+        if add_months(month, 1) > oldest_kept:
+            continue
+        db.execute(text(f"ALTER TABLE {spec.table} DETACH PARTITION {name}"))
+        db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}"))
+        db.execute(text(f"ALTER TABLE {name} SET SCHEMA {archive_schema}"))
+        detached.append(f"{archive_schema}.{name}")
+    return detached
+
+
+def run_partition_maintenance(
+    session_factory: Callable[[], Session] = SessionLocal,
+    now: Optional[datetime] = None,
+    tables: Optional[List[PartitionedTable]] = None,
+) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Crée les partitions à venir et archive les partitions expirées de chaque table.
+
+    Chaque table est traitée dans sa propre transaction : un échec n'empêche pas
+    la maintenance des autres. Retourne, par table, les partitions créées et détachées.
+    """
+    now = now or datetime.now(timezone.utc)
+    report: Dict[str, Dict[str, List[str]]] = {}
+    for spec in tables if tables is not None else partitioned_tables():
+        db = session_factory()
+        try:
+            if not is_partitioned(db, spec.table):
+                logger.debug(f"Table {spec.table} non partitionnée, maintenance ignorée")
+                continue
+            created = ensure_future_partitions(db, spec, now, settings.PARTITION_PREMAKE_MONTHS)
+            detached = detach_expired_partitions(db, spec, now, settings.PARTITION_ARCHIVE_SCHEMA)
+            db.commit()
+            report[spec.table] = {"created": created, "detached": detached}
+            if created or detached:
+                logger.info(f"Partitions de {spec.table}: créées {created}, détachées {detached}")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Maintenance des partitions de {spec.table} impossible: {e}")
+        finally:
+            db.close()
+    return report
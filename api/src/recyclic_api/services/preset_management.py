@@ -14,6 +14,7 @@ from ..schemas.preset_button import (
     PresetButtonWithCategory
 )
 from .category_service import CategoryService
+from ..utils.response_cache import invalidate_response_cache
 
 
 class PresetManagementService:
@@ -49,6 +50,7 @@ class PresetManagementService:
         try:
             self.db.commit()
             self.db.refresh(new_preset)
+            invalidate_response_cache("presets")
         except IntegrityError:
             self.db.rollback()
             raise HTTPException(status_code=400, detail="Failed to create preset button")
@@ -149,6 +151,7 @@ class PresetManagementService:
             try:
                 self.db.commit()
                 self.db.refresh(preset)
+                invalidate_response_cache("presets")
             except IntegrityError:
                 self.db.rollback()
                 raise HTTPException(status_code=400, detail="Failed to update preset button")
@@ -172,6 +175,7 @@ class PresetManagementService:
         preset.is_active = False
         self.db.commit()
         self.db.refresh(preset)
+        invalidate_response_cache("presets")
 
         return True
 
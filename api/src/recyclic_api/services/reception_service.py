@@ -5,7 +5,7 @@ from uuid import UUID
 from decimal import Decimal
 from datetime import date
 
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy import func, desc, and_
 from fastapi import HTTPException, status
 
@@ -16,6 +16,7 @@ from recyclic_api.models import (
     TicketDepotStatus,
     LigneDepot,
     Destination as DBLigneDestination,
+    User,
 )
 from recyclic_api.repositories.reception import (
     PosteReceptionRepository,
@@ -26,6 +27,11 @@ from recyclic_api.repositories.reception import (
 )
 
 
+def _to_poids(poids_kg: float) -> Decimal:
+    """Poids à la précision stockée en base (Numeric(8, 3))."""
+    return Decimal(str(poids_kg)).quantize(Decimal("0.001"))
+
+
 class ReceptionService:
     """Service métier pour la gestion des postes de réception et des tickets."""
 
@@ -123,6 +129,7 @@ class ReceptionService:
             destination=dest_value,
             notes=notes,
         )
+        self.ticket_repo.add_to_totals(ticket.id, lignes=1, poids_kg=_to_poids(poids_kg))
         return self.ligne_repo.add(ligne)
 
     def update_ligne(
@@ -152,6 +159,9 @@ class ReceptionService:
         if poids_kg is not None:
             if poids_kg <= 0:
                 raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="poids_kg doit être > 0")
+            new_poids = _to_poids(poids_kg)
+            if new_poids != ligne.poids_kg:
+                self.ticket_repo.add_to_totals(ticket.id, poids_kg=new_poids - ligne.poids_kg)
             ligne.poids_kg = poids_kg
 
         if destination is not None:
@@ -170,18 +180,20 @@ class ReceptionService:
         assert ticket is not None
         if ticket.status != TicketDepotStatus.OPENED.value:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Ticket fermé")
+        self.ticket_repo.add_to_totals(ticket.id, lignes=-1, poids_kg=-ligne.poids_kg)
         self.ligne_repo.delete(ligne)
 
+    def recompute_ticket_totals(self, ticket_id: Optional[UUID] = None) -> None:
+        """Recalculer les totaux d'un ticket (ou de tous) dont les lignes ont été écrites hors du service (import, reprise)."""
+        self.ticket_repo.recompute_totals(ticket_id)
+        self.db.commit()
+
     # Méthodes pour l'historique des tickets
     def get_tickets_list(self, page: int = 1, per_page: int = 10, status: Optional[str] = None) -> Tuple[List[TicketDepot], int]:
         """Récupérer la liste paginée des tickets avec leurs informations de base."""
         offset = (page - 1) * per_page
         
-        # Requête avec eager loading pour éviter les N+1 queries
-        query = self.db.query(TicketDepot).options(
-            selectinload(TicketDepot.benevole),
-            selectinload(TicketDepot.lignes)
-        ).order_by(desc(TicketDepot.created_at))
+        query = self.db.query(TicketDepot)
         
         # Appliquer le filtre par statut si fourni
         if status:
@@ -190,8 +202,15 @@ class ReceptionService:
         # Compter le total
         total = query.count()
         
-        # Récupérer les tickets paginés
-        tickets = query.offset(offset).limit(per_page).all()
+        # Récupérer les tickets paginés : les totaux sont stockés sur le ticket,
+        # une seule requête (jointure sur le bénévole) sans charger les lignes
+        tickets = (
+            query.options(joinedload(TicketDepot.benevole).load_only(User.username))
+            .order_by(desc(TicketDepot.created_at))
+            .offset(offset)
+            .limit(per_page)
+            .all()
+        )
         
         return tickets, total
 
@@ -203,10 +222,8 @@ class ReceptionService:
         ).filter(TicketDepot.id == ticket_id).first()
 
     def _calculate_ticket_totals(self, ticket: TicketDepot) -> Tuple[int, Decimal]:
-        """Calculer le nombre de lignes et le poids total d'un ticket."""
-        total_lignes = len(ticket.lignes)
-        total_poids = sum(ligne.poids_kg for ligne in ticket.lignes)
-        return total_lignes, total_poids
+        """Nombre de lignes et poids total d'un ticket (totaux stockés, sans charger les lignes)."""
+        return ticket.total_lignes or 0, ticket.total_poids_kg or Decimal("0")
 
     def get_lignes_depot_filtered(
         self,
@@ -5,15 +5,25 @@ Ce service gère l'exécution périodique des tâches de maintenance,
 de monitoring et de rapports automatiques.
 """
 
+import html
+import heapq
+import json
 import logging
 import asyncio
-from typing import Dict, List, Callable, Any, Optional
+import random
+import uuid
+from typing import Dict, List, Callable, Any, Optional, Set, Tuple
 from datetime import datetime, timedelta, timezone
 from contextlib import asynccontextmanager
 
 from recyclic_api.core.database import get_db
 from recyclic_api.core.database import SessionLocal
+from recyclic_api.core.config import settings
+from recyclic_api.core.redis import get_redis
+from recyclic_api.models.email_log import EmailType
+from recyclic_api.services.email_outbox_service import enqueue_email
 from recyclic_api.services.anomaly_detection_service import get_anomaly_detection_service
+from recyclic_api.services.partition_service import run_partition_maintenance
 from recyclic_api.models.cash_session import CashSession
 from recyclic_api.models.deposit import Deposit
 from recyclic_api.models.user import User
@@ -26,11 +36,21 @@ logger = logging.getLogger(__name__)
 class ScheduledTask:
     """Représente une tâche planifiée."""
 
-    def __init__(self, name: str, func: Callable, interval_minutes: int, enabled: bool = True):
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        interval_minutes: int,
+        enabled: bool = True,
+        timeout_seconds: Optional[float] = None,
+        jitter_seconds: float = 0.0,
+    ):
         self.name = name
         self.func = func
         self.interval_minutes = interval_minutes
         self.enabled = enabled
+        self.timeout_seconds = timeout_seconds
+        self.jitter_seconds = jitter_seconds
         self.last_run: Optional[datetime] = None
         self.next_run: Optional[datetime] = None
         self.running = False
@@ -46,13 +66,14 @@ class ScheduledTask:
         return datetime.now(timezone.utc) >= self.next_run
 
     def update_next_run(self):
-        """Met à jour la prochaine exécution."""
+        """Met à jour la prochaine exécution (avec un décalage aléatoire pour étaler la charge)."""
         now = datetime.now(timezone.utc)
         self.last_run = now
-        self.next_run = now + timedelta(minutes=self.interval_minutes)
+        jitter = random.uniform(0, self.jitter_seconds) if self.jitter_seconds > 0 else 0.0
+        self.next_run = now + timedelta(minutes=self.interval_minutes, seconds=jitter)
 
     async def execute(self, *args, **kwargs):
-        """Exécute la tâche."""
+        """Exécute la tâche (interrompue si elle dépasse timeout_seconds)."""
         if self.running:
             logger.warning(f"Tâche {self.name} déjà en cours d'exécution")
             return
@@ -61,13 +82,20 @@ class ScheduledTask:
             self.running = True
             logger.info(f"Démarrage de la tâche {self.name}")
 
-            result = await self.func(*args, **kwargs)
+            if self.timeout_seconds:
+                result = await asyncio.wait_for(self.func(*args, **kwargs), timeout=self.timeout_seconds)
+            else:
+                result = await self.func(*args, **kwargs)
 
             self.update_next_run()
             logger.info(f"Tâche {self.name} terminée avec succès")
 
             return result
 
+        except asyncio.TimeoutError:
+            logger.error(f"Tâche {self.name} interrompue après {self.timeout_seconds}s (délai dépassé)")
+            self.update_next_run()
+            raise
         except Exception as e:
             logger.error(f"Erreur lors de l'exécution de la tâche {self.name}: {e}")
             self.update_next_run()  # On planifie quand même la prochaine exécution
@@ -76,6 +104,42 @@ class ScheduledTask:
             self.running = False
 
 
+class SchedulerLeaderLock:
+    """
+    Verrou Redis d'élection de leader : un seul worker par déploiement exécute
+    les tâches planifiées. Le verrou expire seul si le leader disparaît.
+    """
+
+    # Ne prolonge / libère le verrou que s'il nous appartient toujours
+    _RENEW_SCRIPT = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('pexpire', KEYS[1], ARGV[2])
+    end
+    return 0
+    """
+    _RELEASE_SCRIPT = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, redis_client, key: str, ttl_seconds: int):
+        self.redis = redis_client
+        self.key = key
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self.owner_id = uuid.uuid4().hex
+
+    def acquire_or_renew(self) -> bool:
+        """Renouvelle le verrou s'il est à nous, sinon tente de l'acquérir."""
+        if self.redis.eval(self._RENEW_SCRIPT, 1, self.key, self.owner_id, self.ttl_ms):
+            return True
+        return bool(self.redis.set(self.key, self.owner_id, nx=True, px=self.ttl_ms))
+
+    def release(self) -> None:
+        self.redis.eval(self._RELEASE_SCRIPT, 1, self.key, self.owner_id)
+
+
 class SchedulerService:
     """
     Service de planification des tâches.
@@ -83,15 +147,48 @@ class SchedulerService:
     Gère l'exécution périodique des tâches de maintenance et de monitoring.
     """
 
-    def __init__(self):
+    STATE_KEY = "scheduler:state"
+    LEADER_KEY = "scheduler:leader"
+
+    def __init__(self, redis_client=None):
         self.tasks: Dict[str, ScheduledTask] = {}
         self.running = False
         self._task = None
-
-    def add_task(self, name: str, func: Callable, interval_minutes: int, enabled: bool = True):
+        self._redis = redis_client
+        self._leader_lock: Optional[SchedulerLeaderLock] = None
+        self.is_leader = False
+        # Tas (next_run, séquence, nom) : la boucle dort jusqu'à la prochaine échéance
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._heap_seq = 0
+        self._scheduled: Dict[str, datetime] = {}  # Échéance valide de chaque tâche dans le tas
+        self._inflight: Set[asyncio.Task] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    def add_task(
+        self,
+        name: str,
+        func: Callable,
+        interval_minutes: int,
+        enabled: bool = True,
+        timeout_seconds: Optional[float] = None,
+    ):
         """Ajoute une nouvelle tâche planifiée."""
-        task = ScheduledTask(name, func, interval_minutes, enabled)
+        task = ScheduledTask(
+            name,
+            func,
+            interval_minutes,
+            enabled,
+            timeout_seconds=timeout_seconds or settings.SCHEDULER_TASK_TIMEOUT_SECONDS,
+            jitter_seconds=settings.SCHEDULER_JITTER_SECONDS,
+        )
         self.tasks[name] = task
+        self._schedule(task)
         logger.info(f"Tâche ajoutée: {name} (interval: {interval_minutes} minutes)")
 
     async def run_anomaly_detection_task(self):
@@ -102,7 +199,7 @@ class SchedulerService:
         try:
             with SessionLocal() as db:
                 service = get_anomaly_detection_service(db)
-                anomalies = await service.run_anomaly_detection()
+                anomalies = await service.run_anomaly_detection(force_refresh=True)
 
                 # Envoyer les notifications si des anomalies sont détectées
                 await service.send_anomaly_notifications(anomalies)
@@ -135,6 +232,11 @@ class SchedulerService:
 
         return {"status": "completed", "timestamp": datetime.now(timezone.utc)}
 
+    async def run_partition_maintenance_task(self):
+        """Tâche de maintenance des partitions mensuelles (création à l'avance, archivage)."""
+        logger.info("Exécution de la maintenance des partitions")
+        return await asyncio.to_thread(run_partition_maintenance)
+
     async def run_weekly_reports_task(self):
         """Tâche de génération des rapports hebdomadaires."""
         logger.info("Exécution de la génération des rapports hebdomadaires")
@@ -260,15 +362,29 @@ et envoie des notifications en cas de problème.
         return report
 
     async def _send_weekly_report_email(self, report_text: str, start_date: datetime, end_date: datetime) -> bool:
-        """Envoie le rapport hebdomadaire par email."""
+        """Met le rapport hebdomadaire en file d'envoi (outbox email)."""
         try:
-            # TODO: Implémenter l'envoi d'email
-            # Pour l'instant, on logue le rapport
             logger.info("Rapport hebdomadaire généré:")
             logger.info(report_text)
 
-            # Ici on pourrait utiliser le service email existant
-            # Pour l'instant, on retourne True pour indiquer que le rapport a été généré
+            recipient = settings.WEEKLY_REPORT_RECIPIENT
+            if not recipient:
+                logger.info("WEEKLY_REPORT_RECIPIENT non configuré; rapport non envoyé par email")
+                return False
+
+            html_content = "<pre style=\"font-family: sans-serif; white-space: pre-wrap;\">{}</pre>".format(
+                html.escape(report_text)
+            )
+            # L'envoi Brevo est fait par le worker de l'outbox, pas dans la boucle du scheduler
+            with SessionLocal() as db:
+                enqueue_email(
+                    db,
+                    to_email=recipient,
+                    subject=f"Rapport hebdomadaire Recyclic - {start_date.strftime('%d/%m/%Y')} au {end_date.strftime('%d/%m/%Y')}",
+                    html_content=html_content,
+                    body_text=report_text,
+                    email_type=EmailType.ADMIN_NOTIFICATION,
+                )
             return True
 
         except Exception as e:
@@ -282,7 +398,8 @@ et envoie des notifications en cas de problème.
             name="anomaly_detection",
             func=self.run_anomaly_detection_task,
             interval_minutes=30,
-            enabled=True
+            enabled=True,
+            timeout_seconds=600
         )
 
         # Vérification de santé toutes les 5 minutes
@@ -290,7 +407,8 @@ et envoie des notifications en cas de problème.
             name="health_check",
             func=self.run_health_check_task,
             interval_minutes=5,
-            enabled=True
+            enabled=True,
+            timeout_seconds=60
         )
 
         # Nettoyage quotidien à 2h du matin
@@ -301,6 +419,15 @@ et envoie des notifications en cas de problème.
             enabled=True
         )
 
+        # Partitions mensuelles (audit_logs, login_history) une fois par jour
+        self.add_task(
+            name="partition_maintenance",
+            func=self.run_partition_maintenance_task,
+            interval_minutes=1440,  # 24h
+            enabled=True,
+            timeout_seconds=600
+        )
+
         # Rapports hebdomadaires tous les lundis à 8h
         self.add_task(
             name="weekly_reports",
@@ -309,25 +436,141 @@ et envoie des notifications en cas de problème.
             enabled=True
         )
 
+    def _schedule(self, task: ScheduledTask):
+        """Place la tâche dans le tas à sa prochaine échéance et réveille la boucle."""
+        if not task.enabled or task.running:
+            return
+        deadline = task.next_run or datetime.now(timezone.utc)
+        self._scheduled[task.name] = deadline
+        self._heap_seq += 1
+        heapq.heappush(self._heap, (deadline, self._heap_seq, task.name))
+        self._wake()
+
+    def _rebuild_heap(self):
+        self._heap = []
+        self._scheduled = {}
+        for task in self.tasks.values():
+            self._schedule(task)
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _pop_due_tasks(self, now: datetime) -> List[ScheduledTask]:
+        """Dépile les tâches échues ; les entrées périmées du tas sont ignorées."""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, name = heapq.heappop(self._heap)
+            if self._scheduled.get(name) != deadline:
+                continue  # Entrée remplacée par une planification plus récente
+            del self._scheduled[name]
+            task = self.tasks.get(name)
+            if task is None or not task.enabled or task.running:
+                continue
+            due.append(task)
+        return due
+
+    def _seconds_until_next_deadline(self, now: datetime) -> Optional[float]:
+        if not self._heap:
+            return None
+        return max((self._heap[0][0] - now).total_seconds(), 0.0)
+
+    async def _run_task(self, task: ScheduledTask):
+        try:
+            await task.execute()
+        except Exception as e:
+            logger.error(f"Erreur dans la tâche {task.name}: {e}")
+        finally:
+            await self._persist_task_state(task)
+            self._schedule(task)
+
+    async def _persist_task_state(self, task: ScheduledTask):
+        """Sauvegarde last_run/next_run dans Redis pour survivre aux redémarrages."""
+        state = {
+            "last_run": task.last_run.isoformat() if task.last_run else None,
+            "next_run": task.next_run.isoformat() if task.next_run else None,
+        }
+        try:
+            await asyncio.to_thread(self.redis.hset, self.STATE_KEY, task.name, json.dumps(state))
+        except Exception as e:
+            logger.warning(f"Impossible de sauvegarder l'état de la tâche {task.name}: {e}")
+
+    async def _restore_state(self):
+        """Recharge l'état persistant pour ne pas relancer toutes les tâches au démarrage."""
+        try:
+            stored = await asyncio.to_thread(self.redis.hgetall, self.STATE_KEY)
+        except Exception as e:
+            logger.warning(f"Impossible de charger l'état du scheduler: {e}")
+            return
+
+        for name, raw in (stored or {}).items():
+            task = self.tasks.get(name)
+            if task is None:
+                continue
+            try:
+                state = json.loads(raw)
+                if state.get("last_run"):
+                    task.last_run = datetime.fromisoformat(state["last_run"])
+                if state.get("next_run"):
+                    task.next_run = datetime.fromisoformat(state["next_run"])
+            except (ValueError, TypeError) as e:
+                logger.warning(f"État invalide pour la tâche {name}: {e}")
+
+    async def _refresh_leadership(self) -> bool:
+        """Acquiert ou renouvelle le verrou de leader (un seul worker exécute les tâches)."""
+        if not settings.SCHEDULER_LEADER_ELECTION:
+            return True
+
+        if self._leader_lock is None:
+            self._leader_lock = SchedulerLeaderLock(
+                self.redis, self.LEADER_KEY, settings.SCHEDULER_LEADER_LOCK_TTL_SECONDS
+            )
+        try:
+            leader = await asyncio.to_thread(self._leader_lock.acquire_or_renew)
+        except Exception as e:
+            # Sans Redis on ne peut pas garantir l'unicité : on n'exécute rien
+            logger.error(f"Élection du leader du scheduler impossible: {e}")
+            leader = False
+
+        if leader and not self.is_leader:
+            logger.info("Ce worker devient leader du scheduler")
+            await self._restore_state()
+            self._rebuild_heap()
+        elif not leader and self.is_leader:
+            logger.warning("Ce worker n'est plus leader du scheduler")
+        self.is_leader = leader
+        return leader
+
     async def run_scheduler_loop(self):
         """Boucle principale du scheduler."""
         logger.info("Démarrage du scheduler")
+        lock_renew_interval = max(settings.SCHEDULER_LEADER_LOCK_TTL_SECONDS / 3, 1.0)
 
         while self.running:
             try:
-                now = datetime.now(timezone.utc)
+                if not await self._refresh_leadership():
+                    await asyncio.sleep(lock_renew_interval)
+                    continue
 
-                # Exécuter les tâches qui doivent l'être
-                for task in self.tasks.values():
-                    if task.should_run():
-                        try:
-                            await task.execute()
-                        except Exception as e:
-                            logger.error(f"Erreur dans la tâche {task.name}: {e}")
+                now = datetime.now(timezone.utc)
 
-                # Attendre 1 minute avant la prochaine vérification
-                await asyncio.sleep(60)
+                # Lancer en parallèle les tâches échues : une tâche lente ne retarde pas les autres
+                for task in self._pop_due_tasks(now):
+                    running_task = asyncio.create_task(self._run_task(task))
+                    self._inflight.add(running_task)
+                    running_task.add_done_callback(self._inflight.discard)
+
+                # Dormir jusqu'à la prochaine échéance (ou au renouvellement du verrou)
+                delay = self._seconds_until_next_deadline(datetime.now(timezone.utc))
+                timeout = lock_renew_interval if delay is None else min(delay, lock_renew_interval)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
 
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Erreur dans la boucle du scheduler: {e}")
                 await asyncio.sleep(60)  # Attendre avant de réessayer
@@ -339,11 +582,13 @@ et envoie des notifications en cas de problème.
             return
 
         self.running = True
-        self._task = asyncio.create_task(self.run_scheduler_loop())
+        self._wakeup = asyncio.Event()
 
         # Configuration initiale des tâches
         self.setup_default_tasks()
 
+        self._task = asyncio.create_task(self.run_scheduler_loop())
+
         logger.info("Scheduler démarré avec succès")
 
     async def stop(self):
@@ -362,6 +607,18 @@ et envoie des notifications en cas de problème.
             except asyncio.CancelledError:
                 pass
 
+        for running_task in list(self._inflight):
+            running_task.cancel()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+        if self.is_leader and self._leader_lock is not None:
+            try:
+                await asyncio.to_thread(self._leader_lock.release)
+            except Exception as e:
+                logger.warning(f"Impossible de libérer le verrou du scheduler: {e}")
+        self.is_leader = False
+
         logger.info("Scheduler arrêté")
 
     def get_status(self) -> Dict[str, Any]:
@@ -374,11 +631,13 @@ et envoie des notifications en cas de problème.
                 'last_run': task.last_run.isoformat() if task.last_run else None,
                 'next_run': task.next_run.isoformat() if task.next_run else None,
                 'running': task.running,
-                'interval_minutes': task.interval_minutes
+                'interval_minutes': task.interval_minutes,
+                'timeout_seconds': task.timeout_seconds
             })
 
         return {
             'running': self.running,
+            'is_leader': self.is_leader,
             'tasks': tasks_status,
             'total_tasks': len(self.tasks)
         }
@@ -387,6 +646,7 @@ et envoie des notifications en cas de problème.
         """Active une tâche."""
         if name in self.tasks:
             self.tasks[name].enabled = True
+            self._schedule(self.tasks[name])
             logger.info(f"Tâche {name} activée")
 
     def disable_task(self, name: str):
@@ -7,6 +7,7 @@ from sqlalchemy.exc import IntegrityError
 
 from recyclic_api.models.setting import Setting
 from recyclic_api.schemas.setting import SessionSettingsResponse, SessionSettingsUpdate
+from recyclic_api.utils.response_cache import invalidate_response_cache
 
 
 class SessionSettingsService:
@@ -66,6 +67,7 @@ class SessionSettingsService:
         try:
             self.db.commit()
             self.db.refresh(setting)
+            invalidate_response_cache("settings")
         except IntegrityError as e:
             self.db.rollback()
             raise ValueError(f"Erreur lors de la sauvegarde: {str(e)}") from e
@@ -3,10 +3,15 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import json
 import logging
+import os
+import threading
 import time
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Any, Callable, Optional
+from typing import Any, Callable, NoReturn, Optional
 
 try:
     from webdav3.client import Client
@@ -30,6 +35,60 @@ class UploadFailedError(RuntimeError):
     """Raised when a file fails to upload after all retries."""
 
 
+MANIFEST_FILENAME = ".kdrive_manifest.json"
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class ManifestEntry:
+    """State of a local file as it was last pushed to kDrive."""
+
+    remote_path: str
+    size: int
+    mtime_ns: int
+    sha256: str
+
+
+class SyncManifest:
+    """Local record of uploaded files, used to only push new or changed exports."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.entries: dict[str, ManifestEntry] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> "SyncManifest":
+        manifest = cls(path)
+        if not path.exists():
+            return manifest
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            manifest.entries = {
+                relative: ManifestEntry(**entry) for relative, entry in raw.get("files", {}).items()
+            }
+        except (OSError, ValueError, TypeError) as exc:
+            # A corrupt manifest only costs a full re-upload; never block the sync on it.
+            logger.warning("Ignoring unreadable kDrive manifest %s: %s", path, exc)
+            manifest.entries = {}
+        return manifest
+
+    def save(self) -> None:
+        """Persist the manifest atomically (write to a temp file then rename)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": 1, "files": {key: asdict(entry) for key, entry in sorted(self.entries.items())}}
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+
+@dataclass
+class _PendingUpload:
+    local_path: Path
+    relative: str
+    remote_path: str
+    entry: ManifestEntry
+
+
 class KDriveSyncService:
     """Service responsible for pushing local exports to Infomaniak kDrive via WebDAV."""
 
@@ -38,11 +97,18 @@ class KDriveSyncService:
         client_factory: Optional[Callable[[], Client]] = None,
         max_retries: Optional[int] = None,
         retry_delay_seconds: Optional[float] = None,
+        max_workers: Optional[int] = None,
     ) -> None:
         self._client_factory = client_factory or self._default_client_factory
-        self._client: Optional[Client] = None
+        # WebDAV clients are not thread-safe: each upload worker gets its own.
+        self._local = threading.local()
         self.max_retries = max_retries or settings.KDRIVE_MAX_RETRIES
-        self.retry_delay_seconds = retry_delay_seconds or settings.KDRIVE_RETRY_DELAY_SECONDS
+        self.retry_delay_seconds = (
+            retry_delay_seconds if retry_delay_seconds is not None else settings.KDRIVE_RETRY_DELAY_SECONDS
+        )
+        self.max_workers = max(int(max_workers or settings.KDRIVE_SYNC_MAX_WORKERS), 1)
+        self._known_remote_dirs: set[str] = set()
+        self._remote_dirs_lock = threading.Lock()
 
     def _default_client_factory(self) -> Client:
         """Instantiate a WebDAV client using environment configuration."""
@@ -63,12 +129,28 @@ class KDriveSyncService:
         return client
 
     def _get_client(self) -> Client:
-        if self._client is None:
-            self._client = self._client_factory()
-        return self._client
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._client_factory()
+            self._local.client = client
+        return client
 
     def _reset_client(self) -> None:
-        self._client = None
+        self._local.client = None
+
+    def _upload_once(self, local_file: Path, remote_path: str) -> None:
+        """Single upload attempt; resets the worker's client and remote dir cache on failure."""
+        client = self._get_client()
+        try:
+            self._ensure_remote_directory(client, remote_path)
+            client.upload_sync(remote_path=remote_path, local_path=str(local_file))
+        except Exception:
+            self._reset_client()
+            self._forget_remote_directory(remote_path)
+            raise
+
+    def _backoff_delay(self, attempt: int) -> float:
+        return self.retry_delay_seconds * (2 ** (attempt - 1))
 
     def upload_file_to_kdrive(self, local_path: Path | str, remote_path: str) -> str:
         """Upload a single file to kDrive with retry logic."""
@@ -80,10 +162,47 @@ class KDriveSyncService:
         last_error: Exception | None = None
 
         for attempt in range(1, self.max_retries + 1):
-            client = self._get_client()
             try:
-                self._ensure_remote_directory(client, remote_path_normalized)
-                client.upload_sync(remote_path=remote_path_normalized, local_path=str(local_file))
+                self._upload_once(local_file, remote_path_normalized)
+                logger.info(
+                    "Uploaded %s to kDrive at %s (attempt %s/%s)",
+                    local_file,
+                    remote_path_normalized,
+                    attempt,
+                    self.max_retries,
+                )
+                return remote_path_normalized
+            except Exception as exc:  # noqa: BLE001 - log + retry policy is intentional
+                last_error = exc
+                logger.warning(
+                    "Upload attempt %s/%s failed for %s -> %s: %s",
+                    attempt,
+                    self.max_retries,
+                    local_file,
+                    remote_path_normalized,
+                    exc,
+                )
+                if attempt < self.max_retries:
+                    time.sleep(self._backoff_delay(attempt))
+
+        self._give_up(local_file, remote_path_normalized, last_error)
+
+    async def upload_file_to_kdrive_async(self, local_path: Path | str, remote_path: str) -> str:
+        """Async variant of :meth:`upload_file_to_kdrive` with non-blocking backoff.
+
+        The WebDAV call itself runs in a worker thread; waiting between retries
+        uses ``asyncio.sleep`` so the event loop and other uploads keep going.
+        """
+        local_file = Path(local_path)
+        if not local_file.exists() or not local_file.is_file():
+            raise FileNotFoundError(f"Local file '{local_file}' does not exist")
+
+        remote_path_normalized = self._normalize_remote_path(remote_path)
+        last_error: Exception | None = None
+
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                await asyncio.to_thread(self._upload_once, local_file, remote_path_normalized)
                 logger.info(
                     "Uploaded %s to kDrive at %s (attempt %s/%s)",
                     local_file,
@@ -102,10 +221,13 @@ class KDriveSyncService:
                     remote_path_normalized,
                     exc,
                 )
-                self._reset_client()
                 if attempt < self.max_retries:
-                    time.sleep(self.retry_delay_seconds)
+                    await asyncio.sleep(self._backoff_delay(attempt))
 
+        self._give_up(local_file, remote_path_normalized, last_error)
+
+    def _give_up(self, local_file: Path, remote_path_normalized: str, last_error: Exception | None) -> NoReturn:
+        """Log, notify admins and raise once every attempt has failed."""
         logger.error(
             "Giving up uploading %s -> %s after %s attempts: %s",
             local_file,
@@ -119,36 +241,159 @@ class KDriveSyncService:
         ) from last_error
 
     def sync_directory(self, local_directory: Path | str, remote_directory: str) -> list[Path]:
-        """Synchronise every file from a local folder to kDrive."""
+        """Synchronise new or changed files from a local folder to kDrive.
+
+        Blocking wrapper around :meth:`sync_directory_async`, meant to be called
+        from synchronous code (CLI, worker threads).
+        """
+        return asyncio.run(self.sync_directory_async(local_directory, remote_directory))
+
+    async def sync_directory_async(
+        self,
+        local_directory: Path | str,
+        remote_directory: str,
+        manifest_path: Path | str | None = None,
+    ) -> list[Path]:
+        """Incrementally synchronise a local folder to kDrive.
+
+        Files whose size/mtime (and, when those changed, content hash) match the
+        local manifest are skipped. The remaining ones are uploaded in parallel
+        with at most ``max_workers`` uploads in flight. Only successful uploads
+        are recorded, so failed files are retried on the next cycle.
+        """
         base_dir = Path(local_directory)
         base_dir.mkdir(parents=True, exist_ok=True)
+        manifest_file = Path(
+            manifest_path or settings.KDRIVE_SYNC_MANIFEST_PATH or base_dir / MANIFEST_FILENAME
+        )
+
+        manifest = await asyncio.to_thread(SyncManifest.load, manifest_file)
+        pending = await asyncio.to_thread(
+            self._plan_sync, base_dir, remote_directory, manifest, manifest_file
+        )
+        if not pending:
+            logger.debug("kDrive sync: nothing to upload from %s", base_dir)
+            await asyncio.to_thread(manifest.save)
+            return []
+
+        # Remote directory existence is only trusted for the duration of one run.
+        with self._remote_dirs_lock:
+            self._known_remote_dirs.clear()
+
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def _push(item: _PendingUpload) -> Optional[Path]:
+            async with semaphore:
+                try:
+                    await self.upload_file_to_kdrive_async(item.local_path, item.remote_path)
+                except FileNotFoundError:
+                    logger.warning("Skipped missing file during sync: %s", item.local_path)
+                    return None
+                except UploadFailedError:
+                    # Already logged and notification dispatched; retried next cycle
+                    return None
+            manifest.entries[item.relative] = item.entry
+            return item.local_path
+
+        results = await asyncio.gather(*(_push(item) for item in pending))
+        await asyncio.to_thread(manifest.save)
+
+        uploaded = [path for path in results if path is not None]
+        logger.info(
+            "kDrive sync: %s/%s changed file(s) uploaded from %s",
+            len(uploaded),
+            len(pending),
+            base_dir,
+        )
+        return uploaded
+
+    def _plan_sync(
+        self,
+        base_dir: Path,
+        remote_directory: str,
+        manifest: SyncManifest,
+        manifest_file: Path,
+    ) -> list[_PendingUpload]:
+        """Return files that differ from the manifest; drops entries for deleted files."""
+        pending: list[_PendingUpload] = []
+        seen: set[str] = set()
+        excluded = {manifest_file.resolve(), manifest_file.with_name(manifest_file.name + ".tmp").resolve()}
 
-        uploaded: list[Path] = []
         for file_path in sorted(p for p in base_dir.rglob("*") if p.is_file()):
+            if file_path.resolve() in excluded:
+                continue
             relative = file_path.relative_to(base_dir).as_posix()
-            remote_path = f"{remote_directory.rstrip('/')}/{relative}" if relative else remote_directory.rstrip('/')
+            remote_path = self._normalize_remote_path(f"{remote_directory.rstrip('/')}/{relative}")
+            seen.add(relative)
+
             try:
-                self.upload_file_to_kdrive(file_path, remote_path)
-                uploaded.append(file_path)
+                stat = file_path.stat()
             except FileNotFoundError:
-                logger.warning("Skipped missing file during sync: %s", file_path)
-            except UploadFailedError:
-                # Already logged and notification dispatched; continue with next file
                 continue
 
-        return uploaded
+            previous = manifest.entries.get(relative)
+            if (
+                previous is not None
+                and previous.remote_path == remote_path
+                and previous.size == stat.st_size
+                and previous.mtime_ns == stat.st_mtime_ns
+            ):
+                continue
+
+            try:
+                digest = self._hash_file(file_path)
+            except FileNotFoundError:
+                continue
+            entry = ManifestEntry(
+                remote_path=remote_path,
+                size=stat.st_size,
+                mtime_ns=stat.st_mtime_ns,
+                sha256=digest,
+            )
+            if previous is not None and previous.remote_path == remote_path and previous.sha256 == digest:
+                # Touched but identical content: refresh metadata, skip the upload.
+                manifest.entries[relative] = entry
+                continue
+
+            pending.append(_PendingUpload(file_path, relative, remote_path, entry))
+
+        for relative in set(manifest.entries) - seen:
+            del manifest.entries[relative]
+
+        return pending
+
+    @staticmethod
+    def _hash_file(file_path: Path) -> str:
+        digest = hashlib.sha256()
+        with file_path.open("rb") as handle:
+            for chunk in iter(lambda: handle.read(_HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
 
     def _ensure_remote_directory(self, client: Client, remote_path: str) -> None:
         remote_dir = self._extract_remote_directory(remote_path)
         if not remote_dir:
             return
 
+        with self._remote_dirs_lock:
+            if remote_dir in self._known_remote_dirs:
+                return
+
         try:
             check_path = remote_dir.rstrip("/") + "/"
             if not client.check(check_path):
                 client.mkdir(remote_dir)
         except Exception as exc:  # noqa: BLE001 - best effort
             logger.debug("Failed to ensure remote directory %s: %s", remote_dir, exc)
+            return
+
+        with self._remote_dirs_lock:
+            self._known_remote_dirs.add(remote_dir)
+
+    def _forget_remote_directory(self, remote_path: str) -> None:
+        remote_dir = self._extract_remote_directory(remote_path)
+        with self._remote_dirs_lock:
+            self._known_remote_dirs.discard(remote_dir)
 
     @staticmethod
     def _extract_remote_directory(remote_path: str) -> str:
@@ -236,7 +481,7 @@ async def run_periodic_exports_sync() -> None:
 
     while True:
         try:
-            await asyncio.to_thread(sync_service.sync_directory, local_dir, remote_dir)
+            await sync_service.sync_directory_async(local_dir, remote_dir)
         except Exception as exc:  # noqa: BLE001 - keep the loop alive while logging
             logger.exception("kDrive sync cycle failed: %s", exc)
         await asyncio.sleep(interval)
@@ -1,13 +1,15 @@
 """
 Email metrics collection system for monitoring and observability.
+
+Backed by the shared metrics registry: recording is O(1) and the figures
+cover every API worker.
 """
 import time
-from collections import defaultdict, deque
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
-from threading import Lock
 import logging
-import statistics
+
+from recyclic_api.utils.metrics_registry import MetricsRegistry, metrics_registry
 
 logger = logging.getLogger(__name__)
 
@@ -28,17 +30,24 @@ class EmailMetric:
 class EmailMetricsCollector:
     """Collects and manages email sending metrics."""
 
-    def __init__(self, max_history: int = 10000):
+    SENDS = "email_sends_total"
+    LATENCY = "email_send_duration_ms"
+
+    def __init__(self, registry: MetricsRegistry = metrics_registry):
         """
         Initialize the metrics collector.
 
         Args:
-            max_history: Maximum number of metrics to keep in memory
+            registry: Metrics registry holding the counters and histograms
         """
-        self.max_history = max_history
-        self._metrics_history: deque = deque(maxlen=max_history)
-        self._counters = defaultdict(int)
-        self._lock = Lock()
+        self.registry = registry
+        self._sends = registry.counter(
+            self.SENDS, "Email send attempts by provider, outcome and error type",
+            ("provider", "outcome", "error_type")
+        )
+        self._latency = registry.histogram(
+            self.LATENCY, "Email send time in milliseconds", ("provider",)
+        )
 
     def record_email_send(
         self,
@@ -73,16 +82,13 @@ class EmailMetricsCollector:
             error_detail=error_detail
         )
 
-        with self._lock:
-            self._metrics_history.append(metric)
-
-            # Update counters
-            if success:
-                self._counters[f"emails_sent_total_{provider}_success"] += 1
-                self._log_success(metric)
-            else:
-                self._counters[f"emails_failed_total_{provider}_{error_type or 'unknown'}"] += 1
-                self._log_error(metric)
+        if success:
+            self._sends.inc(provider=provider, outcome="success", error_type="")
+            self._log_success(metric)
+        else:
+            self._sends.inc(provider=provider, outcome="failure", error_type=error_type or "unknown")
+            self._log_error(metric)
+        self._latency.observe(elapsed_ms, provider=provider)
 
     def _log_success(self, metric: EmailMetric) -> None:
         """Log successful email send with structured logging."""
@@ -115,23 +121,31 @@ class EmailMetricsCollector:
 
     def get_metrics_summary(self, hours: int = 24) -> Dict[str, Any]:
         """
-        Get a summary of email metrics for the specified time period.
+        Get a summary of email metrics.
+
+        Figures cover the last ``hours`` clock hours, the current one included.
 
         Args:
-            hours: Number of hours to include in the summary
+            hours: Number of hours to include
 
         Returns:
             Dictionary containing metrics summary
         """
-        cutoff_time = time.time() - (hours * 3600)
-
-        with self._lock:
-            recent_metrics = [
-                m for m in self._metrics_history
-                if m.timestamp >= cutoff_time
-            ]
+        success_count = 0
+        failure_count = 0
+        error_breakdown: Dict[str, int] = {}
+        provider_breakdown: Dict[str, Dict[str, int]] = {}
+        for (provider, outcome, error_type), value in self._sends.values(hours).items():
+            stats = provider_breakdown.setdefault(provider, {"success": 0, "failure": 0})
+            stats[outcome] += int(value)
+            if outcome == "success":
+                success_count += int(value)
+            else:
+                failure_count += int(value)
+                error_breakdown[error_type] = error_breakdown.get(error_type, 0) + int(value)
 
-        if not recent_metrics:
+        total_emails = success_count + failure_count
+        if not total_emails:
             return {
                 "total_emails": 0,
                 "success_count": 0,
@@ -142,44 +156,19 @@ class EmailMetricsCollector:
                 "provider_breakdown": {}
             }
 
-        # Calculate basic stats
-        total_emails = len(recent_metrics)
-        success_count = sum(1 for m in recent_metrics if m.success)
-        failure_count = total_emails - success_count
-        success_rate = (success_count / total_emails) * 100 if total_emails > 0 else 0
-
-        # Calculate latency statistics
-        latencies = [m.elapsed_ms for m in recent_metrics]
-        latency_metrics = {
-            "min_ms": min(latencies) if latencies else 0,
-            "max_ms": max(latencies) if latencies else 0,
-            "avg_ms": statistics.mean(latencies) if latencies else 0,
-            "p50_ms": statistics.median(latencies) if latencies else 0,
-            "p95_ms": statistics.quantiles(latencies, n=20)[18] if len(latencies) >= 20 else (max(latencies) if latencies else 0)
-        }
-
-        # Error breakdown
-        error_breakdown = defaultdict(int)
-        for metric in recent_metrics:
-            if not metric.success:
-                error_breakdown[metric.error_type or "unknown"] += 1
-
-        # Provider breakdown
-        provider_breakdown = defaultdict(lambda: {"success": 0, "failure": 0})
-        for metric in recent_metrics:
-            if metric.success:
-                provider_breakdown[metric.provider]["success"] += 1
-            else:
-                provider_breakdown[metric.provider]["failure"] += 1
-
+        latency = self._latency.merged(hours)
         return {
             "total_emails": total_emails,
             "success_count": success_count,
             "failure_count": failure_count,
-            "success_rate_percent": round(success_rate, 2),
-            "latency_metrics": latency_metrics,
-            "error_breakdown": dict(error_breakdown),
-            "provider_breakdown": dict(provider_breakdown),
+            "success_rate_percent": round(success_count / total_emails * 100, 2),
+            "latency_metrics": {
+                "avg_ms": latency.mean,
+                "p50_ms": latency.quantile(0.5),
+                "p95_ms": latency.quantile(0.95),
+            },
+            "error_breakdown": error_breakdown,
+            "provider_breakdown": provider_breakdown,
             "time_period_hours": hours,
             "timestamp": time.time()
         }
@@ -191,34 +180,12 @@ class EmailMetricsCollector:
         Returns:
             List of metric strings in Prometheus format
         """
-        metrics = []
-
-        with self._lock:
-            # Add counter metrics
-            for counter_name, value in self._counters.items():
-                metrics.append(f"# TYPE {counter_name} counter")
-                metrics.append(f"{counter_name} {value}")
-
-        # Add current summary metrics
-        summary = self.get_metrics_summary(hours=1)  # Last hour
-
-        metrics.extend([
-            "# TYPE email_send_latency_ms histogram",
-            f"email_send_latency_ms_sum {summary['latency_metrics'].get('avg_ms', 0) * summary['total_emails']}",
-            f"email_send_latency_ms_count {summary['total_emails']}",
-
-            "# TYPE email_success_rate gauge",
-            f"email_success_rate {summary['success_rate_percent'] / 100}",
-        ])
-
-        return metrics
+        return self.registry.render_prometheus([self.SENDS, self.LATENCY])
 
     def reset_metrics(self) -> None:
         """Reset all metrics (useful for testing)."""
-        with self._lock:
-            self._metrics_history.clear()
-            self._counters.clear()
+        self.registry.reset([self.SENDS, self.LATENCY])
 
 
 # Global metrics collector instance
-email_metrics = EmailMetricsCollector()
\ No newline at end of file
+email_metrics = EmailMetricsCollector()
@@ -0,0 +1,417 @@
+"""
+Process-wide metrics registry with counters and fixed-bucket histograms.
+
+Recording is O(1) and stays in memory: a counter increments one slot, a
+histogram finds its bucket by bisection. Pending increments are flushed to a
+Redis hash (HINCRBYFLOAT) at most every METRICS_FLUSH_INTERVAL_SECONDS and
+before every read, so that the exposition covers every API worker, like the
+rate limiter counters (see rate_limit_metrics).
+
+Each increment is also added to a per-hour hash that expires after
+METRICS_WINDOW_RETENTION_HOURS: summaries over the last N hours sum the N most
+recent hourly hashes (the current, partial hour included), while /metrics keeps
+exposing the cumulative values.
+"""
+import json
+import logging
+import math
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from recyclic_api.core.config import settings
+from recyclic_api.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in milliseconds
+DEFAULT_LATENCY_BUCKETS_MS: Tuple[float, ...] = (
+    5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000,
+)
+
+LabelValues = Tuple[str, ...]
+# Redis hash field: (metric name, sample suffix, label values, bucket bound)
+SampleKey = Tuple[str, str, LabelValues, Optional[float]]
+
+SECONDS_PER_HOUR = 3600
+
+
+def _current_hour() -> int:
+    return int(time.time() // SECONDS_PER_HOUR)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+@dataclass
+class HistogramSnapshot:
+    """Aggregated state of one histogram series."""
+    bounds: Tuple[float, ...]
+    bucket_counts: List[float]  # Per bucket (not cumulative), last one is +Inf
+    sum: float
+    count: float
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile by linear interpolation inside its bucket
+        (same estimation as Prometheus' histogram_quantile).
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0.0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if index == len(self.bounds):
+                    # Beyond the last bound: the best estimate is that bound
+                    return float(self.bounds[-1])
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return float(self.bounds[-1])
+
+
+class _Metric:
+    """Base class of the registered metrics."""
+
+    kind = ""
+
+    def __init__(self, registry: "MetricsRegistry", name: str, documentation: str, labelnames: Sequence[str]):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _label_values(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple("" if labels[name] is None else str(labels[name]) for name in self.labelnames)
+
+
+class Counter(_Metric):
+    """Monotonic counter."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        self.registry._record([((self.name, "", self._label_values(labels), None), amount)])
+
+    def values(self, hours: Optional[int] = None) -> Dict[LabelValues, float]:
+        """
+        Aggregated value of every series, keyed by label values.
+
+        Args:
+            hours: Only count the last ``hours`` hours (cumulative when omitted)
+        """
+        return {
+            label_values: value
+            for (name, _, label_values, _), value in self.registry.collect(hours).items()
+            if name == self.name
+        }
+
+
+class Histogram(_Metric):
+    """Histogram with fixed bucket bounds."""
+
+    kind = "histogram"
+
+    def __init__(self, registry: "MetricsRegistry", name: str, documentation: str,
+                 labelnames: Sequence[str], buckets: Sequence[float]):
+        super().__init__(registry, name, documentation, labelnames)
+        self.bounds = tuple(sorted(float(bound) for bound in buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        label_values = self._label_values(labels)
+        index = bisect_left(self.bounds, value)
+        bound = self.bounds[index] if index < len(self.bounds) else math.inf
+        self.registry._record([
+            ((self.name, "bucket", label_values, bound), 1),
+            ((self.name, "sum", label_values, None), value),
+            ((self.name, "count", label_values, None), 1),
+        ])
+
+    def snapshots(self, hours: Optional[int] = None) -> Dict[LabelValues, HistogramSnapshot]:
+        """
+        Aggregated state of every series, keyed by label values.
+
+        Args:
+            hours: Only count the last ``hours`` hours (cumulative when omitted)
+        """
+        slots = {bound: index for index, bound in enumerate(self.bounds + (math.inf,))}
+        result: Dict[LabelValues, HistogramSnapshot] = {}
+        for (name, suffix, label_values, bound), value in self.registry.collect(hours).items():
+            if name != self.name:
+                continue
+            snapshot = result.get(label_values)
+            if snapshot is None:
+                snapshot = result[label_values] = HistogramSnapshot(
+                    bounds=self.bounds, bucket_counts=[0.0] * len(slots), sum=0.0, count=0.0
+                )
+            if suffix == "bucket" and bound in slots:
+                snapshot.bucket_counts[slots[bound]] += value
+            elif suffix == "sum":
+                snapshot.sum += value
+            elif suffix == "count":
+                snapshot.count += value
+        return result
+
+    def merged(self, hours: Optional[int] = None, **labels: Any) -> HistogramSnapshot:
+        """
+        Sum of the series matching the given labels (all series when none given).
+
+        Args:
+            hours: Only count the last ``hours`` hours (cumulative when omitted)
+        """
+        positions = {self.labelnames.index(name): str(value) for name, value in labels.items()}
+        merged = HistogramSnapshot(
+            bounds=self.bounds, bucket_counts=[0.0] * (len(self.bounds) + 1), sum=0.0, count=0.0
+        )
+        for label_values, snapshot in self.snapshots(hours).items():
+            if all(label_values[position] == value for position, value in positions.items()):
+                merged.bucket_counts = [a + b for a, b in zip(merged.bucket_counts, snapshot.bucket_counts)]
+                merged.sum += snapshot.sum
+                merged.count += snapshot.count
+        return merged
+
+
+class MetricsRegistry:
+    """Holds the metric definitions and the increments shared through Redis."""
+
+    def __init__(
+        self,
+        redis_factory: Callable[[], Any] = get_redis,
+        key: str = "metrics:registry",
+        flush_interval_seconds: Optional[float] = None,
+        window_retention_hours: Optional[int] = None,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            redis_factory: Callable returning the Redis client
+            key: Redis hash holding the aggregated samples of every worker
+            flush_interval_seconds: Maximum delay before local increments reach Redis
+                (defaults to METRICS_FLUSH_INTERVAL_SECONDS)
+            window_retention_hours: Lifetime of the hourly hashes
+                (defaults to METRICS_WINDOW_RETENTION_HOURS)
+        """
+        self.redis_factory = redis_factory
+        self.key = key
+        self.flush_interval_seconds = (
+            settings.METRICS_FLUSH_INTERVAL_SECONDS if flush_interval_seconds is None else flush_interval_seconds
+        )
+        self.window_retention_hours = (
+            settings.METRICS_WINDOW_RETENTION_HOURS if window_retention_hours is None else window_retention_hours
+        )
+        self._metrics: Dict[str, _Metric] = {}
+        self._pending: Dict[SampleKey, float] = defaultdict(float)
+        self._pending_hourly: Dict[Tuple[int, SampleKey], float] = defaultdict(float)
+        self._last_flush = time.monotonic()
+        self._lock = Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Register (or return the already registered) counter."""
+        return self._register(name, lambda: Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS_MS) -> Histogram:
+        """Register (or return the already registered) histogram."""
+        return self._register(name, lambda: Histogram(self, name, documentation, labelnames, buckets))
+
+    def _register(self, name: str, factory: Callable[[], _Metric]) -> Any:
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = factory()
+            return self._metrics[name]
+
+    def _hour_key(self, hour: int) -> str:
+        return f"{self.key}:hour:{hour}"
+
+    def _record(self, samples: Iterable[Tuple[SampleKey, float]]) -> None:
+        hour = _current_hour()
+        with self._lock:
+            for sample, amount in samples:
+                self._pending[sample] += amount
+                self._pending_hourly[(hour, sample)] += amount
+            due = time.monotonic() - self._last_flush >= self.flush_interval_seconds
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Push the local increments to Redis.
+
+        Never raises: on failure the increments stay pending for the next flush.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(float)
+            pending_hourly, self._pending_hourly = self._pending_hourly, defaultdict(float)
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        try:
+            pipe = self.redis_factory().pipeline(transaction=False)
+            for sample, amount in pending.items():
+                pipe.hincrbyfloat(self.key, self._encode(sample), amount)
+            for (hour, sample), amount in pending_hourly.items():
+                pipe.hincrbyfloat(self._hour_key(hour), self._encode(sample), amount)
+            for hour in {hour for hour, _ in pending_hourly}:
+                pipe.expire(self._hour_key(hour), (self.window_retention_hours + 1) * SECONDS_PER_HOUR)
+            pipe.execute()
+        except Exception as e:
+            logger.debug(f"Could not flush metrics to Redis: {e}")
+            with self._lock:
+                for sample, amount in pending.items():
+                    self._pending[sample] += amount
+                for hourly_sample, amount in pending_hourly.items():
+                    self._pending_hourly[hourly_sample] += amount
+
+    def collect(self, hours: Optional[int] = None) -> Dict[SampleKey, float]:
+        """
+        Aggregated samples of every worker.
+
+        Falls back to the increments of this process when Redis is unavailable.
+
+        Args:
+            hours: Only sum the last ``hours`` hourly hashes, the current hour
+                included (cumulative values when omitted)
+        """
+        self.flush()
+        if hours is not None:
+            current_hour = _current_hour()
+            window = range(current_hour - max(int(hours), 1) + 1, current_hour + 1)
+        try:
+            client = self.redis_factory()
+            if hours is None:
+                stored_hashes = [client.hgetall(self.key) or {}]
+            else:
+                pipe = client.pipeline(transaction=False)
+                for hour in window:
+                    pipe.hgetall(self._hour_key(hour))
+                stored_hashes = [stored or {} for stored in pipe.execute()]
+        except Exception as e:
+            logger.debug(f"Could not read metrics from Redis: {e}")
+            with self._lock:
+                if hours is None:
+                    return dict(self._pending)
+                local: Dict[SampleKey, float] = defaultdict(float)
+                for (hour, sample), amount in self._pending_hourly.items():
+                    if hour in window:
+                        local[sample] += amount
+                return dict(local)
+        samples: Dict[SampleKey, float] = defaultdict(float)
+        for stored in stored_hashes:
+            for field, value in stored.items():
+                sample = self._decode(field)
+                if sample is not None:
+                    samples[sample] += float(value)
+        return dict(samples)
+
+    def render_prometheus(self, names: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Render metrics in the Prometheus text format.
+
+        Args:
+            names: Metrics to render (all registered metrics when omitted)
+
+        Returns:
+            List of metric lines
+        """
+        samples = self.collect()
+        with self._lock:
+            metrics = [self._metrics[name] for name in (names or list(self._metrics)) if name in self._metrics]
+
+        lines: List[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            if isinstance(metric, Histogram):
+                lines.extend(self._render_histogram(metric))
+                continue
+            series = sorted(
+                (label_values, value)
+                for (name, _, label_values, _), value in samples.items()
+                if name == metric.name
+            )
+            for label_values, value in series:
+                lines.append(f"{metric.name}{self._labels(metric.labelnames, label_values)} {_format_value(value)}")
+        return lines
+
+    def _render_histogram(self, metric: Histogram) -> List[str]:
+        lines = []
+        for label_values, snapshot in sorted(metric.snapshots().items()):
+            cumulative = 0.0
+            for bound, bucket_count in zip(metric.bounds + (math.inf,), snapshot.bucket_counts):
+                cumulative += bucket_count
+                labels = self._labels(metric.labelnames + ("le",), label_values + (_format_value(bound),))
+                lines.append(f"{metric.name}_bucket{labels} {_format_value(cumulative)}")
+            labels = self._labels(metric.labelnames, label_values)
+            lines.append(f"{metric.name}_sum{labels} {_format_value(snapshot.sum)}")
+            lines.append(f"{metric.name}_count{labels} {_format_value(snapshot.count)}")
+        return lines
+
+    def reset(self, names: Optional[Iterable[str]] = None) -> None:
+        """
+        Reset metrics in every worker (useful for testing).
+
+        Args:
+            names: Metrics to reset (all metrics when omitted)
+        """
+        selected = set(names) if names is not None else None
+        with self._lock:
+            for sample in list(self._pending):
+                if selected is None or sample[0] in selected:
+                    del self._pending[sample]
+            for hourly_sample in list(self._pending_hourly):
+                if selected is None or hourly_sample[1][0] in selected:
+                    del self._pending_hourly[hourly_sample]
+        client = self.redis_factory()
+        keys = [self.key, *client.scan_iter(match=f"{self.key}:hour:*")]
+        if selected is None:
+            client.delete(*keys)
+            return
+        for key in keys:
+            fields = [field for field in client.hkeys(key) if (self._decode(field) or ("",))[0] in selected]
+            if fields:
+                client.hdel(key, *fields)
+
+    @staticmethod
+    def _labels(labelnames: Sequence[str], label_values: Sequence[str]) -> str:
+        if not labelnames:
+            return ""
+        pairs = ",".join(f'{name}="{_escape_label(value)}"' for name, value in zip(labelnames, label_values))
+        return f"{{{pairs}}}"
+
+    @staticmethod
+    def _encode(sample: SampleKey) -> str:
+        name, suffix, label_values, bound = sample
+        return json.dumps([name, suffix, list(label_values), None if bound is None else _format_value(bound)])
+
+    @staticmethod
+    def _decode(field: str) -> Optional[SampleKey]:
+        try:
+            name, suffix, label_values, bound = json.loads(field)
+        except (TypeError, ValueError):
+            return None
+        return name, suffix, tuple(label_values), None if bound is None else float(bound)
+
+
+# Global registry shared by the metrics collectors
+metrics_registry = MetricsRegistry()
@@ -7,8 +7,12 @@ from pathlib import Path
 from typing import Optional
 import logging
 
+from sqlalchemy.orm import Session
+
 from recyclic_api.core.email_service import EmailService, EmailConfigurationError
 from recyclic_api.core.config import settings
+from recyclic_api.models.email_log import EmailType
+from recyclic_api.services.email_outbox_service import enqueue_email
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +43,21 @@ def load_email_template(template_name: str) -> str:
         return f.read()
 
 
+PASSWORD_RESET_SUBJECT = "🔄 Réinitialisation de votre mot de passe - RecyClique"
+
+
+def render_password_reset_email(reset_link: str, user_name: Optional[str] = None) -> str:
+    """
+    Render the password reset email HTML.
+
+    Raises:
+        FileNotFoundError: If email template is not found
+    """
+    template_content = load_email_template("password_reset.html")
+    html_content = template_content.replace("{{ reset_link }}", reset_link)
+    return html_content.replace("{{ user_name }}", user_name or "")
+
+
 def send_password_reset_email(
     to_email: str, 
     reset_link: str, 
@@ -60,21 +79,14 @@ def send_password_reset_email(
         FileNotFoundError: If email template is not found
     """
     try:
-        # Load the email template
-        template_content = load_email_template("password_reset.html")
-        
-        # Replace template variables
-        html_content = template_content.replace("{{ reset_link }}", reset_link)
-        if user_name:
-            html_content = html_content.replace("{{ user_name }}", user_name)
-        else:
-            html_content = html_content.replace("{{ user_name }}", "")
+        # Load and render the email template
+        html_content = render_password_reset_email(reset_link, user_name)
         
         # Initialize email service
         email_service = EmailService(require_api_key=True)
         
         # Prepare email content
-        subject = "🔄 Réinitialisation de votre mot de passe - RecyClique"
+        subject = PASSWORD_RESET_SUBJECT
         
         # Send the email
         success = email_service.send_email(
@@ -124,3 +136,42 @@ def send_password_reset_email_safe(
     except Exception as e:
         logger.error(f"Failed to send password reset email to {to_email}: {e}")
         return False
+
+
+def queue_password_reset_email(
+    db: Session,
+    to_email: str,
+    reset_link: str,
+    user_name: Optional[str] = None,
+    user_id: Optional[str] = None
+) -> bool:
+    """
+    Queue a password reset email in the outbox instead of calling Brevo inline.
+
+    Used by request handlers so that a slow email provider never adds latency
+    to the response. Never raises.
+
+    Returns:
+        bool: True if the email was queued, False otherwise
+    """
+    try:
+        html_content = render_password_reset_email(reset_link, user_name)
+        enqueue_email(
+            db,
+            to_email=to_email,
+            subject=PASSWORD_RESET_SUBJECT,
+            html_content=html_content,
+            from_email=settings.EMAIL_FROM_ADDRESS,
+            from_name=settings.EMAIL_FROM_NAME,
+            email_type=EmailType.PASSWORD_RESET,
+            user_id=user_id,
+            recipient_name=user_name
+        )
+        return True
+    except Exception as e:
+        logger.error(f"Failed to queue password reset email to {to_email}: {e}")
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        return False
@@ -3,18 +3,22 @@ Performance monitoring utilities for classification service.
 
 This module provides metrics collection and performance monitoring
 for the classification pipeline according to QA recommendations.
+Completed sessions are recorded in the shared metrics registry.
 """
 
 import time
 import logging
 from typing import Dict, Any, Optional
-from dataclasses import dataclass, field
-from threading import Lock
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from datetime import datetime
 import json
 
+from recyclic_api.utils.metrics_registry import MetricsRegistry, metrics_registry
+
 logger = logging.getLogger(__name__)
 
+CONFIDENCE_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
 
 @dataclass
 class ClassificationMetrics:
@@ -39,10 +43,27 @@ class PerformanceMonitor:
     providing insights for optimization and monitoring.
     """
 
-    def __init__(self):
-        """Initialize the performance monitor."""
-        self._metrics: list[ClassificationMetrics] = []
-        self._lock = Lock()
+    OPERATIONS = "classification_operations_total"
+    DURATION = "classification_duration_ms"
+    CONFIDENCE = "classification_confidence"
+
+    def __init__(self, registry: MetricsRegistry = metrics_registry):
+        """
+        Initialize the performance monitor.
+
+        Args:
+            registry: Metrics registry holding the counters and histograms
+        """
+        self.registry = registry
+        self._operations = registry.counter(
+            self.OPERATIONS, "Classification operations by method and outcome", ("method", "outcome")
+        )
+        self._duration = registry.histogram(
+            self.DURATION, "Classification time in milliseconds by phase", ("phase",)
+        )
+        self._confidence = registry.histogram(
+            self.CONFIDENCE, "Classification confidence score", (), buckets=CONFIDENCE_BUCKETS
+        )
         self._current_session: Optional[Dict[str, Any]] = None
 
     def start_classification_session(self, audio_file_path: str) -> str:
@@ -158,12 +179,15 @@ class PerformanceMonitor:
             error=session.get("transcription_error") or session.get("classification_error")
         )
 
-        # Store metrics
-        with self._lock:
-            self._metrics.append(metrics)
-            # Keep only last 1000 metrics to prevent memory issues
-            if len(self._metrics) > 1000:
-                self._metrics = self._metrics[-1000:]
+        # Record metrics
+        self._operations.inc(method=method_used, outcome="success" if success else "failure")
+        self._duration.observe(total_time_ms, phase="total")
+        if transcription_time_ms > 0:
+            self._duration.observe(transcription_time_ms, phase="transcription")
+        if classification_time_ms > 0:
+            self._duration.observe(classification_time_ms, phase="classification")
+        if metrics.confidence_score is not None:
+            self._confidence.observe(metrics.confidence_score)
 
         logger.info(f"Classification session completed: {total_time_ms:.1f}ms total, "
                    f"{transcription_time_ms:.1f}ms transcription, "
@@ -177,101 +201,71 @@ class PerformanceMonitor:
 
     def get_performance_summary(self, hours: int = 24) -> Dict[str, Any]:
         """
-        Get performance summary for the last N hours.
+        Get performance summary.
+
+        Figures cover the last ``hours`` clock hours, the current one included.
 
         Args:
-            hours: Number of hours to include in summary
+            hours: Number of hours to include
 
         Returns:
             Dictionary containing performance metrics summary
         """
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-
-        with self._lock:
-            recent_metrics = [m for m in self._metrics if m.timestamp >= cutoff_time]
-
-        if not recent_metrics:
+        method_counts: Dict[str, int] = {}
+        successful_operations = 0
+        for (method, outcome), value in self._operations.values(hours).items():
+            method_counts[method] = method_counts.get(method, 0) + int(value)
+            if outcome == "success":
+                successful_operations += int(value)
+
+        total_operations = sum(method_counts.values())
+        if not total_operations:
             return {"message": "No metrics available for the specified period"}
 
-        # Calculate summary statistics
-        total_operations = len(recent_metrics)
-        successful_operations = len([m for m in recent_metrics if m.success])
-        success_rate = (successful_operations / total_operations) * 100
-
-        total_times = [m.total_time_ms for m in recent_metrics]
-        transcription_times = [m.transcription_time_ms for m in recent_metrics if m.transcription_time_ms > 0]
-        classification_times = [m.classification_time_ms for m in recent_metrics if m.classification_time_ms > 0]
-
-        # Method usage statistics
-        method_counts = {}
-        for metrics in recent_metrics:
-            method = metrics.method_used
-            method_counts[method] = method_counts.get(method, 0) + 1
+        durations = self._duration.snapshots(hours)
+        total_times = durations.get(("total",))
+        transcription_times = durations.get(("transcription",))
+        classification_times = durations.get(("classification",))
+        confidence = self._confidence.merged(hours)
 
-        # Confidence score statistics
-        confidence_scores = [m.confidence_score for m in recent_metrics if m.confidence_score is not None]
-
-        summary = {
+        return {
             "period_hours": hours,
             "total_operations": total_operations,
             "successful_operations": successful_operations,
-            "success_rate_percent": round(success_rate, 2),
+            "success_rate_percent": round(successful_operations / total_operations * 100, 2),
             "timing_metrics": {
-                "avg_total_time_ms": round(sum(total_times) / len(total_times), 2) if total_times else 0,
-                "min_total_time_ms": min(total_times) if total_times else 0,
-                "max_total_time_ms": max(total_times) if total_times else 0,
-                "avg_transcription_time_ms": round(sum(transcription_times) / len(transcription_times), 2) if transcription_times else 0,
-                "avg_classification_time_ms": round(sum(classification_times) / len(classification_times), 2) if classification_times else 0,
+                "avg_total_time_ms": round(total_times.mean, 2) if total_times else 0,
+                "p50_total_time_ms": round(total_times.quantile(0.5), 2) if total_times else 0,
+                "p95_total_time_ms": round(total_times.quantile(0.95), 2) if total_times else 0,
+                "avg_transcription_time_ms": round(transcription_times.mean, 2) if transcription_times else 0,
+                "avg_classification_time_ms": round(classification_times.mean, 2) if classification_times else 0,
             },
             "method_usage": method_counts,
             "confidence_metrics": {
-                "avg_confidence": round(sum(confidence_scores) / len(confidence_scores), 3) if confidence_scores else 0,
-                "min_confidence": min(confidence_scores) if confidence_scores else 0,
-                "max_confidence": max(confidence_scores) if confidence_scores else 0,
+                "avg_confidence": round(confidence.mean, 3),
+                "p50_confidence": round(confidence.quantile(0.5), 3),
             }
         }
 
-        return summary
-
     def export_metrics(self, file_path: str, hours: int = 24):
         """
-        Export metrics to a JSON file.
+        Export the metrics summary to a JSON file.
 
         Args:
             file_path: Path to export the metrics
-            hours: Number of hours of metrics to export
+            hours: Number of hours to include in the summary
         """
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-
-        with self._lock:
-            recent_metrics = [m for m in self._metrics if m.timestamp >= cutoff_time]
-
-        # Convert to serializable format
         export_data = {
             "export_timestamp": datetime.now().isoformat(),
             "period_hours": hours,
-            "metrics_count": len(recent_metrics),
-            "metrics": [
-                {
-                    "timestamp": m.timestamp.isoformat(),
-                    "audio_file_path": m.audio_file_path,
-                    "transcription_time_ms": m.transcription_time_ms,
-                    "classification_time_ms": m.classification_time_ms,
-                    "total_time_ms": m.total_time_ms,
-                    "success": m.success,
-                    "method_used": m.method_used,
-                    "confidence_score": m.confidence_score,
-                    "category": m.category,
-                    "error": m.error
-                }
-                for m in recent_metrics
-            ]
+            "summary": self.get_performance_summary(hours=hours),
+            "prometheus": self.registry.render_prometheus([self.OPERATIONS, self.DURATION, self.CONFIDENCE]),
         }
 
         with open(file_path, 'w', encoding='utf-8') as f:
             json.dump(export_data, f, indent=2, ensure_ascii=False)
 
-        logger.info(f"Exported {len(recent_metrics)} metrics to {file_path}")
+        logger.info(f"Exported classification metrics to {file_path}")
 
 
 # Global performance monitor instance
@@ -1,12 +1,70 @@
+import logging
 import os
-from typing import Callable
+from typing import Callable, Optional
 
-from slowapi import Limiter
+from fastapi import Request
+from jose import JWTError, jwt
+from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
+from starlette.responses import Response
 
+from recyclic_api.core.config import settings
+from recyclic_api.utils.rate_limit_metrics import rate_limit_metrics
 
-limiter = Limiter(key_func=get_remote_address)
+logger = logging.getLogger(__name__)
+
+
+def _authenticated_user_id(request: Request) -> Optional[str]:
+    """Return the user id of a valid Bearer token, or None.
+
+    Only the signature and expiry are checked (no DB access): an invalid or
+    forged token falls back to the IP bucket instead of opening a fresh one.
+    """
+    authorization = request.headers.get("authorization")
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    user_id = payload.get("sub")
+    return str(user_id) if user_id else None
+
+
+def rate_limit_key(request: Request) -> str:
+    """Rate limit per user when authenticated, per client IP otherwise."""
+    user_id = _authenticated_user_id(request)
+    if user_id:
+        return f"user:{user_id}"
+    return f"ip:{get_remote_address(request)}"
+
+
+# Shared limiter: counters live in Redis so a limit means the same thing for
+# 1 or N uvicorn workers and survives restarts. The "moving-window" strategy
+# is an exact sliding window evaluated atomically by a Lua script on Redis.
+# If Redis is unreachable, slowapi falls back to per-process memory storage
+# and switches back once Redis answers again.
+limiter = Limiter(
+    key_func=rate_limit_key,
+    storage_uri=settings.RATE_LIMIT_STORAGE_URI or settings.REDIS_URL,
+    strategy=settings.RATE_LIMIT_STRATEGY,
+    key_prefix=settings.RATE_LIMIT_KEY_PREFIX,
+    in_memory_fallback_enabled=True,
+)
+
+
+def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded) -> Response:
+    """Count the throttled request, then build slowapi's standard 429 response."""
+    route = request.scope.get("route")
+    rate_limit_metrics.record_throttled(
+        route=getattr(route, "path", None) or request.url.path,
+        limit=str(exc.limit.limit) if getattr(exc, "limit", None) else None,
+    )
+    return _rate_limit_exceeded_handler(request, exc)
 
 
 def _is_test_mode() -> bool:
@@ -31,5 +89,7 @@ def conditional_rate_limit(limit_str: str) -> Callable:
 __all__ = [
     "limiter",
     "conditional_rate_limit",
+    "rate_limit_key",
+    "rate_limit_exceeded_handler",
     "RateLimitExceeded",
 ]
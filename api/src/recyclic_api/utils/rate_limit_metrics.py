@@ -0,0 +1,103 @@
+"""
+Throttled request counters for rate limiting observability.
+
+Counters are kept in Redis (like the limiter storage itself) so that the
+figures cover every API worker, not only the one serving the metrics endpoint.
+"""
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from recyclic_api.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitMetricsCollector:
+    """Collects counters of requests rejected by the rate limiter."""
+
+    TOTAL_FIELD = "__total__"
+
+    def __init__(
+        self,
+        redis_factory: Callable[[], Any] = get_redis,
+        key: str = "rate_limit:metrics:throttled",
+        limits_key: str = "rate_limit:metrics:limits",
+    ):
+        """
+        Initialize the metrics collector.
+
+        Args:
+            redis_factory: Callable returning the Redis client
+            key: Redis hash holding the per-route throttled counters
+            limits_key: Redis hash holding the last limit hit per route
+        """
+        self.redis_factory = redis_factory
+        self.key = key
+        self.limits_key = limits_key
+
+    def record_throttled(self, route: str, limit: Optional[str] = None) -> None:
+        """
+        Record a request rejected with 429.
+
+        Never raises: losing a metric must not turn a 429 into a 500.
+
+        Args:
+            route: Route template (e.g. /v1/auth/login)
+            limit: Human readable limit that was exceeded (e.g. "10 per 1 minute")
+        """
+        try:
+            pipe = self.redis_factory().pipeline(transaction=False)
+            pipe.hincrby(self.key, route, 1)
+            pipe.hincrby(self.key, self.TOTAL_FIELD, 1)
+            if limit:
+                pipe.hset(self.limits_key, route, limit)
+            pipe.execute()
+        except Exception as e:
+            logger.debug(f"Could not record rate limit metric for {route}: {e}")
+
+    def get_metrics_summary(self) -> Dict[str, Any]:
+        """
+        Get throttled request counters.
+
+        Returns:
+            Dictionary with the total and a per-route breakdown
+        """
+        client = self.redis_factory()
+        counters = client.hgetall(self.key) or {}
+        limits = client.hgetall(self.limits_key) or {}
+
+        total = int(counters.pop(self.TOTAL_FIELD, 0))
+        routes = {
+            route: {"throttled": int(count), "limit": limits.get(route)}
+            for route, count in sorted(counters.items(), key=lambda item: -int(item[1]))
+        }
+        return {
+            "throttled_total": total,
+            "routes": routes,
+        }
+
+    def get_prometheus_metrics(self) -> List[str]:
+        """
+        Get metrics in Prometheus format.
+
+        Returns:
+            List of metric strings in Prometheus format
+        """
+        summary = self.get_metrics_summary()
+        metrics = [
+            "# TYPE rate_limit_throttled_total counter",
+            f"rate_limit_throttled_total {summary['throttled_total']}",
+            "# TYPE rate_limit_throttled_by_route_total counter",
+        ]
+        for route, data in summary["routes"].items():
+            escaped_route = route.replace("\\", "\\\\").replace('"', '\\"')
+            metrics.append(f'rate_limit_throttled_by_route_total{{route="{escaped_route}"}} {data["throttled"]}')
+        return metrics
+
+    def reset_metrics(self) -> None:
+        """Reset all counters (useful for testing)."""
+        self.redis_factory().delete(self.key, self.limits_key)
+
+
+# Global metrics collector instance
+rate_limit_metrics = RateLimitMetricsCollector()
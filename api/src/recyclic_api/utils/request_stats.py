@@ -0,0 +1,91 @@
+"""
+Per-request counters of database statements and Redis calls.
+
+The stats of the request being served live in a context variable: they
+follow the request into the threadpool running sync endpoints, and the
+SQLAlchemy / Redis hooks are no-ops outside of a request.
+"""
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Distinct statements kept per request (the counters stay exact beyond it)
+MAX_TRACKED_STATEMENTS = 200
+
+_QUERY_START_KEY = "request_stats_query_start"
+
+
+@dataclass
+class RequestStats:
+    """Database and Redis activity of one request."""
+    db_queries: int = 0
+    db_time_ms: float = 0.0
+    redis_calls: int = 0
+    # statement -> [executions, total time in ms]
+    statements: Dict[str, List[float]] = field(default_factory=dict)
+
+    def record_statement(self, statement: str, elapsed_ms: float) -> None:
+        self.db_queries += 1
+        self.db_time_ms += elapsed_ms
+        entry = self.statements.get(statement)
+        if entry is not None:
+            entry[0] += 1
+            entry[1] += elapsed_ms
+        elif len(self.statements) < MAX_TRACKED_STATEMENTS:
+            self.statements[statement] = [1, elapsed_ms]
+
+    def top_statements(self, limit: int) -> List[Tuple[str, int, float]]:
+        """Most expensive statements as (statement, executions, total ms)."""
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+        return [(statement, int(count), total_ms) for statement, (count, total_ms) in ranked[:limit]]
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def start_request_stats() -> Tuple[RequestStats, Token]:
+    """Start collecting for the current request; pass the token to stop_request_stats."""
+    stats = RequestStats()
+    return stats, _current_stats.set(stats)
+
+
+def stop_request_stats(token: Token) -> None:
+    _current_stats.reset(token)
+
+
+def get_request_stats() -> Optional[RequestStats]:
+    return _current_stats.get()
+
+
+def record_redis_call() -> None:
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.redis_calls += 1
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault(_QUERY_START_KEY, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    starts = conn.info.get(_QUERY_START_KEY)
+    if stats is None or not starts:
+        return
+    stats.record_statement(statement, (time.perf_counter() - starts.pop()) * 1000)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # The failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    starts = connection.info.get(_QUERY_START_KEY) if connection is not None else None
+    if _current_stats.get() is not None and starts:
+        starts.pop()
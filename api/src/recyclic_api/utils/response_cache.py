@@ -0,0 +1,238 @@
+"""
+HTTP response cache for read-mostly endpoints.
+
+``cache_response`` stores the serialized body of a GET endpoint in Redis and
+serves it, with an ``ETag``, without touching the database. Entries are
+invalidated through version tags: each entry records the version of its tags
+when it was computed, and ``invalidates_response_cache`` / ``invalidate_response_cache``
+bump those versions after a write, so every API process sees the change on its
+next lookup.
+
+Past RESPONSE_CACHE_TTL_SECONDS an entry is kept for RESPONSE_CACHE_STALE_SECONDS
+more: a single request recomputes it while the others get the stale copy, and the
+stale copy is also served when the database is unreachable. When Redis itself is
+unreachable, or under tests, the endpoint is simply called.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+from redis.exceptions import RedisError
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+from starlette.responses import Response
+
+from recyclic_api.core.config import settings
+from recyclic_api.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+ENTRY_PREFIX = "response_cache:entry:"
+VERSION_PREFIX = "response_cache:version:"
+REFRESH_LOCK_PREFIX = "response_cache:refresh:"
+
+# Errors after which a stale entry is preferred to a 5xx
+DATABASE_ERRORS = (OperationalError, PoolTimeoutError)
+
+
+def _is_test_mode() -> bool:
+    # Tests share one Redis and roll back every transaction: cached bodies would leak between them
+    return (
+        os.getenv("PYTEST_CURRENT_TEST") is not None
+        or os.getenv("TESTING") == "true"
+        or os.getenv("ENVIRONMENT") == "test"
+    )
+
+
+def _cache_enabled() -> bool:
+    return settings.RESPONSE_CACHE_TTL_SECONDS > 0 and not _is_test_mode()
+
+
+def _entry_key(request: Request) -> str:
+    query = "&".join(f"{name}={value}" for name, value in sorted(request.query_params.multi_items()))
+    return f"{ENTRY_PREFIX}{request.url.path}?{query}"
+
+
+def _etag(body: str) -> str:
+    return '"%s"' % hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def _build_response(request: Request, body: str, etag: str, cache_status: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "X-Cache": cache_status}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def invalidate_response_cache(*tags: str, redis_client=None) -> None:
+    """Bump the version of the given tags: every entry depending on them is recomputed."""
+    try:
+        pipeline = (redis_client or get_redis()).pipeline(transaction=False)
+        for tag in tags:
+            pipeline.incr(f"{VERSION_PREFIX}{tag}")
+        pipeline.execute()
+    except RedisError as exc:
+        # Entries then expire after RESPONSE_CACHE_TTL_SECONDS + RESPONSE_CACHE_STALE_SECONDS
+        logger.warning("Response cache invalidation failed for %s: %s", ", ".join(tags), exc)
+
+
+def invalidates_response_cache(*tags: str) -> Callable:
+    """Invalidate the given tags once the decorated write endpoint has returned successfully."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if inspect.iscoroutinefunction(func):
+                result = await func(*args, **kwargs)
+            else:
+                result = await run_in_threadpool(func, *args, **kwargs)
+            invalidate_response_cache(*tags)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+class ResponseCache:
+    """Redis storage of cached responses and of their tag versions."""
+
+    def __init__(self, tags: Sequence[str], redis_client=None):
+        self.tags = list(tags)
+        self.redis_client = redis_client
+
+    @property
+    def redis(self):
+        return self.redis_client or get_redis()
+
+    def lookup(self, key: str) -> Tuple[Optional[Dict[str, Any]], List[Optional[str]]]:
+        """Return the stored entry (or None) and the current tag versions, in one round trip."""
+        pipeline = self.redis.pipeline(transaction=False)
+        pipeline.get(key)
+        pipeline.mget([f"{VERSION_PREFIX}{tag}" for tag in self.tags])
+        raw_entry, versions = pipeline.execute()
+        return (json.loads(raw_entry) if raw_entry else None), versions
+
+    def store(self, key: str, body: str, etag: str, versions: List[Optional[str]]) -> None:
+        entry = {"body": body, "etag": etag, "versions": versions, "stored_at": time.time()}
+        lifetime = settings.RESPONSE_CACHE_TTL_SECONDS + settings.RESPONSE_CACHE_STALE_SECONDS
+        self.redis.set(key, json.dumps(entry), ex=max(1, int(lifetime)))
+
+    def acquire_refresh(self, key: str) -> bool:
+        """Elect the request that recomputes a soft-expired entry."""
+        lock_ttl = max(1, int(settings.RESPONSE_CACHE_STALE_SECONDS))
+        return bool(self.redis.set(f"{REFRESH_LOCK_PREFIX}{key}", "1", nx=True, ex=lock_ttl))
+
+    def release_refresh(self, key: str) -> None:
+        self.redis.delete(f"{REFRESH_LOCK_PREFIX}{key}")
+
+
+def cache_response(*tags: str, response_model: Any) -> Callable:
+    """
+    Cache the JSON response of a GET endpoint, invalidated by the given tags.
+
+    ``response_model`` is the model declared on the route: the cached body is
+    serialized with it, exactly once per version. The key is the path and the
+    query string only, so the decorated endpoint must not return user-specific
+    data; its dependencies (authentication included) still run on every request.
+    """
+    adapter = TypeAdapter(response_model)
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        request_param = next(
+            (name for name, param in signature.parameters.items() if param.annotation is Request),
+            None,
+        )
+
+        async def call_endpoint(kwargs: Dict[str, Any]) -> Any:
+            if request_param is None:
+                kwargs = {name: value for name, value in kwargs.items() if name != "response_cache_request"}
+            if inspect.iscoroutinefunction(func):
+                return await func(**kwargs)
+            return await run_in_threadpool(func, **kwargs)
+
+        def serialize(result: Any) -> str:
+            return adapter.dump_json(
+                adapter.validate_python(result, from_attributes=True), by_alias=True
+            ).decode("utf-8")
+
+        @functools.wraps(func)
+        async def wrapper(**kwargs):
+            request: Request = kwargs[request_param or "response_cache_request"]
+            if not _cache_enabled():
+                return await call_endpoint(kwargs)
+
+            cache = ResponseCache(tags)
+            key = _entry_key(request)
+            try:
+                entry, versions = cache.lookup(key)
+            except (RedisError, ValueError) as exc:
+                logger.warning("Response cache unavailable for %s: %s", key, exc)
+                return await call_endpoint(kwargs)
+
+            refreshing = False
+            if entry is not None and entry["versions"] == versions:
+                age = time.time() - entry["stored_at"]
+                if age < settings.RESPONSE_CACHE_TTL_SECONDS:
+                    return _build_response(request, entry["body"], entry["etag"], "HIT")
+                # Soft-expired: one request recomputes, the others keep serving the stale copy
+                try:
+                    refreshing = cache.acquire_refresh(key)
+                except RedisError:
+                    refreshing = True
+                if not refreshing:
+                    return _build_response(request, entry["body"], entry["etag"], "STALE")
+
+            try:
+                body = serialize(await call_endpoint(kwargs))
+            except DATABASE_ERRORS as exc:
+                if entry is None:
+                    raise
+                logger.warning("Database unavailable, serving stale response for %s: %s", key, exc)
+                return _build_response(request, entry["body"], entry["etag"], "STALE")
+
+            etag = _etag(body)
+            try:
+                # Versions read before the computation: a concurrent write makes this entry outdated at once
+                cache.store(key, body, etag, versions)
+                if refreshing:
+                    cache.release_refresh(key)
+            except RedisError as exc:
+                logger.warning("Response cache store failed for %s: %s", key, exc)
+            return _build_response(request, body, etag, "MISS")
+
+        if request_param is None:
+            extra = inspect.Parameter(
+                "response_cache_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request
+            )
+            wrapper.__signature__ = signature.replace(
+                parameters=[*signature.parameters.values(), extra]
+            )
+        return wrapper
+
+    return decorator
+
+
+__all__ = [
+    "cache_response",
+    "invalidate_response_cache",
+    "invalidates_response_cache",
+    "ResponseCache",
+]
@@ -83,12 +83,21 @@ if "openpyxl" not in sys.modules:
                 yield [_DummyCell() for _ in row]
 
     class _DummyWorkbook:
-        def __init__(self):
+        def __init__(self, write_only=False):
             self.active = _DummyWorksheet()
 
+        def create_sheet(self, title=None):
+            self.active.title = title or ""
+            return self.active
+
         def save(self, _buffer):
             pass
 
+    class _DummyWriteOnlyCell(_DummyCell):
+        def __init__(self, worksheet=None, value=None):
+            super().__init__()
+            self.value = value
+
     class _DummyFont:
         def __init__(self, *args, **kwargs):
             pass
@@ -107,9 +116,14 @@ if "openpyxl" not in sys.modules:
     styles_module.Alignment = _DummyAlignment
     styles_module.PatternFill = _DummyPatternFill
 
+    cell_module = types.ModuleType("openpyxl.cell")
+    cell_module.WriteOnlyCell = _DummyWriteOnlyCell
+
     sys.modules["openpyxl"] = openpyxl
     sys.modules["openpyxl.styles"] = styles_module
+    sys.modules["openpyxl.cell"] = cell_module
     openpyxl.styles = styles_module
+    openpyxl.cell = cell_module
 
     def _workbook_factory():
         return _DummyWorkbook()
@@ -3,8 +3,12 @@ Performance tests for the login endpoint.
 
 Tests that the login endpoint meets the required performance criteria:
 - Average response time should be under 300ms under normal load conditions
+- P95 stays bounded under a burst of 50 concurrent logins, and bcrypt (run in
+  the dedicated hashing pool) does not stall the event loop meanwhile
 """
 import asyncio
+import math
+import os
 import time
 import statistics
 from typing import List
@@ -15,7 +19,9 @@ from httpx import ASGITransport
 from sqlalchemy.orm import Session
 
 from recyclic_api.models.user import User, UserRole, UserStatus
+from recyclic_api.core.config import settings
 from recyclic_api.core.security import hash_password
+from recyclic_api.utils.rate_limit import limiter
 
 
 @pytest.mark.performance
@@ -23,7 +29,7 @@ class TestLoginPerformance:
     """Performance tests for the login endpoint."""
 
     @pytest.fixture
-    def test_user_credentials(self, db: Session):
+    def test_user_credentials(self, db_session: Session):
         """Create a test user for performance testing."""
         # Create test user
         test_password = "TestPassword123!"
@@ -38,19 +44,17 @@ class TestLoginPerformance:
             is_active=True
         )
 
-        db.add(test_user)
-        db.commit()
-        db.refresh(test_user)
+        db_session.add(test_user)
+        db_session.commit()
+        db_session.refresh(test_user)
 
+        # The per-test transaction is discarded by conftest, along with the
+        # login history and audit rows referencing this user
         yield {
             "username": "perf_test_user",
             "password": "TestPassword123!"
         }
 
-        # Cleanup
-        db.delete(test_user)
-        db.commit()
-
     async def single_login_request(self, client: httpx.AsyncClient, credentials: dict) -> float:
         """
         Perform a single login request and measure response time.
@@ -182,6 +186,63 @@ class TestLoginPerformance:
         assert p95_response_time < 5000, f"P95 response time {p95_response_time:.2f}ms is too high under load"
         assert max_response_time < 4000, f"Max response time {max_response_time:.2f}ms is too high under load"
 
+    @pytest.mark.skip(reason="Performance tests disabled in unit suite; run in perf pipeline")
+    async def test_login_p95_under_50_concurrent_logins(self, test_user_credentials, monkeypatch):
+        """
+        Test login latency under a burst of 50 simultaneous logins.
+
+        All requests are fired at once. Since bcrypt runs in the dedicated hashing pool,
+        the event loop must keep ticking during the burst (measured by a heartbeat task).
+        The p95 bound scales with the cost of one login and the parallelism actually
+        available (pool size capped by CPU count), so it holds on any runner.
+        """
+        base_url = "http://testserver"
+        num_requests = 50
+        heartbeat_interval = 0.01
+        loop_lags: List[float] = []
+        burst_done = asyncio.Event()
+        # The burst comes from a single client IP: measure hashing, not the rate limiter
+        monkeypatch.setattr(limiter, "enabled", False)
+
+        async def heartbeat():
+            """Measure how late the event loop wakes us up while logins are in flight."""
+            while not burst_done.is_set():
+                expected = time.perf_counter() + heartbeat_interval
+                await asyncio.sleep(heartbeat_interval)
+                loop_lags.append((time.perf_counter() - expected) * 1000)
+
+        transport = ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url=base_url) as client:
+            # Warm-up: create the hashing pool and the DB connection, and measure one login
+            single_login_ms = await self.single_login_request(client, test_user_credentials)
+
+            heartbeat_task = asyncio.create_task(heartbeat())
+            start_time = time.time()
+            response_times = await asyncio.gather(*[
+                self.single_login_request(client, test_user_credentials)
+                for _ in range(num_requests)
+            ])
+            total_time_ms = (time.time() - start_time) * 1000
+            burst_done.set()
+            await heartbeat_task
+
+        avg_response_time = statistics.mean(response_times)
+        p95_response_time = statistics.quantiles(response_times, n=20)[18]
+        max_loop_lag = max(loop_lags) if loop_lags else 0.0
+        parallelism = max(min(settings.PASSWORD_HASH_WORKERS, os.cpu_count() or 1), 1)
+        p95_budget_ms = single_login_ms * math.ceil(num_requests / parallelism) * 1.5
+
+        print(f"\nLogin Performance Results (Burst):")
+        print(f"  Concurrent requests: {num_requests}")
+        print(f"  Total time: {total_time_ms:.2f}ms")
+        print(f"  Average response time: {avg_response_time:.2f}ms")
+        print(f"  P95 response time: {p95_response_time:.2f}ms (budget {p95_budget_ms:.2f}ms)")
+        print(f"  Max event loop lag: {max_loop_lag:.2f}ms")
+
+        assert len(response_times) == num_requests
+        assert p95_response_time < p95_budget_ms, f"P95 response time {p95_response_time:.2f}ms is too high under a login burst"
+        assert max_loop_lag < 250, f"Event loop stalled for {max_loop_lag:.2f}ms during the login burst"
+
     @pytest.mark.skip(reason="Performance tests disabled in unit suite; run in perf pipeline")
     async def test_login_performance_failed_attempts(self, test_user_credentials):
         """
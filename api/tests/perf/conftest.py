@@ -0,0 +1,114 @@
+"""
+Fixtures of the API benchmark suite (opt-in: RECYC_PERF=1).
+
+Environment variables:
+- RECYC_PERF_SCALE: dataset size, one of 10k (default), 100k, 1m
+- RECYC_PERF_ITERATIONS: measured calls per scenario (default 30)
+- RECYC_PERF_COMPARE_TIMINGS=1: also compare p95 with the baseline (only meaningful
+  on the machine that recorded it); SQL statement counts are always compared
+- RECYC_PERF_TOLERANCE: allowed p95 slowdown against the baseline (default 0.25)
+- RECYC_PERF_BASELINE: baseline file (default tests/perf/baseline.json)
+- RECYC_PERF_UPDATE_BASELINE=1: record this run as the new baseline of the scale
+- RECYC_PERF_REPORT: also write the results of this run to this JSON file
+"""
+import json
+import os
+from typing import Callable, Dict, Optional
+
+import pytest
+from fastapi.testclient import TestClient
+
+from recyclic_api.core.security import create_access_token
+from recyclic_api.main import app
+from recyclic_api.utils.rate_limit import limiter
+
+from .datasets import SCALES, PerfDataset, drop_dataset, seed_dataset
+from .harness import Baseline, ScenarioResult, run_scenario
+
+_RESULTS_KEY = pytest.StashKey[Dict[str, ScenarioResult]]()
+
+
+def _scale() -> str:
+    scale = os.getenv("RECYC_PERF_SCALE", "10k").lower()
+    if scale not in SCALES:
+        raise pytest.UsageError(f"RECYC_PERF_SCALE must be one of {', '.join(SCALES)}")
+    return scale
+
+
+@pytest.fixture(scope="session")
+def perf_results(request):
+    """Results of the run, saved as baseline and/or report once every scenario ran."""
+    results = request.config.stash.setdefault(_RESULTS_KEY, {})
+    yield results
+    if not results:
+        return
+    scale = _scale()
+    if os.getenv("RECYC_PERF_UPDATE_BASELINE") == "1":
+        baseline = Baseline.load(os.getenv("RECYC_PERF_BASELINE"))
+        for result in results.values():
+            baseline.record(scale, result)
+        baseline.save()
+    report_path = os.getenv("RECYC_PERF_REPORT")
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as handle:
+            json.dump({scale: {name: vars(result) for name, result in sorted(results.items())}}, handle, indent=2)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    results = config.stash.get(_RESULTS_KEY, None)
+    if results:
+        terminalreporter.write_sep("-", f"benchmark results ({_scale()})")
+        for result in results.values():
+            terminalreporter.write_line(result.summary())
+
+
+@pytest.fixture(scope="session")
+def perf_dataset(db_engine):
+    dataset = seed_dataset(db_engine, _scale())
+    yield dataset
+    drop_dataset(db_engine, dataset)
+
+
+@pytest.fixture
+def perf_client(perf_dataset: PerfDataset, db_session, monkeypatch) -> TestClient:
+    """Client authenticated as the dataset operator (an admin of the benchmark site)."""
+    # Scenarios call endpoints far more often than their per-minute limits allow
+    monkeypatch.setattr(limiter, "enabled", False)
+    client = TestClient(app)
+    client.headers["Authorization"] = f"Bearer {create_access_token(data={'sub': str(perf_dataset.operator_id)})}"
+    return client
+
+
+@pytest.fixture
+def bench(perf_results):
+    """
+    Run a scenario, then check it against its budgets and the baseline.
+
+    ``max_queries`` and ``max_p95_ms`` are absolute budgets asserted on every
+    machine, as is the baseline SQL statement count. The baseline p95 is only
+    compared on the reference machine (RECYC_PERF_COMPARE_TIMINGS=1).
+    """
+    baseline = Baseline.load(os.getenv("RECYC_PERF_BASELINE"))
+    tolerance = float(os.getenv("RECYC_PERF_TOLERANCE", "0.25"))
+    compare_timings = os.getenv("RECYC_PERF_COMPARE_TIMINGS") == "1"
+    default_iterations = int(os.getenv("RECYC_PERF_ITERATIONS", "30"))
+    scale = _scale()
+
+    def _bench(
+        name: str,
+        call: Callable,
+        max_queries: int,
+        max_p95_ms: float,
+        iterations: Optional[int] = None,
+        setup: Optional[Callable] = None,
+    ) -> ScenarioResult:
+        result = run_scenario(name, call, iterations or default_iterations, setup=setup)
+        perf_results[name] = result
+        assert result.queries <= max_queries, f"{result.summary()}: more than {max_queries} SQL statements"
+        assert result.p95_ms <= max_p95_ms, f"{result.summary()}: p95 above {max_p95_ms}ms"
+        if os.getenv("RECYC_PERF_UPDATE_BASELINE") != "1":
+            problems = baseline.regressions(scale, result, tolerance, compare_timings=compare_timings)
+            assert not problems, f"{name} regressed against the {scale} baseline: {'; '.join(problems)}"
+        return result
+
+    return _bench
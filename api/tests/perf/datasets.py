@@ -0,0 +1,183 @@
+"""
+Seeded synthetic datasets for the benchmark suite.
+
+Rows are generated by PostgreSQL itself (``generate_series``), so that even the
+1M scale is seeded in seconds, and committed: they must be visible to every
+connection the API opens. Identifiers are derived from a per-run prefix
+(``md5(prefix || n)::uuid``), which keeps the dataset deterministic in shape and
+lets ``drop_dataset`` remove exactly what was inserted.
+
+For a scale of N rows: N sales with one line each, N/100 closed cash sessions
+(100 sales per session), N/10 reception tickets with 10 lines each, and a
+category tree of 10 roots with 5 children.
+"""
+import hashlib
+import uuid
+from dataclasses import dataclass
+from typing import Dict
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from recyclic_api.core.security import hash_password
+
+SCALES: Dict[str, int] = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+ROOT_CATEGORIES = 10
+CHILD_CATEGORIES_PER_ROOT = 5
+SALES_PER_SESSION = 100
+LINES_PER_TICKET = 10
+
+OPERATOR_PASSWORD = "BenchPassword123!"
+
+
+def _uuid(prefix: str, kind: str, index: int) -> uuid.UUID:
+    # Same derivation as md5(:prefix || ':' || kind || ':' || n)::uuid in the seed statements
+    return uuid.UUID(hashlib.md5(f"{prefix}:{kind}:{index}".encode()).hexdigest())
+
+
+@dataclass
+class PerfDataset:
+    scale: str
+    rows: int
+    prefix: str
+    site_id: uuid.UUID
+    operator_id: uuid.UUID
+    operator_username: str
+    poste_id: uuid.UUID
+    busiest_session_id: uuid.UUID
+
+
+_SEED_STATEMENTS = [
+    # Category tree: roots first, then their children
+    """
+    INSERT INTO categories (id, name, is_active, parent_id, price, display_order, is_visible)
+    SELECT md5(:prefix || ':category:' || r)::uuid, 'bench-' || :prefix || '-' || r, true, NULL, NULL, r, true
+    FROM generate_series(0, :roots - 1) AS r
+    """,
+    """
+    INSERT INTO categories (id, name, is_active, parent_id, price, display_order, is_visible)
+    SELECT md5(:prefix || ':category:' || (:roots + r * :children + c))::uuid,
+           'bench-' || :prefix || '-' || r || '-' || c, true,
+           md5(:prefix || ':category:' || r)::uuid, 1.0 + c, c, true
+    FROM generate_series(0, :roots - 1) AS r, generate_series(0, :children - 1) AS c
+    """,
+    """
+    INSERT INTO cash_sessions (id, operator_id, site_id, initial_amount, current_amount, status,
+                               opened_at, closed_at, total_sales, total_items)
+    SELECT md5(:prefix || ':session:' || s)::uuid, :operator_id, :site_id, 50.0,
+           50.0 + :per_session * 5.0, 'CLOSED',
+           now() - (s || ' hours')::interval, now() - (s || ' hours')::interval + interval '6 hours',
+           :per_session * 5.0, :per_session
+    FROM generate_series(0, :sessions - 1) AS s
+    """,
+    """
+    INSERT INTO sales (id, cash_session_id, operator_id, total_amount, donation, payment_method, created_at)
+    SELECT md5(:prefix || ':sale:' || n)::uuid, md5(:prefix || ':session:' || (n / :per_session))::uuid,
+           :operator_id, 5.0, (n % 3)::float, 'CASH', now() - ((n / :per_session) || ' hours')::interval
+    FROM generate_series(0, :rows - 1) AS n
+    """,
+    """
+    INSERT INTO sale_items (id, sale_id, category, quantity, weight, unit_price, total_price)
+    SELECT md5(:prefix || ':sale_item:' || n)::uuid, md5(:prefix || ':sale:' || n)::uuid,
+           'EEE-' || (n % 4 + 1), 1, 1.5, 5.0, 5.0
+    FROM generate_series(0, :rows - 1) AS n
+    """,
+    """
+    INSERT INTO ticket_depot (id, poste_id, benevole_user_id, created_at, closed_at, status, total_lignes, total_poids_kg)
+    SELECT md5(:prefix || ':ticket:' || t)::uuid, :poste_id, :operator_id,
+           now() - (t || ' minutes')::interval, now() - (t || ' minutes')::interval, 'closed',
+           :lines_per_ticket, :lines_per_ticket * 2.5
+    FROM generate_series(0, :tickets - 1) AS t
+    """,
+    """
+    INSERT INTO ligne_depot (id, ticket_id, category_id, poids_kg, destination)
+    SELECT md5(:prefix || ':line:' || n)::uuid, md5(:prefix || ':ticket:' || (n / :lines_per_ticket))::uuid,
+           md5(:prefix || ':category:' || (:roots + n % (:roots * :children)))::uuid, 2.5,
+           (ARRAY['MAGASIN', 'RECYCLAGE', 'DECHETERIE'])[n % 3 + 1]::destinationenum
+    FROM generate_series(0, :rows - 1) AS n
+    """,
+]
+
+_DROP_STATEMENTS = [
+    "DELETE FROM ligne_depot WHERE ticket_id IN (SELECT id FROM ticket_depot WHERE poste_id = :poste_id)",
+    "DELETE FROM ticket_depot WHERE poste_id = :poste_id",
+    "DELETE FROM poste_reception WHERE id = :poste_id",
+    """DELETE FROM sale_items WHERE sale_id IN (
+           SELECT s.id FROM sales s JOIN cash_sessions c ON c.id = s.cash_session_id WHERE c.site_id = :site_id)""",
+    "DELETE FROM sales WHERE cash_session_id IN (SELECT id FROM cash_sessions WHERE site_id = :site_id)",
+    "DELETE FROM cash_session_close_jobs WHERE cash_session_id IN (SELECT id FROM cash_sessions WHERE site_id = :site_id)",
+    "DELETE FROM cash_sessions WHERE site_id = :site_id",
+    "DELETE FROM categories WHERE name LIKE 'bench-' || :prefix || '-%' AND parent_id IS NOT NULL",
+    "DELETE FROM categories WHERE name LIKE 'bench-' || :prefix || '-%'",
+    "DELETE FROM login_history WHERE user_id = :operator_id",
+    "DELETE FROM audit_logs WHERE actor_id = :operator_id",
+    "DELETE FROM users WHERE id = :operator_id",
+    "DELETE FROM sites WHERE id = :site_id",
+]
+
+
+def seed_dataset(engine: Engine, scale: str) -> PerfDataset:
+    rows = SCALES[scale]
+    prefix = uuid.uuid4().hex[:12]
+    dataset = PerfDataset(
+        scale=scale,
+        rows=rows,
+        prefix=prefix,
+        site_id=_uuid(prefix, "site", 0),
+        operator_id=_uuid(prefix, "operator", 0),
+        operator_username=f"bench_{prefix}",
+        poste_id=_uuid(prefix, "poste", 0),
+        # Sessions are numbered from the most recent one
+        busiest_session_id=_uuid(prefix, "session", 0),
+    )
+    params = {
+        "prefix": prefix,
+        "rows": rows,
+        "site_id": dataset.site_id,
+        "operator_id": dataset.operator_id,
+        "poste_id": dataset.poste_id,
+        "roots": ROOT_CATEGORIES,
+        "children": CHILD_CATEGORIES_PER_ROOT,
+        "per_session": SALES_PER_SESSION,
+        "sessions": max(1, rows // SALES_PER_SESSION),
+        "tickets": max(1, rows // LINES_PER_TICKET),
+        "lines_per_ticket": LINES_PER_TICKET,
+    }
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO sites (id, name, is_active) VALUES (:site_id, 'bench-' || :prefix, true)"),
+            params,
+        )
+        conn.execute(
+            text(
+                "INSERT INTO users (id, username, hashed_password, role, status, is_active, site_id) "
+                "VALUES (:operator_id, :username, :hashed_password, 'admin', 'approved', true, :site_id)"
+            ),
+            {**params, "username": dataset.operator_username, "hashed_password": hash_password(OPERATOR_PASSWORD)},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO poste_reception (id, opened_by_user_id, opened_at, closed_at, status) "
+                "VALUES (:poste_id, :operator_id, now(), now(), 'closed')"
+            ),
+            params,
+        )
+        for statement in _SEED_STATEMENTS:
+            conn.execute(text(statement), params)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in ("categories", "cash_sessions", "sales", "sale_items", "ticket_depot", "ligne_depot"):
+            conn.execute(text(f"ANALYZE {table}"))
+    return dataset
+
+
+def drop_dataset(engine: Engine, dataset: PerfDataset) -> None:
+    params = {
+        "prefix": dataset.prefix,
+        "site_id": dataset.site_id,
+        "operator_id": dataset.operator_id,
+        "poste_id": dataset.poste_id,
+    }
+    with engine.begin() as conn:
+        for statement in _DROP_STATEMENTS:
+            conn.execute(text(statement), params)
@@ -0,0 +1,162 @@
+"""
+Measurement and baseline comparison for the API benchmark suite.
+
+Each scenario runs a callable a fixed number of times (after a warm-up) and
+records, per call, the wall-clock latency and the number of SQL statements sent
+to PostgreSQL. Results are compared with the JSON baseline of the dataset scale
+being run; a slower p95 (beyond the tolerance) or an extra SQL statement is a
+regression.
+"""
+import json
+import math
+import statistics
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+# p95 regressions smaller than this are noise on any machine
+MIN_REGRESSION_MS = 5.0
+
+
+class QueryCounter:
+    """Counts the SQL statements executed, whatever the thread running them."""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.count += 1
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(Engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(Engine, "before_cursor_execute", self._on_execute)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    iterations: int
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+    mean_ms: float
+    queries: int  # SQL statements per call (maximum over the measured calls)
+
+    @classmethod
+    def from_samples(cls, name: str, durations_ms: List[float], queries: List[int]) -> "ScenarioResult":
+        return cls(
+            name=name,
+            iterations=len(durations_ms),
+            p50_ms=round(percentile(durations_ms, 50), 2),
+            p95_ms=round(percentile(durations_ms, 95), 2),
+            max_ms=round(max(durations_ms), 2),
+            mean_ms=round(statistics.fmean(durations_ms), 2),
+            queries=max(queries),
+        )
+
+    def summary(self) -> str:
+        return (
+            f"{self.name}: p50={self.p50_ms:.1f}ms p95={self.p95_ms:.1f}ms "
+            f"max={self.max_ms:.1f}ms queries={self.queries} (n={self.iterations})"
+        )
+
+
+def run_scenario(
+    name: str,
+    call: Callable[[], object],
+    iterations: int,
+    warmup: int = 2,
+    setup: Optional[Callable[[], object]] = None,
+) -> ScenarioResult:
+    """
+    Run ``call`` ``warmup + iterations`` times and measure the last ``iterations``.
+
+    ``setup``, when given, runs before each call outside of the measurement and
+    its return value is passed to ``call`` (e.g. a fresh cash session to close).
+    """
+    durations_ms: List[float] = []
+    queries: List[int] = []
+    for index in range(warmup + iterations):
+        argument = setup() if setup is not None else None
+        with QueryCounter() as counter:
+            started = time.perf_counter()
+            call(argument) if setup is not None else call()
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+        if index >= warmup:
+            durations_ms.append(elapsed_ms)
+            queries.append(counter.count)
+    return ScenarioResult.from_samples(name, durations_ms, queries)
+
+
+@dataclass
+class Baseline:
+    """Reference results per dataset scale, stored as JSON in the repository."""
+
+    path: Path = DEFAULT_BASELINE_PATH
+    scales: Dict[str, Dict[str, dict]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "Baseline":
+        path = Path(path or DEFAULT_BASELINE_PATH)
+        if not path.exists():
+            return cls(path=path)
+        with path.open(encoding="utf-8") as handle:
+            return cls(path=path, scales=json.load(handle))
+
+    def get(self, scale: str, name: str) -> Optional[dict]:
+        return self.scales.get(scale, {}).get(name)
+
+    def record(self, scale: str, result: ScenarioResult) -> None:
+        entry = asdict(result)
+        del entry["name"]
+        self.scales.setdefault(scale, {})[result.name] = entry
+
+    def save(self) -> None:
+        ordered = {scale: dict(sorted(results.items())) for scale, results in sorted(self.scales.items())}
+        with self.path.open("w", encoding="utf-8") as handle:
+            json.dump(ordered, handle, indent=2)
+            handle.write("\n")
+
+    def regressions(
+        self, scale: str, result: ScenarioResult, tolerance: float, compare_timings: bool = False
+    ) -> List[str]:
+        """
+        Reasons why ``result`` is worse than the baseline (empty when it is not).
+
+        SQL statement counts do not depend on the machine and are always compared.
+        Timings are only comparable on the machine that recorded the baseline:
+        they are compared when ``compare_timings`` is set.
+        """
+        reference = self.get(scale, result.name)
+        if reference is None:
+            return []
+        problems = []
+        if result.queries > reference["queries"]:
+            problems.append(f"{result.queries} SQL statements > baseline {reference['queries']}")
+        if not compare_timings:
+            return problems
+        allowed_p95 = max(reference["p95_ms"] * (1 + tolerance), reference["p95_ms"] + MIN_REGRESSION_MS)
+        if result.p95_ms > allowed_p95:
+            problems.append(
+                f"p95 {result.p95_ms:.1f}ms > {allowed_p95:.1f}ms (baseline {reference['p95_ms']:.1f}ms)"
+            )
+        return problems
@@ -0,0 +1,177 @@
+"""
+Benchmarks of the API hot paths on a seeded dataset.
+
+Opt-in (the dataset is committed to the test database, then removed):
+
+    RECYC_PERF=1 RECYC_PERF_SCALE=100k pytest tests/perf -p no:cacheprovider
+
+Each scenario asserts an absolute SQL statement and p95 budget, then compares
+its statement count with tests/perf/baseline.json. p95 is compared with the
+baseline only with RECYC_PERF_COMPARE_TIMINGS=1, on the machine that recorded
+it. To prove an optimisation, record a baseline before the change
+(RECYC_PERF_UPDATE_BASELINE=1 RECYC_PERF_BASELINE=/tmp/before.json) and run
+the suite again after it with RECYC_PERF_COMPARE_TIMINGS=1 on the same machine.
+"""
+import os
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from recyclic_api.core.redis import get_redis
+from recyclic_api.models.cash_session import CashSession, CashSessionStatus
+
+from .datasets import OPERATOR_PASSWORD, PerfDataset
+
+pytestmark = [
+    pytest.mark.performance,
+    pytest.mark.skipif(os.getenv("RECYC_PERF") != "1", reason="benchmarks disabled (set RECYC_PERF=1)"),
+]
+
+
+def _ok(response, status_code: int = 200):
+    assert response.status_code == status_code, response.text
+    return response
+
+
+def _open_session(db_session: Session, dataset: PerfDataset) -> CashSession:
+    session = CashSession(
+        operator_id=dataset.operator_id,
+        site_id=dataset.site_id,
+        initial_amount=50.0,
+        current_amount=50.0,
+        status=CashSessionStatus.OPEN,
+        opened_at=datetime.now(timezone.utc),
+    )
+    db_session.add(session)
+    db_session.commit()
+    return session
+
+
+def test_auth_login(bench, perf_client: TestClient, perf_dataset: PerfDataset):
+    credentials = {"username": perf_dataset.operator_username, "password": OPERATOR_PASSWORD}
+    client = TestClient(perf_client.app)
+
+    bench(
+        "auth_login",
+        lambda: _ok(client.post("/api/v1/auth/login", json=credentials)),
+        iterations=10,
+        max_queries=7,
+        max_p95_ms=2000,
+    )
+
+
+def test_auth_current_user(bench, perf_client: TestClient):
+    bench(
+        "auth_me",
+        lambda: _ok(perf_client.get("/api/v1/users/me")),
+        max_queries=1,
+        max_p95_ms=200,
+    )
+
+
+def test_sale_creation(bench, perf_client: TestClient, perf_dataset: PerfDataset, db_session: Session):
+    session = _open_session(db_session, perf_dataset)
+    payload = {
+        "cash_session_id": str(session.id),
+        "items": [
+            {"category": "EEE-1", "quantity": 1, "weight": 1.5, "unit_price": 5.0, "total_price": 5.0},
+            {"category": "EEE-2", "quantity": 1, "weight": 0.5, "unit_price": 2.0, "total_price": 2.0},
+        ],
+        "total_amount": 7.0,
+        "donation": 1.0,
+        "payment_method": "cash",
+    }
+
+    bench(
+        "sale_create",
+        lambda: _ok(perf_client.post("/api/v1/sales/", json=payload)),
+        max_queries=8,
+        max_p95_ms=500,
+    )
+
+
+def test_session_close(bench, perf_client: TestClient, perf_dataset: PerfDataset, db_session: Session):
+    bench(
+        "session_close",
+        lambda session: _ok(
+            perf_client.post(f"/api/v1/cash-sessions/{session.id}/close", json={"actual_amount": 50.0})
+        ),
+        setup=lambda: _open_session(db_session, perf_dataset),
+        max_queries=12,
+        max_p95_ms=1000,
+    )
+
+
+def test_dashboard_stats(bench, perf_client: TestClient, perf_dataset: PerfDataset):
+    bench(
+        "dashboard_stats",
+        lambda: _ok(perf_client.get("/api/v1/admin/dashboard/stats", params={"site_id": str(perf_dataset.site_id)})),
+        max_queries=14,
+        max_p95_ms=2000,
+    )
+
+
+def test_cash_sessions_list(bench, perf_client: TestClient, perf_dataset: PerfDataset):
+    bench(
+        "cash_sessions_list",
+        lambda: _ok(perf_client.get("/api/v1/cash-sessions/", params={"site_id": str(perf_dataset.site_id), "limit": 50})),
+        max_queries=4,
+        max_p95_ms=1000,
+    )
+
+
+def test_reception_stats(bench, perf_client: TestClient):
+    bench(
+        "reception_summary",
+        lambda: _ok(perf_client.get("/api/v1/stats/reception/summary")),
+        max_queries=1,
+        max_p95_ms=2000,
+    )
+    bench(
+        "reception_by_category",
+        lambda: _ok(perf_client.get("/api/v1/stats/reception/by-category")),
+        max_queries=1,
+        max_p95_ms=2000,
+    )
+
+
+def test_category_hierarchy(bench, perf_client: TestClient, monkeypatch):
+    bench(
+        "category_hierarchy",
+        lambda: _ok(perf_client.get("/api/v1/categories/hierarchy")),
+        max_queries=3,
+        max_p95_ms=500,
+    )
+
+    # Same endpoint served by the response cache (bypassed under tests by default)
+    monkeypatch.setattr("recyclic_api.utils.response_cache._is_test_mode", lambda: False)
+    try:
+        bench(
+            "category_hierarchy_cached",
+            lambda: _ok(perf_client.get("/api/v1/categories/hierarchy")),
+            max_queries=0,
+            max_p95_ms=100,
+        )
+    finally:
+        redis_client = get_redis()
+        keys = list(redis_client.scan_iter(match="response_cache:entry:*"))
+        if keys:
+            redis_client.delete(*keys)
+
+
+def test_exports(bench, perf_client: TestClient, perf_dataset: PerfDataset):
+    bench(
+        "categories_export_csv",
+        lambda: _ok(perf_client.get("/api/v1/categories/actions/export", params={"format": "csv"})),
+        max_queries=1,
+        max_p95_ms=1000,
+    )
+    bench(
+        "session_report_csv",
+        lambda: _ok(perf_client.get(f"/api/v1/admin/reports/cash-sessions/by-session/{perf_dataset.busiest_session_id}")),
+        iterations=10,
+        max_queries=4,
+        max_p95_ms=2000,
+    )
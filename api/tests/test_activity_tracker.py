@@ -0,0 +1,122 @@
+"""
+Tests du middleware de suivi d'activité et de l'écriture par lots.
+"""
+import time
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from recyclic_api.core.auth import create_access_token
+from recyclic_api.core.redis import get_redis
+from recyclic_api.middleware.activity_tracker import ActivityTrackerMiddleware
+from recyclic_api.services.activity_service import ActivityBatchWriter, ActivityService
+
+
+@pytest.fixture
+def user_ids():
+    ids = [str(uuid.uuid4()) for _ in range(2)]
+    yield ids
+    client = get_redis()
+    for user_id in ids:
+        client.delete(f"last_activity:{user_id}", f"last_activity_meta:{user_id}", f"last_logout:{user_id}")
+
+
+@pytest.fixture
+def batch_writer(db_engine):
+    return ActivityBatchWriter(session_factory=sessionmaker(bind=db_engine))
+
+
+def _client(batch_writer: ActivityBatchWriter, debounce_seconds: float = 60) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping():
+        return {"status": "ok"}
+
+    app.add_middleware(ActivityTrackerMiddleware, debounce_seconds=debounce_seconds, batch_writer=batch_writer)
+    return TestClient(app)
+
+
+def _headers(user_id: str) -> dict:
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': user_id})}"}
+
+
+class TestActivityTrackerMiddleware:
+
+    def test_activity_is_debounced_then_flushed_in_batch(self, batch_writer, user_ids):
+        client = _client(batch_writer)
+        first, second = user_ids
+
+        for _ in range(3):
+            client.get("/ping", headers=_headers(first))
+        client.get("/ping", headers=_headers(second))
+
+        # Nothing written during the requests, one entry per user queued
+        assert get_redis().get(f"last_activity:{first}") is None
+        assert batch_writer.pending_count() == 2
+
+        assert batch_writer.flush() == 2
+        service = ActivityService()
+        assert service.get_last_activity_timestamp(first) is not None
+        assert service.get_last_activity_timestamp(second) is not None
+        assert get_redis().hget(f"last_activity_meta:{first}", "last_endpoint") == "/ping"
+
+    def test_activity_is_queued_again_after_window(self, batch_writer, user_ids):
+        client = _client(batch_writer, debounce_seconds=0)
+
+        client.get("/ping", headers=_headers(user_ids[0]))
+        batch_writer.flush()
+        client.get("/ping", headers=_headers(user_ids[0]))
+
+        assert batch_writer.pending_count() == 1
+
+    def test_token_with_invalid_signature_is_ignored(self, batch_writer, user_ids):
+        client = _client(batch_writer)
+        header, payload, _ = create_access_token(data={"sub": user_ids[0]}).split(".")
+
+        client.get("/ping", headers={"Authorization": f"Bearer {header}.{payload}.forged"})
+        client.get("/ping")
+
+        assert batch_writer.pending_count() == 0
+
+    def test_new_activity_clears_logout_marker(self, batch_writer, user_ids):
+        service = ActivityService()
+        get_redis().set(f"last_logout:{user_ids[0]}", int(time.time()) - 10)
+
+        batch_writer.add(user_ids[0])
+        batch_writer.flush()
+
+        assert service.get_last_logout_timestamp(user_ids[0]) is None
+        assert service.get_last_activity_timestamp(user_ids[0]) is not None
+
+    def test_logout_is_not_undone_by_queued_activity(self, batch_writer, user_ids, monkeypatch):
+        monkeypatch.setattr("recyclic_api.services.activity_service.activity_batch_writer", batch_writer)
+        app = FastAPI()
+
+        @app.get("/ping")
+        def ping():
+            return {"status": "ok"}
+
+        @app.post("/api/v1/auth/logout")
+        def logout():
+            ActivityService().clear_user_activity(user_ids[0])
+            return {"message": "ok"}
+
+        app.add_middleware(ActivityTrackerMiddleware, debounce_seconds=0, batch_writer=batch_writer)
+        client = TestClient(app)
+        client.get("/ping", headers=_headers(user_ids[0]))
+        client.post("/api/v1/auth/logout", headers=_headers(user_ids[0]))
+        # Entrée mise en attente par un autre worker avant la déconnexion
+        other_worker = ActivityBatchWriter(session_factory=batch_writer.session_factory)
+        other_worker._pending[user_ids[0]] = (int(time.time()) - 5, None)
+
+        assert batch_writer.pending_count() == 0
+        assert batch_writer.flush() == 0
+        assert other_worker.flush() == 0
+
+        service = ActivityService()
+        assert service.get_last_activity_timestamp(user_ids[0]) is None
+        assert service.get_last_logout_timestamp(user_ids[0]) is not None
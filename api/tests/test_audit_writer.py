@@ -0,0 +1,101 @@
+"""
+Tests de l'écriture du journal d'audit par lots (file en mémoire, fichier de secours).
+"""
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.orm import Session, sessionmaker
+
+from recyclic_api.core.audit import log_audit
+from recyclic_api.models.audit_log import AuditActionType, AuditLog
+from recyclic_api.services.audit_writer_service import AuditLogWriter
+
+
+def _unavailable_database():
+    raise ConnectionError("database unavailable")
+
+
+@pytest.fixture
+def writer(db_session: Session, tmp_path):
+    return AuditLogWriter(session_factory=lambda: db_session, max_queue_size=3, spool_path=str(tmp_path / "audit.jsonl"))
+
+
+@pytest.fixture
+def running_writer(writer, monkeypatch):
+    writer.running = True
+    monkeypatch.setattr("recyclic_api.core.audit.get_audit_log_writer", lambda: writer)
+    return writer
+
+
+def _log(db_session: Session, description: str):
+    return log_audit(AuditActionType.SYSTEM_CONFIG_CHANGED, description=description, details={"n": 1}, db=db_session)
+
+
+def _descriptions(db_session: Session, prefix: str):
+    rows = db_session.query(AuditLog).filter(AuditLog.description.like(f"{prefix}%")).all()
+    return sorted(row.description for row in rows)
+
+
+def test_log_audit_is_queued_then_flushed_in_one_batch(db_session: Session, running_writer):
+    entries = [_log(db_session, f"batch-{index}") for index in range(3)]
+
+    assert running_writer.pending_count() == 3
+    assert _descriptions(db_session, "batch-") == []
+
+    assert running_writer.flush() == 3
+    assert _descriptions(db_session, "batch-") == ["batch-0", "batch-1", "batch-2"]
+    assert db_session.get(AuditLog, entries[0].id) is not None
+
+
+def test_log_audit_writes_synchronously_without_writer(db_session: Session):
+    entry = _log(db_session, "sync-write")
+
+    assert entry is not None
+    assert _descriptions(db_session, "sync-") == ["sync-write"]
+
+
+def test_failed_flush_spools_events_and_replays_them(db_session: Session, running_writer):
+    _log(db_session, "spool-0")
+    running_writer.session_factory = _unavailable_database
+
+    assert running_writer.flush() == 0
+    assert running_writer.pending_count() == 0
+
+    running_writer.session_factory = lambda: db_session
+    _log(db_session, "spool-1")
+
+    assert running_writer.flush() == 2
+    assert _descriptions(db_session, "spool-") == ["spool-0", "spool-1"]
+    # Rejoué une seule fois
+    assert running_writer.flush() == 0
+
+
+def test_queue_overflow_goes_to_spool_file(db_session: Session, running_writer):
+    for index in range(5):
+        _log(db_session, f"overflow-{index}")
+
+    assert running_writer.pending_count() == 3
+    with open(running_writer.spool_path, encoding="utf-8") as spool:
+        assert len(spool.readlines()) == 2
+
+    assert running_writer.flush() == 5
+    assert len(_descriptions(db_session, "overflow-")) == 5
+
+
+def test_rejected_row_goes_to_dead_letter_file(db_session: Session, running_writer):
+    # Chaque insertion dans son savepoint : l'échec d'une ligne n'annule pas la transaction du test
+    running_writer.session_factory = sessionmaker(bind=db_session.get_bind(), join_transaction_mode="create_savepoint")
+    _log(db_session, "dead-0")
+    running_writer.add({**running_writer._pending[0], "id": uuid4(), "actor_id": uuid4(), "description": "dead-bad"})
+    _log(db_session, "dead-1")
+
+    # La ligne dont l'acteur n'existe pas viole la clé étrangère : les autres sont écrites
+    assert running_writer.flush() == 2
+    assert _descriptions(db_session, "dead-") == ["dead-0", "dead-1"]
+    with open(running_writer.dead_letter_path, encoding="utf-8") as dead:
+        assert ["dead-bad" in line for line in dead.readlines()] == [True]
+
+    # La ligne rejetée ne bloque plus les vidages suivants
+    _log(db_session, "dead-2")
+    assert running_writer.flush() == 1
+    assert _descriptions(db_session, "dead-") == ["dead-0", "dead-1", "dead-2"]
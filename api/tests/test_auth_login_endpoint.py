@@ -294,4 +294,38 @@ class TestAuthLoginEndpoint:
                 "password": "casesensitive123"
             }
         )
-        assert response.status_code == 401
\ No newline at end of file
+        assert response.status_code == 401
+
+    def test_login_rehashes_password_with_outdated_cost(self, client: TestClient, db_session: Session):
+        """Test qu'un hash bcrypt au coût obsolète est recalculé à la connexion"""
+        from passlib.context import CryptContext
+        from recyclic_api.core.security import pwd_context
+
+        legacy_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+        legacy_hash = legacy_context.hash("RehashMe123!")
+        assert pwd_context.needs_update(legacy_hash)
+
+        test_user = User(
+            username="rehash_test_endpoint",
+            hashed_password=legacy_hash,
+            role=UserRole.USER,
+            status=UserStatus.APPROVED,
+            is_active=True
+        )
+        db_session.add(test_user)
+        db_session.commit()
+
+        response = client.post(
+            "/api/v1/auth/login",
+            json={
+                "username": "rehash_test_endpoint",
+                "password": "RehashMe123!"
+            }
+        )
+        assert response.status_code == 200
+
+        db_session.expire_all()
+        refreshed = db_session.get(User, test_user.id)
+        assert refreshed.hashed_password != legacy_hash
+        assert not pwd_context.needs_update(refreshed.hashed_password)
+        assert pwd_context.verify("RehashMe123!", refreshed.hashed_password)
\ No newline at end of file
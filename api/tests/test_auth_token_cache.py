@@ -0,0 +1,170 @@
+import time
+import uuid
+
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+
+from recyclic_api.core.auth import CachedUser, get_current_user, invalidate_user_auth_cache
+from recyclic_api.core.auth_cache import (
+    INVALIDATION_CHANNEL,
+    AuthCacheInvalidationListener,
+    VerifiedTokenCache,
+    get_verified_token_cache,
+)
+from recyclic_api.core.security import create_access_token
+from recyclic_api.models.user import User, UserRole, UserStatus
+
+
+class CountingRedis:
+    """Redis stub recording the commands sent by the auth dependency."""
+
+    def __init__(self):
+        self.storage = {}
+        self.calls = []
+
+    def get(self, key):
+        self.calls.append(("get", key))
+        return self.storage.get(key)
+
+    def set(self, key, value, ex=None):
+        self.calls.append(("set", key))
+        self.storage[key] = value
+        return True
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def delete(self, key):
+        self.calls.append(("delete", key))
+        self.storage.pop(key, None)
+
+    def publish(self, channel, message):
+        self.calls.append(("publish", channel, message))
+
+    def execute(self):
+        return []
+
+
+class ResultWrapper:
+    def __init__(self, obj):
+        self._obj = obj
+
+    def scalar_one_or_none(self):
+        return self._obj
+
+
+class CountingDBSession:
+    def __init__(self, user: User):
+        self.user = user
+        self.calls = 0
+
+    def execute(self, stmt):
+        self.calls += 1
+        return ResultWrapper(self.user)
+
+
+class DummyRequest:
+    def __init__(self, method: str):
+        self.method = method
+
+
+def _user() -> User:
+    return User(
+        id=uuid.uuid4(),
+        username="token-cache-user",
+        hashed_password="hashed",
+        role=UserRole.ADMIN,
+        status=UserStatus.APPROVED,
+        is_active=True,
+    )
+
+
+async def _authenticate(token, db, redis_client, method="GET"):
+    return await get_current_user(
+        credentials=HTTPAuthorizationCredentials(scheme="Bearer", credentials=token),
+        db=db,
+        redis_client=redis_client,
+        request=DummyRequest(method=method),
+    )
+
+
+@pytest.mark.asyncio
+async def test_repeated_safe_requests_are_served_from_local_cache(monkeypatch):
+    user = _user()
+    token = create_access_token(data={"sub": str(user.id)})
+    redis_client, db = CountingRedis(), CountingDBSession(user)
+
+    await _authenticate(token, db, redis_client, method="POST")
+    calls_after_first_request = len(redis_client.calls)
+
+    def fail_verify(token):
+        raise AssertionError("token should not be verified again")
+
+    monkeypatch.setattr("recyclic_api.core.auth.verify_token", fail_verify)
+    cached = await _authenticate(token, db, redis_client)
+
+    assert isinstance(cached, CachedUser)
+    assert cached.id == user.id and cached.role == UserRole.ADMIN
+    assert len(redis_client.calls) == calls_after_first_request
+    assert db.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_unsafe_requests_still_load_the_user_from_database():
+    user = _user()
+    token = create_access_token(data={"sub": str(user.id)})
+    redis_client, db = CountingRedis(), CountingDBSession(user)
+
+    await _authenticate(token, db, redis_client)
+    result = await _authenticate(token, db, redis_client, method="PATCH")
+
+    assert result is user
+    assert db.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidation_drops_local_entries_and_notifies_other_processes():
+    user = _user()
+    token = create_access_token(data={"sub": str(user.id)})
+    redis_client, db = CountingRedis(), CountingDBSession(user)
+    await _authenticate(token, db, redis_client)
+
+    invalidate_user_auth_cache(user.id, redis_client=redis_client)
+
+    assert get_verified_token_cache().get(token) is None
+    assert ("delete", f"user_cache:{user.id}") in redis_client.calls
+    assert ("publish", INVALIDATION_CHANNEL, str(user.id)) in redis_client.calls
+
+
+def test_listener_drops_entries_of_published_user():
+    cache = VerifiedTokenCache(max_size=10, ttl_seconds=60)
+    cache.put("token-a", "user-1", {})
+    cache.put("token-b", "user-2", {})
+
+    AuthCacheInvalidationListener(cache=cache)._on_message({"channel": INVALIDATION_CHANNEL, "data": "user-1"})
+
+    assert cache.get("token-a") is None
+    assert cache.get("token-b") is not None
+
+
+def test_entries_never_outlive_token_expiration():
+    cache = VerifiedTokenCache(max_size=10, ttl_seconds=60)
+
+    cache.put("expired", "user-1", {"exp": time.time() - 1})
+    entry = cache.put("short", "user-1", {"exp": time.time() + 5})
+
+    assert cache.get("expired") is None
+    assert entry.expires_at <= time.monotonic() + 5
+
+
+def test_cache_is_bounded_least_recently_used_first():
+    cache = VerifiedTokenCache(max_size=2, ttl_seconds=60)
+    cache.put("token-a", "user-1", {})
+    cache.put("token-b", "user-2", {})
+    cache.get("token-a")
+
+    cache.put("token-c", "user-3", {})
+
+    assert len(cache) == 2
+    assert cache.get("token-b") is None
+    assert cache.get("token-a") is not None
@@ -1,6 +1,8 @@
+import asyncio
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 from pathlib import Path
 from urllib.parse import urlparse, parse_qs
 from unittest.mock import patch, MagicMock
@@ -11,6 +13,7 @@ from recyclic_api.models.user import User, UserRole, UserStatus
 from recyclic_api.models.site import Site
 from recyclic_api.core.auth import create_access_token
 from recyclic_api.core.config import settings
+from recyclic_api.services.cash_session_close_service import CashSessionCloseWorker
 from recyclic_api.utils.report_tokens import verify_download_token
 
 @pytest.fixture
@@ -56,11 +59,12 @@ def test_site(client, db_session: Session):
 
 
 @pytest.fixture
-def report_environment(monkeypatch, tmp_path):
-    """Configure report directory and mock email service."""
+def report_environment(monkeypatch, tmp_path, db_session: Session):
+    """Configure report directory and return a runner for the post-close jobs."""
     report_dir = tmp_path / 'reports'
     monkeypatch.setattr(settings, 'CASH_SESSION_REPORT_DIR', str(report_dir))
     monkeypatch.setattr(settings, 'CASH_SESSION_REPORT_RECIPIENT', 'reports@example.com')
+    monkeypatch.setattr(settings, 'KDRIVE_SYNC_ENABLED', False)
 
     report_dir.mkdir(parents=True, exist_ok=True)
 
@@ -71,20 +75,41 @@ def report_environment(monkeypatch, tmp_path):
         file_path.write_text("session_id\n", encoding='utf-8')
         return file_path
 
-    fake_email_service = MagicMock()
-    fake_email_service.send_email.return_value = True
-    fake_email_service.report_dir = report_dir
-
     monkeypatch.setattr(
-        'recyclic_api.api.api_v1.endpoints.cash_sessions.generate_cash_session_report',
+        'recyclic_api.services.cash_session_close_service.generate_cash_session_report',
         _fake_generate,
     )
-    monkeypatch.setattr(
-        'recyclic_api.api.api_v1.endpoints.cash_sessions.get_email_service',
-        lambda: fake_email_service,
-    )
 
-    return fake_email_service
+    worker = CashSessionCloseWorker(session_factory=sessionmaker(bind=db_session.get_bind()))
+
+    def run_close_jobs() -> int:
+        return asyncio.run(worker.process_batch())
+
+    return run_close_jobs
+
+
+def assert_close_job_completed(client: TestClient, session_id, headers, run_close_jobs):
+    """Run the pending post-close jobs and check the report was produced and mailed."""
+    assert run_close_jobs() == 1
+
+    response = client.get(f"/api/v1/cash-sessions/{session_id}/close-job", headers=headers)
+    assert response.status_code == 200
+    job = response.json()
+    assert job["status"] == "completed"
+    assert job["report_status"] == "done"
+    assert job["kdrive_status"] == "skipped"
+
+    parsed = urlparse(job["report_download_url"])
+    token = parse_qs(parsed.query).get('token', [None])[0]
+    assert token
+    filename = Path(parsed.path).name
+    assert verify_download_token(token, filename)
+    assert (Path(settings.CASH_SESSION_REPORT_DIR) / filename).exists()
+
+    # L'email est mis en file d'envoi (outbox), pas envoyé pendant le traitement
+    assert job["email_status"] == "done"
+    assert job["email_delivery_status"] == "pending"
+
 
 @pytest.fixture
 def test_cash_session(client, db_session: Session, test_user: User, test_site: Site):
@@ -133,16 +158,10 @@ class TestCashSessionClose:
         assert data["variance"] == 0.0
         assert data["variance_comment"] is None
 
-        download_url = data["report_download_url"]
-        parsed = urlparse(download_url)
-        token = parse_qs(parsed.query).get('token', [None])[0]
-        assert token
-        filename = Path(parsed.path).name
-        assert verify_download_token(token, filename)
-        assert (Path(settings.CASH_SESSION_REPORT_DIR) / filename).exists()
-
-        assert data["report_email_sent"] is True
-        assert report_environment.send_email.called
+        assert data["close_job_id"]
+        assert data["close_job_status"] == "pending"
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(test_user.id)})}"}
+        assert_close_job_completed(client, test_cash_session.id, headers, report_environment)
 
     def test_close_session_with_variance_and_comment(self, client: TestClient, db_session: Session, test_cash_session: CashSession, test_user: User, report_environment):
         """Test de fermeture de session avec écart et commentaire."""
@@ -170,16 +189,10 @@ class TestCashSessionClose:
         assert data["variance"] == 5.0
         assert data["variance_comment"] == "Petite monnaie supplémentaire trouvée"
 
-        download_url = data["report_download_url"]
-        parsed = urlparse(download_url)
-        token = parse_qs(parsed.query).get('token', [None])[0]
-        assert token
-        filename = Path(parsed.path).name
-        assert verify_download_token(token, filename)
-        assert (Path(settings.CASH_SESSION_REPORT_DIR) / filename).exists()
-
-        assert data["report_email_sent"] is True
-        assert report_environment.send_email.called
+        assert data["close_job_id"]
+        assert data["close_job_status"] == "pending"
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(test_user.id)})}"}
+        assert_close_job_completed(client, test_cash_session.id, headers, report_environment)
 
     def test_close_session_with_variance_without_comment_fails(self, client: TestClient, db_session: Session, test_cash_session: CashSession, test_user: User):
         """Test de fermeture de session avec écart mais sans commentaire (doit échouer)."""
@@ -298,12 +311,7 @@ class TestCashSessionClose:
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "closed"
-        download_url = data["report_download_url"]
-        parsed = urlparse(download_url)
-        token = parse_qs(parsed.query).get('token', [None])[0]
-        assert token
-        filename = Path(parsed.path).name
-        assert verify_download_token(token, filename)
-        assert (Path(settings.CASH_SESSION_REPORT_DIR) / filename).exists()
-        assert data["report_email_sent"] is True
-        assert report_environment.send_email.called
+        assert data["close_job_id"]
+        assert data["close_job_status"] == "pending"
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(test_user.id)})}"}
+        assert_close_job_completed(client, test_cash_session.id, headers, report_environment)
@@ -0,0 +1,196 @@
+"""
+Tests for the cash session post-close pipeline (report, email, kDrive).
+"""
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from sqlalchemy.orm import Session, sessionmaker
+
+from recyclic_api.core.config import settings
+from recyclic_api.models.cash_session import CashSession, CashSessionStatus
+from recyclic_api.models.cash_session_close_job import CashSessionCloseJob, CloseJobStatus, CloseJobStepStatus
+from recyclic_api.models.email_log import EmailStatus
+from recyclic_api.models.site import Site
+from recyclic_api.models.user import User, UserRole, UserStatus
+from recyclic_api.services.cash_session_close_service import CashSessionCloseJobService, CashSessionCloseWorker
+
+
+class FakeKDriveService:
+    """Records uploads instead of calling WebDAV."""
+
+    def __init__(self):
+        self.uploads = []
+
+    def upload_file_to_kdrive(self, local_path: Path, remote_path: str) -> str:
+        self.uploads.append((local_path, remote_path))
+        return remote_path
+
+
+@pytest.fixture
+def report_dir(monkeypatch, tmp_path):
+    directory = tmp_path / "reports"
+    directory.mkdir()
+    monkeypatch.setattr(settings, "CASH_SESSION_REPORT_DIR", str(directory))
+    monkeypatch.setattr(settings, "CASH_SESSION_REPORT_RECIPIENT", "reports@example.com")
+    monkeypatch.setattr(settings, "KDRIVE_SYNC_ENABLED", False)
+    return directory
+
+
+@pytest.fixture
+def generate_report(monkeypatch, report_dir):
+    """Fake report generation; set ``fail`` to make it raise."""
+    state = {"fail": False, "calls": 0}
+
+    def _fake_generate(db_session, cash_session, reports_dir=None):
+        state["calls"] += 1
+        if state["fail"]:
+            raise RuntimeError("disk full")
+        file_path = report_dir / f"cash_session_{cash_session.id}.csv"
+        file_path.write_text("session_id\n", encoding="utf-8")
+        return file_path
+
+    monkeypatch.setattr(
+        "recyclic_api.services.cash_session_close_service.generate_cash_session_report",
+        _fake_generate,
+    )
+    return state
+
+
+@pytest.fixture
+def close_job(db_session: Session) -> CashSessionCloseJob:
+    site = Site(name="Close Job Site", address="1 Rue", city="Paris", postal_code="75001", country="France", is_active=True)
+    db_session.add(site)
+    db_session.commit()
+    operator = User(
+        username="close_job_cashier",
+        hashed_password="x",
+        role=UserRole.USER,
+        status=UserStatus.APPROVED,
+        is_active=True,
+        site_id=site.id,
+    )
+    db_session.add(operator)
+    db_session.commit()
+    session = CashSession(
+        operator_id=operator.id,
+        site_id=site.id,
+        initial_amount=20.0,
+        current_amount=30.0,
+        status=CashSessionStatus.OPEN,
+        total_sales=10.0,
+        total_items=1,
+    )
+    db_session.add(session)
+    db_session.commit()
+
+    job = CashSessionCloseJobService(db_session).enqueue(session)
+    session.close_with_amounts(30.0, None)
+    db_session.commit()
+    return job
+
+
+def _worker(db_session: Session, **kwargs) -> CashSessionCloseWorker:
+    # The worker rolls back failed attempts: keep that inside a savepoint of the test transaction
+    session_factory = sessionmaker(bind=db_session.get_bind(), join_transaction_mode="create_savepoint")
+    return CashSessionCloseWorker(
+        session_factory=session_factory,
+        retry_base_seconds=60,
+        **kwargs,
+    )
+
+
+def _make_due(db_session: Session, job: CashSessionCloseJob) -> None:
+    job.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db_session.commit()
+
+
+class TestCashSessionCloseWorker:
+    """Test the steps, retries and final failure of the close jobs."""
+
+    @pytest.mark.asyncio
+    async def test_job_runs_all_steps(self, db_session: Session, generate_report, close_job):
+        processed = await _worker(db_session).process_batch()
+
+        assert processed == 1
+        db_session.expire_all()
+        assert close_job.status == CloseJobStatus.COMPLETED
+        assert close_job.completed_at is not None
+        assert close_job.report_status == CloseJobStepStatus.DONE
+        assert close_job.report_filename == f"cash_session_{close_job.cash_session_id}.csv"
+        assert close_job.email_status == CloseJobStepStatus.DONE
+        assert close_job.email_log.status == EmailStatus.PENDING
+        assert close_job.email_log.recipient_email == "reports@example.com"
+        assert close_job.kdrive_status == CloseJobStepStatus.SKIPPED
+
+        # Nothing left to do
+        assert await _worker(db_session).process_batch() == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_step_is_retried_with_backoff(self, db_session: Session, generate_report, close_job):
+        generate_report["fail"] = True
+
+        await _worker(db_session).process_batch()
+
+        db_session.expire_all()
+        assert close_job.status == CloseJobStatus.PENDING
+        assert close_job.attempts == 1
+        assert close_job.last_error == "disk full"
+        assert close_job.report_status == CloseJobStepStatus.PENDING
+        assert close_job.next_attempt_at > datetime.now(timezone.utc) + timedelta(seconds=50)
+        # Not due yet
+        assert await _worker(db_session).process_batch() == 0
+
+        generate_report["fail"] = False
+        _make_due(db_session, close_job)
+        await _worker(db_session).process_batch()
+
+        db_session.expire_all()
+        assert close_job.status == CloseJobStatus.COMPLETED
+        assert close_job.last_error is None
+        assert close_job.email_status == CloseJobStepStatus.DONE
+
+    @pytest.mark.asyncio
+    async def test_job_fails_after_max_attempts(self, db_session: Session, generate_report, close_job):
+        generate_report["fail"] = True
+        worker = _worker(db_session, max_attempts=2)
+
+        await worker.process_batch()
+        _make_due(db_session, close_job)
+        await worker.process_batch()
+
+        db_session.expire_all()
+        assert close_job.status == CloseJobStatus.FAILED
+        assert close_job.attempts == 2
+        assert close_job.next_attempt_at is None
+        assert close_job.report_status == CloseJobStepStatus.FAILED
+        assert close_job.email_status == CloseJobStepStatus.PENDING
+
+    @pytest.mark.asyncio
+    async def test_kdrive_upload_resumes_after_email(self, db_session: Session, monkeypatch, generate_report, close_job):
+        monkeypatch.setattr(settings, "KDRIVE_SYNC_ENABLED", True)
+        monkeypatch.setattr(settings, "CASH_SESSION_REPORT_KDRIVE_PATH", "/Recyclic/caisse")
+        kdrive = FakeKDriveService()
+
+        def _failing_kdrive():
+            raise ConnectionError("kDrive unreachable")
+
+        await _worker(db_session, kdrive_service_factory=_failing_kdrive).process_batch()
+
+        db_session.expire_all()
+        assert close_job.status == CloseJobStatus.PENDING
+        assert close_job.email_status == CloseJobStepStatus.DONE
+        assert close_job.kdrive_status == CloseJobStepStatus.PENDING
+        email_log_id = close_job.email_log_id
+
+        _make_due(db_session, close_job)
+        await _worker(db_session, kdrive_service_factory=lambda: kdrive).process_batch()
+
+        db_session.expire_all()
+        assert close_job.status == CloseJobStatus.COMPLETED
+        assert close_job.kdrive_status == CloseJobStepStatus.DONE
+        assert close_job.kdrive_remote_path == f"/Recyclic/caisse/{close_job.report_filename}"
+        # The retry neither regenerated the report nor queued a second email
+        assert generate_report["calls"] == 1
+        assert close_job.email_log_id == email_log_id
+        assert len(kdrive.uploads) == 1
@@ -0,0 +1,179 @@
+"""
+Tests for cursor pagination and total count modes of the cash session history.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from recyclic_api.core.auth import create_access_token
+from recyclic_api.core.config import settings
+from recyclic_api.core.redis import get_redis
+from recyclic_api.models.cash_session import CashSession, CashSessionStatus
+from recyclic_api.models.site import Site
+from recyclic_api.models.user import User, UserRole, UserStatus
+from recyclic_api.schemas.cash_session import CashSessionFilters
+from recyclic_api.services.cash_session_service import CashSessionService
+
+
+@pytest.fixture
+def history(db_session: Session):
+    """Seven sessions of one operator; three of them share the same opening time."""
+    site = Site(name="Pagination Site", is_active=True)
+    db_session.add(site)
+    db_session.commit()
+    operator = User(
+        username=f"pagination_{uuid.uuid4().hex[:8]}",
+        hashed_password="x",
+        role=UserRole.ADMIN,
+        status=UserStatus.APPROVED,
+        is_active=True,
+        site_id=site.id,
+    )
+    db_session.add(operator)
+    db_session.commit()
+
+    base = datetime(2025, 3, 1, 9, 0, tzinfo=timezone.utc)
+    opened = [base, base, base] + [base + timedelta(days=i) for i in range(1, 5)]
+    sessions = [
+        CashSession(
+            operator_id=operator.id,
+            site_id=site.id,
+            initial_amount=10.0,
+            current_amount=10.0,
+            status=CashSessionStatus.CLOSED,
+            opened_at=opened_at,
+        )
+        for opened_at in opened
+    ]
+    db_session.add_all(sessions)
+    db_session.commit()
+    return operator, sessions
+
+
+@pytest.fixture
+def count_cache():
+    yield
+    client = get_redis()
+    keys = list(client.scan_iter("cash_sessions:count:*"))
+    if keys:
+        client.delete(*keys)
+
+
+def _expected_order(sessions):
+    return [s.id for s in sorted(sessions, key=lambda s: (s.opened_at, s.id), reverse=True)]
+
+
+class TestCashSessionCursorPagination:
+
+    def test_cursor_walks_history_without_gaps_or_duplicates(self, db_session: Session, history):
+        operator, sessions = history
+        service = CashSessionService(db_session)
+
+        seen, cursor = [], None
+        while True:
+            page = service.get_sessions_page(
+                CashSessionFilters(operator_id=str(operator.id), limit=3, cursor=cursor)
+            )
+            seen.extend(s.id for s in page.sessions)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert seen == _expected_order(sessions)
+        assert page.total == 7
+
+    def test_cursor_matches_offset_pagination(self, db_session: Session, history):
+        operator, _ = history
+        service = CashSessionService(db_session)
+
+        first = service.get_sessions_page(CashSessionFilters(operator_id=str(operator.id), limit=4))
+        by_cursor = service.get_sessions_page(
+            CashSessionFilters(operator_id=str(operator.id), limit=4, cursor=first.next_cursor)
+        )
+        by_offset = service.get_sessions_page(CashSessionFilters(operator_id=str(operator.id), skip=4, limit=4))
+
+        assert [s.id for s in by_cursor.sessions] == [s.id for s in by_offset.sessions]
+        assert by_cursor.next_cursor is None
+
+    def test_endpoint_returns_next_cursor(self, client: TestClient, history):
+        operator, sessions = history
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(operator.id)})}"}
+
+        first = client.get(
+            "/api/v1/cash-sessions/",
+            params={"operator_id": str(operator.id), "limit": 5},
+            headers=headers,
+        )
+        assert first.status_code == 200
+        body = first.json()
+        assert body["next_cursor"]
+        assert body["total_is_approximate"] is False
+
+        second = client.get(
+            "/api/v1/cash-sessions/",
+            params={"operator_id": str(operator.id), "limit": 5, "cursor": body["next_cursor"]},
+            headers=headers,
+        )
+        assert second.status_code == 200
+        ids = [item["id"] for item in body["data"] + second.json()["data"]]
+        assert ids == [str(session_id) for session_id in _expected_order(sessions)]
+        assert second.json()["next_cursor"] is None
+
+    def test_endpoint_rejects_invalid_cursor(self, client: TestClient, history):
+        operator, _ = history
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(operator.id)})}"}
+
+        response = client.get("/api/v1/cash-sessions/", params={"cursor": "not-a-cursor"}, headers=headers)
+
+        assert response.status_code == 400
+
+
+class TestCashSessionCountModes:
+
+    def test_cached_count_is_reused(self, db_session: Session, history, count_cache):
+        operator, sessions = history
+        service = CashSessionService(db_session)
+        filters = CashSessionFilters(operator_id=str(operator.id), count="cached")
+
+        first = service.get_sessions_page(filters)
+        db_session.add(CashSession(
+            operator_id=operator.id,
+            site_id=sessions[0].site_id,
+            initial_amount=10.0,
+            current_amount=10.0,
+            status=CashSessionStatus.OPEN,
+        ))
+        db_session.commit()
+        second = service.get_sessions_page(filters)
+
+        assert (first.total, first.total_is_approximate) == (7, False)
+        assert (second.total, second.total_is_approximate) == (7, True)
+        assert service.get_sessions_page(CashSessionFilters(operator_id=str(operator.id))).total == 8
+
+    def test_estimate_below_threshold_counts_exactly(self, db_session: Session, history):
+        operator, _ = history
+        page = CashSessionService(db_session).get_sessions_page(
+            CashSessionFilters(operator_id=str(operator.id), count="estimate")
+        )
+
+        assert (page.total, page.total_is_approximate) == (7, False)
+
+    def test_estimate_uses_query_planner(self, db_session: Session, history, monkeypatch):
+        operator, _ = history
+        monkeypatch.setattr(settings, "CASH_SESSION_COUNT_ESTIMATE_THRESHOLD", 0)
+
+        page = CashSessionService(db_session).get_sessions_page(
+            CashSessionFilters(
+                operator_id=str(operator.id),
+                date_from=datetime(2025, 1, 1),
+                search="pagination",
+                count="estimate",
+            )
+        )
+
+        assert page.total_is_approximate is True
+        assert page.total >= 0
+        assert len(page.sessions) == 7
@@ -1,9 +1,9 @@
+import asyncio
 from pathlib import Path
 from urllib.parse import urlparse, parse_qs
 
 from fastapi.testclient import TestClient
-from sqlalchemy.orm import Session
-from unittest.mock import MagicMock
+from sqlalchemy.orm import Session, sessionmaker
 
 from recyclic_api.core.auth import create_access_token
 from recyclic_api.core.config import settings
@@ -13,6 +13,7 @@ from recyclic_api.models.sale import Sale
 from recyclic_api.models.sale_item import SaleItem
 from recyclic_api.models.site import Site
 from recyclic_api.models.user import User, UserRole, UserStatus
+from recyclic_api.services.cash_session_close_service import CashSessionCloseWorker
 from recyclic_api.utils.report_tokens import verify_download_token, generate_download_token
 
 
@@ -60,12 +61,7 @@ def test_cash_session_report_workflow(monkeypatch, tmp_path: Path, client: TestC
     monkeypatch.setattr(settings, "CASH_SESSION_REPORT_DIR", str(reports_dir))
     monkeypatch.setattr(settings, "CASH_SESSION_REPORT_RECIPIENT", "reports@example.com")
 
-    fake_email_service = MagicMock()
-    fake_email_service.send_email.return_value = True
-    monkeypatch.setattr(
-        'recyclic_api.api.api_v1.endpoints.cash_sessions.get_email_service',
-        lambda: fake_email_service,
-    )
+    monkeypatch.setattr(settings, "KDRIVE_SYNC_ENABLED", False)
 
     site = _create_site(db_session, "Workflow Site")
     cashier = _create_user(db_session, username="cashier_workflow", role=UserRole.USER, site=site)
@@ -106,12 +102,23 @@ def test_cash_session_report_workflow(monkeypatch, tmp_path: Path, client: TestC
     )
 
     assert response.status_code == 200
-    payload = response.json()
-    assert payload["report_download_url"].startswith(settings.API_V1_STR)
-    assert payload["report_email_sent"] is True
-    fake_email_service.send_email.assert_called_once()
+    assert response.json()["close_job_status"] == "pending"
+
+    # Le rapport et l'email sont produits par le worker post-fermeture
+    worker = CashSessionCloseWorker(session_factory=sessionmaker(bind=db_session.get_bind()))
+    assert asyncio.run(worker.process_batch()) == 1
+
+    job_response = client.get(
+        f"/api/v1/cash-sessions/{session.id}/close-job",
+        headers=_auth_headers(cashier),
+    )
+    assert job_response.status_code == 200
+    job = job_response.json()
+    assert job["status"] == "completed"
+    assert job["email_status"] == "done"
+    assert job["report_download_url"].startswith(settings.API_V1_STR)
 
-    download_url = payload["report_download_url"]
+    download_url = job["report_download_url"]
     parsed = urlparse(download_url)
     token = parse_qs(parsed.query).get("token", [None])[0]
     assert token
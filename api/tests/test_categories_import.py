@@ -175,3 +175,112 @@ def test_categories_import_execute_without_delete_existing(admin_client, db_sess
     # Il doit y avoir au moins 3 catégories (1 existante + 2 nouvelles)
     assert len(remaining_categories) >= 3
 
+
+
+def _import(service, csv_data: str, **kwargs):
+    analysis = service.analyze(make_csv(csv_data))
+    assert analysis["errors"] == []
+    return service.execute(analysis["session_id"], **kwargs)
+
+
+def test_categories_import_execute_applies_rows_in_order(db_session):
+    """Les lignes sont appliquées dans l'ordre du fichier et chaque ligne rapporte son résultat."""
+    from decimal import Decimal
+    from recyclic_api.models.category import Category
+    from recyclic_api.services.category_import_service import CategoryImportService
+
+    garden = Category(name="Jardin", is_active=True, price=Decimal("3.00"))
+    db_session.add(garden)
+    db_session.commit()
+    mower = Category(name="Tondeuse", is_active=False, parent_id=garden.id, price=Decimal("20.00"))
+    db_session.add(mower)
+    db_session.commit()
+
+    result = _import(
+        CategoryImportService(db_session),
+        "Catégorie racine,Sous-catégorie,Prix minimum (€),Prix maximum (€)\n"
+        "Outillage,,4,9\n"
+        "Outillage,Tondeuse,,40\n"
+        "Outillage,Perceuse,5,15\n"
+        "Outillage,Perceuse,,\n"
+        "Jardin,,,\n",
+    )
+
+    assert result["errors"] == []
+    assert [(r["line"], r["status"]) for r in result["rows"]] == [
+        (2, "created"),
+        (3, "updated"),
+        (4, "created"),
+        (5, "unchanged"),
+        (6, "unchanged"),
+    ]
+    assert (result["imported"], result["updated"]) == (2, 1)
+
+    db_session.expire_all()
+    tools = db_session.query(Category).filter(Category.name == "Outillage").one()
+    drill = db_session.query(Category).filter(Category.name == "Perceuse").one()
+    # Les prix de la racine sont retirés dès qu'elle reçoit une sous-catégorie
+    assert (tools.price, tools.max_price, tools.parent_id) == (None, None, None)
+    assert (mower.parent_id, mower.price, mower.max_price, mower.is_active) == (
+        tools.id, Decimal("20.00"), Decimal("40.00"), True
+    )
+    assert (drill.parent_id, drill.price, drill.max_price) == (tools.id, Decimal("5.00"), Decimal("15.00"))
+    assert garden.price == Decimal("3.00")
+
+
+def test_categories_import_execute_is_all_or_nothing(db_session, monkeypatch):
+    from sqlalchemy.orm import sessionmaker
+    from recyclic_api.models.category import Category
+    from recyclic_api.services.category_import_service import CategoryImportService
+
+    # Le rollback du service reste dans un savepoint de la transaction de test
+    session = sessionmaker(bind=db_session.get_bind(), join_transaction_mode="create_savepoint")()
+    service = CategoryImportService(session)
+    monkeypatch.setattr(CategoryImportService, "UPSERT_BATCH_SIZE", 1)
+    original = service._bulk_upsert
+
+    def _fail_after_writing(changed):
+        original(changed)
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(service, "_bulk_upsert", _fail_after_writing)
+
+    result = _import(
+        service,
+        "Catégorie racine,Sous-catégorie,Prix minimum (€),Prix maximum (€)\n"
+        "Livres,Romans,1,3\n"
+        "Livres,BD,2,6\n",
+    )
+
+    assert result == {"imported": 0, "updated": 0, "errors": ["Erreur d'exécution: disk full"], "rows": []}
+    assert session.query(Category).filter(Category.name.in_(["Livres", "Romans", "BD"])).count() == 0
+
+
+def test_categories_import_execute_batches_statements(db_session, monkeypatch):
+    from sqlalchemy import event
+    from recyclic_api.models.category import Category
+    from recyclic_api.services.category_import_service import CategoryImportService
+
+    lines = ["Catégorie racine,Sous-catégorie,Prix minimum (€),Prix maximum (€)"]
+    lines += [f"Racine {i % 12},Article {i},1,{i}" for i in range(1200)]
+    service = CategoryImportService(db_session)
+    analysis = service.analyze(make_csv("\n".join(lines) + "\n"))
+
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.lstrip().split()[0].upper())
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        result = service.execute(analysis["session_id"])
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+    assert result["errors"] == []
+    assert result["imported"] == 1200
+    # Une requête IN pour résoudre les noms, puis 1212 catégories en lots de 500
+    assert statements.count("SELECT") == 1
+    assert statements.count("INSERT") == 3
+    assert db_session.query(Category).filter(Category.name.like("Article %")).count() == 1200
@@ -8,11 +8,20 @@ from uuid import uuid4
 from openpyxl import load_workbook
 from PyPDF2 import PdfReader
 
+from recyclic_api.core.config import settings
 from recyclic_api.models.category import Category
 from recyclic_api.models.user import User, UserRole, UserStatus
 from recyclic_api.core.security import hash_password
 
 
+@pytest.fixture(autouse=True)
+def export_cache_dir(monkeypatch, tmp_path):
+    """Keep cached exports inside the test's temporary directory"""
+    cache_dir = tmp_path / "category_exports"
+    monkeypatch.setattr(settings, "CATEGORY_EXPORT_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
 class TestCategoryExportEndpoint:
     """Test export endpoint with authentication and authorization"""
 
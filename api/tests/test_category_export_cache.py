@@ -0,0 +1,140 @@
+"""Tests for the category export traversal and its per-version file cache."""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from recyclic_api.core.auth import create_access_token
+from recyclic_api.core.config import settings
+from recyclic_api.models.category import Category
+from recyclic_api.models.user import User, UserRole, UserStatus
+from recyclic_api.services.category_export_service import CategoryExportService
+
+
+@pytest.fixture
+def export_cache_dir(tmp_path):
+    return tmp_path / "category_exports"
+
+
+@pytest.fixture
+def category_tree(db_session):
+    """Two roots, a child and a grandchild"""
+    tools = Category(id=uuid4(), name="Tools", is_active=True, price=Decimal("5.00"))
+    appliances = Category(id=uuid4(), name="Appliances", is_active=True)
+    db_session.add_all([tools, appliances])
+    db_session.commit()
+    fridge = Category(id=uuid4(), name="Fridge", is_active=True, parent_id=appliances.id,
+                      price=Decimal("15.00"), max_price=Decimal("75.00"))
+    db_session.add(fridge)
+    db_session.commit()
+    door = Category(id=uuid4(), name="Fridge Door", is_active=True, parent_id=fridge.id)
+    db_session.add(door)
+    db_session.commit()
+    return {"tools": tools, "appliances": appliances, "fridge": fridge, "door": door}
+
+
+class TestCategoryExportService:
+    """Test export content and the per-version cache"""
+
+    def test_export_rows_come_from_a_single_traversal(self, db_session, category_tree, export_cache_dir):
+        rows = CategoryExportService(db_session, cache_dir=export_cache_dir)._get_export_rows()
+
+        assert [(row.category.name, row.level, row.root.name) for row in rows] == [
+            ("Appliances", 0, "Appliances"),
+            ("Fridge", 1, "Appliances"),
+            ("Fridge Door", 2, "Appliances"),
+            ("Tools", 0, "Tools"),
+        ]
+
+    def test_csv_keeps_import_contract(self, db_session, category_tree, export_cache_dir):
+        content = CategoryExportService(db_session, cache_dir=export_cache_dir).export_to_csv().decode("utf-8")
+
+        assert content.splitlines() == [
+            "Catégorie racine,Sous-catégorie,Prix minimum (€),Prix maximum (€)",
+            "Appliances,,,",
+            "Appliances,Fridge,15.00,75.00",
+            "Tools,,5.00,",
+        ]
+
+    def test_cached_export_is_reused_until_tree_changes(self, db_session, category_tree, export_cache_dir, monkeypatch):
+        service = CategoryExportService(db_session, cache_dir=export_cache_dir)
+        calls = []
+        original = service.write_csv
+        monkeypatch.setattr(service, "write_csv", lambda output: calls.append(1) or original(output))
+
+        first = service.get_cached_export("csv")
+        second = service.get_cached_export("csv")
+
+        assert first == second
+        assert first.parent == export_cache_dir
+        assert len(calls) == 1
+
+        category_tree["tools"].price = Decimal("6.00")
+        db_session.commit()
+        third = service.get_cached_export("csv")
+
+        assert third != first
+        assert len(calls) == 2
+        assert not first.exists()
+        assert [p.name for p in export_cache_dir.iterdir()] == [third.name]
+        assert "Tools,,6.00," in third.read_text(encoding="utf-8")
+
+    def test_open_export_survives_pruning_and_retries_vanished_file(
+        self, db_session, category_tree, export_cache_dir, monkeypatch
+    ):
+        service = CategoryExportService(db_session, cache_dir=export_cache_dir)
+        streaming = service.open_cached_export("csv")
+
+        # The tree changes while the first download is streaming: its file is pruned
+        category_tree["tools"].price = Decimal("7.00")
+        db_session.commit()
+        service.get_cached_export("csv")
+        assert b"Tools,,5.00," in streaming.read()
+        streaming.close()
+
+        # A file pruned by another worker before it is opened is looked up again
+        original = service.get_cached_export
+        paths = iter([export_cache_dir / "categories_pruned.csv"])
+        monkeypatch.setattr(service, "get_cached_export", lambda fmt: next(paths, None) or original(fmt))
+        with service.open_cached_export("csv") as reopened:
+            assert b"Tools,,7.00," in reopened.read()
+
+    def test_pdf_shows_tree_modification_time(self, db_session, category_tree, export_cache_dir):
+        category_tree["tools"].updated_at = datetime(2030, 2, 1, 12, 0, tzinfo=timezone.utc)
+        db_session.commit()
+        service = CategoryExportService(db_session, cache_dir=export_cache_dir)
+
+        last_modified = service.tree_last_modified()
+
+        assert last_modified == datetime(2030, 2, 1, 12, 0, tzinfo=timezone.utc)
+        assert service._format_last_modified(last_modified).startswith("Catégories à jour au 01/02/2030 à")
+
+    def test_get_cached_export_rejects_unknown_format(self, db_session, export_cache_dir):
+        with pytest.raises(ValueError):
+            CategoryExportService(db_session, cache_dir=export_cache_dir).get_cached_export("docx")
+
+
+def test_export_endpoint_streams_cached_file(client, db_session, category_tree, export_cache_dir, monkeypatch):
+    monkeypatch.setattr(settings, "CATEGORY_EXPORT_CACHE_DIR", str(export_cache_dir))
+    admin = User(
+        username=f"export_admin_{uuid4().hex[:8]}",
+        hashed_password="x",
+        role=UserRole.ADMIN,
+        status=UserStatus.APPROVED,
+        is_active=True,
+    )
+    db_session.add(admin)
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(admin.id)})}"}
+
+    first = client.get("/api/v1/categories/actions/export", params={"format": "csv"}, headers=headers)
+    second = client.get("/api/v1/categories/actions/export", params={"format": "csv"}, headers=headers)
+
+    assert first.status_code == 200
+    assert first.headers["content-type"].startswith("text/csv")
+    assert ".csv" in first.headers["content-disposition"]
+    assert first.content == second.content
+    assert first.content.decode("utf-8").splitlines()[1] == "Appliances,,,"
+    assert len(list(export_cache_dir.glob("categories_*.csv"))) == 1
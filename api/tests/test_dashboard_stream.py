@@ -0,0 +1,191 @@
+"""
+Tests du tableau de bord en direct : publication des variations et diffusion SSE.
+"""
+import asyncio
+import json
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from recyclic_api.models.cash_session import CashSessionStatus
+from recyclic_api.models.site import Site
+from recyclic_api.models.user import User, UserRole, UserStatus
+from recyclic_api.schemas.cash_session import CashSessionUpdate
+from recyclic_api.services.cash_session_service import CashSessionService
+from recyclic_api.services.dashboard_stream_service import (
+    RESYNC,
+    SALE_CREATED,
+    SESSION_CLOSED,
+    SESSION_OPENED,
+    SESSION_UPDATED,
+    DashboardEventBroadcaster,
+    DashboardSubscriber,
+    publish_dashboard_event,
+)
+
+
+@pytest.fixture
+def operator(db_session: Session):
+    site = Site(name="Dashboard Site", is_active=True)
+    db_session.add(site)
+    db_session.commit()
+    operator = User(
+        username=f"dashboard_{uuid.uuid4().hex[:8]}",
+        hashed_password="x",
+        role=UserRole.USER,
+        status=UserStatus.APPROVED,
+        is_active=True,
+        site_id=site.id,
+    )
+    db_session.add(operator)
+    db_session.commit()
+    return operator
+
+
+@pytest.fixture
+def published(monkeypatch):
+    events = []
+    for module in ("recyclic_api.services.cash_session_service", "recyclic_api.api.api_v1.endpoints.sales"):
+        monkeypatch.setattr(
+            f"{module}.publish_dashboard_event",
+            lambda event_type, site_id, deltas: events.append((event_type, str(site_id), deltas)),
+        )
+    return events
+
+
+def _stats(admin_client: TestClient, site_id) -> dict:
+    response = admin_client.get(f"/api/v1/admin/dashboard/stats?site_id={site_id}")
+    assert response.status_code == 200
+    metrics = response.json()["metrics"]
+    # Moyenne recalculée par /stats, pas de variation publiée
+    metrics.pop("averageSessionDuration")
+    return metrics
+
+
+def _sell(admin_client: TestClient, session_id, weights, total_amount: float, donation: float):
+    response = admin_client.post("/api/v1/sales/", json={
+        "cash_session_id": str(session_id),
+        "items": [
+            {"category": "EEE-1", "quantity": 1, "weight": weight, "unit_price": 5.0, "total_price": 5.0}
+            for weight in weights
+        ],
+        "total_amount": total_amount,
+        "donation": donation,
+        "payment_method": "cash",
+    })
+    assert response.status_code == 200
+
+
+def test_session_open_and_close_publish_deltas(db_session: Session, operator, published):
+    service = CashSessionService(db_session)
+
+    session = service.create_session(str(operator.id), str(operator.site_id), initial_amount=20.0)
+    service.close_session(str(session.id))
+    # Déjà fermée : rien n'est publié
+    service.close_session(str(session.id))
+
+    site_id = str(operator.site_id)
+    assert published == [
+        (SESSION_OPENED, site_id, {"totalSessions": 1, "openSessions": 1}),
+        (SESSION_CLOSED, site_id, {"openSessions": -1, "closedSessions": 1}),
+    ]
+
+
+def test_deltas_applied_to_stats_snapshot_match_fresh_stats(
+    admin_client: TestClient, db_session: Session, operator, published
+):
+    service = CashSessionService(db_session)
+    snapshot = _stats(admin_client, operator.site_id)
+
+    first = service.create_session(str(operator.id), str(operator.site_id), initial_amount=20.0)
+    _sell(admin_client, first.id, [1.5, 0.75], total_amount=10.0, donation=2.5)
+    _sell(admin_client, first.id, [3.0], total_amount=5.0, donation=0.0)
+    # Fermeture par PUT /cash-sessions/{id}
+    closed = service.update_session(str(first.id), CashSessionUpdate(status="closed"))
+    assert closed.status == CashSessionStatus.CLOSED
+    assert closed.closed_at is not None
+
+    second = service.create_session(str(operator.id), str(operator.site_id), initial_amount=10.0)
+    _sell(admin_client, second.id, [2.0], total_amount=5.0, donation=1.0)
+    service.close_session(str(second.id))
+
+    for _, _, deltas in published:
+        for key, value in deltas.items():
+            snapshot[key] += value
+
+    fresh = _stats(admin_client, operator.site_id)
+    assert snapshot == pytest.approx(fresh)
+    assert fresh["numberOfSales"] == 3
+    assert fresh["totalWeightSold"] == pytest.approx(7.25)
+    assert [event[0] for event in published].count(SESSION_CLOSED) == 2
+
+
+def test_update_session_publishes_total_corrections(db_session: Session, operator, published):
+    service = CashSessionService(db_session)
+    session = service.create_session(str(operator.id), str(operator.site_id), initial_amount=20.0)
+    service.close_session(str(session.id))
+    published.clear()
+
+    service.update_session(str(session.id), CashSessionUpdate(total_sales=42.0, total_items=3))
+
+    assert published == [(SESSION_UPDATED, str(operator.site_id), {"totalItems": 3, "totalSales": 42.0})]
+
+
+@pytest.mark.asyncio
+async def test_events_are_relayed_to_matching_subscribers():
+    broadcaster = DashboardEventBroadcaster()
+    site_a, site_b = str(uuid.uuid4()), str(uuid.uuid4())
+    try:
+        all_sites = await broadcaster.subscribe()
+        only_a = await broadcaster.subscribe(site_a)
+        await asyncio.sleep(0.2)
+
+        publish_dashboard_event(SALE_CREATED, site_b, {"totalSales": 12.5, "totalItems": 1})
+
+        event = await asyncio.wait_for(all_sites.queue.get(), timeout=5)
+        assert event["type"] == SALE_CREATED
+        assert event["siteId"] == site_b
+        assert event["deltas"] == {"totalSales": 12.5, "totalItems": 1}
+        assert only_a.queue.empty()
+    finally:
+        await broadcaster.stop()
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_ready_then_events_and_unsubscribes_on_close():
+    broadcaster = DashboardEventBroadcaster()
+    try:
+        subscriber = await broadcaster.subscribe()
+        stream = broadcaster.stream(subscriber, heartbeat_seconds=0.05)
+
+        assert await stream.__anext__() == 'event: ready\ndata: {"siteId": null}\n\n'
+        assert await stream.__anext__() == ": keepalive\n\n"
+
+        subscriber.deliver({"type": SESSION_OPENED, "siteId": None, "deltas": {"openSessions": 1}})
+        chunk = await stream.__anext__()
+        assert chunk.startswith(f"event: {SESSION_OPENED}\ndata: ")
+        assert json.loads(chunk.split("data: ", 1)[1])["deltas"] == {"openSessions": 1}
+
+        await stream.aclose()
+        assert broadcaster.subscriber_count() == 0
+    finally:
+        await broadcaster.stop()
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_asked_to_resync():
+    subscriber = DashboardSubscriber(loop=asyncio.get_running_loop(), queue=asyncio.Queue(maxsize=2))
+
+    for index in range(3):
+        subscriber.deliver({"type": SALE_CREATED, "deltas": {"totalItems": index}})
+
+    assert subscriber.queue.qsize() == 1
+    assert subscriber.queue.get_nowait() == {"type": RESYNC}
+
+
+def test_stream_requires_admin(client: TestClient):
+    response = client.get("/api/v1/admin/dashboard/stream")
+
+    assert response.status_code in (401, 403)
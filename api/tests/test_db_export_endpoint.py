@@ -3,51 +3,80 @@ Tests pour l'endpoint d'export de base de données (Story B11-P2)
 Pattern: Mocks & Overrides (évite d'exécuter pg_dump réel en test)
 """
 
-import pytest
+import asyncio
 import os
+import pytest
 from unittest.mock import Mock, patch, MagicMock
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
+from recyclic_api.core.config import settings
 from recyclic_api.models.user import User, UserRole, UserStatus
 from recyclic_api.core.security import create_access_token
+from recyclic_api.services.db_backup_service import parse_database_url
 from tests.factories import UserFactory
 
 
+class FakeProcess:
+    """Sous-processus simulé : sortie standard, erreurs et code retour."""
+
+    def __init__(self, stdout: bytes = b"", stderr: bytes = b"", returncode: int = 0, hang: bool = False):
+        self.stdout = asyncio.StreamReader()
+        self.stdout.feed_data(stdout)
+        if not hang:
+            self.stdout.feed_eof()
+        self.stderr = asyncio.StreamReader()
+        self.stderr.feed_data(stderr)
+        self.stderr.feed_eof()
+        self.returncode = None
+        self._returncode = returncode
+
+    async def wait(self):
+        if self.returncode is None:
+            self.returncode = self._returncode
+        return self.returncode
+
+    async def communicate(self):
+        await self.wait()
+        return await self.stdout.read(), await self.stderr.read()
+
+    def kill(self):
+        self.returncode = -9
+
+
+@pytest.fixture
+def fake_spawn():
+    """Remplace le lancement des sous-processus ; ``results`` donne les processus à retourner."""
+    state = {"commands": [], "results": []}
+
+    async def _spawn(command, env=None, stdout=None, stdin=None):
+        state["commands"].append(command)
+        return FakeProcess(**state["results"].pop(0))
+
+    with patch("recyclic_api.services.db_backup_service.spawn_process", _spawn):
+        yield state
+
+
 class TestDatabaseExportEndpoint:
     """Tests pour l'endpoint POST /api/v1/admin/db/export"""
 
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.FileResponse')
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.subprocess.run')
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.os.path.exists')
-    def test_export_database_success_as_super_admin(
-        self,
-        mock_exists: Mock,
-        mock_subprocess: Mock,
-        mock_file_response: Mock,
-        super_admin_client: TestClient
-    ):
-        """Teste qu'un super-admin peut exporter la base de données avec succès."""
+    def test_export_database_success_as_super_admin(self, fake_spawn, super_admin_client: TestClient):
+        """Teste qu'un super-admin peut exporter la base de données avec succès (format custom en flux)."""
         # Arrange
-        # Mock pg_dump successful execution
-        mock_subprocess.return_value = MagicMock(returncode=0, stderr="")
-        mock_exists.return_value = True
-
-        # Mock FileResponse pour éviter l'erreur de fichier inexistant
-        from fastapi.responses import Response
-        mock_file_response.return_value = Response(
-            content=b"SQL content",
-            media_type="application/sql",
-            headers={"content-disposition": "attachment; filename=recyclic_db_export_test.sql"}
-        )
+        fake_spawn["results"].append({"stdout": b"PGDMP" + b"x" * 200_000})
 
         # Act
         response = super_admin_client.post("/api/v1/admin/db/export")
 
         # Assert
         assert response.status_code == 200
-        assert "recyclic_db_export_" in str(mock_file_response.call_args)
-        assert mock_subprocess.called
+        assert response.content == b"PGDMP" + b"x" * 200_000
+        assert response.headers["content-type"] == "application/octet-stream"
+        assert ".dump" in response.headers["content-disposition"]
+        command = fake_spawn["commands"][0]
+        assert command[0] == "pg_dump"
+        assert command[command.index("-F") + 1] == "c"
+        assert "-f" not in command  # Sortie standard, aucun fichier temporaire
 
     def test_export_database_requires_authentication(self, client: TestClient):
         """Teste que l'endpoint nécessite une authentification."""
@@ -89,21 +118,10 @@ class TestDatabaseExportEndpoint:
         # require_super_admin_role() retourne 401 pour les non-super-admins même s'ils sont authentifiés
         assert response.status_code == 401
 
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.subprocess.run')
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.os.path.exists')
-    def test_export_database_pg_dump_failure_returns_500(
-        self,
-        mock_exists: Mock,
-        mock_subprocess: Mock,
-        super_admin_client: TestClient
-    ):
+    def test_export_database_pg_dump_failure_returns_500(self, fake_spawn, super_admin_client: TestClient):
         """Teste que l'échec de pg_dump retourne une erreur 500."""
         # Arrange
-        # Mock pg_dump failed execution
-        mock_subprocess.return_value = MagicMock(
-            returncode=1,
-            stderr="pg_dump: error: connection failed"
-        )
+        fake_spawn["results"].append({"stderr": b"pg_dump: error: connection failed", "returncode": 1})
 
         # Act
         response = super_admin_client.post("/api/v1/admin/db/export")
@@ -111,78 +129,69 @@ class TestDatabaseExportEndpoint:
         # Assert
         assert response.status_code == 500
         assert "Database export failed" in response.json()["detail"]
+        assert "connection failed" in response.json()["detail"]
 
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.subprocess.run')
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.os.path.exists')
-    def test_export_database_file_not_created_returns_500(
-        self,
-        mock_exists: Mock,
-        mock_subprocess: Mock,
-        super_admin_client: TestClient
-    ):
-        """Teste que l'absence de fichier créé retourne une erreur 500."""
+    def test_export_database_timeout_returns_504(self, fake_spawn, super_admin_client: TestClient, monkeypatch):
+        """Teste qu'un pg_dump ne produisant rien dans le délai retourne une erreur 504."""
         # Arrange
-        # Mock pg_dump successful but file not created
-        mock_subprocess.return_value = MagicMock(returncode=0, stderr="")
-        mock_exists.return_value = False
+        monkeypatch.setattr(settings, "DB_EXPORT_IDLE_TIMEOUT_SECONDS", 0.05)
+        fake_spawn["results"].append({"hang": True})
 
         # Act
         response = super_admin_client.post("/api/v1/admin/db/export")
 
         # Assert
-        assert response.status_code == 500
-        assert "Export file was not created" in response.json()["detail"]
+        assert response.status_code == 504
+        assert "timeout" in response.json()["detail"].lower()
 
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.subprocess.run')
-    def test_export_database_timeout_returns_504(
-        self,
-        mock_subprocess: Mock,
-        super_admin_client: TestClient
-    ):
-        """Teste que le timeout de pg_dump retourne une erreur 504."""
+    def test_export_database_plain_format(self, fake_spawn, super_admin_client: TestClient):
+        """Teste l'export SQL brut (compatible avec l'import)."""
         # Arrange
-        # Mock pg_dump timeout
-        from subprocess import TimeoutExpired
-        mock_subprocess.side_effect = TimeoutExpired(cmd="pg_dump", timeout=300)
+        fake_spawn["results"].append({"stdout": b"-- PostgreSQL database dump"})
 
         # Act
-        response = super_admin_client.post("/api/v1/admin/db/export")
+        response = super_admin_client.post("/api/v1/admin/db/export", params={"format": "plain"})
 
         # Assert
-        assert response.status_code == 504
-        assert "timeout" in response.json()["detail"].lower()
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/sql")
+        filename = response.headers["content-disposition"]
+        assert "recyclic_db_export_" in filename
+        assert ".sql" in filename
+        command = fake_spawn["commands"][0]
+        assert command[command.index("-F") + 1] == "p"
+        assert "--clean" in command
 
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.FileResponse')
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.subprocess.run')
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.os.path.exists')
-    def test_export_database_filename_contains_timestamp(
-        self,
-        mock_exists: Mock,
-        mock_subprocess: Mock,
-        mock_file_response: Mock,
-        super_admin_client: TestClient
-    ):
-        """Teste que le nom du fichier contient un timestamp."""
+    def test_export_database_directory_format_runs_parallel_dump(self, fake_spawn, super_admin_client: TestClient):
+        """Teste le format répertoire : pg_dump -j puis archive tar diffusée, répertoire supprimé."""
         # Arrange
-        # Mock pg_dump successful execution
-        mock_subprocess.return_value = MagicMock(returncode=0, stderr="")
-        mock_exists.return_value = True
-
-        # Mock FileResponse
-        from fastapi.responses import Response
-        mock_file_response.return_value = Response(
-            content=b"SQL content",
-            media_type="application/sql",
-            headers={"content-disposition": "attachment; filename=recyclic_db_export_20250101_120000.sql"}
-        )
+        fake_spawn["results"].extend([{}, {"stdout": b"tar-content"}])
 
         # Act
-        response = super_admin_client.post("/api/v1/admin/db/export")
+        response = super_admin_client.post("/api/v1/admin/db/export", params={"format": "directory", "jobs": 3})
 
         # Assert
         assert response.status_code == 200
-        # Vérifier que FileResponse a été appelé avec un filename contenant timestamp
-        call_args = mock_file_response.call_args
-        filename = call_args.kwargs.get('filename', '')
-        assert "recyclic_db_export_" in filename
-        assert ".sql" in filename
+        assert response.content == b"tar-content"
+        assert ".tar" in response.headers["content-disposition"]
+        dump_command, tar_command = fake_spawn["commands"]
+        assert dump_command[dump_command.index("-j") + 1] == "3"
+        dump_path = dump_command[dump_command.index("-f") + 1]
+        assert tar_command[:2] == ["tar", "-C"]
+        assert not os.path.exists(os.path.dirname(dump_path))
+
+    def test_export_database_rejects_unknown_format(self, super_admin_client: TestClient):
+        """Teste qu'un format inconnu est refusé."""
+        response = super_admin_client.post("/api/v1/admin/db/export", params={"format": "xml"})
+
+        assert response.status_code == 422
+
+
+def test_parse_database_url():
+    params = parse_database_url("postgresql://recyclic:p%40ss@db:5433/recyclic")
+
+    assert (params.host, params.port, params.user, params.password, params.database) == (
+        "db", "5433", "recyclic", "p@ss", "recyclic"
+    )
+    with pytest.raises(ValueError):
+        parse_database_url("mysql://user@host/db")
@@ -1,51 +1,131 @@
 """
 Tests pour l'endpoint d'import de base de données (Story B26-P2)
-Pattern: Mocks & Overrides (évite d'exécuter psql réel en test)
+Pattern: Mocks & Overrides (évite d'exécuter pg_dump / psql / pg_restore réels en test)
 """
 
-import pytest
+import asyncio
 import os
-from unittest.mock import Mock, patch, MagicMock
+import pytest
+from unittest.mock import patch
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from io import BytesIO
 
+from recyclic_api.core.config import settings
+from recyclic_api.core.redis import get_redis
 from recyclic_api.models.user import User, UserRole, UserStatus
 from recyclic_api.core.security import create_access_token
+from recyclic_api.services.db_restore_service import DatabaseImportJobStore, spool_upload
 from tests.factories import UserFactory
 
 
+class FakeStdin:
+    def __init__(self):
+        self.data = b""
+        self.closed = False
+
+    def write(self, data: bytes):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakeProcess:
+    """Sous-processus simulé : entrée standard, sorties et code retour."""
+
+    def __init__(self, stdout: bytes = b"", stderr: bytes = b"", returncode: int = 0, hang: bool = False):
+        self.stdin = FakeStdin()
+        self.stdout = asyncio.StreamReader()
+        self.stdout.feed_data(stdout)
+        self.stdout.feed_eof()
+        self.stderr = asyncio.StreamReader()
+        self.stderr.feed_data(stderr)
+        self.stderr.feed_eof()
+        self.returncode = None
+        self._returncode = returncode
+        self._hang = hang
+
+    async def wait(self):
+        while self.returncode is None and self._hang:
+            await asyncio.sleep(0.01)
+        if self.returncode is None:
+            self.returncode = self._returncode
+        return self.returncode
+
+    async def communicate(self):
+        await self.wait()
+        return await self.stdout.read(), await self.stderr.read()
+
+    def kill(self):
+        self.returncode = -9
+
+
+@pytest.fixture
+def fake_spawn():
+    """Remplace le lancement des outils PostgreSQL ; ``results`` donne les processus à retourner."""
+    state = {"commands": [], "results": [], "processes": []}
+
+    async def _spawn(command, env=None, stdout=None, stdin=None):
+        state["commands"].append(command)
+        process = FakeProcess(**state["results"].pop(0))
+        state["processes"].append(process)
+        return process
+
+    with patch("recyclic_api.services.db_backup_service.spawn_process", _spawn), \
+            patch("recyclic_api.services.db_restore_service.spawn_process", _spawn):
+        yield state
+    get_redis().delete(DatabaseImportJobStore.LOCK_KEY)
+
+
+def _import(client: TestClient, filename: str = "test.sql",
+            content: bytes = b"CREATE TABLE test (id SERIAL PRIMARY KEY);\n"):
+    files = {"file": (filename, BytesIO(content), "application/octet-stream")}
+    return client.post("/api/v1/admin/db/import", files=files)
+
+
+def _job(client: TestClient, job_id: str) -> dict:
+    response = client.get(f"/api/v1/admin/db/import/{job_id}")
+    assert response.status_code == 200
+    return response.json()
+
+
 class TestDatabaseImportEndpoint:
-    """Tests pour l'endpoint POST /api/v1/admin/db/import"""
+    """Tests pour les endpoints POST /api/v1/admin/db/import et GET /api/v1/admin/db/import/{job_id}"""
 
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.subprocess.run')
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.os.path.exists')
-    def test_import_database_success_as_super_admin(
-        self,
-        mock_exists: Mock,
-        mock_subprocess: Mock,
-        super_admin_client: TestClient
-    ):
-        """Teste qu'un super-admin peut importer la base de données avec succès."""
+    def test_import_database_success_as_super_admin(self, fake_spawn, super_admin_client: TestClient):
+        """Teste qu'un super-admin peut importer la base : sauvegarde, puis psql en une transaction."""
         # Arrange
-        # Mock successful backup and import
-        mock_subprocess.return_value = MagicMock(returncode=0, stderr="")
-        mock_exists.return_value = True
-
-        # Create a test SQL file
-        sql_content = b"CREATE TABLE test (id SERIAL PRIMARY KEY);"
-        files = {"file": ("test.sql", BytesIO(sql_content), "application/sql")}
+        fake_spawn["results"] += [{}, {}]  # pg_dump (sauvegarde), psql (restauration)
+        sql_content = b"CREATE TABLE test (id SERIAL PRIMARY KEY);\nCOPY test (id) FROM stdin;\n1\n2\n\\.\n"
 
         # Act
-        response = super_admin_client.post("/api/v1/admin/db/import", files=files)
+        response = _import(super_admin_client, content=sql_content)
 
         # Assert
-        assert response.status_code == 200
+        assert response.status_code == 202
         response_data = response.json()
-        assert "Import de la base de données effectué avec succès" in response_data["message"]
         assert response_data["imported_file"] == "test.sql"
-        assert "backup_created" in response_data
-        assert mock_subprocess.called
+        assert response_data["format"] == "plain"
+        assert "recyclic_db_backup_before_import_" in response_data["backup_created"]
+
+        job = _job(super_admin_client, response_data["job_id"])
+        assert job["status"] == "completed"
+        assert job["progress_percent"] == 100
+
+        backup_command, restore_command = fake_spawn["commands"]
+        assert backup_command[0] == "pg_dump"
+        assert backup_command[backup_command.index("-f") + 1] == response_data["backup_path"]
+        assert restore_command[0] == "psql"
+        assert "--single-transaction" in restore_command
+        assert "ON_ERROR_STOP=1" in restore_command
+        # Le fichier est transmis tel quel : les blocs COPY passent par le protocole COPY
+        psql = fake_spawn["processes"][1]
+        assert psql.stdin.data == sql_content
+        assert psql.stdin.closed
 
     def test_import_database_requires_authentication(self, client: TestClient):
         """Teste que l'endpoint nécessite une authentification."""
@@ -132,136 +212,117 @@ class TestDatabaseImportEndpoint:
         assert response.status_code == 413
         assert "trop volumineux" in response.json()["detail"]
 
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.subprocess.run')
-    def test_import_database_backup_failure_returns_500(
-        self,
-        mock_subprocess: Mock,
-        super_admin_client: TestClient
-    ):
-        """Teste que l'échec de la sauvegarde automatique retourne une erreur 500."""
-        # Arrange
-        # Mock backup failure
-        mock_subprocess.return_value = MagicMock(
-            returncode=1,
-            stderr="pg_dump: error: connection failed"
-        )
 
-        sql_content = b"CREATE TABLE test (id SERIAL PRIMARY KEY);"
-        files = {"file": ("test.sql", BytesIO(sql_content), "application/sql")}
+    def test_import_custom_format_uses_parallel_pg_restore(self, fake_spawn, super_admin_client: TestClient):
+        """Teste qu'une sauvegarde au format custom est restaurée par pg_restore avec plusieurs workers."""
+        # Arrange
+        fake_spawn["results"] += [
+            {},  # pg_dump
+            {"stdout": b";\n; Archive created\n;\n1; 1259 16386 TABLE public test postgres\n"},  # pg_restore -l
+            {"stderr": b"pg_restore: creating TABLE \"public.test\"\n"},  # pg_restore
+        ]
 
         # Act
-        response = super_admin_client.post("/api/v1/admin/db/import", files=files)
+        response = _import(super_admin_client, filename="backup.dump", content=b"PGDMP\x01\x0e" + b"x" * 1000)
 
         # Assert
-        assert response.status_code == 500
-        assert "sauvegarde automatique" in response.json()["detail"]
-
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.subprocess.run')
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.os.path.exists')
-    def test_import_database_import_failure_returns_500(
-        self,
-        mock_exists: Mock,
-        mock_subprocess: Mock,
-        super_admin_client: TestClient
-    ):
-        """Teste que l'échec de l'import retourne une erreur 500."""
+        assert response.status_code == 202
+        assert response.json()["format"] == "custom"
+        assert _job(super_admin_client, response.json()["job_id"])["status"] == "completed"
+        restore_command = fake_spawn["commands"][2]
+        assert restore_command[0] == "pg_restore"
+        assert restore_command[restore_command.index("-j") + 1] == str(settings.DB_IMPORT_PARALLEL_JOBS)
+        assert "--exit-on-error" in restore_command
+
+    def test_import_database_backup_failure_marks_job_failed(self, fake_spawn, super_admin_client: TestClient):
+        """Teste que l'échec de la sauvegarde automatique fait échouer l'import sans restauration."""
         # Arrange
-        # Mock successful backup but failed import
-        def side_effect(*args, **kwargs):
-            # First call (backup) succeeds, second call (import) fails
-            if len(mock_subprocess.call_args_list) == 0:
-                return MagicMock(returncode=0, stderr="")
-            else:
-                return MagicMock(returncode=1, stderr="psql: error: syntax error")
-        
-        mock_subprocess.side_effect = side_effect
-        mock_exists.return_value = True
+        fake_spawn["results"].append({"returncode": 1, "stderr": b"pg_dump: error: connection failed"})
 
-        sql_content = b"CREATE TABLE test (id SERIAL PRIMARY KEY);"
-        files = {"file": ("test.sql", BytesIO(sql_content), "application/sql")}
+        # Act
+        response = _import(super_admin_client)
+
+        # Assert
+        assert response.status_code == 202
+        job = _job(super_admin_client, response.json()["job_id"])
+        assert job["status"] == "failed"
+        assert job["stage"] == "backup"
+        assert "connection failed" in job["error"]
+        assert len(fake_spawn["commands"]) == 1
+
+    def test_import_database_import_failure_marks_job_failed(self, fake_spawn, super_admin_client: TestClient):
+        """Teste que l'échec de psql est remonté dans l'état du job."""
+        # Arrange
+        fake_spawn["results"] += [{}, {"returncode": 3, "stderr": b"psql:<stdin>:1: ERROR:  syntax error"}]
 
         # Act
-        response = super_admin_client.post("/api/v1/admin/db/import", files=files)
+        response = _import(super_admin_client)
 
         # Assert
-        assert response.status_code == 500
-        assert "Erreur lors de l'import" in response.json()["detail"]
+        job = _job(super_admin_client, response.json()["job_id"])
+        assert job["status"] == "failed"
+        assert job["stage"] == "restore"
+        assert "syntax error" in job["error"]
 
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.subprocess.run')
-    def test_import_database_timeout_returns_504(
-        self,
-        mock_subprocess: Mock,
-        super_admin_client: TestClient
-    ):
-        """Teste que le timeout de l'import retourne une erreur 504."""
+    def test_import_database_timeout_marks_job_failed(self, fake_spawn, super_admin_client: TestClient):
+        """Teste qu'une restauration trop longue est interrompue et signalée."""
         # Arrange
-        # Mock timeout during import
-        from subprocess import TimeoutExpired
-        mock_subprocess.side_effect = TimeoutExpired(cmd="psql", timeout=600)
-
-        sql_content = b"CREATE TABLE test (id SERIAL PRIMARY KEY);"
-        files = {"file": ("test.sql", BytesIO(sql_content), "application/sql")}
+        fake_spawn["results"] += [{}, {"hang": True}]
 
         # Act
-        response = super_admin_client.post("/api/v1/admin/db/import", files=files)
+        with patch.object(settings, "DB_IMPORT_TIMEOUT_SECONDS", 0.2):
+            response = _import(super_admin_client)
 
         # Assert
-        assert response.status_code == 504
-        assert "timeout" in response.json()["detail"].lower()
+        job = _job(super_admin_client, response.json()["job_id"])
+        assert job["status"] == "failed"
+        assert "timeout" in job["error"].lower()
+        assert fake_spawn["processes"][1].returncode == -9
 
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.subprocess.run')
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.os.path.exists')
-    def test_import_database_creates_automatic_backup(
-        self,
-        mock_exists: Mock,
-        mock_subprocess: Mock,
-        super_admin_client: TestClient
-    ):
-        """Teste que l'import crée automatiquement une sauvegarde."""
+    def test_import_database_cleans_up_and_releases_lock(self, fake_spawn, super_admin_client: TestClient):
+        """Teste que le fichier temporaire est supprimé et qu'un nouvel import est possible ensuite."""
         # Arrange
-        # Mock successful backup and import
-        mock_subprocess.return_value = MagicMock(returncode=0, stderr="")
-        mock_exists.return_value = True
+        fake_spawn["results"] += [{}, {}, {}, {}]
+        deleted = []
+        original_unlink = os.unlink
 
-        sql_content = b"CREATE TABLE test (id SERIAL PRIMARY KEY);"
-        files = {"file": ("test.sql", BytesIO(sql_content), "application/sql")}
+        def tracking_unlink(path):
+            deleted.append(path)
+            original_unlink(path)
 
         # Act
-        response = super_admin_client.post("/api/v1/admin/db/import", files=files)
+        with patch("recyclic_api.services.db_restore_service.os.unlink", tracking_unlink):
+            first = _import(super_admin_client)
+        second = _import(super_admin_client)
 
         # Assert
-        assert response.status_code == 200
-        response_data = response.json()
-        assert "backup_created" in response_data
-        assert "recyclic_db_backup_before_import_" in response_data["backup_created"]
-        
-        # Vérifier que pg_dump a été appelé pour la sauvegarde
-        assert mock_subprocess.called
-        # Le premier appel devrait être pg_dump (backup)
-        first_call = mock_subprocess.call_args_list[0]
-        assert "pg_dump" in first_call[0][0]
-
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.subprocess.run')
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.os.path.exists')
-    def test_import_database_cleans_up_temporary_files(
-        self,
-        mock_exists: Mock,
-        mock_subprocess: Mock,
-        super_admin_client: TestClient
-    ):
-        """Teste que les fichiers temporaires sont nettoyés après l'import."""
-        # Arrange
-        # Mock successful backup and import
-        mock_subprocess.return_value = MagicMock(returncode=0, stderr="")
-        mock_exists.return_value = True
+        assert first.status_code == 202
+        assert second.status_code == 202
+        assert deleted and not os.path.exists(deleted[0])
 
-        sql_content = b"CREATE TABLE test (id SERIAL PRIMARY KEY);"
-        files = {"file": ("test.sql", BytesIO(sql_content), "application/sql")}
+    def test_import_database_rejected_while_another_is_running(self, fake_spawn, super_admin_client: TestClient):
+        """Teste qu'un seul import peut s'exécuter à la fois."""
+        # Arrange
+        DatabaseImportJobStore().acquire_lock("other-job")
 
         # Act
-        response = super_admin_client.post("/api/v1/admin/db/import", files=files)
+        response = _import(super_admin_client)
 
         # Assert
-        assert response.status_code == 200
-        # Le test vérifie que le code gère le nettoyage des fichiers temporaires
-        # (le nettoyage est fait dans le finally block)
+        assert response.status_code == 409
+        assert fake_spawn["commands"] == []
+
+    def test_import_status_unknown_job_returns_404(self, super_admin_client: TestClient):
+        """Teste qu'un identifiant d'import inconnu retourne 404."""
+        response = super_admin_client.get("/api/v1/admin/db/import/unknown")
+
+        assert response.status_code == 404
+
+
+def test_spool_upload_filters_restrict_directives(tmp_path):
+    """Les directives \\restrict de pg_dump >= 17.6 sont retirées des sauvegardes SQL."""
+    source = BytesIO(b"\\restrict abc\nCREATE TABLE t (id int);\n\\unrestrict abc\n")
+    destination = tmp_path / "spool.sql"
+
+    assert spool_upload(source, str(destination), max_bytes=1024) == "plain"
+    assert destination.read_bytes() == b"CREATE TABLE t (id int);\n"
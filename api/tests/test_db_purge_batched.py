@@ -0,0 +1,145 @@
+"""
+Tests de la purge des données transactionnelles : TRUNCATE complet et purge par lots.
+"""
+import uuid
+from functools import partial
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from recyclic_api.core.config import settings
+from recyclic_api.core.redis import get_redis
+from recyclic_api.models.cash_session import CashSession, CashSessionStatus
+from recyclic_api.models.cash_session_close_job import CashSessionCloseJob
+from recyclic_api.models.category import Category
+from recyclic_api.models.ligne_depot import Destination, LigneDepot
+from recyclic_api.models.poste_reception import PosteReception
+from recyclic_api.models.sale import Sale
+from recyclic_api.models.sale_item import SaleItem
+from recyclic_api.models.site import Site
+from recyclic_api.models.ticket_depot import TicketDepot
+from recyclic_api.models.user import User, UserRole, UserStatus
+from recyclic_api.services.db_purge_service import (
+    DatabasePurgeJobStore,
+    purge_older_than,
+    run_batched_purge,
+    vacuum_tables,
+)
+
+OLD = datetime(2015, 3, 1, tzinfo=timezone.utc)
+RECENT = datetime.now(timezone.utc) - timedelta(days=1)
+
+
+@pytest.fixture
+def purge_lock():
+    yield
+    get_redis().delete(DatabasePurgeJobStore.LOCK_KEY)
+
+
+@pytest.fixture
+def transactional_data(db_session: Session):
+    """Deux sessions (ancienne et récente) avec ventes, et deux tickets de dépôt."""
+    suffix = uuid.uuid4().hex[:8]
+    site = Site(name=f"Purge Site {suffix}", address="1 Rue", city="Paris", postal_code="75001", country="France", is_active=True)
+    db_session.add(site)
+    db_session.commit()
+    operator = User(
+        username=f"purge_cashier_{suffix}", hashed_password="x", role=UserRole.USER,
+        status=UserStatus.APPROVED, is_active=True, site_id=site.id,
+    )
+    category = Category(name=f"Purge category {suffix}")
+    db_session.add_all([operator, category])
+    db_session.commit()
+    poste = PosteReception(opened_by_user_id=operator.id)
+    db_session.add(poste)
+    db_session.commit()
+
+    sessions = {}
+    for label, at in (("old", OLD), ("recent", RECENT)):
+        cash_session = CashSession(
+            operator_id=operator.id, site_id=site.id, initial_amount=0.0, current_amount=0.0,
+            status=CashSessionStatus.CLOSED, opened_at=at, closed_at=at + timedelta(hours=8),
+        )
+        db_session.add(cash_session)
+        db_session.flush()
+        for _ in range(3):
+            sale = Sale(cash_session_id=cash_session.id, total_amount=5.0, created_at=at)
+            db_session.add(sale)
+            db_session.flush()
+            db_session.add(SaleItem(sale_id=sale.id, category="EEE-1", quantity=1, unit_price=5.0, total_price=5.0))
+        ticket = TicketDepot(poste_id=poste.id, benevole_user_id=operator.id, created_at=at)
+        db_session.add(ticket)
+        db_session.flush()
+        db_session.add(LigneDepot(ticket_id=ticket.id, category_id=category.id, poids_kg=1.5, destination=Destination.MAGASIN))
+        sessions[label] = cash_session
+    db_session.add(CashSessionCloseJob(cash_session_id=sessions["old"].id))
+    db_session.commit()
+    return sessions
+
+
+def test_purge_older_than_deletes_old_rows_in_batches(db_session: Session, transactional_data):
+    old_id, recent_id = transactional_data["old"].id, transactional_data["recent"].id
+    progress = []
+
+    counts = purge_older_than(
+        datetime(2020, 1, 1, tzinfo=timezone.utc),
+        batch_size=2,
+        session_factory=lambda: db_session,
+        on_progress=lambda table, counts, percent: progress.append((table, percent)),
+    )
+
+    assert counts["sales"] == 3 and counts["sale_items"] == 3
+    assert counts["ticket_depot"] == 1 and counts["ligne_depot"] == 1
+    assert counts["cash_sessions"] == 1 and counts["cash_session_close_jobs"] == 1
+    # Deux lots pour les 3 ventes (taille 2), puis tickets et sessions
+    assert [table for table, _ in progress] == ["sales", "sales", "ticket_depot", "cash_sessions"]
+    assert progress[-1][1] == 100.0
+
+    assert db_session.get(CashSession, old_id) is None
+    assert db_session.get(CashSession, recent_id) is not None
+    assert db_session.query(Sale).filter(Sale.cash_session_id == recent_id).count() == 3
+
+
+def test_batched_purge_endpoint_reports_job_progress(
+    super_admin_client: TestClient, db_session: Session, transactional_data, purge_lock, monkeypatch
+):
+    # Le job doit voir les données du test (transaction non validée) : même session
+    monkeypatch.setattr(
+        "recyclic_api.api.api_v1.endpoints.db_purge.run_batched_purge",
+        partial(run_batched_purge, session_factory=lambda: db_session),
+    )
+    monkeypatch.setattr(settings, "DB_PURGE_VACUUM", False)
+
+    response = super_admin_client.post("/api/v1/admin/db/purge-transactions", params={"older_than_years": 5, "batch_size": 100})
+
+    assert response.status_code == 202
+    assert response.json()["mode"] == "batched"
+    job = super_admin_client.get(f"/api/v1/admin/db/purge-transactions/{response.json()['job_id']}").json()
+    assert job["status"] == "completed"
+    assert job["deleted_records"]["sales"] >= 3
+    assert job["deleted_records"]["cash_session_close_jobs"] >= 1
+
+
+def test_full_purge_truncates_all_transactional_tables(super_admin_client: TestClient, db_session: Session, transactional_data):
+    response = super_admin_client.post("/api/v1/admin/db/purge-transactions")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["mode"] == "truncate"
+    assert data["deleted_records"]["sales"] >= 6
+    assert data["deleted_records"]["cash_session_close_jobs"] >= 1
+    assert db_session.query(Sale).count() == 0
+    assert db_session.query(CashSession).count() == 0
+    assert db_session.query(User).count() > 0
+
+
+def test_purge_status_unknown_job_returns_404(super_admin_client: TestClient):
+    response = super_admin_client.get("/api/v1/admin/db/purge-transactions/unknown")
+
+    assert response.status_code == 404
+
+
+def test_vacuum_runs_outside_transaction(db_session: Session):
+    vacuum_tables(["sales"], session_factory=lambda: db_session)
@@ -0,0 +1,127 @@
+"""
+Tests de la file des événements webhook Brevo et de leur application par lots.
+"""
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from recyclic_api.core.config import settings
+from recyclic_api.core.redis import get_redis
+from recyclic_api.models.email_event import EmailEvent, EmailStatusModel
+from recyclic_api.models.email_log import EmailLog, EmailStatus
+from recyclic_api.services.email_webhook_service import (
+    BrevoWebhookService,
+    EmailEventQueue,
+    EmailEventWorker,
+)
+
+SENT_AT = datetime(2026, 1, 5, 9, 0, tzinfo=timezone.utc)
+
+
+def _event(event: str, message_id: str, ts: int, email: str = "user@example.com") -> dict:
+    return {"event": event, "email": email, "message-id": message_id, "ts": str(ts)}
+
+
+@pytest.fixture
+def message(db_session: Session):
+    """Un email envoyé, suivi à la fois par EmailStatusModel et EmailLog."""
+    message_id = f"<{uuid.uuid4().hex}@smtp-relay.brevo.com>"
+    db_session.add(EmailStatusModel(
+        email_address="user@example.com", message_id=message_id, current_status="sent",
+        last_updated=SENT_AT, sent_timestamp=SENT_AT,
+    ))
+    email_log = EmailLog(
+        recipient_email="user@example.com", subject="Test", status=EmailStatus.SENT, external_id=message_id,
+    )
+    db_session.add(email_log)
+    db_session.commit()
+    return message_id, email_log.id
+
+
+@pytest.fixture
+def queue():
+    queue = EmailEventQueue()
+    suffix = uuid.uuid4().hex
+    queue.QUEUE_KEY = f"test:email_events:queue:{suffix}"
+    queue.DEAD_LETTER_KEY = f"test:email_events:dead:{suffix}"
+    queue.LOCK_KEY = f"test:email_events:lock:{suffix}"
+    yield queue
+    get_redis().delete(queue.QUEUE_KEY, queue.DEAD_LETTER_KEY, queue.LOCK_KEY)
+
+
+def test_batch_coalesces_events_per_message_in_timestamp_order(db_session: Session, message):
+    message_id, email_log_id = message
+    delivered_ts = int(SENT_AT.timestamp()) + 60
+    opened_ts = delivered_ts + 600
+
+    # Ordre d'arrivée inversé : l'ouverture arrive avant la livraison
+    result = BrevoWebhookService(db_session).process_webhook_events([
+        _event("opened", message_id, opened_ts),
+        _event("delivered", message_id, delivered_ts),
+        _event("delivered", "<unknown@smtp-relay.brevo.com>", delivered_ts),
+    ])
+
+    assert result == {"events": 3, "statuses": 1, "email_logs": 1}
+    status = db_session.query(EmailStatusModel).filter_by(message_id=message_id).one()
+    assert status.current_status == "delivered"
+    email_log = db_session.get(EmailLog, email_log_id)
+    assert email_log.status == EmailStatus.OPENED
+    assert email_log.delivered_at == datetime.fromtimestamp(delivered_ts, tz=timezone.utc)
+    assert email_log.opened_at == datetime.fromtimestamp(opened_ts, tz=timezone.utc)
+    events = db_session.query(EmailEvent).filter_by(message_id=message_id).all()
+    assert sorted(event.processed for event in events) == ["success", "success"]
+
+
+def test_worker_drains_queue_and_dead_letters_malformed_entries(db_session: Session, message, queue):
+    message_id, email_log_id = message
+    queue.push(_event("delivered", message_id, int(SENT_AT.timestamp()) + 60))
+    get_redis().rpush(queue.QUEUE_KEY, "not json")
+    queue.push(_event("clicked", message_id, int(SENT_AT.timestamp()) + 120))
+    worker = EmailEventWorker(session_factory=lambda: db_session, queue=queue, batch_size=10)
+
+    assert worker.process_batch() == 3
+
+    assert queue.length() == 0
+    assert get_redis().lrange(queue.DEAD_LETTER_KEY, 0, -1) == ["not json"]
+    assert db_session.get(EmailLog, email_log_id).status == EmailStatus.CLICKED
+    # Le verrou est libéré pour le cycle suivant
+    assert worker.process_batch() == 0
+
+
+def test_worker_leaves_queue_untouched_when_another_consumer_holds_the_lock(db_session: Session, queue):
+    queue.push(_event("delivered", "<msg@smtp-relay.brevo.com>", int(SENT_AT.timestamp())))
+    assert queue.acquire_lock("other-process", ttl_seconds=60)
+
+    worker = EmailEventWorker(session_factory=lambda: db_session, queue=queue)
+
+    assert worker.process_batch() == 0
+    assert queue.length() == 1
+
+
+def test_webhook_endpoint_only_queues_the_event(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "BREVO_WEBHOOK_SECRET", None)
+    redis_client = get_redis()
+    payload = _event("delivered", f"<{uuid.uuid4().hex}@smtp-relay.brevo.com>", int(SENT_AT.timestamp()))
+    before = redis_client.llen(EmailEventQueue.QUEUE_KEY)
+
+    try:
+        response = client.post("/api/v1/email/webhook", json=payload)
+
+        assert response.status_code == 200
+        assert response.json()["message"] == "Webhook queued for processing"
+        queued = redis_client.lrange(EmailEventQueue.QUEUE_KEY, before, -1)
+        assert [json.loads(item) for item in queued] == [payload]
+    finally:
+        redis_client.lrem(EmailEventQueue.QUEUE_KEY, 0, json.dumps(payload))
+
+
+def test_webhook_endpoint_rejects_incomplete_payload(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "BREVO_WEBHOOK_SECRET", None)
+
+    response = client.post("/api/v1/email/webhook", json={"event": "delivered"})
+
+    assert response.status_code == 400
@@ -1,19 +1,25 @@
 """
 Unit tests for the email metrics system.
 """
+import uuid
+
 import pytest
-import time
 from unittest.mock import patch, MagicMock
 
 from recyclic_api.utils.email_metrics import EmailMetricsCollector, EmailMetric
+from recyclic_api.utils.metrics_registry import MetricsRegistry
 
 
 class TestEmailMetricsCollector:
     """Test cases for EmailMetricsCollector class."""
 
     def setup_method(self):
-        """Set up a fresh metrics collector for each test."""
-        self.collector = EmailMetricsCollector(max_history=100)
+        """Set up a fresh metrics collector (own Redis hash) for each test."""
+        self.registry = MetricsRegistry(key=f"test_email_metrics_{uuid.uuid4().hex}")
+        self.collector = EmailMetricsCollector(registry=self.registry)
+
+    def teardown_method(self):
+        self.registry.reset()
 
     def test_record_successful_email(self):
         """Test recording a successful email send."""
@@ -25,17 +31,10 @@ class TestEmailMetricsCollector:
             message_id="msg-123"
         )
 
-        # Check that the metric was recorded
-        assert len(self.collector._metrics_history) == 1
-        metric = self.collector._metrics_history[0]
-        assert metric.to_email == "test@example.com"
-        assert metric.success is True
-        assert metric.elapsed_ms == 150.0
-        assert metric.provider == "brevo"
-        assert metric.message_id == "msg-123"
-
-        # Check counters
-        assert self.collector._counters["emails_sent_total_brevo_success"] == 1
+        assert self.collector._sends.values() == {("brevo", "success", ""): 1}
+        latency = self.collector._latency.merged(provider="brevo")
+        assert latency.count == 1
+        assert latency.sum == 150.0
 
     def test_record_failed_email(self):
         """Test recording a failed email send."""
@@ -48,18 +47,7 @@ class TestEmailMetricsCollector:
             error_detail="Invalid API key"
         )
 
-        # Check that the metric was recorded
-        assert len(self.collector._metrics_history) == 1
-        metric = self.collector._metrics_history[0]
-        assert metric.to_email == "test@example.com"
-        assert metric.success is False
-        assert metric.elapsed_ms == 75.0
-        assert metric.provider == "brevo"
-        assert metric.error_type == "api_exception"
-        assert metric.error_detail == "Invalid API key"
-
-        # Check counters
-        assert self.collector._counters["emails_failed_total_brevo_api_exception"] == 1
+        assert self.collector._sends.values() == {("brevo", "failure", "api_exception"): 1}
 
     def test_metrics_summary_empty(self):
         """Test metrics summary when no data is available."""
@@ -92,12 +80,11 @@ class TestEmailMetricsCollector:
         assert summary["failure_count"] == 1
         assert summary["success_rate_percent"] == 66.67
 
-        # Check latency metrics
+        # Check latency metrics (quantiles are estimated from the histogram buckets)
         latency = summary["latency_metrics"]
-        assert latency["min_ms"] == 50.0
-        assert latency["max_ms"] == 200.0
         assert latency["avg_ms"] == pytest.approx(116.67, abs=0.1)
-        assert latency["p50_ms"] == 100.0
+        assert 50.0 < latency["p50_ms"] <= 100.0
+        assert 100.0 < latency["p95_ms"] <= 250.0
 
         # Check error breakdown
         assert summary["error_breakdown"]["api_exception"] == 1
@@ -107,29 +94,17 @@ class TestEmailMetricsCollector:
         assert provider_stats["success"] == 2
         assert provider_stats["failure"] == 1
 
-    def test_metrics_summary_time_filtering(self):
-        """Test that metrics summary filters by time correctly."""
-        # Mock time to control timestamps
-        with patch('time.time') as mock_time:
-            # Set initial time
-            mock_time.return_value = 1000.0
-
-            # Record an old email (3 hours ago)
-            mock_time.return_value = 1000.0 - (3 * 3600)
-            self.collector.record_email_send("old@example.com", True, 100.0, "brevo")
-
-            # Record a recent email (1 hour ago)
-            mock_time.return_value = 1000.0 - (1 * 3600)
-            self.collector.record_email_send("recent@example.com", True, 150.0, "brevo")
+    def test_metrics_are_shared_between_workers(self):
+        """Two collectors on the same Redis hash report the same totals."""
+        other_worker = EmailMetricsCollector(registry=MetricsRegistry(key=self.registry.key))
 
-            # Set current time back
-            mock_time.return_value = 1000.0
+        self.collector.record_email_send("test1@example.com", True, 100.0, "brevo")
+        other_worker.record_email_send("test2@example.com", False, 50.0, "brevo", error_type="timeout")
+        other_worker.registry.flush()
 
-            # Get summary for last 2 hours - should only include recent email
-            summary = self.collector.get_metrics_summary(hours=2)
-
-            assert summary["total_emails"] == 1
-            assert summary["success_count"] == 1
+        summary = self.collector.get_metrics_summary()
+        assert summary["total_emails"] == 2
+        assert summary["error_breakdown"] == {"timeout": 1}
 
     def test_prometheus_metrics(self):
         """Test Prometheus metrics format."""
@@ -145,39 +120,26 @@ class TestEmailMetricsCollector:
 
         # Check for expected metric types
         metrics_text = "\n".join(prometheus_metrics)
-        assert "emails_sent_total_brevo_success 1" in metrics_text
-        assert "emails_failed_total_brevo_api_error 1" in metrics_text
-        assert "email_send_latency_ms" in metrics_text
-        assert "email_success_rate" in metrics_text
+        assert "# TYPE email_sends_total counter" in metrics_text
+        assert 'email_sends_total{provider="brevo",outcome="success",error_type=""} 1' in metrics_text
+        assert 'email_sends_total{provider="brevo",outcome="failure",error_type="api_error"} 1' in metrics_text
+        assert "# TYPE email_send_duration_ms histogram" in metrics_text
+        assert 'email_send_duration_ms_bucket{provider="brevo",le="50"} 1' in metrics_text
+        assert 'email_send_duration_ms_bucket{provider="brevo",le="+Inf"} 2' in metrics_text
+        assert 'email_send_duration_ms_sum{provider="brevo"} 150' in metrics_text
 
     def test_reset_metrics(self):
         """Test resetting metrics."""
         # Record some metrics
         self.collector.record_email_send("test@example.com", True, 100.0, "brevo")
-        assert len(self.collector._metrics_history) == 1
-        assert len(self.collector._counters) > 0
+        assert self.collector.get_metrics_summary()["total_emails"] == 1
 
         # Reset metrics
         self.collector.reset_metrics()
 
         # Check everything is cleared
-        assert len(self.collector._metrics_history) == 0
-        assert len(self.collector._counters) == 0
-
-    def test_max_history_limit(self):
-        """Test that metrics history respects max_history limit."""
-        collector = EmailMetricsCollector(max_history=3)
-
-        # Add 5 metrics (should only keep last 3)
-        for i in range(5):
-            collector.record_email_send(f"test{i}@example.com", True, 100.0, "brevo")
-
-        # Should only have 3 metrics
-        assert len(collector._metrics_history) == 3
-
-        # Should be the last 3 emails
-        emails = [m.to_email for m in collector._metrics_history]
-        assert emails == ["test2@example.com", "test3@example.com", "test4@example.com"]
+        assert self.collector.get_metrics_summary()["total_emails"] == 0
+        assert self.collector._sends.values() == {}
 
     @patch('recyclic_api.utils.email_metrics.logger')
     def test_logging_success(self, mock_logger):
@@ -0,0 +1,115 @@
+"""
+Tests for the email outbox (queued, asynchronous Brevo delivery).
+"""
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.orm import Session, sessionmaker
+
+from recyclic_api.core.email_service import EmailAttachment, EmailDeliveryResult
+from recyclic_api.models.email_log import EmailLog, EmailStatus, EmailType
+from recyclic_api.services.email_outbox_service import (
+    EmailOutboxService,
+    EmailOutboxWorker,
+    OutboxMessage,
+)
+
+
+class FakeEmailService:
+    """Records deliveries instead of calling Brevo."""
+
+    def __init__(self, succeed: bool = True):
+        self.succeed = succeed
+        self.calls = []
+
+    def deliver(self, **kwargs) -> EmailDeliveryResult:
+        self.calls.append(kwargs)
+        if self.succeed:
+            return EmailDeliveryResult(success=True, message_id=f"msg-{len(self.calls)}")
+        return EmailDeliveryResult(success=False, error_type="api_exception", error_detail="Brevo down")
+
+
+def _worker(db_session: Session, email_service: FakeEmailService, **kwargs) -> EmailOutboxWorker:
+    session_factory = sessionmaker(bind=db_session.get_bind(), autoflush=False)
+    return EmailOutboxWorker(
+        session_factory=session_factory,
+        email_service_factory=lambda: email_service,
+        concurrency=2,
+        batch_size=10,
+        retry_base_seconds=60,
+        **kwargs,
+    )
+
+
+def _enqueue(db_session: Session, **kwargs) -> EmailLog:
+    return EmailOutboxService(db_session).enqueue(
+        to_email="outbox@example.com",
+        subject="Outbox test",
+        html_content="<p>Hello</p>",
+        email_type=EmailType.NOTIFICATION,
+        **kwargs,
+    )
+
+
+class TestEmailOutbox:
+    """Test the enqueue side and the worker side of the outbox."""
+
+    def test_enqueue_creates_pending_entry(self, db_session: Session):
+        attachment = EmailAttachment(filename="report.csv", content=b"a;b\n1;2\n", mime_type="text/csv")
+
+        email_log = _enqueue(db_session, attachments=[attachment], from_name="Recyclic Test")
+
+        assert email_log.status == EmailStatus.PENDING
+        assert email_log.next_attempt_at is not None
+        assert email_log.attempts == 0
+
+        message = OutboxMessage.from_log(email_log)
+        assert message.from_name == "Recyclic Test"
+        assert message.attachments[0].filename == "report.csv"
+        assert message.attachments[0].content == b"a;b\n1;2\n"
+
+    @pytest.mark.asyncio
+    async def test_worker_sends_and_marks_sent(self, db_session: Session):
+        email_log = _enqueue(db_session)
+        email_service = FakeEmailService()
+
+        processed = await _worker(db_session, email_service).process_batch()
+
+        assert processed == 1
+        assert email_service.calls[0]["to_email"] == "outbox@example.com"
+        db_session.expire_all()
+        sent = db_session.get(EmailLog, email_log.id)
+        assert sent.status == EmailStatus.SENT
+        assert sent.external_id == "msg-1"
+        assert sent.next_attempt_at is None
+        assert sent.outbox_payload is None
+
+        # Nothing left to send
+        assert await _worker(db_session, email_service).process_batch() == 0
+
+    @pytest.mark.asyncio
+    async def test_worker_schedules_retry_on_failure(self, db_session: Session):
+        email_log = _enqueue(db_session)
+
+        await _worker(db_session, FakeEmailService(succeed=False), max_attempts=3).process_batch()
+
+        db_session.expire_all()
+        retried = db_session.get(EmailLog, email_log.id)
+        assert retried.status == EmailStatus.PENDING
+        assert retried.attempts == 1
+        assert retried.error_message == "Brevo down"
+        next_attempt_at = retried.next_attempt_at
+        if next_attempt_at.tzinfo is None:
+            next_attempt_at = next_attempt_at.replace(tzinfo=timezone.utc)
+        assert next_attempt_at > datetime.now(timezone.utc)
+
+    @pytest.mark.asyncio
+    async def test_worker_marks_failed_after_max_attempts(self, db_session: Session):
+        email_log = _enqueue(db_session)
+
+        await _worker(db_session, FakeEmailService(succeed=False), max_attempts=1).process_batch()
+
+        db_session.expire_all()
+        failed = db_session.get(EmailLog, email_log.id)
+        assert failed.status == EmailStatus.FAILED
+        assert failed.next_attempt_at is None
@@ -3,11 +3,14 @@
 from __future__ import annotations
 
 import csv
+import io
+import zipfile
 from datetime import datetime, timedelta
 from pathlib import Path
 import os
 
 import pytest
+from sqlalchemy import event
 
 from recyclic_api.models.deposit import Deposit, DepositStatus, EEECategory
 from recyclic_api.models.site import Site
@@ -19,6 +22,7 @@ from recyclic_api.core.config import settings
 from recyclic_api.services.export_service import (
     ECOLOGIC_CATEGORIES,
     generate_ecologic_csv,
+    generate_ecologic_csv_batch,
     generate_cash_session_report,
     preview_ecologic_export,
 )
@@ -200,6 +204,96 @@ def test_preview_ecologic_export_returns_aggregated_rows(sample_data, db_session
     assert eee2["sales_amount_eur"] == 20.0
 
 
+def _add_march_deposit(db_session, sample_data):
+    db_session.add(
+        Deposit(
+            user_id=sample_data["donor"].id,
+            site_id=sample_data["site"].id,
+            status=DepositStatus.VALIDATED,
+            category=EEECategory.LIGHTING,
+            weight=1.25,
+            created_at=datetime(2025, 3, 15, 9, 0, 0),
+        )
+    )
+    db_session.commit()
+
+
+def test_generate_ecologic_csv_batch_writes_one_file_per_month(sample_data, db_session, tmp_path):
+    _add_march_deposit(db_session, sample_data)
+
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        result = generate_ecologic_csv_batch(
+            db_session,
+            datetime(2025, 1, 1),
+            datetime(2025, 4, 30),
+            granularity="month",
+            export_dir=tmp_path,
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+    # Les quatre mois sont calculés en une seule requête
+    assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 1
+    assert result.archive_path is None
+    assert [path.name.split("_")[2:4] for path in result.files] == [
+        ["20250101", "20250131"],
+        ["20250201", "20250228"],
+        ["20250301", "20250331"],
+        ["20250401", "20250430"],
+    ]
+
+    january, february, march, _ = (_read_csv(path) for path in result.files)
+    assert january["EEE-2"]["deposit_count"] == "1"
+    assert january["EEE-2"]["sales_quantity"] == "2"
+    assert january["EEE-8"]["sales_amount_eur"] == "20.0"
+    assert all(row["deposit_count"] == "0" for row in february.values())
+    assert march["EEE-4"]["deposit_count"] == "1"
+    assert march["EEE-4"]["deposit_weight_kg"] == "1.25"
+    assert march["EEE-4"]["period_start"] == "2025-03-01"
+
+    # Même résultat que l'export d'une seule période
+    single = _read_csv(generate_ecologic_csv(db_session, datetime(2025, 1, 1), datetime(2025, 1, 31), export_dir=tmp_path / "single"))
+    for code, row in single.items():
+        assert {k: v for k, v in row.items() if k != "generated_at"} == {
+            k: v for k, v in january[code].items() if k != "generated_at"
+        }
+
+
+def test_generate_ecologic_csv_batch_archive(sample_data, db_session, tmp_path):
+    _add_march_deposit(db_session, sample_data)
+
+    result = generate_ecologic_csv_batch(
+        db_session,
+        datetime(2025, 1, 1),
+        datetime(2025, 12, 31),
+        granularity="quarter",
+        export_dir=tmp_path,
+        archive=True,
+    )
+
+    assert result.archive_path.exists()
+    assert list(tmp_path.glob("*.csv")) == []
+    with zipfile.ZipFile(result.archive_path) as archive:
+        assert archive.namelist() == [path.name for path in result.files]
+        assert len(result.files) == 4
+        with archive.open(result.files[0].name) as member:
+            rows = {row["category_code"]: row for row in csv.DictReader(io.TextIOWrapper(member, encoding="utf-8"))}
+    assert rows["EEE-1"]["deposit_count"] == "1"
+    assert rows["EEE-4"]["deposit_count"] == "1"
+    assert rows["EEE-4"]["period_end"] == "2025-03-31"
+
+
+def test_generate_ecologic_csv_batch_rejects_unknown_granularity(db_session, tmp_path):
+    with pytest.raises(ValueError):
+        generate_ecologic_csv_batch(db_session, datetime(2025, 1, 1), datetime(2025, 2, 1), granularity="fortnight", export_dir=tmp_path)
+
 
 def test_generate_cash_session_report_prunes_old_files(db_session, monkeypatch, tmp_path, sample_data):
     monkeypatch.setattr(settings, 'CASH_SESSION_REPORT_DIR', str(tmp_path))
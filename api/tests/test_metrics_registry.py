@@ -0,0 +1,133 @@
+"""
+Tests for the metrics registry shared by every API worker.
+"""
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from recyclic_api.core.redis import get_redis
+from recyclic_api.utils.metrics_registry import HistogramSnapshot, MetricsRegistry
+
+
+class BrokenRedis:
+    """Redis client whose every call fails."""
+
+    def pipeline(self, transaction=True):
+        raise ConnectionError("redis down")
+
+    def hgetall(self, key):
+        raise ConnectionError("redis down")
+
+
+@pytest.fixture
+def redis_key():
+    key = f"test_metrics_registry_{uuid.uuid4().hex}"
+    yield key
+    get_redis().delete(key)
+
+
+def _worker(key: str, **kwargs) -> MetricsRegistry:
+    registry = MetricsRegistry(key=key, **kwargs)
+    registry.counter("jobs_total", "Jobs processed", ("outcome",))
+    registry.histogram("job_duration_ms", "Job duration", (), buckets=(10, 100))
+    return registry
+
+
+class TestMetricsRegistry:
+
+    def test_workers_are_aggregated(self, redis_key):
+        worker_a = _worker(redis_key)
+        worker_b = _worker(redis_key)
+
+        worker_a.counter("jobs_total", "Jobs processed", ("outcome",)).inc(outcome="ok")
+        worker_b.counter("jobs_total", "Jobs processed", ("outcome",)).inc(2, outcome="ok")
+        worker_b.counter("jobs_total", "Jobs processed", ("outcome",)).inc(outcome="error")
+        worker_b.flush()
+
+        assert worker_a.counter("jobs_total", "Jobs processed").values() == {("ok",): 3, ("error",): 1}
+
+    def test_increments_are_flushed_after_interval(self, redis_key):
+        registry = _worker(redis_key, flush_interval_seconds=0)
+        registry.counter("jobs_total", "Jobs processed").inc(outcome="ok")
+
+        # Flushed on record: visible without reading through the same registry
+        assert get_redis().hlen(redis_key) == 1
+
+    def test_histogram_exposition(self, redis_key):
+        registry = _worker(redis_key)
+        histogram = registry.histogram("job_duration_ms", "Job duration")
+        for value in (5, 10, 50, 500):
+            histogram.observe(value)
+
+        lines = registry.render_prometheus(["job_duration_ms"])
+
+        assert lines == [
+            "# HELP job_duration_ms Job duration",
+            "# TYPE job_duration_ms histogram",
+            'job_duration_ms_bucket{le="10"} 2',
+            'job_duration_ms_bucket{le="100"} 3',
+            'job_duration_ms_bucket{le="+Inf"} 4',
+            "job_duration_ms_sum 565",
+            "job_duration_ms_count 4",
+        ]
+
+    def test_reset_only_selected_metrics(self, redis_key):
+        registry = _worker(redis_key)
+        registry.counter("jobs_total", "Jobs processed").inc(outcome="ok")
+        registry.histogram("job_duration_ms", "Job duration").observe(5)
+
+        registry.reset(["jobs_total"])
+
+        assert registry.counter("jobs_total", "Jobs processed").values() == {}
+        assert registry.histogram("job_duration_ms", "Job duration").merged().count == 1
+
+    def test_unexpected_labels_are_rejected(self, redis_key):
+        with pytest.raises(ValueError):
+            _worker(redis_key).counter("jobs_total", "Jobs processed").inc(status="ok")
+
+    def test_redis_failure_keeps_local_values(self):
+        registry = _worker("unused", redis_factory=BrokenRedis, flush_interval_seconds=0)
+        counter = registry.counter("jobs_total", "Jobs processed")
+
+        counter.inc(outcome="ok")
+        counter.inc(outcome="ok")
+
+        assert counter.values() == {("ok",): 2}
+
+
+def test_histogram_quantile_interpolates_within_bucket():
+    snapshot = HistogramSnapshot(bounds=(10.0, 100.0), bucket_counts=[2, 2, 0], sum=0, count=4)
+
+    assert snapshot.quantile(0.5) == 10.0
+    assert snapshot.quantile(0.75) == 55.0
+
+
+def test_metrics_endpoint_exposes_registry(client: TestClient):
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE auth_login_attempts_total counter" in response.text
+    assert "# TYPE email_send_duration_ms histogram" in response.text
+    assert "rate_limit_throttled_total" in response.text
+
+
+def test_hourly_windows_only_count_recent_hours(redis_key, monkeypatch):
+    registry = _worker(redis_key)
+    counter = registry.counter("jobs_total", "Jobs processed")
+    now = 1_000 * 3600 + 120
+
+    monkeypatch.setattr("recyclic_api.utils.metrics_registry.time.time", lambda: now - 2 * 3600)
+    counter.inc(outcome="ok")
+    registry.flush()
+    monkeypatch.setattr("recyclic_api.utils.metrics_registry.time.time", lambda: now)
+    counter.inc(2, outcome="ok")
+
+    assert counter.values(hours=1) == {("ok",): 2}
+    assert counter.values(hours=3) == {("ok",): 3}
+    assert counter.values() == {("ok",): 3}
+    assert 0 < get_redis().ttl(f"{redis_key}:hour:1000") <= 169 * 3600
+
+    registry.reset(["jobs_total"])
+    assert counter.values(hours=3) == {}
@@ -5,19 +5,39 @@ Ce module teste les fonctionnalités critiques du système de monitoring
 incluant la détection d'anomalies et la planification des tâches.
 """
 
+import json
+import uuid
+
 import pytest
 import asyncio
 from unittest.mock import Mock, AsyncMock, patch
 from datetime import datetime, timedelta, timezone
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 
 from recyclic_api.services.anomaly_detection_service import AnomalyDetectionService
-from recyclic_api.services.scheduler_service import SchedulerService, ScheduledTask
-from recyclic_api.models.cash_session import CashSession
+from recyclic_api.services.scheduler_service import SchedulerService, ScheduledTask, SchedulerLeaderLock
+from recyclic_api.models.cash_session import CashSession, CashSessionStatus
 from recyclic_api.models.deposit import Deposit
+from recyclic_api.models.login_history import LoginHistory
+from recyclic_api.models.setting import Setting
+from recyclic_api.models.site import Site
+from recyclic_api.models.sync_log import SyncLog
 from recyclic_api.models.user import User
 
 
+class FakeRedis:
+    """Stockage clé/valeur en mémoire à la place de Redis."""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+
+
 class TestAnomalyDetectionService:
     """Tests pour le service de détection d'anomalies."""
 
@@ -27,9 +47,22 @@ class TestAnomalyDetectionService:
         return Mock(spec=Session)
 
     @pytest.fixture
-    def anomaly_service(self, mock_db):
+    def fake_redis(self):
+        return FakeRedis()
+
+    @pytest.fixture
+    def anomaly_service(self, mock_db, fake_redis):
         """Instance du service de détection d'anomalies."""
-        return AnomalyDetectionService(mock_db)
+        return AnomalyDetectionService(mock_db, redis_factory=lambda: fake_redis)
+
+    @pytest.fixture
+    def db_anomaly_service(self, db_session, fake_redis):
+        """Service dont les détecteurs travaillent sur la base de test."""
+        return AnomalyDetectionService(
+            db_session,
+            session_factory=sessionmaker(bind=db_session.get_bind()),
+            redis_factory=lambda: fake_redis,
+        )
 
     def test_anomaly_service_initialization(self, anomaly_service, mock_db):
         """Test l'initialisation du service."""
@@ -37,125 +70,125 @@ class TestAnomalyDetectionService:
         assert anomaly_service.anomaly_thresholds is not None
 
     @pytest.mark.asyncio
-    async def test_detect_cash_anomalies(self, anomaly_service, mock_db):
+    async def test_detect_cash_anomalies(self, db_anomaly_service, db_session):
         """Test la détection d'écarts de caisse."""
-        # Mock des sessions de caisse avec écarts
-        mock_sessions = [
-            Mock(
-                id=1,
-                variance=15.0,
-                operator_id=1,
-                operator=Mock(username="test_operator"),
-                site=Mock(name="test_site"),
+        operator = User(username=f"op_{uuid.uuid4().hex[:8]}", hashed_password="x")
+        site = Site(name="Site anomalies")
+        db_session.add_all([operator, site])
+        db_session.commit()
+
+        def closed_session(variance, closed_at):
+            return CashSession(
+                operator_id=operator.id,
+                site_id=site.id,
+                initial_amount=100.0,
+                current_amount=100.0,
+                status=CashSessionStatus.CLOSED,
+                closed_at=closed_at,
                 closing_amount=150.0,
-                actual_amount=135.0,
-                closed_at=datetime.now(timezone.utc)
+                actual_amount=150.0 + variance,
+                variance=variance,
             )
-        ]
 
-        # Mock de la requête de base de données avec joinedload
-        mock_query = Mock()
-        mock_query.filter.return_value.options.return_value.limit.return_value.all.return_value = mock_sessions
-        mock_db.query.return_value = mock_query
+        earlier = datetime.now(timezone.utc) - timedelta(minutes=5)
+        db_session.add_all([closed_session(-15.0, earlier), closed_session(2.0, earlier)])
+        db_session.commit()
 
-        # Exécution de la détection
-        anomalies = await anomaly_service._detect_cash_anomalies()
+        anomalies = await db_anomaly_service._detect_cash_anomalies()
 
-        # Vérifications
         assert len(anomalies) == 1
         assert anomalies[0]['type'] == 'cash_variance'
         assert anomalies[0]['severity'] == 'medium'
 
+        # Passage suivant : seule la nouvelle session est lue, l'anomalie précédente reste connue
+        db_session.add(closed_session(80.0, datetime.now(timezone.utc)))
+        db_session.commit()
+        anomalies = await db_anomaly_service._detect_cash_anomalies()
+
+        assert [a['severity'] for a in anomalies] == ['high', 'medium']
+
     @pytest.mark.asyncio
-    async def test_detect_sync_anomalies(self, anomaly_service, mock_db):
+    async def test_detect_sync_anomalies(self, db_anomaly_service, db_session):
         """Test la détection d'erreurs de synchronisation."""
-        # Mock des logs de synchronisation avec erreurs
-        mock_sync_logs = [
-            Mock(
-                id=1,
-                status='error',
-                sync_type='deposit_sync',
-                created_at=datetime.now(timezone.utc) - timedelta(minutes=30)
-            ),
-            Mock(
-                id=2,
-                status='error',
-                sync_type='deposit_sync',
-                created_at=datetime.now(timezone.utc) - timedelta(minutes=15)
-            ),
-            Mock(
-                id=3,
-                status='error',
-                sync_type='deposit_sync',
-                created_at=datetime.now(timezone.utc) - timedelta(minutes=5)
-            )
-        ]
+        now = datetime.now(timezone.utc)
+        db_session.add_all([
+            SyncLog(sync_type='deposit_sync', status='error', created_at=now - timedelta(minutes=minutes))
+            for minutes in (30, 15)
+        ] + [SyncLog(sync_type='deposit_sync', status='success', created_at=now - timedelta(minutes=20))])
+        db_session.commit()
 
-        # Mock de la requête de base de données avec limit
-        mock_query = Mock()
-        mock_query.filter.return_value.order_by.return_value.limit.return_value.all.return_value = mock_sync_logs
-        mock_db.query.return_value = mock_query
+        # Sous le seuil de 3 erreurs
+        assert await db_anomaly_service._detect_sync_anomalies() == []
 
-        # Exécution de la détection
-        anomalies = await anomaly_service._detect_sync_anomalies()
+        # Une seule nouvelle erreur : le compteur de la fenêtre est conservé entre deux passages
+        db_session.add(SyncLog(sync_type='deposit_sync', status='error', created_at=datetime.now(timezone.utc)))
+        db_session.commit()
+        anomalies = await db_anomaly_service._detect_sync_anomalies()
 
-        # Vérifications
         assert len(anomalies) == 1  # Seuil de 3 erreurs
         assert anomalies[0]['type'] == 'sync_failure'
         assert anomalies[0]['severity'] == 'medium'
+        assert anomalies[0]['details']['failure_count'] == 3
+        assert anomalies[0]['details']['recent_syncs'] == 4
 
     @pytest.mark.asyncio
-    async def test_detect_auth_anomalies(self, anomaly_service, mock_db):
+    async def test_detect_auth_anomalies(self, db_anomaly_service, db_session):
         """Test la détection d'échecs d'authentification."""
-        # Mock des logs d'authentification avec échecs
-        mock_auth_logs = [
-            Mock(
-                id=1,
-                user_id=1,
-                success=False,
-                created_at=datetime.now(timezone.utc) - timedelta(minutes=10)
-            ),
-            Mock(
-                id=2,
-                user_id=1,
-                success=False,
-                created_at=datetime.now(timezone.utc) - timedelta(minutes=5)
-            ),
-            Mock(
-                id=3,
-                user_id=1,
-                success=False,
-                created_at=datetime.now(timezone.utc) - timedelta(minutes=1)
-            ),
-            Mock(
-                id=4,
-                user_id=1,
-                success=False,
-                created_at=datetime.now(timezone.utc) - timedelta(minutes=30)
-            ),
-            Mock(
-                id=5,
-                user_id=1,
-                success=False,
-                created_at=datetime.now(timezone.utc) - timedelta(minutes=20)
-            )
-        ]
-
-        # Mock de la requête de base de données avec limit
-        mock_query = Mock()
-        mock_query.filter.return_value.limit.return_value.all.return_value = mock_auth_logs
-        mock_db.query.return_value = mock_query
+        user_id = uuid.uuid4()
+        now = datetime.now(timezone.utc)
+        db_session.add_all([
+            LoginHistory(id=uuid.uuid4(), user_id=user_id, success=False, created_at=now - timedelta(minutes=minutes))
+            for minutes in (1, 5, 10, 20, 30)
+        ] + [LoginHistory(id=uuid.uuid4(), user_id=uuid.uuid4(), success=False, created_at=now)])
+        db_session.commit()
 
-        # Exécution de la détection
-        anomalies = await anomaly_service._detect_auth_anomalies()
+        anomalies = await db_anomaly_service._detect_auth_anomalies()
 
-        # Vérifications
         assert len(anomalies) == 1  # Seuil de 5 échecs
         assert anomalies[0]['type'] == 'auth_failure'
         assert anomalies[0]['severity'] == 'medium'
+        assert anomalies[0]['details']['total_attempts'] == 5
+
+    @pytest.mark.asyncio
+    async def test_detector_only_reads_rows_after_watermark(self, db_anomaly_service, db_session):
+        """Les lignes antérieures au filigrane ne sont pas relues."""
+        db_session.add_all([
+            SyncLog(sync_type='backup', status='error', created_at=datetime.now(timezone.utc) - timedelta(minutes=1))
+            for _ in range(3)
+        ])
+        db_session.commit()
+        assert len(await db_anomaly_service._detect_sync_anomalies()) == 1
+
+        state = db_session.query(Setting).filter(Setting.key == 'anomaly_detection.sync').one()
+        db_session.refresh(state)
+        assert json.loads(state.value)['watermark']
+
+        # Une erreur antérieure au filigrane (ex: insertion tardive) n'est pas comptée
+        db_session.add(SyncLog(sync_type='backup', status='error', created_at=datetime.now(timezone.utc) - timedelta(hours=1)))
+        db_session.commit()
+        anomalies = await db_anomaly_service._detect_sync_anomalies()
+        assert anomalies[0]['details']['failure_count'] == 3
 
     @pytest.mark.asyncio
-    async def test_run_anomaly_detection(self, anomaly_service):
+    async def test_late_committed_row_is_counted_once(self, db_anomaly_service, db_session):
+        """Une ligne validée après un passage mais datée d'avant est comptée au suivant, une seule fois."""
+        db_session.add_all([
+            SyncLog(sync_type='backup', status='error', created_at=datetime.now(timezone.utc) - timedelta(minutes=5))
+            for _ in range(2)
+        ])
+        db_session.commit()
+        assert await db_anomaly_service._detect_sync_anomalies() == []
+
+        # Datée d'avant le passage précédent, mais dans le retrait du filigrane
+        db_session.add(SyncLog(sync_type='backup', status='error', created_at=datetime.now(timezone.utc) - timedelta(seconds=5)))
+        db_session.commit()
+
+        for _ in range(2):
+            anomalies = await db_anomaly_service._detect_sync_anomalies()
+            assert anomalies[0]['details']['failure_count'] == 3
+
+    @pytest.mark.asyncio
+    async def test_run_anomaly_detection(self, anomaly_service, fake_redis):
         """Test l'exécution complète de la détection d'anomalies."""
         # Mock des méthodes de détection
         with patch.object(anomaly_service, '_detect_cash_anomalies', return_value=[]), \
@@ -172,6 +205,23 @@ class TestAnomalyDetectionService:
             assert 'recommendations' in result
             assert 'summary' in result
 
+    @pytest.mark.asyncio
+    async def test_result_is_shared_through_redis(self, mock_db, fake_redis):
+        """Un autre worker lit le résultat publié sans relancer les détecteurs."""
+        producer = AnomalyDetectionService(mock_db, redis_factory=lambda: fake_redis)
+        with patch.object(producer, '_detect_cash_anomalies', return_value=[{'type': 'cash_variance'}]), \
+             patch.object(producer, '_detect_sync_anomalies', return_value=[]), \
+             patch.object(producer, '_detect_auth_anomalies', return_value=[]):
+            await producer.run_anomaly_detection(force_refresh=True)
+
+        reader = AnomalyDetectionService(mock_db, redis_factory=lambda: fake_redis)
+        with patch.object(reader, '_detect_cash_anomalies') as detector:
+            result = await reader.run_anomaly_detection()
+
+        detector.assert_not_called()
+        assert result['summary']['total_anomalies'] == 1
+        assert result['anomalies']['cash_anomalies'] == [{'type': 'cash_variance'}]
+
     @pytest.mark.asyncio
     async def test_send_anomaly_notifications(self, anomaly_service):
         """Test l'envoi de notifications d'anomalies."""
@@ -293,7 +343,7 @@ class TestSchedulerService:
         """Test la configuration des tâches par défaut."""
         scheduler_service.setup_default_tasks()
         
-        expected_tasks = ["anomaly_detection", "health_check", "cleanup", "weekly_reports"]
+        expected_tasks = ["anomaly_detection", "health_check", "cleanup", "partition_maintenance", "weekly_reports"]
         for task_name in expected_tasks:
             assert task_name in scheduler_service.tasks
 
@@ -327,6 +377,110 @@ class TestSchedulerService:
         assert len(status["tasks"]) == 1
 
 
+class TestSchedulerDispatch:
+    """Tests du tas d'échéances, de l'exécution concurrente et de l'élection du leader."""
+
+    def test_due_tasks_popped_in_deadline_order(self):
+        scheduler = SchedulerService(redis_client=Mock())
+
+        async def dummy_task():
+            return "test"
+
+        now = datetime.now(timezone.utc)
+        scheduler.add_task("later", dummy_task, 30)
+        scheduler.add_task("sooner", dummy_task, 30)
+        scheduler.tasks["later"].next_run = now - timedelta(minutes=1)
+        scheduler.tasks["sooner"].next_run = now - timedelta(minutes=5)
+        scheduler._rebuild_heap()
+
+        due = scheduler._pop_due_tasks(now)
+
+        assert [task.name for task in due] == ["sooner", "later"]
+        assert scheduler._pop_due_tasks(now) == []
+
+    def test_next_deadline_drives_sleep(self):
+        scheduler = SchedulerService(redis_client=Mock())
+
+        async def dummy_task():
+            return "test"
+
+        now = datetime.now(timezone.utc)
+        scheduler.add_task("task", dummy_task, 30)
+        scheduler.tasks["task"].next_run = now + timedelta(seconds=90)
+        scheduler._rebuild_heap()
+
+        assert scheduler._pop_due_tasks(now) == []
+        assert scheduler._seconds_until_next_deadline(now) == pytest.approx(90, abs=1)
+
+    def test_disabled_task_is_not_dispatched(self):
+        scheduler = SchedulerService(redis_client=Mock())
+
+        async def dummy_task():
+            return "test"
+
+        scheduler.add_task("task", dummy_task, 30)
+        scheduler.disable_task("task")
+
+        assert scheduler._pop_due_tasks(datetime.now(timezone.utc) + timedelta(minutes=1)) == []
+
+    @pytest.mark.asyncio
+    async def test_task_timeout_reschedules(self):
+        async def slow_task():
+            await asyncio.sleep(5)
+
+        task = ScheduledTask("slow", slow_task, 30, timeout_seconds=0.05)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await task.execute()
+
+        assert task.running is False
+        assert task.next_run is not None
+
+    @pytest.mark.asyncio
+    async def test_slow_task_does_not_delay_others(self, monkeypatch):
+        monkeypatch.setattr("recyclic_api.services.scheduler_service.settings.SCHEDULER_LEADER_ELECTION", False)
+        scheduler = SchedulerService(redis_client=Mock())
+        fast_done = asyncio.Event()
+
+        async def slow_task():
+            await asyncio.sleep(5)
+
+        async def fast_task():
+            fast_done.set()
+
+        scheduler.running = True
+        scheduler._wakeup = asyncio.Event()
+        scheduler.add_task("slow", slow_task, 30)
+        scheduler.add_task("fast", fast_task, 30)
+        loop_task = asyncio.create_task(scheduler.run_scheduler_loop())
+        try:
+            await asyncio.wait_for(fast_done.wait(), timeout=2)
+            assert scheduler.tasks["slow"].running is True
+        finally:
+            scheduler._task = loop_task
+            await scheduler.stop()
+
+    def test_leader_lock_is_exclusive(self):
+        from recyclic_api.core.redis import get_redis
+
+        redis_client = get_redis()
+        key = "scheduler:leader:test"
+        redis_client.delete(key)
+        first = SchedulerLeaderLock(redis_client, key, ttl_seconds=5)
+        second = SchedulerLeaderLock(redis_client, key, ttl_seconds=5)
+
+        try:
+            assert first.acquire_or_renew() is True
+            assert second.acquire_or_renew() is False
+            # Le leader renouvelle son propre verrou
+            assert first.acquire_or_renew() is True
+
+            first.release()
+            assert second.acquire_or_renew() is True
+        finally:
+            redis_client.delete(key)
+
+
 class TestMonitoringIntegration:
     """Tests d'intégration pour le système de monitoring."""
 
@@ -342,8 +496,9 @@ class TestMonitoringIntegration:
         mock_db.query.return_value.filter.return_value.order_by.return_value.all.return_value = []
         
         # Test du service de détection d'anomalies
-        anomaly_service = AnomalyDetectionService(mock_db)
-        result = await anomaly_service.run_anomaly_detection()
+        anomaly_service = AnomalyDetectionService(mock_db, redis_factory=FakeRedis)
+        with patch.object(anomaly_service, '_run_detector', AsyncMock(return_value=[])):
+            result = await anomaly_service.run_anomaly_detection()
         
         # Test du service de planification
         scheduler_service = SchedulerService()
@@ -352,8 +507,8 @@ class TestMonitoringIntegration:
         # Vérifications
         assert isinstance(result, dict)
         assert 'anomalies' in result
-        assert len(scheduler_service.tasks) == 4
-        assert scheduler_service.get_status()["total_tasks"] == 4
+        assert len(scheduler_service.tasks) == 5
+        assert scheduler_service.get_status()["total_tasks"] == 5
 
 
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+"""
+Tests de la maintenance des partitions mensuelles.
+
+Les tables de test sont créées par create_all (non partitionnées) : on travaille
+sur une table partitionnée jetable, dans la transaction du test.
+"""
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from recyclic_api.services.partition_service import (
+    PartitionedTable,
+    add_months,
+    create_partition,
+    list_monthly_partitions,
+    run_partition_maintenance,
+)
+
+NOW = datetime(2026, 5, 17, 10, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def events_table(db_session: Session) -> PartitionedTable:
+    db_session.execute(text(
+        "CREATE TABLE test_partition_events (id int, created_at timestamptz NOT NULL) "
+        "PARTITION BY RANGE (created_at)"
+    ))
+    spec = PartitionedTable("test_partition_events", "created_at", retention_months=12)
+    for month in (datetime(2024, 12, 1, tzinfo=timezone.utc), datetime(2025, 5, 1, tzinfo=timezone.utc)):
+        create_partition(db_session, spec, month)
+    db_session.execute(text("INSERT INTO test_partition_events VALUES (1, '2024-12-15'), (2, '2025-05-20')"))
+    return spec
+
+
+def _maintain(db_session: Session, spec: PartitionedTable):
+    return run_partition_maintenance(session_factory=lambda: db_session, now=NOW, tables=[spec])
+
+
+def test_add_months_crosses_years():
+    assert add_months(datetime(2025, 11, 1), 3) == datetime(2026, 2, 1)
+    assert add_months(datetime(2025, 1, 1), -1) == datetime(2024, 12, 1)
+
+
+def test_maintenance_creates_upcoming_partitions(db_session: Session, events_table):
+    report = _maintain(db_session, events_table)
+
+    created = report["test_partition_events"]["created"]
+    assert created == [
+        "test_partition_events_p202605",
+        "test_partition_events_p202606",
+        "test_partition_events_p202607",
+        "test_partition_events_p202608",
+    ]
+    # Deuxième passage : rien à créer
+    assert _maintain(db_session, events_table)["test_partition_events"]["created"] == []
+
+
+def test_maintenance_detaches_expired_partitions_to_archive(db_session: Session, events_table):
+    report = _maintain(db_session, events_table)
+
+    # Rétention de 12 mois au 17/05/2026 : décembre 2024 sort, mai 2025 reste
+    assert report["test_partition_events"]["detached"] == ["archive.test_partition_events_p202412"]
+    assert "test_partition_events_p202412" not in list_monthly_partitions(db_session, "test_partition_events")
+    assert db_session.execute(text("SELECT id FROM test_partition_events")).scalars().all() == [2]
+    # Les données détachées restent consultables dans le schéma d'archive
+    assert db_session.execute(text("SELECT id FROM archive.test_partition_events_p202412")).scalars().all() == [1]
+
+
+def test_range_query_prunes_partitions(db_session: Session, events_table):
+    _maintain(db_session, events_table)
+
+    plan = "\n".join(db_session.execute(text(
+        "EXPLAIN SELECT * FROM test_partition_events "
+        "WHERE created_at >= '2026-06-01' AND created_at < '2026-07-01'"
+    )).scalars())
+
+    assert "test_partition_events_p202606" in plan
+    assert "test_partition_events_p202605" not in plan
+
+
+def test_unpartitioned_tables_are_skipped(db_session: Session):
+    report = run_partition_maintenance(session_factory=lambda: db_session, now=NOW)
+
+    # audit_logs / login_history sont créées par create_all dans la base de test
+    assert report == {}
@@ -120,7 +120,7 @@ class TestForgotPasswordEndpoint:
 
     def test_forgot_password_success(self, client: TestClient, test_user: User):
         """Test la réinitialisation de mot de passe avec envoi d'email réussi."""
-        with patch('recyclic_api.api.api_v1.endpoints.auth.send_password_reset_email_safe') as mock_send_email:
+        with patch('recyclic_api.api.api_v1.endpoints.auth.queue_password_reset_email') as mock_send_email:
             # Configuration du mock
             mock_send_email.return_value = True
             
@@ -143,7 +143,7 @@ class TestForgotPasswordEndpoint:
 
     def test_forgot_password_user_not_found(self, client: TestClient):
         """Test la réinitialisation avec un email qui n'existe pas."""
-        with patch('recyclic_api.api.api_v1.endpoints.auth.send_password_reset_email_safe') as mock_send_email:
+        with patch('recyclic_api.api.api_v1.endpoints.auth.queue_password_reset_email') as mock_send_email:
             # Test
             response = client.post(
                 "/api/v1/auth/forgot-password",
@@ -172,7 +172,7 @@ class TestForgotPasswordEndpoint:
         db_session.add(user)
         db_session.commit()
         
-        with patch('recyclic_api.api.api_v1.endpoints.auth.send_password_reset_email_safe') as mock_send_email:
+        with patch('recyclic_api.api.api_v1.endpoints.auth.queue_password_reset_email') as mock_send_email:
             # Test
             response = client.post(
                 "/api/v1/auth/forgot-password",
@@ -189,7 +189,7 @@ class TestForgotPasswordEndpoint:
 
     def test_forgot_password_email_send_failure(self, client: TestClient, test_user: User):
         """Test la gestion d'échec d'envoi d'email."""
-        with patch('recyclic_api.api.api_v1.endpoints.auth.send_password_reset_email_safe') as mock_send_email:
+        with patch('recyclic_api.api.api_v1.endpoints.auth.queue_password_reset_email') as mock_send_email:
             # Configuration du mock pour simuler un échec
             mock_send_email.return_value = False
             
@@ -209,7 +209,7 @@ class TestForgotPasswordEndpoint:
 
     def test_forgot_password_email_send_exception(self, client: TestClient, test_user: User):
         """Test la gestion d'exception lors de l'envoi d'email."""
-        with patch('recyclic_api.api.api_v1.endpoints.auth.send_password_reset_email_safe') as mock_send_email:
+        with patch('recyclic_api.api.api_v1.endpoints.auth.queue_password_reset_email') as mock_send_email:
             # Configuration du mock pour lever une exception
             mock_send_email.side_effect = Exception("Email service unavailable")
             
@@ -229,7 +229,7 @@ class TestForgotPasswordEndpoint:
 
     def test_forgot_password_rate_limiting(self, client: TestClient, test_user: User):
         """Test le rate limiting sur l'endpoint forgot-password."""
-        with patch('recyclic_api.api.api_v1.endpoints.auth.send_password_reset_email_safe') as mock_send_email:
+        with patch('recyclic_api.api.api_v1.endpoints.auth.queue_password_reset_email') as mock_send_email:
             mock_send_email.return_value = True
             
             # Faire plusieurs requêtes rapidement
@@ -247,7 +247,7 @@ class TestForgotPasswordEndpoint:
 
     def test_forgot_password_audit_logging(self, client: TestClient, test_user: User, db_session: Session):
         """Test que l'audit logging fonctionne pour les demandes de réinitialisation."""
-        with patch('recyclic_api.api.api_v1.endpoints.auth.send_password_reset_email_safe') as mock_send_email:
+        with patch('recyclic_api.api.api_v1.endpoints.auth.queue_password_reset_email') as mock_send_email:
             mock_send_email.return_value = True
             
             # Test
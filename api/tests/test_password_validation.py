@@ -102,3 +102,24 @@ class TestPasswordValidation:
         
         assert is_valid is False
         assert "Password must be at least 8 characters long" in errors
+
+
+class TestAsyncPasswordHashing:
+    """Tests for the executor-backed hashing helpers"""
+
+    @pytest.mark.asyncio
+    async def test_hash_and_verify_run_in_dedicated_pool(self):
+        """Hashing and verification give the same results as the sync helpers"""
+        from recyclic_api.core.security import (
+            hash_password_async,
+            verify_and_update_password_async,
+            verify_password,
+            verify_password_async,
+        )
+
+        hashed = await hash_password_async("StrongPass123!")
+
+        assert verify_password("StrongPass123!", hashed)
+        assert await verify_password_async("StrongPass123!", hashed) is True
+        assert await verify_password_async("WrongPass123!", hashed) is False
+        assert await verify_and_update_password_async("StrongPass123!", hashed) == (True, None)
@@ -0,0 +1,113 @@
+"""
+Tests for the Redis-backed rate limiter (sliding window shared across workers).
+"""
+import uuid
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from slowapi import Limiter
+from slowapi.errors import RateLimitExceeded
+from starlette.requests import Request as StarletteRequest
+
+from recyclic_api.core.config import settings
+from recyclic_api.core.redis import get_redis
+from recyclic_api.core.security import create_access_token
+from recyclic_api.utils.rate_limit import rate_limit_exceeded_handler, rate_limit_key
+from recyclic_api.utils.rate_limit_metrics import RateLimitMetricsCollector
+
+
+def _request(headers=None, client_host="10.0.0.1") -> StarletteRequest:
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": (client_host, 1234),
+    }
+    return StarletteRequest(scope)
+
+
+def _redis_limiter(prefix: str) -> Limiter:
+    """A limiter configured like the application one, isolated by key prefix."""
+    return Limiter(
+        key_func=rate_limit_key,
+        storage_uri=settings.REDIS_URL,
+        strategy=settings.RATE_LIMIT_STRATEGY,
+        key_prefix=prefix,
+    )
+
+
+@pytest.fixture
+def redis_prefix():
+    prefix = f"test_rate_limit_{uuid.uuid4().hex}"
+    yield prefix
+    client = get_redis()
+    keys = list(client.scan_iter(f"{prefix}*"))
+    if keys:
+        client.delete(*keys)
+
+
+class TestRateLimitKey:
+    """The bucket is the user when authenticated, the IP otherwise."""
+
+    def test_authenticated_request_is_keyed_by_user(self):
+        token = create_access_token({"sub": "user-123"})
+        request = _request({"Authorization": f"Bearer {token}"})
+
+        assert rate_limit_key(request) == "user:user-123"
+
+    def test_anonymous_request_is_keyed_by_ip(self):
+        assert rate_limit_key(_request()) == "ip:10.0.0.1"
+
+    def test_invalid_token_falls_back_to_ip(self):
+        request = _request({"Authorization": "Bearer not-a-jwt"})
+
+        assert rate_limit_key(request) == "ip:10.0.0.1"
+
+
+class TestRedisSlidingWindow:
+    """Limits are enforced in Redis, hence shared between workers."""
+
+    def test_limit_is_shared_between_workers(self, redis_prefix):
+        from limits import parse
+
+        worker_a = _redis_limiter(redis_prefix)
+        worker_b = _redis_limiter(redis_prefix)
+        limit = parse("4/minute")
+
+        # Requests alternate between two "workers" sharing the same Redis
+        results = [
+            (worker_a if i % 2 == 0 else worker_b).limiter.hit(limit, "ip:10.0.0.1")
+            for i in range(5)
+        ]
+
+        assert results == [True, True, True, True, False]
+        # Another client has its own window
+        assert worker_b.limiter.hit(limit, "ip:10.0.0.2") is True
+
+    def test_throttled_requests_are_counted(self, redis_prefix):
+        limiter = _redis_limiter(redis_prefix)
+        app = FastAPI()
+        app.state.limiter = limiter
+        app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
+
+        @app.get("/limited")
+        @limiter.limit("2/minute")
+        async def limited(request: Request):
+            return {"ok": True}
+
+        metrics = RateLimitMetricsCollector(
+            key=f"{redis_prefix}:metrics", limits_key=f"{redis_prefix}:limits"
+        )
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr("recyclic_api.utils.rate_limit.rate_limit_metrics", metrics)
+            client = TestClient(app)
+            statuses = [client.get("/limited").status_code for _ in range(3)]
+
+        assert statuses == [200, 200, 429]
+        summary = metrics.get_metrics_summary()
+        assert summary["throttled_total"] == 1
+        assert summary["routes"]["/limited"]["throttled"] == 1
+        assert summary["routes"]["/limited"]["limit"] == "2 per 1 minute"
+        assert 'rate_limit_throttled_by_route_total{route="/limited"} 1' in metrics.get_prometheus_metrics()
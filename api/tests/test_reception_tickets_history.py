@@ -10,6 +10,7 @@ from decimal import Decimal
 from recyclic_api.main import app
 from recyclic_api.models import TicketDepot, PosteReception, LigneDepot, Category, User, UserRole, UserStatus
 from recyclic_api.models.ligne_depot import Destination
+from recyclic_api.services.reception_service import ReceptionService
 
 
 @pytest.fixture
@@ -115,6 +116,10 @@ def test_tickets(db_session, test_poste, test_user, test_category):
         tickets.append(ticket)
     
     db_session.commit()
+    # Lignes insérées hors du service : recalculer les totaux stockés
+    service = ReceptionService(db_session)
+    for ticket in tickets:
+        service.recompute_ticket_totals(ticket.id)
     return tickets
 
 
@@ -302,3 +307,56 @@ def test_get_tickets_list_large_per_page(client, test_user):
     )
     
     assert response.status_code == 422  # Validation error
+
+
+def test_ticket_totals_follow_line_changes(db_session, test_poste, test_user, test_category):
+    """Les totaux stockés suivent la création, la modification et la suppression des lignes."""
+    service = ReceptionService(db_session)
+    ticket = service.create_ticket(poste_id=test_poste.id, benevole_user_id=test_user.id)
+
+    first = service.create_ligne(ticket_id=ticket.id, category_id=test_category.id, poids_kg=1.5, destination="MAGASIN", notes=None)
+    service.create_ligne(ticket_id=ticket.id, category_id=test_category.id, poids_kg=2.25, destination="RECYCLAGE", notes=None)
+    db_session.refresh(ticket)
+    assert (ticket.total_lignes, ticket.total_poids_kg) == (2, Decimal("3.750"))
+
+    service.update_ligne(ligne_id=first.id, poids_kg=4.0)
+    db_session.refresh(ticket)
+    assert (ticket.total_lignes, ticket.total_poids_kg) == (2, Decimal("6.250"))
+
+    service.delete_ligne(ligne_id=first.id)
+    db_session.refresh(ticket)
+    assert (ticket.total_lignes, ticket.total_poids_kg) == (1, Decimal("2.250"))
+
+
+def test_get_tickets_list_does_not_load_lines(db_session, test_tickets):
+    """La liste lit les totaux stockés sans charger les lignes des tickets."""
+    from sqlalchemy import inspect
+
+    tickets, total = ReceptionService(db_session).get_tickets_list(page=1, per_page=10)
+
+    assert total == 3
+    assert all("lignes" in inspect(ticket).unloaded for ticket in tickets)
+    assert all(ticket.total_lignes == 2 for ticket in tickets)
+
+
+def test_recompute_ticket_totals_repairs_lines_written_outside_the_service(db_session, test_tickets):
+    """Les totaux d'un ticket, ou de tous, sont recalculés à partir des lignes (ex: import avec suppression)."""
+    first, second, third = test_tickets
+    db_session.query(LigneDepot).filter(LigneDepot.ticket_id == first.id).delete()
+    db_session.query(LigneDepot).filter(LigneDepot.ticket_id == second.id).delete()
+    db_session.commit()
+    service = ReceptionService(db_session)
+
+    service.recompute_ticket_totals(first.id)
+    for ticket in test_tickets:
+        db_session.refresh(ticket)
+    assert [(t.total_lignes, t.total_poids_kg) for t in test_tickets] == [
+        (0, Decimal("0")), (2, Decimal("3.000")), (2, Decimal("3.000"))
+    ]
+
+    service.recompute_ticket_totals()
+    for ticket in test_tickets:
+        db_session.refresh(ticket)
+    assert [(t.total_lignes, t.total_poids_kg) for t in test_tickets] == [
+        (0, Decimal("0")), (0, Decimal("0")), (2, Decimal("3.000"))
+    ]
@@ -0,0 +1,74 @@
+"""
+Tests for the per-request latency, SQL and Redis metrics middleware.
+"""
+import uuid
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from recyclic_api.core.redis import get_redis
+from recyclic_api.middleware.request_metrics import RequestMetricsMiddleware
+from recyclic_api.utils.metrics_registry import MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    registry = MetricsRegistry(key=f"test_request_metrics_{uuid.uuid4().hex}")
+    yield registry
+    get_redis().delete(registry.key)
+
+
+def _make_app(db_engine, registry, **kwargs) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        # One statement per "child": the N+1 pattern the middleware must surface
+        with db_engine.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT 1"))
+        get_redis().ping()
+        return {"id": item_id}
+
+    app.add_middleware(RequestMetricsMiddleware, registry=registry, **kwargs)
+    return app
+
+
+def test_records_route_template_with_db_and_redis_counts(db_engine, registry):
+    client = TestClient(_make_app(db_engine, registry, slow_request_ms=60000))
+
+    assert client.get("/items/1").status_code == 200
+    assert client.get("/items/2").status_code == 200
+
+    labels = {"method": "GET", "route": "/items/{item_id}"}
+    duration = registry.histogram("http_request_duration_ms", "").merged(status="2xx", **labels)
+    assert duration.count == 2
+    assert registry.histogram("http_request_db_queries", "").merged(**labels).sum == 6
+    assert registry.histogram("http_request_redis_calls", "").merged(**labels).sum == 2
+
+
+def test_unknown_path_is_grouped(db_engine, registry):
+    client = TestClient(_make_app(db_engine, registry))
+
+    assert client.get(f"/random/{uuid.uuid4()}").status_code == 404
+
+    snapshots = registry.histogram("http_request_duration_ms", "").snapshots()
+    assert list(snapshots) == [("GET", "unmatched", "4xx")]
+
+
+def test_slow_request_logs_top_statements(db_engine, registry):
+    client = TestClient(_make_app(db_engine, registry, slow_request_ms=0, top_statements=1))
+
+    with patch("recyclic_api.middleware.request_metrics.logger") as mock_logger:
+        client.get("/items/1")
+
+    mock_logger.warning.assert_called_once()
+    message = mock_logger.warning.call_args[0][0]
+    assert "GET /items/{item_id}" in message
+    assert "3x" in message and "SELECT 1" in message
+    extra = mock_logger.warning.call_args[1]["extra"]
+    assert extra["db_queries"] == 3
+    assert extra["redis_calls"] == 1
@@ -0,0 +1,103 @@
+"""
+Tests du cache Redis des réponses (ETag, invalidation par tags, copie périmée).
+"""
+import json
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from recyclic_api.core.redis import get_redis
+from recyclic_api.models.site import Site
+from recyclic_api.services.site_service import SiteService
+from recyclic_api.utils.response_cache import REFRESH_LOCK_PREFIX, invalidate_response_cache
+
+SITES_URL = "/api/v1/sites/?limit=137"
+
+
+@pytest.fixture(autouse=True)
+def response_cache(monkeypatch):
+    """Active le cache (désactivé sous tests) et nettoie ses clés Redis."""
+    monkeypatch.setattr("recyclic_api.utils.response_cache._is_test_mode", lambda: False)
+    redis_client = get_redis()
+    yield redis_client
+    keys = list(redis_client.scan_iter(match="response_cache:*"))
+    if keys:
+        redis_client.delete(*keys)
+
+
+@pytest.fixture
+def site(db_session: Session):
+    site = Site(name="Site en cache", address="1 rue du Cache", is_active=True)
+    db_session.add(site)
+    db_session.commit()
+    return site
+
+
+def _fail_list(*args, **kwargs):
+    raise AssertionError("the database should not be queried")
+
+
+def _database_down(*args, **kwargs):
+    raise OperationalError("SELECT", {}, Exception("connection refused"))
+
+
+def test_second_request_is_served_from_cache_with_etag(admin_client, site, monkeypatch):
+    first = admin_client.get(SITES_URL)
+    assert first.status_code == 200
+    assert first.headers["X-Cache"] == "MISS"
+    assert "Site en cache" in [item["name"] for item in first.json()]
+
+    monkeypatch.setattr(SiteService, "list", _fail_list)
+    second = admin_client.get(SITES_URL)
+
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+    not_modified = admin_client.get(SITES_URL, headers={"If-None-Match": first.headers["ETag"]})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+
+def test_write_endpoint_invalidates_cached_list(admin_client, site):
+    admin_client.get(SITES_URL)
+
+    created = admin_client.post("/api/v1/sites/", json={"name": "Site ajouté", "is_active": True})
+    assert created.status_code == 201
+
+    response = admin_client.get(SITES_URL)
+    assert response.headers["X-Cache"] == "MISS"
+    assert "Site ajouté" in [item["name"] for item in response.json()]
+
+
+def test_stale_copy_is_served_when_database_is_unavailable(admin_client, site, monkeypatch):
+    cached = admin_client.get(SITES_URL)
+    invalidate_response_cache("sites")
+
+    monkeypatch.setattr(SiteService, "list", _database_down)
+    response = admin_client.get(SITES_URL)
+
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "STALE"
+    assert response.json() == cached.json()
+
+
+def test_soft_expired_entry_is_refreshed_by_a_single_request(admin_client, site, response_cache, monkeypatch):
+    admin_client.get(SITES_URL)
+    key = next(response_cache.scan_iter(match="response_cache:entry:/api/v1/sites/*"))
+    entry = json.loads(response_cache.get(key))
+    entry["stored_at"] -= 3600
+    response_cache.set(key, json.dumps(entry))
+
+    # Another request is already refreshing the entry
+    response_cache.set(f"{REFRESH_LOCK_PREFIX}{key}", "1", ex=30)
+    monkeypatch.setattr(SiteService, "list", _fail_list)
+    assert admin_client.get(SITES_URL).headers["X-Cache"] == "STALE"
+
+    response_cache.delete(f"{REFRESH_LOCK_PREFIX}{key}")
+    monkeypatch.undo()
+    monkeypatch.setattr("recyclic_api.utils.response_cache._is_test_mode", lambda: False)
+    assert admin_client.get(SITES_URL).headers["X-Cache"] == "MISS"
+    assert admin_client.get(SITES_URL).headers["X-Cache"] == "HIT"
+    assert not response_cache.exists(f"{REFRESH_LOCK_PREFIX}{key}")
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import asyncio
+import os
 from pathlib import Path
 
 import pytest
@@ -126,6 +127,81 @@ def test_sync_directory_uploads_all_files(tmp_path: Path) -> None:
     assert ("/backup/nested/b.csv", str(file_b)) in client.uploads
 
 
+def test_sync_directory_skips_unchanged_files(tmp_path: Path) -> None:
+    base_dir = tmp_path / "exports"
+    base_dir.mkdir()
+    file_a = base_dir / "a.csv"
+    file_a.write_text("a", encoding="utf-8")
+    file_b = base_dir / "b.csv"
+    file_b.write_text("b", encoding="utf-8")
+
+    client = DummyClient()
+    service = KDriveSyncService(client_factory=_client_factory(client), max_retries=1, retry_delay_seconds=0)
+
+    assert set(service.sync_directory(base_dir, "/backup")) == {file_a, file_b}
+    assert (base_dir / sync_service.MANIFEST_FILENAME).exists()
+
+    # Second run: nothing changed, nothing uploaded (manifest itself is never pushed)
+    client.uploads.clear()
+    assert service.sync_directory(base_dir, "/backup") == []
+    assert client.uploads == []
+
+    # Only the modified file is sent again
+    file_b.write_text("b-modified", encoding="utf-8")
+    assert service.sync_directory(base_dir, "/backup") == [file_b]
+    assert client.uploads == [("/backup/b.csv", str(file_b))]
+
+
+def test_sync_directory_touched_file_with_same_content_is_skipped(tmp_path: Path) -> None:
+    base_dir = tmp_path / "exports"
+    base_dir.mkdir()
+    file_a = base_dir / "a.csv"
+    file_a.write_text("a", encoding="utf-8")
+
+    client = DummyClient()
+    service = KDriveSyncService(client_factory=_client_factory(client), max_retries=1, retry_delay_seconds=0)
+    service.sync_directory(base_dir, "/backup")
+
+    stat = file_a.stat()
+    os.utime(file_a, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    client.uploads.clear()
+
+    assert service.sync_directory(base_dir, "/backup") == []
+    assert client.uploads == []
+
+
+def test_sync_directory_retries_failed_upload_next_cycle(tmp_path: Path) -> None:
+    base_dir = tmp_path / "exports"
+    base_dir.mkdir()
+    file_a = base_dir / "a.csv"
+    file_a.write_text("a", encoding="utf-8")
+
+    client = DummyClient(failures_before_success=1)
+    service = KDriveSyncService(client_factory=_client_factory(client), max_retries=1, retry_delay_seconds=0)
+
+    assert service.sync_directory(base_dir, "/backup") == []
+    assert service.sync_directory(base_dir, "/backup") == [file_a]
+
+
+def test_sync_directory_checks_remote_directory_once_per_run(tmp_path: Path) -> None:
+    base_dir = tmp_path / "exports"
+    nested = base_dir / "nested"
+    nested.mkdir(parents=True)
+    for name in ("a.csv", "b.csv", "c.csv"):
+        (nested / name).write_text(name, encoding="utf-8")
+
+    client = DummyClient()
+    service = KDriveSyncService(
+        client_factory=_client_factory(client), max_retries=1, retry_delay_seconds=0, max_workers=1
+    )
+
+    service.sync_directory(base_dir, "/backup")
+
+    assert len(client.uploads) == 3
+    assert client.check_calls.count("/backup/nested") == 1
+    assert client.mkdir_calls == ["/backup/nested"]
+
+
 def test_schedule_periodic_sync_disabled(monkeypatch) -> None:
     monkeypatch.setattr(settings, "KDRIVE_SYNC_ENABLED", False)
     assert schedule_periodic_kdrive_sync() is None
@@ -591,9 +591,9 @@ const Settings: React.FC = () => {
   const handleFileSelect = (event: React.ChangeEvent<HTMLInputElement>) => {
     const file = event.target.files?.[0]
     if (file) {
-      // Vérifier que c'est un fichier SQL
-      if (!file.name.toLowerCase().endsWith('.sql')) {
-        alert('❌ Veuillez sélectionner un fichier SQL (.sql)')
+      // Vérifier que c'est une sauvegarde SQL ou pg_dump (format custom)
+      if (!/\.(sql|dump)$/i.test(file.name)) {
+        alert('❌ Veuillez sélectionner un fichier SQL (.sql) ou une sauvegarde pg_dump (.dump)')
         return
       }
       setSelectedFile(file)
@@ -1362,14 +1362,14 @@ const Settings: React.FC = () => {
           <ModalContent>
             <ModalTitle>📥 Import de sauvegarde</ModalTitle>
             <ModalText>
-              Sélectionnez un fichier SQL de sauvegarde à importer. Cette action remplacera
+              Sélectionnez un fichier de sauvegarde (.sql ou .dump) à importer. Cette action remplacera
               complètement la base de données existante.
             </ModalText>
             
             <div style={{ margin: '20px 0' }}>
               <input
                 type="file"
-                accept=".sql"
+                accept=".sql,.dump"
                 onChange={handleFileSelect}
                 style={{
                   width: '100%',
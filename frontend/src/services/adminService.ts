@@ -509,7 +509,8 @@ export const adminService = {
 
   /**
    * Importe une sauvegarde de base de données (réservé aux Super-Admins)
-   * Remplace la base de données existante par le contenu du fichier SQL
+   * Remplace la base de données existante par le contenu du fichier (.sql ou .dump).
+   * La restauration s'exécute côté serveur en tâche de fond : on suit le job jusqu'à sa fin.
    */
   async importDatabase(file: File): Promise<{ message: string; imported_file: string; backup_created: string; backup_path: string; timestamp: string }> {
     try {
@@ -521,11 +522,28 @@ export const adminService = {
         headers: {
           'Content-Type': 'multipart/form-data',
         },
-        timeout: 600000, // 10 minutes timeout (import peut être long)
+        timeout: 600000, // 10 minutes pour l'envoi du fichier
       });
 
-      console.log('Import de base de données réussi:', response.data);
-      return response.data;
+      const { job_id: jobId } = response.data;
+      // Suivi de la restauration jusqu'à sa fin
+      for (;;) {
+        await new Promise(resolve => setTimeout(resolve, 2000));
+        const { data: job } = await axiosClient.get(`/v1/admin/db/import/${jobId}`);
+        if (job.status === 'failed') {
+          throw new Error(job.error || 'Import de la base de données échoué');
+        }
+        if (job.status === 'completed') {
+          console.log('Import de base de données réussi:', job);
+          return {
+            message: 'Import de la base de données effectué avec succès',
+            imported_file: job.imported_file,
+            backup_created: job.backup_created,
+            backup_path: job.backup_path,
+            timestamp: job.finished_at,
+          };
+        }
+      }
     } catch (error) {
       console.error('Erreur lors de l\'import de la base de données:', error);
       throw error;